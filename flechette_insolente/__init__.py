@@ -1,6 +1,15 @@
 """A Python wrapper for dart-sass"""
-from importlib.metadata import version
 
 
 __pkgname__ = "flechette-insolente"
-__version__ = version(__pkgname__)
+
+
+def __getattr__(name):
+    # Reading package metadata is costly, it is only done once when requested
+    if name == "__version__":
+        from importlib.metadata import version
+
+        globals()[name] = version(__pkgname__)
+        return globals()[name]
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark for the cost of building executable arguments for a target.
+
+It compares a full ``ArgumentsModel`` which validates every options for each
+target with a ``CompileProfile`` which validates shared options once. Run it with: ::
+
+    python -m flechette_insolente.benchmarks.arguments
+"""
+import tempfile
+import timeit
+from pathlib import Path
+
+from ..compiler.arguments import ArgumentsModel, CompileProfile
+
+
+def measure(func, number, repeat=5):
+    """
+    Measure the duration of a function call.
+
+    Arguments:
+        func (callable): Function to call without arguments.
+        number (integer): Number of calls for each measure.
+
+    Keyword Arguments:
+        repeat (integer): Number of measures, the best one is kept since the other
+            ones are only slowed down by other processes.
+
+    Returns:
+        float: Duration in seconds of a single call.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def create_fixtures(directory, load_paths=3):
+    """
+    Create a source file and some load path directories.
+
+    Arguments:
+        directory (pathlib.Path): Directory where to create fixtures.
+
+    Keyword Arguments:
+        load_paths (integer): Number of load path directories to create.
+
+    Returns:
+        tuple: Source path, destination path and compile options.
+    """
+    source = directory / "main.scss"
+    source.write_text(".foo { color: red; }\n")
+
+    paths = []
+    for index in range(load_paths):
+        path = directory / "library_{}".format(index)
+        path.mkdir()
+        paths.append(path)
+
+    options = {
+        "style": "compressed",
+        "load_path": paths,
+        "source_map": False,
+    }
+
+    return source, directory / "main.css", options
+
+
+def benchmark_arguments(number=1000, repeat=5, load_paths=3):
+    """
+    Measure the per-target cost of building arguments.
+
+    Keyword Arguments:
+        number (integer): Number of targets for each measure.
+        repeat (integer): Number of measures.
+        load_paths (integer): Number of load paths in options.
+
+    Returns:
+        dict: Per-target duration in seconds with ``ArgumentsModel`` (``model``) and
+        with ``CompileProfile`` (``profile``), then the duration to create a profile
+        (``profile_setup``).
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source, destination, options = create_fixtures(
+            Path(tmpdir),
+            load_paths=load_paths,
+        )
+        profile = CompileProfile(**options)
+
+        return {
+            "number": number,
+            "model": measure(
+                lambda: ArgumentsModel(
+                    source,
+                    destination=destination,
+                    **options
+                ).cmd_args,
+                number,
+                repeat=repeat,
+            ),
+            "profile": measure(
+                lambda: profile.get_arguments(source, destination=destination),
+                number,
+                repeat=repeat,
+            ),
+            "profile_setup": measure(
+                lambda: CompileProfile(**options),
+                number,
+                repeat=repeat,
+            ),
+        }
+
+
+if __name__ == "__main__":
+    results = benchmark_arguments()
+
+    for name in ("model", "profile", "profile_setup"):
+        print("{}: {:.2f}µs".format(name, results[name] * 1000000))
@@ -0,0 +1,234 @@
+"""
+Generator of synthetic Sass projects to measure behaviors at scale.
+
+A generated project is made of entrypoints which load partials organized in levels,
+each partial loads some partials from the next level until the last one. Partials of
+the last level are stored in load path directories so their resolution goes through
+load paths.
+
+Generation is reproducible, the same settings and seed always produce the same
+files.
+"""
+import random
+from pathlib import Path
+
+
+class ProjectGenerator:
+    """
+    Build a synthetic Sass project.
+
+    Keyword Arguments:
+        entrypoints (integer): Number of entrypoints.
+        partials (integer): Total number of partials, spread evenly on levels.
+        fanout (integer): Number of partials loaded by each entrypoint or partial.
+        depth (integer): Number of partial levels, so the import depth.
+        load_paths (integer): Number of load path directories for the partials of
+            the last level. If zero, they stay in the project sources.
+        output_size (integer): Approximated size in characters of CSS rules in each
+            partial.
+        seed (integer): Random seed to pick loaded partials.
+    """
+    def __init__(self, entrypoints=10, partials=100, fanout=5, depth=3,
+                 load_paths=1, output_size=512, seed=42):
+        if depth < 1:
+            raise ValueError("Depth must be at least 1")
+
+        self.entrypoints = entrypoints
+        self.partials = max(partials, depth)
+        self.fanout = fanout
+        self.depth = depth
+        self.load_paths = load_paths
+        self.output_size = output_size
+        self.seed = seed
+
+    def get_levels(self):
+        """
+        Distribute partials on levels.
+
+        Returns:
+            list: Number of partials for each level.
+        """
+        size, remaining = divmod(self.partials, self.depth)
+
+        return [
+            size + (1 if index < remaining else 0)
+            for index in range(self.depth)
+        ]
+
+    def get_partial_url(self, level, index, sibling=False):
+        """
+        Get the URL to load a partial.
+
+        Partials of the last level are loaded from load paths, the other ones are
+        loaded relatively to the loading file.
+
+        Arguments:
+            level (integer): Partial level.
+            index (integer): Partial index in its level.
+
+        Keyword Arguments:
+            sibling (boolean): If True, URL is relative to another level directory
+                instead of the sources directory.
+
+        Returns:
+            string: URL without partial prefix and extension.
+        """
+        if level == self.depth - 1 and self.load_paths:
+            return "library/level_{}/item_{:05d}".format(level, index)
+
+        if sibling:
+            return "../level_{}/item_{:05d}".format(level, index)
+
+        return "components/level_{}/item_{:05d}".format(level, index)
+
+    def get_partial_path(self, directory, level, index):
+        """
+        Get the file path of a partial.
+
+        Arguments:
+            directory (pathlib.Path): Project directory.
+            level (integer): Partial level.
+            index (integer): Partial index in its level.
+
+        Returns:
+            pathlib.Path: Partial path.
+        """
+        url = self.get_partial_url(level, index)
+        name = "_{}.scss".format(Path(url).name)
+
+        if level == self.depth - 1 and self.load_paths:
+            root = directory / "load_path_{}".format(index % self.load_paths)
+        else:
+            root = directory / "scss"
+
+        return root / Path(url).parent / name
+
+    def get_rules(self, name):
+        """
+        Build CSS rules of approximated output size.
+
+        Arguments:
+            name (string): Unique name used in selectors and variable.
+
+        Returns:
+            string: Sass content with a variable and rules.
+        """
+        lines = ["${}-color: #336699;".format(name)]
+        length = 0
+        index = 0
+
+        while length < self.output_size:
+            rule = (
+                ".{name}-{index} {{ color: ${name}-color; padding: {index}px; }}"
+            ).format(name=name, index=index)
+            lines.append(rule)
+            length += len(rule)
+            index += 1
+
+        return lines
+
+    def get_loads(self, picker, level, count, sibling=False):
+        """
+        Pick the partials to load from a level.
+
+        Arguments:
+            picker (iterator): Iterator of partial indexes for the level.
+            level (integer): Level of partials to load.
+            count (integer): Number of partials in level.
+
+        Keyword Arguments:
+            sibling (boolean): If True, loading file is a partial from another
+                level.
+
+        Returns:
+            list: Loading rules.
+        """
+        indexes = set()
+        for index in picker:
+            indexes.add(index)
+            if len(indexes) >= min(self.fanout, count):
+                break
+
+        return [
+            '@use "{}" as *;'.format(
+                self.get_partial_url(level, index, sibling=sibling)
+            )
+            for index in sorted(indexes)
+        ]
+
+    def get_picker(self, rng, count):
+        """
+        Endless iterator on partial indexes of a level in random order.
+
+        Every partial is picked once before any one is picked again, so every
+        partial is loaded as long as there are enough loading files.
+
+        Arguments:
+            rng (random.Random): Random generator.
+            count (integer): Number of partials in level.
+
+        Yields:
+            integer: Partial index.
+        """
+        indexes = list(range(count))
+        while indexes:
+            rng.shuffle(indexes)
+            yield from indexes
+
+    def generate(self, directory):
+        """
+        Write project files.
+
+        Arguments:
+            directory (pathlib.Path): Directory where to write project, it is created
+                if needed.
+
+        Returns:
+            dict: Project summary with the sources directory, entrypoint paths, load
+            path directories and the count of written files and characters.
+        """
+        directory = Path(directory)
+        rng = random.Random(self.seed)
+        levels = self.get_levels()
+        summary = {
+            "sources": directory / "scss",
+            "entrypoints": [],
+            "load_paths": [
+                directory / "load_path_{}".format(index)
+                for index in range(self.load_paths)
+            ],
+            "files": 0,
+            "size": 0,
+        }
+
+        def write(path, lines):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            content = "\n".join(lines) + "\n"
+            path.write_text(content)
+            summary["files"] += 1
+            summary["size"] += len(content)
+
+        pickers = [self.get_picker(rng, count) for count in levels]
+
+        for index in range(self.entrypoints):
+            path = directory / "scss" / "main_{:05d}.scss".format(index)
+            write(path, self.get_loads(pickers[0], 0, levels[0]))
+            summary["entrypoints"].append(path)
+
+        for level, count in enumerate(levels):
+            for index in range(count):
+                lines = []
+                if level + 1 < self.depth:
+                    lines.extend(self.get_loads(
+                        pickers[level + 1],
+                        level + 1,
+                        levels[level + 1],
+                        sibling=True,
+                    ))
+                lines.extend(self.get_rules("l{}-i{}".format(level, index)))
+                write(self.get_partial_path(directory, level, index), lines)
+
+        for path in summary["load_paths"]:
+            path.mkdir(parents=True, exist_ok=True)
+
+        return summary
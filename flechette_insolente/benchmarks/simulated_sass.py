@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+A simulated dart-sass executable for benchmarks.
+
+It accepts the same command line arguments as the dart-sass executable but does not
+compile anything. It waits for a given latency, then outputs generated CSS of a given
+size, either to the destinations or to standard output.
+
+Simulation settings are given with options which must come before any dart-sass
+arguments: ::
+
+    python simulated_sass.py --simulate-latency 0.05 --simulate-size 10240 a.scss
+
+This script only imports modules from the standard library that are already loaded
+by the interpreter, so its own startup cost stays close to the interpreter's.
+"""
+import sys
+import time
+
+
+VERSION = "0.0.0-simulated"
+
+SIMULATION_OPTIONS = ("--simulate-latency", "--simulate-size")
+
+# Options from dart-sass which expect a value
+VALUE_OPTIONS = ("--style", "--load-path")
+
+
+def generate_css(size):
+    """
+    Generate CSS content of an exact size.
+
+    Arguments:
+        size (integer): Content size in characters.
+
+    Returns:
+        string: CSS content.
+    """
+    rule = ".selector-{:06d} {{ color: #123456; }}\n"
+    rules = []
+    length = 0
+    index = 0
+
+    while length < size:
+        item = rule.format(index)
+        rules.append(item)
+        length += len(item)
+        index += 1
+
+    return "".join(rules)[:size]
+
+
+def parse_arguments(args):
+    """
+    Parse simulation settings and dart-sass arguments.
+
+    Arguments:
+        args (list): Command line arguments.
+
+    Returns:
+        dict: Parsed settings and arguments.
+    """
+    settings = {
+        "latency": 0.0,
+        "size": 1024,
+        "version": False,
+        "stdin": False,
+        "positionals": [],
+    }
+
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg == "--simulate-latency":
+            settings["latency"] = float(args.pop(0))
+        elif arg == "--simulate-size":
+            settings["size"] = int(args.pop(0))
+        elif arg == "--version":
+            settings["version"] = True
+        elif arg == "--stdin":
+            settings["stdin"] = True
+        elif arg in VALUE_OPTIONS:
+            args.pop(0)
+        elif not arg.startswith("--"):
+            settings["positionals"].append(arg)
+
+    return settings
+
+
+def get_destinations(settings):
+    """
+    Get destinations to write from positional arguments.
+
+    Arguments:
+        settings (dict): Parsed settings and arguments.
+
+    Returns:
+        list: Destination paths, ``None`` stands for standard output.
+    """
+    positionals = settings["positionals"]
+
+    if settings["stdin"]:
+        return positionals[:1] or [None]
+
+    if len(positionals) == 2 and ":" not in positionals[0]:
+        return [positionals[1]]
+
+    return [
+        item.rsplit(":", 1)[1] if ":" in item else None
+        for item in positionals
+    ]
+
+
+def main(args):
+    settings = parse_arguments(args)
+
+    if settings["version"]:
+        sys.stdout.write(VERSION + "\n")
+        return 0
+
+    if settings["stdin"]:
+        sys.stdin.read()
+
+    time.sleep(settings["latency"])
+
+    css = generate_css(settings["size"])
+    for destination in get_destinations(settings):
+        if destination is None:
+            sys.stdout.write(css)
+        else:
+            with open(destination, "w") as fp:
+                fp.write(css)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,361 @@
+"""
+Benchmark suite for the compile pipeline.
+
+Benchmarks run against the simulated dart-sass executable from
+``flechette_insolente.benchmarks.simulated_sass`` so they do not depend on the
+installed dart-sass, its version or the Sass sources. Every benchmark is measured
+for each iteration, its durations are summarized with percentiles.
+
+Results can be saved to JSON and compared to a baseline saved from a previous run to
+find regressions.
+"""
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ..compiler.arguments import ArgumentsModel, CompileProfile
+from ..compiler.compiler import DartSassCompiler
+from ..compiler.graph import DependencyGraph
+from ..utils.jsons import ExtendedJsonEncoder
+from ..utils.system import get_cpu_count
+from . import simulated_sass
+from .generator import ProjectGenerator
+
+
+# Statistics which can be used to compare results
+COMPARABLE_METRICS = ("mean", "p50", "p90", "p99")
+
+
+def get_percentile(durations, percent):
+    """
+    Compute a percentile with linear interpolation.
+
+    Arguments:
+        durations (list): Sorted durations.
+        percent (float): Percentile to compute, between 0 and 100.
+
+    Returns:
+        float: Percentile value.
+    """
+    if not durations:
+        return None
+
+    position = (len(durations) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+
+    return durations[lower] + (durations[upper] - durations[lower]) * (
+        position - lower
+    )
+
+
+def get_statistics(durations, elapsed=None):
+    """
+    Summarize durations.
+
+    Arguments:
+        durations (list): Duration in seconds of each iteration.
+
+    Keyword Arguments:
+        elapsed (float): Total elapsed time in seconds, default to the sum of
+            durations. It differs from the sum when iterations run concurrently.
+
+    Returns:
+        dict: Statistics with count, mean, min, max, percentiles and throughput in
+        iterations per second.
+    """
+    durations = sorted(durations)
+    if elapsed is None:
+        elapsed = sum(durations)
+
+    return {
+        "count": len(durations),
+        "mean": sum(durations) / len(durations) if durations else None,
+        "min": durations[0] if durations else None,
+        "max": durations[-1] if durations else None,
+        "p50": get_percentile(durations, 50),
+        "p90": get_percentile(durations, 90),
+        "p99": get_percentile(durations, 99),
+        "throughput": len(durations) / elapsed if elapsed else None,
+    }
+
+
+class BenchmarkSuite:
+    """
+    Measure the cost of each step of the compile pipeline.
+
+    Available benchmarks are:
+
+    arguments
+        Build executable arguments with ``ArgumentsModel``;
+    profile
+        Build executable arguments with a ``CompileProfile``;
+    spawn
+        Run the executable for its version, this is mostly the process spawn;
+    capture
+        Compile without destination so output is captured and decoded;
+    compile
+        Compile to a destination file;
+    parallel
+        Compile many targets concurrently with ``compile_parallel()``;
+    graph
+        Build the dependency graph of a generated project from scratch.
+
+    Keyword Arguments:
+        iterations (integer): Number of iterations for each benchmark.
+        latency (float): Simulated compile latency in seconds.
+        output_size (integer): Simulated CSS output size in characters.
+        jobs (integer): Number of concurrent jobs for ``parallel`` benchmark.
+            Default to the number of usable CPUs.
+        executable (list): A custom executable to use instead of the simulated one.
+        project (dict): Arguments for ``ProjectGenerator`` to generate the project
+            used by ``graph`` benchmark.
+    """
+    BENCHMARKS = (
+        "arguments", "profile", "spawn", "capture", "compile", "parallel", "graph",
+    )
+
+    def __init__(self, iterations=20, latency=0.0, output_size=10240, jobs=None,
+                 executable=None, project=None):
+        self.iterations = iterations
+        self.project = project or {"entrypoints": 10, "partials": 200}
+        self.latency = latency
+        self.output_size = output_size
+        self.jobs = jobs or get_cpu_count()
+        self.executable = executable or [
+            sys.executable,
+            simulated_sass.__file__,
+            "--simulate-latency", str(latency),
+            "--simulate-size", str(output_size),
+        ]
+
+    def get_settings(self):
+        return {
+            "iterations": self.iterations,
+            "latency": self.latency,
+            "output_size": self.output_size,
+            "jobs": self.jobs,
+            "executable": self.executable,
+            "project": self.project,
+        }
+
+    def get_environment(self):
+        return {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpus": get_cpu_count(),
+        }
+
+    def create_fixtures(self, directory):
+        """
+        Create the Sass source and load path used by benchmarks.
+
+        Arguments:
+            directory (pathlib.Path): Directory where to create fixtures.
+
+        Returns:
+            dict: Options given to compiler.
+        """
+        (directory / "main.scss").write_text(".foo { color: red; }\n")
+        (directory / "library").mkdir()
+        (directory / "css").mkdir()
+
+        return {
+            "style": "expanded",
+            "load_path": [directory / "library"],
+            "source_map": False,
+        }
+
+    def _timed(self, func):
+        durations = []
+        for index in range(self.iterations):
+            start = time.perf_counter()
+            func(index)
+            durations.append(time.perf_counter() - start)
+
+        return durations, None
+
+    def bench_arguments(self, compiler, directory, options):
+        source = directory / "main.scss"
+
+        return self._timed(lambda index: ArgumentsModel(
+            source,
+            destination=directory / "css" / "main.css",
+            **options
+        ).cmd_args)
+
+    def bench_profile(self, compiler, directory, options):
+        source = directory / "main.scss"
+        profile = CompileProfile(**options)
+
+        return self._timed(lambda index: profile.get_arguments(
+            source,
+            destination=directory / "css" / "main.css",
+        ))
+
+    def bench_spawn(self, compiler, directory, options):
+        return self._timed(lambda index: compiler.version())
+
+    def bench_capture(self, compiler, directory, options):
+        source = directory / "main.scss"
+
+        return self._timed(lambda index: compiler.compile(source, **options))
+
+    def bench_compile(self, compiler, directory, options):
+        source = directory / "main.scss"
+
+        return self._timed(lambda index: compiler.compile(
+            source,
+            destination=directory / "css" / "main_{}.css".format(index),
+            **options
+        ))
+
+    def bench_parallel(self, compiler, directory, options):
+        source = directory / "main.scss"
+        pairs = [
+            (source, directory / "css" / "parallel_{}.css".format(index))
+            for index in range(self.iterations)
+        ]
+
+        start = time.perf_counter()
+        results = list(compiler.compile_parallel(pairs, jobs=self.jobs, **options))
+        elapsed = time.perf_counter() - start
+
+        failures = [item for item in results if not item.success]
+        if failures:
+            raise failures[0].error
+
+        return [item.duration for item in results], elapsed
+
+    def bench_graph(self, compiler, directory, options):
+        project = ProjectGenerator(**self.project).generate(directory / "project")
+
+        return self._timed(lambda index: DependencyGraph(
+            load_paths=project["load_paths"],
+        ).build([project["sources"]]))
+
+    def run(self, names=None, callback=None):
+        """
+        Run benchmarks.
+
+        Keyword Arguments:
+            names (list): Names of benchmarks to run, default to all of them.
+            callback (callable): Function called with the name and statistics of
+                each benchmark once done.
+
+        Returns:
+            dict: Results with settings, environment and statistics of each
+            benchmark.
+        """
+        names = names or self.BENCHMARKS
+        compiler = DartSassCompiler(executable=self.executable)
+        benchmarks = {}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            directory = Path(tmpdir)
+            options = self.create_fixtures(directory)
+
+            for name in names:
+                method = getattr(self, "bench_{}".format(name))
+                durations, elapsed = method(compiler, directory, options)
+                benchmarks[name] = get_statistics(durations, elapsed=elapsed)
+
+                if callback:
+                    callback(name, benchmarks[name])
+
+        return {
+            "settings": self.get_settings(),
+            "environment": self.get_environment(),
+            "benchmarks": benchmarks,
+        }
+
+
+def save_results(results, path):
+    """
+    Save results to a JSON file.
+
+    Arguments:
+        results (dict): Results as returned from ``BenchmarkSuite.run()``.
+        path (pathlib.Path): File path to write.
+    """
+    Path(path).write_text(json.dumps(results, indent=4, cls=ExtendedJsonEncoder))
+
+
+def load_results(path):
+    """
+    Load results from a JSON file.
+
+    Arguments:
+        path (pathlib.Path): File path to read.
+
+    Returns:
+        dict: Results.
+    """
+    return json.loads(Path(path).read_text())
+
+
+def compare_results(results, baseline, tolerance=0.25, metric="p50"):
+    """
+    Find regressions from a baseline.
+
+    Only the benchmarks present in both results are compared.
+
+    Arguments:
+        results (dict): Current results.
+        baseline (dict): Reference results.
+
+    Keyword Arguments:
+        tolerance (float): Allowed slowdown ratio, ``0.25`` means a benchmark can be
+            up to 25% slower than its baseline.
+        metric (string): Statistic to compare, one of ``COMPARABLE_METRICS``.
+
+    Returns:
+        list: Regression details for each benchmark which is slower than allowed.
+    """
+    regressions = []
+
+    for name, stats in results["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name, {}).get(metric)
+        if not reference or stats.get(metric) is None:
+            continue
+
+        ratio = stats[metric] / reference
+        if ratio > 1 + tolerance:
+            regressions.append({
+                "name": name,
+                "metric": metric,
+                "baseline": reference,
+                "current": stats[metric],
+                "ratio": ratio,
+            })
+
+    return regressions
+
+
+def format_statistics(name, stats):
+    """
+    Format statistics of a benchmark on a single line.
+
+    Arguments:
+        name (string): Benchmark name.
+        stats (dict): Benchmark statistics.
+
+    Returns:
+        string: Formatted statistics with durations in milliseconds.
+    """
+    return (
+        "{name}: p50={p50:.3f}ms p90={p90:.3f}ms p99={p99:.3f}ms "
+        "mean={mean:.3f}ms throughput={throughput:.1f}/s"
+    ).format(
+        name=name,
+        p50=stats["p50"] * 1000,
+        p90=stats["p90"] * 1000,
+        p99=stats["p99"] * 1000,
+        mean=stats["mean"] * 1000,
+        throughput=stats["throughput"],
+    )
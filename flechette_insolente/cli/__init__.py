@@ -1,3 +1,5 @@
+import importlib
+
 import click
 
 
@@ -51,3 +53,30 @@ def add_arguments(arguments, options):
         return func
 
     return _add_arguments
+
+
+class LazyGroup(click.Group):
+    """
+    A Click group which imports its commands only when they are invoked.
+
+    This avoids to import every command modules and their dependencies when only a
+    single command is used.
+
+    Keyword Arguments:
+        lazy_commands (dict): Import paths of command objects in format
+            ``module:attribute`` indexed on command names.
+    """
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, attribute = self.lazy_commands[cmd_name].split(":")
+            module = importlib.import_module(module_name)
+            self.add_command(getattr(module, attribute), name=cmd_name)
+
+        return super().get_command(ctx, cmd_name)
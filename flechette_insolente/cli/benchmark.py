@@ -0,0 +1,229 @@
+import logging
+from pathlib import Path
+
+import click
+
+
+@click.group()
+def benchmark_command():
+    """
+    Benchmarks for the compile pipeline.
+    """
+    pass
+
+
+@benchmark_command.command("run")
+@click.option(
+    "--name",
+    "names",
+    multiple=True,
+    type=click.Choice([
+        "arguments", "profile", "spawn", "capture", "compile", "parallel", "graph",
+    ]),
+    help=(
+        "Name of a benchmark to run. May be passed multiple times. Default to run "
+        "every benchmarks."
+    ),
+)
+@click.option(
+    "--iterations",
+    metavar="INTEGER",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of iterations for each benchmark.",
+)
+@click.option(
+    "--latency",
+    metavar="FLOAT",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    show_default=True,
+    help="Simulated compile latency in seconds.",
+)
+@click.option(
+    "--output-size",
+    metavar="INTEGER",
+    type=click.IntRange(min=0),
+    default=10240,
+    show_default=True,
+    help="Simulated CSS output size in characters.",
+)
+@click.option(
+    "--jobs",
+    metavar="INTEGER",
+    type=click.IntRange(min=0),
+    default=None,
+    help=(
+        "Number of concurrent jobs for 'parallel' benchmark. Default to the number "
+        "of usable CPUs."
+    ),
+)
+@click.option(
+    "--output",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="A file where to save results as JSON.",
+)
+@click.option(
+    "--baseline",
+    metavar="PATH",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help=(
+        "A JSON file of previous results to compare with. Command fails if a "
+        "benchmark is slower than its baseline."
+    ),
+)
+@click.option(
+    "--tolerance",
+    metavar="FLOAT",
+    type=click.FloatRange(min=0),
+    default=0.25,
+    show_default=True,
+    help="Allowed slowdown ratio from baseline, '0.25' allows 25%.",
+)
+@click.option(
+    "--metric",
+    type=click.Choice(["mean", "p50", "p90", "p99"]),
+    default="p50",
+    show_default=True,
+    help="Statistic to compare with baseline.",
+)
+@click.pass_context
+def benchmark_run_command(context, names, iterations, latency, output_size, jobs,
+                          output, baseline, tolerance, metric):
+    """
+    Run benchmarks against a simulated dart-sass executable.
+    """
+    from ..benchmarks.suite import (
+        BenchmarkSuite, compare_results, format_statistics, load_results,
+        save_results,
+    )
+
+    logger = logging.getLogger("flechette-insolente")
+
+    suite = BenchmarkSuite(
+        iterations=iterations,
+        latency=latency,
+        output_size=output_size,
+        jobs=jobs,
+    )
+
+    results = suite.run(
+        names=names,
+        callback=lambda name, stats: click.echo(format_statistics(name, stats)),
+    )
+
+    if output:
+        save_results(results, output)
+        logger.info("Results saved to {}".format(output))
+
+    if baseline:
+        regressions = compare_results(
+            results,
+            load_results(baseline),
+            tolerance=tolerance,
+            metric=metric,
+        )
+
+        for item in regressions:
+            logger.error(
+                "Regression on {name}: {metric} is {current:.3f}ms against "
+                "{baseline:.3f}ms ({ratio:.2f}x)".format(
+                    name=item["name"],
+                    metric=item["metric"],
+                    current=item["current"] * 1000,
+                    baseline=item["baseline"] * 1000,
+                    ratio=item["ratio"],
+                )
+            )
+
+        if regressions:
+            raise click.Abort()
+
+
+@benchmark_command.command("generate")
+@click.argument(
+    "destination",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+)
+@click.option(
+    "--entrypoints",
+    metavar="INTEGER",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of entrypoints.",
+)
+@click.option(
+    "--partials",
+    metavar="INTEGER",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Total number of partials, spread evenly on levels.",
+)
+@click.option(
+    "--fanout",
+    metavar="INTEGER",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Number of partials loaded by each entrypoint or partial.",
+)
+@click.option(
+    "--depth",
+    metavar="INTEGER",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Number of partial levels, so the import depth.",
+)
+@click.option(
+    "--load-paths",
+    metavar="INTEGER",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of load path directories for the partials of the last level.",
+)
+@click.option(
+    "--output-size",
+    metavar="INTEGER",
+    type=click.IntRange(min=0),
+    default=512,
+    show_default=True,
+    help="Approximated size in characters of CSS rules in each partial.",
+)
+@click.option(
+    "--seed",
+    metavar="INTEGER",
+    type=int,
+    default=42,
+    show_default=True,
+    help="Random seed, a same seed with same options generate the same project.",
+)
+@click.pass_context
+def benchmark_generate_command(context, destination, **kwargs):
+    """
+    Generate a synthetic Sass project in DESTINATION directory.
+    """
+    from ..benchmarks.generator import ProjectGenerator
+
+    logger = logging.getLogger("flechette-insolente")
+
+    if destination.exists() and any(destination.iterdir()):
+        raise click.UsageError(
+            "Destination directory is not empty: {}".format(destination)
+        )
+
+    summary = ProjectGenerator(**kwargs).generate(destination)
+
+    logger.info("Generated {} files ({} characters) in {}".format(
+        summary["files"],
+        summary["size"],
+        destination,
+    ))
+    click.echo("Sources: {}".format(summary["sources"]))
+    for path in summary["load_paths"]:
+        click.echo("Load path: {}".format(path))
@@ -1,18 +1,450 @@
+import json
 import logging
+import sqlite3
+import sys
+from pathlib import Path
 
 import click
 
-from ..compiler import ArgumentsModel, DartSassCompiler
-from ..exceptions import RunnedCommandError
+from ..compiler import (
+    ArgumentsModel, BatchArgumentsModel, BuildManifest, CachedDartSassCompiler,
+    CompileHistory, CompileMetrics, CompileProfile, CompileWatcher,
+    DartSassCompiler, ParallelExecutor, ResourceGovernor, StatCache,
+    TimingsCollector, TraceRecorder, get_affected_targets, get_history_path,
+    read_jobs, select_shard,
+)
+from ..compiler.cache import get_command_signature
+from ..compiler.resources import format_resources, summarize_resources
+from ..daemon import DaemonClient
+from ..exceptions import (
+    CommandArgumentsError, DaemonError, GitError, RunnedCommandError,
+)
+from ..utils.git import get_changed_files
+from ..utils.jsons import ExtendedJsonEncoder
 
 from . import CLICK_COERCE_TYPES, add_arguments
 
 
+def parse_pair(value):
+    """
+    Parse a ``SOURCE:DESTINATION`` pair.
+
+    The last colon is used as separator to keep Windows drive letters in source.
+
+    Arguments:
+        value (string): Pair to parse.
+
+    Returns:
+        tuple: Source and destination.
+    """
+    if ":" not in value:
+        raise click.BadParameter(
+            "Pair must be in format SOURCE:DESTINATION: {}".format(value)
+        )
+
+    return tuple(value.rsplit(":", 1))
+
+
+def validate_pairs(context, param, value):
+    """
+    Click callback to parse every given pairs.
+    """
+    return [parse_pair(item) for item in value]
+
+
+def validate_shard(context, param, value):
+    """
+    Click callback to parse a ``INDEX/COUNT`` shard.
+    """
+    if value is None:
+        return None
+
+    try:
+        index, count = [int(item) for item in value.split("/")]
+    except ValueError:
+        raise click.BadParameter(
+            "Shard must be in format INDEX/COUNT: {}".format(value)
+        )
+
+    if count < 1 or not 1 <= index <= count:
+        raise click.BadParameter(
+            "Shard index must be between 1 and its count: {}".format(value)
+        )
+
+    return index, count
+
+
+def require_destinations(targets, option):
+    """
+    Ensure every target has a destination.
+
+    Arguments:
+        targets (list): List of ``(source, destination)`` tuples.
+        option (string): Name of the option which requires them.
+
+    Returns:
+        list: Given targets.
+    """
+    if not all(destination for _, destination in targets):
+        raise click.UsageError(
+            "A destination is required with '{}'.".format(option)
+        )
+
+    return targets
+
+
+def open_history(path=None):
+    """
+    Open the compile history store.
+
+    Keyword Arguments:
+        path (pathlib.Path): Store file path. Default to the one from
+            ``get_history_path()``.
+
+    Returns:
+        CompileHistory: Store object, ``None`` if it can not be opened.
+    """
+    logger = logging.getLogger("flechette-insolente")
+
+    try:
+        return CompileHistory(path or get_history_path())
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Compile history is disabled: {}".format(e))
+
+    return None
+
+
+def compile_jobs(compiler, lines, defaults, jobs=None, governor=None,
+                 history=None):
+    """
+    Compile jobs from JSON lines and output a JSON line with the result of each
+    job as soon as it is finished.
+
+    Arguments:
+        compiler (DartSassCompiler): Compiler to use.
+        lines (iterable): JSON lines of job specifications, like a file object.
+        defaults (dict): Compile options for the ones missing from jobs.
+
+    Keyword Arguments:
+        jobs (integer): Maximum number of concurrent compiles.
+        governor (ResourceGovernor): Governor to adjust the number of concurrent
+            compiles.
+        history (CompileHistory): Store where to record compiles and to get the
+            timeout of jobs from.
+
+    Returns:
+        integer: Number of failed jobs.
+    """
+    logger = logging.getLogger("flechette-insolente")
+
+    build = None
+    if history:
+        build = history.start_build()
+
+    def get_jobs():
+        for job in read_jobs(lines, defaults=defaults):
+            if job.error is None and history:
+                # Jobs come one at a time so only the timeout of each one is read,
+                # it never goes below the compiler one
+                target = (job.source, job.destination)
+                job.timeout = history.get_timeouts(
+                    [target],
+                    minimum=getattr(compiler, "command_timeout", None),
+                ).get(history.get_key(*target))
+            yield job
+
+    executor = ParallelExecutor(compiler, jobs=jobs, governor=governor)
+    count = 0
+    failures = 0
+
+    try:
+        for job, result in executor.run_jobs(get_jobs()):
+            count += 1
+            if not result.success:
+                failures += 1
+            if history and job.error is None:
+                history.record(build, result)
+
+            click.echo(json.dumps(job.get_result_dict(result), cls=ExtendedJsonEncoder))
+    finally:
+        if history:
+            history.prune()
+
+    logger.info("Finished {} job(s) with {} failure(s)".format(count, failures))
+
+    return failures
+
+
+def echo_results(results):
+    """
+    Output the status of each compile result then the summary of resource usage.
+
+    Arguments:
+        results (iterable): ``CompileResult`` objects.
+
+    Returns:
+        integer: Count of failed targets.
+    """
+    logger = logging.getLogger("flechette-insolente")
+    failures = 0
+    done = []
+
+    for result in results:
+        done.append(result)
+        if result.success:
+            logger.info("Compiled {} to {}".format(result.source, result.destination))
+        else:
+            failures += 1
+            if isinstance(result.error, RunnedCommandError):
+                print(result.error.get_payload_details())
+            logger.error("Failed to compile {}: {}".format(result.source, result.error))
+
+    resources = summarize_resources(done)
+    if resources:
+        logger.info("Resources: {}".format(format_resources(resources)))
+
+    return failures
+
+
+def compile_with_daemon(socket_path, targets, options, jobs=None, single=False):
+    """
+    Send targets to a compile daemon and output its results like a local compile.
+
+    Arguments:
+        socket_path (pathlib.Path): Socket of the daemon, default socket if ``None``.
+        targets (list): List of ``(source, destination)`` tuples.
+        options (dict): Shared compile options.
+
+    Keyword Arguments:
+        jobs (integer): Maximum number of concurrent compiles.
+        single (boolean): If True, target has been given with SOURCE argument so its
+            output is printed.
+    """
+    logger = logging.getLogger("flechette-insolente")
+
+    try:
+        results = DaemonClient(socket_path).compile(
+            targets,
+            options=options,
+            jobs=jobs or None,
+        )
+    except DaemonError as e:
+        logger.critical(e)
+        raise click.Abort()
+
+    if single:
+        result = results[0]
+        if not result.success:
+            if isinstance(result.error, RunnedCommandError):
+                print(result.error.get_payload_details())
+            logger.critical(result.error)
+            raise click.Abort()
+
+        click.echo(result.output)
+    elif echo_results(results):
+        raise click.Abort()
+
+
 @click.command()
 @add_arguments(
     ArgumentsModel.get_cli_arguments(CLICK_COERCE_TYPES),
     ArgumentsModel.get_cli_options(CLICK_COERCE_TYPES),
 )
+@click.option(
+    "--pair",
+    "pairs",
+    metavar="SOURCE:DESTINATION",
+    multiple=True,
+    callback=validate_pairs,
+    help=(
+        "A source and destination pair to compile. May be passed multiple times to "
+        "compile many targets in a single dart-sass execution. Cannot be used with "
+        "SOURCE and DESTINATION arguments."
+    ),
+)
+@click.option(
+    "--jobs-from",
+    metavar="FILE",
+    type=click.File("r"),
+    default=None,
+    help=(
+        "Read compile jobs from this file of JSON lines, use '-' for standard "
+        "input. Each job is an object with a 'source' and optional 'destination', "
+        "'style', 'load_paths', 'source_map', 'indented' and 'id' keys, missing "
+        "options are taken from command options. Jobs are compiled concurrently as "
+        "they come and a JSON line is written to standard output with the result of "
+        "each job once it is finished. Cannot be used with SOURCE or '--pair'."
+    ),
+)
+@click.option(
+    "--jobs",
+    metavar="INTEGER",
+    type=click.IntRange(min=0),
+    default=None,
+    help=(
+        "Compile pairs concurrently with this number of dart-sass processes instead "
+        "of a single one. Use '0' to follow the number of usable CPUs."
+    ),
+)
+@click.option(
+    "--adaptive",
+    is_flag=True,
+    help=(
+        "With '--jobs', adjust the number of concurrent dart-sass processes while "
+        "compiling, from available memory (including cgroup limit), memory pressure "
+        "and timeouts. The '--jobs' value is the maximum."
+    ),
+)
+@click.option(
+    "--memory-limit",
+    metavar="MIB",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        "Maximum virtual memory in MiB for each dart-sass process. Dart reserves a "
+        "lot of virtual memory so this must be far above the expected usage. Only "
+        "supported on Linux."
+    ),
+)
+@click.option(
+    "--cpu-limit",
+    metavar="SECONDS",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        "Maximum CPU time in seconds for each dart-sass process. Only supported on "
+        "Linux."
+    ),
+)
+@click.option(
+    "--cache-dir",
+    metavar="PATH",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help=(
+        "Directory for compile cache. A compile is restored from cache when its "
+        "sources, loaded files, options and dart-sass version did not change. Pairs "
+        "are only cached when compiled with '--jobs'."
+    ),
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help=(
+        "Compile then watch sources for changes to compile again only the affected "
+        "entrypoints. A destination is required for every target."
+    ),
+)
+@click.option(
+    "--poll",
+    is_flag=True,
+    help=(
+        "With '--watch', poll sources for changes instead of using inotify."
+    ),
+)
+@click.option(
+    "--timings",
+    is_flag=True,
+    help=(
+        "Output a summary of time spent in each phase of dart-sass executions "
+        "(validation, spawn, wait and decode) once finished."
+    ),
+)
+@click.option(
+    "--metrics",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=(
+        "File where to write compile metrics in Prometheus text format once "
+        "finished. With '--watch' it is written again after each build."
+    ),
+)
+@click.option(
+    "--trace",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=(
+        "File where to write a trace of compiles in the Chrome trace event format "
+        "once finished, to open with Perfetto or 'chrome://tracing'. It shows the "
+        "phases of each target for every worker."
+    ),
+)
+@click.option(
+    "--changed-since",
+    metavar="REVISION",
+    default=None,
+    help=(
+        "Only compile the targets affected by files changed in the git repository "
+        "of current directory since this revision, including uncommitted and "
+        "untracked files. Affected targets are found from their imports, including "
+        "load paths, and compiled concurrently. Directory sources are expanded to "
+        "their entrypoints. A destination is required for every target."
+    ),
+)
+@click.option(
+    "--shard",
+    metavar="INDEX/COUNT",
+    callback=validate_shard,
+    default=None,
+    help=(
+        "Only compile a shard of targets, like '2/4' for the second of four shards, "
+        "to spread a build across many machines. Every machine gets the same "
+        "partition from the same targets. Shards are balanced from compile "
+        "durations recorded in '--manifest' if any, else from source sizes. "
+        "Directory sources are expanded to their entrypoints. A destination is "
+        "required for every target."
+    ),
+)
+@click.option(
+    "--manifest",
+    "manifest_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=(
+        "Build manifest file. Targets whose sources, loaded files, output and "
+        "arguments did not change since they have been recorded are skipped. A "
+        "destination is required for every target."
+    ),
+)
+@click.option(
+    "--history",
+    "history_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=(
+        "SQLite file where to record duration, output size and peak memory of "
+        "compiled targets, used with '--jobs' to start the longest targets first "
+        "and to set the timeout of each target. Default to a file in the user "
+        "cache directory. It is only written for builds of many targets, like with "
+        "'--pair', without '--watch' or '--daemon'."
+    ),
+)
+@click.option(
+    "--no-history",
+    is_flag=True,
+    help="Do not use or record compile history.",
+)
+@click.option(
+    "--daemon",
+    is_flag=True,
+    help=(
+        "Send compile to a daemon started with 'serve' instead of running it, so "
+        "it uses warm compilers and caches. Cannot be used with '--watch', "
+        "'--timings', '--metrics' or '--trace'."
+    ),
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="With '--daemon', Unix socket of the daemon.",
+)
 @click.pass_context
 def compile_command(context, **kwargs):
     """
@@ -26,6 +458,25 @@ def compile_command(context, **kwargs):
     load_path = kwargs["load_path"]
     indented = kwargs["indented"]
     source_map = kwargs["source_map"]
+    pairs = kwargs["pairs"]
+    jobs = kwargs["jobs"]
+    adaptive = kwargs["adaptive"]
+    memory_limit = kwargs["memory_limit"]
+    cpu_limit = kwargs["cpu_limit"]
+    cache_dir = kwargs["cache_dir"]
+    watch = kwargs["watch"]
+    poll = kwargs["poll"]
+    timings = kwargs["timings"]
+    metrics = kwargs["metrics"]
+    trace = kwargs["trace"]
+    changed_since = kwargs["changed_since"]
+    shard = kwargs["shard"]
+    manifest_path = kwargs["manifest_path"]
+    jobs_from = kwargs["jobs_from"]
+    history_path = kwargs["history_path"]
+    no_history = kwargs["no_history"]
+    daemon = kwargs["daemon"]
+    socket_path = kwargs["socket_path"]
 
     logger.debug("source: {}".format(source))
     logger.debug("destination: {}".format(destination))
@@ -33,20 +484,296 @@ def compile_command(context, **kwargs):
     logger.debug("load_path: {}".format(load_path))
     logger.debug("indented: {}".format(indented))
     logger.debug("source_map: {}".format(source_map))
+    logger.debug("pairs: {}".format(pairs))
+    logger.debug("jobs_from: {}".format(jobs_from))
+    logger.debug("jobs: {}".format(jobs))
+    logger.debug("adaptive: {}".format(adaptive))
+    logger.debug("memory_limit: {}".format(memory_limit))
+    logger.debug("cpu_limit: {}".format(cpu_limit))
+    logger.debug("cache_dir: {}".format(cache_dir))
+    logger.debug("watch: {}".format(watch))
+    logger.debug("timings: {}".format(timings))
+    logger.debug("metrics: {}".format(metrics))
+    logger.debug("trace: {}".format(trace))
+    logger.debug("changed_since: {}".format(changed_since))
+    logger.debug("shard: {}".format(shard))
+    logger.debug("manifest_path: {}".format(manifest_path))
+    logger.debug("history_path: {}".format(history_path))
+    logger.debug("no_history: {}".format(no_history))
+    logger.debug("daemon: {}".format(daemon))
+    logger.debug("socket_path: {}".format(socket_path))
 
-    compiler = DartSassCompiler()
-    try:
-        output = compiler.compile(
-            source,
-            destination=destination,
+    if adaptive and jobs is None:
+        raise click.UsageError("Option '--adaptive' requires '--jobs'.")
+
+    if jobs_from and (
+        source or pairs or watch or daemon or changed_since or shard or manifest_path
+    ):
+        raise click.UsageError(
+            "Option '--jobs-from' can not be used along SOURCE argument, '--pair', "
+            "'--watch', '--daemon', '--changed-since', '--shard' or '--manifest'."
+        )
+    elif pairs and source:
+        raise click.UsageError("SOURCE argument can not be used along '--pair'.")
+    elif not pairs and not source and not jobs_from:
+        raise click.UsageError(
+            "Either SOURCE argument, '--pair' or '--jobs-from' is required."
+        )
+
+    for name, value in (
+        ("--changed-since", changed_since),
+        ("--shard", shard),
+        ("--manifest", manifest_path),
+    ):
+        if value and (watch or daemon):
+            raise click.UsageError(
+                "Option '{}' can not be used along '--watch' or '--daemon'.".format(
+                    name
+                )
+            )
+
+    if daemon:
+        if watch or timings or metrics or trace:
+            raise click.UsageError(
+                "Option '--daemon' can not be used along '--watch', '--timings', "
+                "'--metrics' or '--trace'."
+            )
+
+        return compile_with_daemon(
+            socket_path,
+            pairs or [(source, destination)],
+            {
+                "style": style,
+                "indented": indented,
+                "source_map": source_map,
+                "load_path": load_path,
+            },
+            jobs=jobs,
+            single=not pairs,
+        )
+
+    hooks = []
+    if timings:
+        collector = TimingsCollector()
+        hooks.append(collector)
+        # Summary is still printed when compile has failed or watch is stopped
+        context.call_on_close(
+            lambda: click.echo(collector.format_summary(), err=True)
+        )
+
+    if metrics:
+        recorder = CompileMetrics()
+        hooks.append(recorder)
+        context.call_on_close(lambda: recorder.registry.write(metrics))
+
+    if trace:
+        tracer = TraceRecorder()
+        hooks.append(tracer)
+        context.call_on_close(lambda: tracer.write(trace))
+
+    compiler_options = {
+        "hooks": hooks,
+        "memory_limit": memory_limit * 1048576 if memory_limit else None,
+        "cpu_limit": cpu_limit,
+    }
+
+    if cache_dir:
+        compiler = CachedDartSassCompiler(cache=cache_dir, **compiler_options)
+    else:
+        compiler = DartSassCompiler(**compiler_options)
+
+    if jobs_from:
+        history = None if no_history else open_history(history_path)
+        try:
+            failures = compile_jobs(
+                compiler,
+                jobs_from,
+                {
+                    "style": style,
+                    "indented": indented,
+                    "source_map": source_map,
+                    "load_path": load_path,
+                },
+                jobs=jobs,
+                governor=ResourceGovernor(max_jobs=jobs) if adaptive else None,
+                history=history,
+            )
+        finally:
+            if history:
+                history.close()
+
+        if failures:
+            raise click.Abort()
+
+        return
+
+    if watch:
+        targets = pairs or [(source, destination)]
+        if not all(target_destination for _, target_destination in targets):
+            raise click.UsageError("A destination is required with '--watch'.")
+
+        watcher = CompileWatcher(
+            compiler,
+            targets,
+            jobs=jobs,
+            polling=poll,
             style=style,
             indented=indented,
             source_map=source_map,
             load_path=load_path,
         )
+
+        def callback(results, elapsed):
+            if metrics:
+                recorder.registry.write(metrics)
+
+        try:
+            watcher.run(callback=callback)
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+
+        return
+
+    # Shared by every step which checks files so each one is checked once
+    stat_cache = StatCache()
+
+    manifest = None
+    if manifest_path:
+        require_destinations(pairs or [(source, destination)], "--manifest")
+        manifest = BuildManifest.load(
+            manifest_path,
+            executable=get_command_signature(compiler.get_command()),
+            stat_cache=stat_cache,
+        )
+
+    if changed_since:
+        targets = require_destinations(
+            pairs or [(source, destination)],
+            "--changed-since",
+        )
+
+        try:
+            changed = get_changed_files(changed_since)
+        except GitError as e:
+            logger.critical(e)
+            raise click.Abort()
+        logger.debug("Changed files: {}".format(len(changed)))
+
+        pairs = get_affected_targets(
+            targets,
+            changed,
+            load_paths=load_path,
+            stat_cache=stat_cache,
+        )
+        if not pairs:
+            logger.info("No target affected by changes since {}".format(changed_since))
+            return
+
+        # Affected targets are independent so they are compiled concurrently
+        if jobs is None:
+            jobs = 0
+
+    if shard:
+        index, count = shard
+        pairs = select_shard(
+            require_destinations(pairs or [(source, destination)], "--shard"),
+            index,
+            count,
+            durations=manifest.get_durations() if manifest else None,
+            stat_cache=stat_cache,
+        )
+        logger.info("Shard {}/{} has {} target(s)".format(index, count, len(pairs)))
+        if not pairs:
+            return
+
+        # Each target gets its own process so its duration is measured to balance
+        # the next shards
+        if jobs is None:
+            jobs = 0
+
+    if manifest:
+        pairs = pairs or [(source, destination)]
+
+    if pairs:
+        options = {
+            "style": style,
+            "indented": indented,
+            "source_map": source_map,
+            "load_path": load_path,
+        }
+
+        history = None if no_history else open_history(history_path)
+
+        try:
+            if manifest:
+                # Stats gathered to check targets are reused by validation
+                options["stat_cache"] = stat_cache
+                profile = CompileProfile(**options)
+                pairs, fresh = manifest.partition(pairs, profile)
+                if fresh:
+                    logger.info("Skipped {} up to date target(s)".format(len(fresh)))
+
+            if not pairs:
+                results = []
+            elif jobs is None:
+                results = compiler.compile_many(pairs, **options)
+            else:
+                # Validate shared options before starting anything
+                BatchArgumentsModel([], **options)
+                results = compiler.compile_parallel(
+                    pairs,
+                    jobs=jobs,
+                    governor=ResourceGovernor(max_jobs=jobs) if adaptive else None,
+                    history=history,
+                    **options
+                )
+        except CommandArgumentsError as e:
+            if history:
+                history.close()
+            logger.critical(e)
+            raise click.Abort()
+
+        if manifest:
+            results = manifest.update(results, profile)
+        if history:
+            results = history.update(results)
+
+        try:
+            failures = echo_results(results)
+        finally:
+            if manifest:
+                manifest.save()
+            if history:
+                history.close()
+
+        if failures:
+            raise click.Abort()
+
+        return
+
+    options = {
+        "destination": destination,
+        "style": style,
+        "indented": indented,
+        "source_map": source_map,
+        "load_path": load_path,
+    }
+
+    try:
+        if destination or cache_dir:
+            click.echo(compiler.compile(source, **options))
+        else:
+            # Output is written as it comes so a large CSS is never held in memory,
+            # warnings are given to stderr so they do not mix with it
+            stdout = sys.stdout.buffer
+            for chunk in compiler.compile_stream(
+                source,
+                stderr=sys.stderr.buffer,
+                **options
+            ):
+                stdout.write(chunk)
+            stdout.flush()
     except RunnedCommandError as e:
         print(e.get_payload_details())
         logger.critical(e)
         raise click.Abort()
-    else:
-        click.echo(output)
@@ -0,0 +1,93 @@
+import logging
+import os
+from pathlib import Path
+
+import click
+
+from ..compiler import DependencyGraph, StatCache
+
+
+@click.command()
+@click.argument(
+    "sources",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, file_okay=True, dir_okay=True, path_type=Path),
+)
+@click.option(
+    "--load-path",
+    metavar="PATH",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    help=(
+        "A path to use when resolving imports. May be passed multiple times."
+    ),
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json", "dot"]),
+    default="text",
+    show_default=True,
+    help="Output format.",
+)
+@click.option(
+    "--graph-file",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help=(
+        "A file to save the graph and load it on the next run, so only the changed "
+        "files are scanned again."
+    ),
+)
+@click.option(
+    "--dependents",
+    metavar="PATH",
+    multiple=True,
+    type=click.Path(path_type=Path),
+    help=(
+        "Only output the entrypoints affected by this file. May be passed multiple "
+        "times."
+    ),
+)
+@click.pass_context
+def deps_command(context, sources, load_path, output_format, graph_file, dependents):
+    """
+    Output dependency graph of Sass sources.
+
+    SOURCES are entrypoint files or directories to search for entrypoints.
+    """
+    logger = logging.getLogger("flechette-insolente")
+
+    # Each path is checked once, even if many files try the same import candidates
+    stat_cache = StatCache()
+
+    if graph_file:
+        graph = DependencyGraph.load(
+            graph_file,
+            load_paths=load_path,
+            stat_cache=stat_cache,
+        )
+    else:
+        graph = DependencyGraph(load_paths=load_path, stat_cache=stat_cache)
+
+    graph.build(sources)
+    logger.debug("Scanned files: {}".format(graph.scanned))
+
+    if graph_file:
+        graph.save(graph_file)
+
+    if dependents:
+        for path in graph.get_affected_entrypoints(dependents):
+            click.echo(os.path.relpath(path))
+    elif output_format == "json":
+        click.echo(graph.to_json())
+    elif output_format == "dot":
+        click.echo(graph.to_dot(), nl=False)
+    else:
+        for entrypoint in graph.entrypoints:
+            click.echo(os.path.relpath(entrypoint))
+            for path in graph.get_dependencies(entrypoint):
+                click.echo("    {}".format(os.path.relpath(path)))
+            for url in graph.files.get(entrypoint, {}).get("unresolved", []):
+                click.echo("    {} (unresolved)".format(url))
@@ -5,9 +5,7 @@ import click
 
 from ..logger import init_logger
 
-from .version import version_command
-from .compile import compile_command
-from .exec_dev import execdev_command
+from . import LazyGroup
 
 # Help alias on "-h" argument
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
@@ -17,7 +15,24 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 APP_LOGGER_CONF = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL", None)
 
 
-@click.group(context_settings=CONTEXT_SETTINGS)
+# Commands are only imported when invoked
+COMMANDS = {
+    "version": "flechette_insolente.cli.version:version_command",
+    "compile": "flechette_insolente.cli.compile:compile_command",
+    "deps": "flechette_insolente.cli.deps:deps_command",
+    "execdev": "flechette_insolente.cli.exec_dev:execdev_command",
+    "benchmark": "flechette_insolente.cli.benchmark:benchmark_command",
+    "serve": "flechette_insolente.cli.serve:serve_command",
+    "merge": "flechette_insolente.cli.merge:merge_command",
+    "stats": "flechette_insolente.cli.stats:stats_command",
+}
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_commands=COMMANDS,
+    context_settings=CONTEXT_SETTINGS,
+)
 @click.option(
     "-v", "--verbose",
     type=click.IntRange(min=0, max=5),
@@ -54,9 +69,3 @@ def cli_frontend(ctx, verbose):
         "verbosity": verbose,
         "logger": root_logger,
     }
-
-
-# Attach commands methods to the main grouper
-cli_frontend.add_command(version_command, name="version")
-cli_frontend.add_command(compile_command, name="compile")
-cli_frontend.add_command(execdev_command, name="execdev")
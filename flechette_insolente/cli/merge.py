@@ -0,0 +1,62 @@
+import json
+import logging
+from pathlib import Path
+
+import click
+
+from ..compiler import BuildManifest, merge_traces
+
+
+@click.command()
+@click.argument(
+    "inputs",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--output",
+    metavar="PATH",
+    required=True,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="File where to write the merged file.",
+)
+@click.pass_context
+def merge_command(context, inputs, output):
+    """
+    Merge build manifests or traces from shards of a build into a single one.
+
+    INPUTS are either manifest files from '--manifest' or trace files from
+    '--trace', all of the same kind. Records from a later manifest replace the ones
+    for the same targets.
+    """
+    logger = logging.getLogger("flechette-insolente")
+
+    documents = []
+    for path in inputs:
+        try:
+            documents.append(json.loads(path.read_text()))
+        except ValueError:
+            raise click.UsageError("Invalid JSON file: {}".format(path))
+
+    if all([isinstance(item, dict) and "traceEvents" in item for item in documents]):
+        merged = merge_traces(documents, names=[path.stem for path in inputs])
+        output.write_text(json.dumps(merged))
+        logger.info("Merged {} trace(s) into: {}".format(len(inputs), output))
+    elif all([isinstance(item, dict) and "targets" in item for item in documents]):
+        manifests = [BuildManifest.from_dict(item) for item in documents]
+
+        merged = BuildManifest(executable=manifests[0].executable)
+        for path, manifest in zip(inputs, manifests):
+            if manifest.executable != merged.executable:
+                logger.warning(
+                    "Manifest has been built with another executable: {}".format(path)
+                )
+            merged.merge(manifest)
+
+        merged.save(output)
+        logger.info("Merged {} manifest(s) into: {}".format(len(inputs), output))
+    else:
+        raise click.UsageError(
+            "Inputs must be either all manifests or all traces."
+        )
@@ -0,0 +1,101 @@
+import logging
+from pathlib import Path
+
+import click
+
+from ..compiler import CachedDartSassCompiler, CompilerPool, DartSassCompiler
+from ..daemon import CompileDaemon, get_socket_path
+from ..exceptions import DaemonError
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=(
+        "Unix socket where to listen for compile jobs. Default to a socket in the "
+        "user runtime directory."
+    ),
+)
+@click.option(
+    "--cache-dir",
+    metavar="PATH",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help=(
+        "Directory for compile cache. The dart-sass version stays in memory "
+        "between jobs, sources and their dependencies are hashed again for each "
+        "compile."
+    ),
+)
+@click.option(
+    "--embedded",
+    is_flag=True,
+    help=(
+        "Compile with a pool of started dart-sass processes through the embedded "
+        "protocol instead of starting a process for each compile. Cannot be used "
+        "with '--cache-dir'."
+    ),
+)
+@click.option(
+    "--pool-size",
+    metavar="INTEGER",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="With '--embedded', number of dart-sass processes to keep started.",
+)
+@click.option(
+    "--jobs",
+    metavar="INTEGER",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        "Maximum number of concurrent compiles for a job. Default to the number of "
+        "usable CPUs."
+    ),
+)
+@click.pass_context
+def serve_command(context, socket_path, cache_dir, embedded, pool_size, jobs):
+    """
+    Run a compile daemon which serves compile jobs from 'compile --daemon'.
+
+    The daemon keeps compilers and caches warm between jobs until it is interrupted.
+    """
+    logger = logging.getLogger("flechette-insolente")
+
+    if embedded and cache_dir:
+        raise click.UsageError(
+            "Option '--embedded' can not be used along '--cache-dir'."
+        )
+
+    if embedded:
+        compiler = CompilerPool(min_size=pool_size, max_size=jobs)
+        compiler.start()
+    elif cache_dir:
+        compiler = CachedDartSassCompiler(cache=cache_dir)
+    else:
+        compiler = DartSassCompiler()
+
+    daemon = CompileDaemon(
+        socket_path=socket_path or get_socket_path(),
+        compiler=compiler,
+        jobs=jobs,
+    )
+
+    try:
+        daemon.bind()
+    except DaemonError as e:
+        daemon.close()
+        logger.critical(e)
+        raise click.Abort()
+
+    logger.info("Serving compile jobs on {}".format(daemon.socket_path))
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopped serving")
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+import click
+
+from ..compiler import CompileHistory, get_history_path
+
+
+def format_trend(item):
+    """
+    Format the trend of a target for text output.
+
+    Arguments:
+        item (dict): Target trend as built from ``CompileHistory.get_trends()``.
+
+    Returns:
+        string: Trend line.
+    """
+    parts = [os.path.relpath(item["target"])]
+
+    if item["duration"] is not None:
+        parts.append("{:.3f}s".format(item["duration"]))
+    if item["change"] is not None:
+        parts.append("({:+.0%} from {:.3f}s)".format(item["change"], item["previous"]))
+    if item["output_size"] is not None:
+        parts.append("output={:.1f}KiB".format(item["output_size"] / 1024))
+    if item["max_rss"] is not None:
+        parts.append("peak RSS={:.1f}MiB".format(item["max_rss"] / 1048576))
+    parts.append("runs={}".format(item["count"]))
+    if item["regression"]:
+        parts.append("REGRESSION")
+
+    return " ".join(parts)
+
+
+@click.command()
+@click.option(
+    "--history",
+    "history_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=(
+        "SQLite file of compile history. Default to the file in the user cache "
+        "directory."
+    ),
+)
+@click.option(
+    "--window",
+    type=click.IntRange(min=1),
+    default=CompileHistory.DEFAULT_WINDOW,
+    show_default=True,
+    help="Number of previous compiles the latest one is compared to.",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help=(
+        "Increase ratio of the latest duration over the previous ones from which "
+        "it is a regression."
+    ),
+)
+@click.option(
+    "--regressions",
+    "only_regressions",
+    is_flag=True,
+    help="Only output regressions and exit with an error if there is any.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Output format.",
+)
+@click.pass_context
+def stats_command(context, history_path, window, threshold, only_regressions,
+                  output_format):
+    """
+    Report trends and regressions of compile durations from compile history.
+
+    Targets are sorted from the biggest increase of their latest duration.
+    """
+    logger = logging.getLogger("flechette-insolente")
+
+    history_path = history_path or get_history_path()
+    if not history_path.exists():
+        logger.critical("There is no compile history: {}".format(history_path))
+        raise click.Abort()
+
+    with CompileHistory(history_path, window=window) as history:
+        trends = history.get_trends(threshold=threshold)
+
+    if only_regressions:
+        trends = [item for item in trends if item["regression"]]
+
+    if output_format == "json":
+        click.echo(json.dumps(trends, indent=4))
+    else:
+        for item in trends:
+            click.echo(format_trend(item))
+
+    if only_regressions and trends:
+        raise click.Abort()
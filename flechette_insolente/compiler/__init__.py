@@ -1,9 +1,63 @@
-from .compiler import DartSassCompiler
-from .arguments import lazy_type, ArgumentsModel
+"""
+Compiler interfaces.
 
+Objects are imported from their module on first access so importing this package
+does not load modules that are not used, like ``asyncio`` for the asynchronous
+compiler.
+"""
+import importlib
 
-__all__ = [
-    "ArgumentsModel",
-    "DartSassCompiler",
-    "lazy_type",
-]
+
+# Module which defines each exported object
+EXPORTS = {
+    "ArgumentsModel": "arguments",
+    "AsyncDartSassCompiler": "asynchronous",
+    "BatchArgumentsModel": "arguments",
+    "BuildManifest": "manifest",
+    "CachedDartSassCompiler": "cache",
+    "CompileCache": "cache",
+    "CompileEvent": "hooks",
+    "CompileHistory": "history",
+    "CompileJob": "jobs",
+    "CompileMetrics": "metrics",
+    "CompilerPool": "pool",
+    "CompileProfile": "arguments",
+    "CompileResult": "results",
+    "CompileWatcher": "watcher",
+    "DartSassCompiler": "compiler",
+    "DependencyGraph": "graph",
+    "EmbeddedDartSassCompiler": "embedded",
+    "expand_targets": "graph",
+    "find_entrypoints": "graph",
+    "get_affected_targets": "graph",
+    "get_history_path": "history",
+    "ImportResolver": "imports",
+    "lazy_type": "arguments",
+    "merge_traces": "tracing",
+    "MetricsRegistry": "metrics",
+    "ParallelExecutor": "parallel",
+    "partition_targets": "sharding",
+    "read_jobs": "jobs",
+    "ResourceGovernor": "governor",
+    "select_shard": "sharding",
+    "StatCache": "manifest",
+    "StdinArgumentsModel": "arguments",
+    "TimingsCollector": "hooks",
+    "TraceRecorder": "tracing",
+}
+
+
+__all__ = list(EXPORTS.keys())
+
+
+def __getattr__(name):
+    if name in EXPORTS:
+        module = importlib.import_module("." + EXPORTS[name], __name__)
+        globals()[name] = getattr(module, name)
+        return globals()[name]
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,5 +1,5 @@
-import copy
 from pathlib import Path
+from types import MappingProxyType
 
 from ..exceptions import CommandArgumentsError
 
@@ -65,6 +65,8 @@ class ArgumentsModel(ArgumentsValidationAbstract):
 
     Attributes:
         OPTION_STYLE_CHOICES (tuple): Available choices for ``style`` option.
+        OPTION_SYNTAX_CHOICES (tuple): Available syntaxes for a source given as a
+            string.
         COMMAND_ARGUMENTS (dict): Description of available click arguments.
         COMMAND_OPTIONS (dict): Description of available click arguments.
         cmd_args (list): List of all parameters to give to dart-sass executable.
@@ -72,6 +74,9 @@ class ArgumentsModel(ArgumentsValidationAbstract):
     # Available choices for 'style' option
     OPTION_STYLE_CHOICES = ("expanded", "compressed")
 
+    # Available syntaxes for a source given as a string
+    OPTION_SYNTAX_CHOICES = ("scss", "sass", "css")
+
     # Available click arguments, note than the item name is used to name the argument
     # to Click
     COMMAND_ARGUMENTS = {
@@ -82,7 +87,8 @@ class ArgumentsModel(ArgumentsValidationAbstract):
                     file_okay=True, dir_okay=True, writable=True, resolve_path=False,
                     path_type=Path, exists=True,
                 ),
-                "required": True,
+                # Not required since CLI can use pairs instead
+                "required": False,
             }
         },
         "destination": {
@@ -128,8 +134,8 @@ class ArgumentsModel(ArgumentsValidationAbstract):
                 ),
             }
         },
-        # Not sure about this option since it only mention stdin, is that only common
-        # shell standard input ? If so, remove it since we won't support it (yet?).
+        # Only used by dart-sass for a source from standard input, see
+        # 'StdinArgumentsModel' which sets it from the source syntax
         "indented": {
             "args": ("--indented/--no-indented",),
             "kwargs": {
@@ -152,6 +158,10 @@ class ArgumentsModel(ArgumentsValidationAbstract):
 
     def __init__(self, source, **kwargs):
         self.destination = None
+        profile = kwargs.pop("profile", None)
+        self.stat_cache = kwargs.pop("stat_cache", None) or getattr(
+            profile, "stat_cache", None
+        )
 
         # Get source path
         self.source = self._validate_source(source)
@@ -166,23 +176,60 @@ class ArgumentsModel(ArgumentsValidationAbstract):
         # Start argument with gathered ressource paths
         self.cmd_args = [":".join(sources)]
 
-        # Get each parameter, validate it and store into command arguments
-        for name, value in kwargs.items():
-            if name not in self.get_available_parameters():
+        if profile is None:
+            self.cmd_args.extend(self.get_option_arguments(kwargs))
+        elif kwargs:
+            msg = "Options can not be given along a profile: {}"
+            raise CommandArgumentsError(msg.format(", ".join(kwargs)))
+        else:
+            # Options have already been validated by profile
+            self.cmd_args.extend(profile.option_args)
+
+    def __str__(self):
+        return " ".join(self.cmd_args)
+
+    def get_option_arguments(self, options):
+        """
+        Validate each given option and build their command arguments.
+
+        Arguments:
+            options (dict): Option values indexed on their parameter name.
+
+        Returns:
+            list: Command arguments for given options.
+        """
+        arguments = []
+
+        schema = self.get_parameter_schema()
+
+        for name, value in options.items():
+            if name not in schema:
                 raise CommandArgumentsError("Unknowed argument: {}".format(name))
             else:
                 content = getattr(self, "_validate_{}".format(name))(value)
                 if content:
-                    self.cmd_args.extend(content)
+                    arguments.extend(content)
 
-    def __str__(self):
-        return " ".join(self.cmd_args)
+        return arguments
 
     @classmethod
-    def get_available_parameters(cls):
+    def get_parameter_schema(cls):
         """
-        Get all available arguments for 'ArgumentsModel'.
+        Get the executable arguments of all available parameters.
+
+        Schema is built once per class from ``COMMAND_ARGUMENTS`` and
+        ``COMMAND_OPTIONS`` then stored in class attribute ``_parameter_schema``.
+
+        Returns:
+            types.MappingProxyType: Read only mapping of parameter arguments indexed
+            on parameter names. Arguments are ``None`` for positional arguments, a
+            string for an option or a tuple of both strings for a boolean flag.
         """
+        # Lookup only in the class itself since each subclass may have its own spec
+        schema = cls.__dict__.get("_parameter_schema")
+        if schema is not None:
+            return schema
+
         parameters = {k: None for k, v in cls.COMMAND_ARGUMENTS.items()}
 
         for k, v in cls.COMMAND_OPTIONS.items():
@@ -190,11 +237,26 @@ class ArgumentsModel(ArgumentsValidationAbstract):
                 msg = "Found multiple definition for parameter '{}'"
                 raise CommandArgumentsError(msg.format(k))
 
-            parameters[k] = v["args"][0].split("/")
-            if len(parameters[k]) == 1:
-                parameters[k] = parameters[k][0]
+            flags = tuple(v["args"][0].split("/"))
+            parameters[k] = flags[0] if len(flags) == 1 else flags
 
-        return parameters
+        cls._parameter_schema = MappingProxyType(parameters)
+
+        return cls._parameter_schema
+
+    @classmethod
+    def get_available_parameters(cls):
+        """
+        Get all available arguments for 'ArgumentsModel'.
+
+        Returns:
+            dict: A new dictionnary from ``get_parameter_schema()`` where boolean
+            flags are lists.
+        """
+        return {
+            k: list(v) if isinstance(v, tuple) else v
+            for k, v in cls.get_parameter_schema().items()
+        }
 
     @classmethod
     def coerce_parameter_type(cls, types, name, values):
@@ -213,8 +275,11 @@ class ArgumentsModel(ArgumentsValidationAbstract):
             type coerced.
         """
         coerce_type = None
-        # Ensure we don't edit in place given values
-        values = copy.deepcopy(values)
+        # Ensure we don't edit in place given values, only the first level and the
+        # 'kwargs' item are modified so there is no need for a deep copy
+        values = dict(values)
+        if "kwargs" in values:
+            values["kwargs"] = dict(values["kwargs"])
 
         if "coerce_type" in values:
             if values["coerce_type"] not in types:
@@ -284,3 +349,157 @@ class ArgumentsModel(ArgumentsValidationAbstract):
             name: cls.coerce_parameter_type(types, name, values)
             for name, values in cls.COMMAND_OPTIONS.items()
         }
+
+
+class BatchArgumentsModel(ArgumentsModel):
+    """
+    Arguments model for many source and destination pairs compiled in a single
+    dart-sass execution.
+
+    Options are shared by all pairs so they are validated only once. A pair with an
+    invalid source does not invalidate the whole batch, it is just excluded from
+    command arguments and stored in ``invalid`` attribute.
+
+    Arguments:
+        pairs (iterable): Iterable of ``(source, destination)`` tuples. Destination is
+            required for every pair.
+
+    Keyword Arguments:
+        stat_cache (StatCache): Stat cache to check source existence.
+        **kwargs: Shared options, every ``ArgumentsModel`` options are allowed except
+            ``destination``.
+
+    Attributes:
+        pairs (list): List of every given ``(source, destination)`` tuples as
+            ``pathlib.Path`` objects in the same order.
+        targets (list): List of valid ``(source, destination)`` tuples as
+            ``pathlib.Path`` objects.
+        invalid (list): List of ``(source, destination, error)`` tuples for pairs which
+            failed validation where ``error`` is a ``CommandArgumentsError``.
+        cmd_args (list): List of all parameters to give to dart-sass executable.
+    """
+    def __init__(self, pairs, **kwargs):
+        if "destination" in kwargs:
+            msg = "Batch arguments does not accept 'destination' option, use pairs"
+            raise CommandArgumentsError(msg)
+
+        self.stat_cache = kwargs.pop("stat_cache", None)
+        self.pairs = []
+        self.targets = []
+        self.invalid = []
+        self.cmd_args = []
+
+        for source, destination in pairs:
+            if not destination:
+                msg = "A destination is required for each source in batch: {}"
+                raise CommandArgumentsError(msg.format(source))
+
+            destination = self._validate_destination(destination)
+            self.pairs.append((Path(source), destination))
+
+            try:
+                source = self._validate_source(source)
+            except CommandArgumentsError as e:
+                self.invalid.append((Path(source), destination, e))
+                continue
+
+            self.targets.append((source, destination))
+            self.cmd_args.append("{}:{}".format(source, destination))
+
+        self.cmd_args.extend(self.get_option_arguments(kwargs))
+
+
+class CompileProfile(ArgumentsModel):
+    """
+    Shared compile options validated once to build the arguments of many targets.
+
+    A profile can be given to ``ArgumentsModel`` and to compiler ``compile()``
+    methods with the ``profile`` argument instead of options, so only the source and
+    destination are validated for each target.
+
+    Keyword Arguments:
+        stat_cache (StatCache): Stat cache to check paths existence, it is also
+            used for the source of each target built with this profile.
+        **kwargs: Shared options, every ``ArgumentsModel`` options are allowed except
+            ``destination``.
+
+    Attributes:
+        options (dict): Given options.
+        option_args (tuple): Command arguments for options.
+    """
+    def __init__(self, **kwargs):
+        if "destination" in kwargs:
+            msg = "Profile does not accept 'destination' option"
+            raise CommandArgumentsError(msg)
+
+        self.stat_cache = kwargs.pop("stat_cache", None)
+        self.options = kwargs
+        self.option_args = tuple(self.get_option_arguments(kwargs))
+
+    def __str__(self):
+        return " ".join(self.option_args)
+
+    def get_arguments(self, source, destination=None):
+        """
+        Build command arguments for a target.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+
+        Keyword Arguments:
+            destination (pathlib.Path): Optional destination path.
+
+        Returns:
+            list: Command arguments.
+        """
+        return ArgumentsModel(
+            source,
+            destination=destination,
+            profile=self,
+        ).cmd_args
+
+
+class StdinArgumentsModel(ArgumentsModel):
+    """
+    Arguments model for a Sass source given through standard input.
+
+    Since there is no file extension to guess it, the source syntax sets the
+    ``indented`` option which is the way dart-sass knows the syntax of standard
+    input. Plain CSS is given as SCSS since it is a subset of it.
+
+    Keyword Arguments:
+        syntax (string): Source syntax, one of ``OPTION_SYNTAX_CHOICES``. Default to
+            ``scss``.
+        destination (pathlib.Path): Path to the CSS file to write. If not given the
+            CSS is output.
+        **kwargs: Every other ``ArgumentsModel`` options. Option ``indented`` is
+            allowed only if it matches the syntax.
+
+    Attributes:
+        STDIN_ARGUMENT (string): Executable argument to read source from standard
+            input.
+        syntax (string): Validated source syntax.
+        cmd_args (list): List of all parameters to give to dart-sass executable.
+    """
+    STDIN_ARGUMENT = "--stdin"
+
+    def __init__(self, syntax="scss", **kwargs):
+        self.source = None
+        self.destination = None
+        self.stat_cache = kwargs.pop("stat_cache", None)
+        self.syntax = self._validate_syntax(syntax)
+
+        indented = self.syntax == "sass"
+        if kwargs.get("indented") not in (None, indented):
+            msg = "Option 'indented' does not match source syntax '{}'"
+            raise CommandArgumentsError(msg.format(self.syntax))
+        kwargs["indented"] = indented
+
+        self.cmd_args = [self.STDIN_ARGUMENT]
+
+        destination = kwargs.pop("destination", None)
+        if destination:
+            self.destination = self._validate_destination(destination)
+            self.cmd_args.append(str(self.destination))
+
+        self.cmd_args.extend(self.get_option_arguments(kwargs))
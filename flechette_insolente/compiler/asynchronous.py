@@ -0,0 +1,216 @@
+import asyncio
+import subprocess
+import time
+
+from ..exceptions import RunnedCommandError
+
+from .arguments import ArgumentsModel, StdinArgumentsModel
+from .executable import ExecutableAbstract
+from .hooks import CompileEvent, SpawnEvent
+from .resources import apply_limits
+
+
+class AsyncDartSassCompiler(ExecutableAbstract):
+    """
+    Asynchronous wrapper interface for dart-sass executable compiler.
+
+    It has the same API than ``DartSassCompiler`` except methods are coroutines
+    which run dart-sass without blocking the event loop, so many compiles can run
+    at once without a thread for each one.
+
+    Timeout and errors raise the same ``RunnedCommandError`` than
+    ``DartSassCompiler``. When a coroutine is cancelled, the dart-sass process is
+    killed before the cancellation is propagated.
+
+    Processes are reaped by the event loop, so there is no resource usage and the
+    ``resources`` of payloads and results are always ``None``.
+    """
+    # Maximum size in bytes of each read from process output
+    READ_SIZE = 65536
+
+    async def _kill(self, process):
+        """
+        Kill a process if it is still running and wait for it to be reaped.
+        """
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+        await process.wait()
+
+    async def _communicate(self, process, content, chunks):
+        """
+        Send content to process standard input and read its output until its end.
+
+        Output is collected into given list as it comes, so what has been output is
+        kept if this is cancelled.
+        """
+        async def feed():
+            try:
+                process.stdin.write(content)
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # Process has exited without reading everything, its return code
+                # tells why
+                pass
+            finally:
+                process.stdin.close()
+
+        async def read():
+            while True:
+                chunk = await process.stdout.read(self.READ_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+
+        await asyncio.gather(
+            *([feed()] if content is not None else []),
+            read(),
+        )
+        await process.wait()
+
+    async def _exec(self, *args, **kwargs):
+        """
+        Execute command.
+
+        Arguments and hook events are the same than ``ExecutableAbstract._exec()``.
+        """
+        cmd = self.get_command(*args, cmd_name=kwargs.get("cmd_name"))
+        content = kwargs.get("input")
+        if content is not None:
+            content = content.encode("utf-8")
+        command_timeout = self.get_timeout()
+        timeout = False
+        chunks = []
+
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=None if content is None else asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        if self.memory_limit or self.cpu_limit:
+            apply_limits(
+                process.pid,
+                memory_limit=self.memory_limit,
+                cpu_limit=self.cpu_limit,
+            )
+        spawned = time.perf_counter()
+        if self.hooks:
+            self.emit_event(SpawnEvent(cmd))
+
+        try:
+            await asyncio.wait_for(
+                self._communicate(process, content, chunks),
+                timeout=command_timeout,
+            )
+        except asyncio.TimeoutError:
+            timeout = True
+            await self._kill(process)
+            # Collect what has been outputed before the timeout
+            chunks.append(await process.stdout.read())
+        except asyncio.CancelledError:
+            await self._kill(process)
+            if self.hooks:
+                self.emit_event(CompileEvent(
+                    cmd,
+                    started=started,
+                    returncode=process.returncode,
+                    cancelled=True,
+                    phases={
+                        "validation": kwargs.get("validation"),
+                        "spawn": spawned - started,
+                        "wait": time.perf_counter() - spawned,
+                    },
+                ))
+            raise
+        waited = time.perf_counter()
+
+        stdout = b"".join(chunks)
+        output_bytes = len(stdout)
+        output = self._decode(stdout)
+
+        if self.hooks:
+            self.emit_event(CompileEvent(
+                cmd,
+                started=started,
+                returncode=process.returncode,
+                timeout=timeout,
+                input_bytes=len(content or b""),
+                output_bytes=output_bytes,
+                phases={
+                    "validation": kwargs.get("validation"),
+                    "spawn": spawned - started,
+                    "wait": waited - spawned,
+                    "decode": time.perf_counter() - waited,
+                },
+            ))
+
+        if timeout:
+            raise RunnedCommandError(error_payload={
+                "returncode": None,
+                "cmd": cmd,
+                "stdout": output or None,
+                "stderr": None,
+                "timeout": command_timeout,
+                "resources": None,
+            })
+
+        if process.returncode:
+            raise RunnedCommandError(error_payload={
+                "returncode": process.returncode,
+                "cmd": cmd,
+                "stdout": output,
+                "stderr": None,
+                "timeout": None,
+                "resources": None,
+            })
+
+        result = subprocess.CompletedProcess(cmd, process.returncode, output, None)
+        result.resources = None
+
+        return result
+
+    async def version(self):
+        result = await self._exec("--version")
+
+        return result.stdout.strip()
+
+    async def compile(self, *args, **kwargs):
+        """
+        Compile Sass sources, see ``DartSassCompiler.compile()`` for arguments.
+
+        Returns:
+            string: Compiler output.
+        """
+        started = time.perf_counter()
+        args_model = ArgumentsModel(*args, **kwargs)
+
+        result = await self._exec(
+            *args_model.cmd_args,
+            validation=time.perf_counter() - started
+        )
+
+        return result.stdout.strip()
+
+    async def compile_string(self, source, syntax="scss", **kwargs):
+        """
+        Compile Sass source content given as a string, see
+        ``DartSassCompiler.compile_string()`` for arguments.
+
+        Returns:
+            string: Compiler output.
+        """
+        started = time.perf_counter()
+        args_model = StdinArgumentsModel(syntax=syntax, **kwargs)
+
+        result = await self._exec(
+            *args_model.cmd_args,
+            input=source,
+            validation=time.perf_counter() - started
+        )
+
+        return result.stdout.strip()
@@ -0,0 +1,364 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Not available on Windows, we still have atomic writes but no locking
+    fcntl = None
+
+from .arguments import ArgumentsModel
+from .compiler import DartSassCompiler
+from .hooks import CacheEvent
+from .imports import ImportResolver
+
+
+def get_file_digest(path):
+    """
+    Compute SHA-256 digest of a file content.
+
+    Arguments:
+        path (pathlib.Path): File path.
+
+    Returns:
+        string: Hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(65536), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def get_command_signature(command):
+    """
+    Build a signature of a command from the stats of its executable files, so a
+    changed executable can be detected without running it.
+
+    Arguments:
+        command (list): Command items, like from ``ExecutableAbstract.get_command()``.
+
+    Returns:
+        list: Resolved path, modification time and size for each item which is a
+        file, other items are kept as strings.
+    """
+    signature = []
+    for item in command:
+        path = Path(item)
+        if path.is_file():
+            stat = path.stat()
+            signature.append([str(path.resolve()), stat.st_mtime_ns, stat.st_size])
+        else:
+            signature.append(str(item))
+
+    return signature
+
+
+def write_atomic(path, content):
+    """
+    Write a file atomically.
+
+    Content is written to a temporary file in the same directory then moved to its
+    final path so a reader never sees a partially written file.
+
+    Arguments:
+        path (pathlib.Path): File path to write.
+        content (string): Content to write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            fp.write(content)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+
+class CompileCache:
+    """
+    On-disk content-addressed storage for compile outputs.
+
+    Entries are JSON files stored with atomic writes so they can be read without any
+    lock. Compiling a missing entry is guarded with a file lock so many processes
+    sharing the same cache directory compile a same key only once.
+
+    Locks are spread on a fixed number of lock files from the key prefix.
+
+    Arguments:
+        directory (pathlib.Path): Cache directory, it is created if needed.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def get_entry_path(self, key):
+        return self.directory / "entries" / key[:2] / "{}.json".format(key)
+
+    def get(self, key):
+        """
+        Get an entry.
+
+        Arguments:
+            key (string): Entry key.
+
+        Returns:
+            dict: Entry content or ``None`` if there is no entry for this key.
+        """
+        try:
+            with open(self.get_entry_path(key), encoding="utf-8") as fp:
+                return json.load(fp)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key, entry):
+        """
+        Store an entry.
+
+        Arguments:
+            key (string): Entry key.
+            entry (dict): Entry content, it must be serializable to JSON.
+        """
+        write_atomic(self.get_entry_path(key), json.dumps(entry))
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        """
+        Context manager to hold an exclusive lock for a key.
+
+        Arguments:
+            key (string): Entry key.
+        """
+        if fcntl is None:
+            yield
+            return
+
+        path = self.directory / "locks" / "{}.lock".format(key[:2])
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, "a") as fp:
+            fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+
+    def get_version(self, compiler):
+        """
+        Get the compiler version from cache.
+
+        The version is stored in cache with a key built from the stats of executable
+        files, so a cache hit does not have to spawn the compiler to get its version.
+
+        Arguments:
+            compiler (DartSassCompiler): Compiler to request for version on cache
+                miss.
+
+        Returns:
+            string: Compiler version.
+        """
+        signature = get_command_signature(compiler.get_command())
+        key = hashlib.sha256(json.dumps(signature).encode("utf-8")).hexdigest()
+        path = self.directory / "versions" / key
+
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            version = compiler.version()
+            write_atomic(path, version)
+            return version
+
+
+class CachedDartSassCompiler(DartSassCompiler):
+    """
+    Dart-sass compiler with a content-addressed cache in front of ``compile()``.
+
+    The cache key is built from the source content, the content of every file it
+    transitively loads, the options which affect output and the dart-sass version.
+    On a cache hit, output and destination files (CSS and source map) are restored
+    from cache without to spawn any process.
+
+    Directory sources are not cached and are always compiled.
+
+    Keyword Arguments:
+        cache (CompileCache or pathlib.Path): Cache object or cache directory path.
+        command_timeout (integer): Timeout in seconds for a command execution.
+        executable (string or pathlib.Path or list): A custom executable to use
+            instead of the shipped dart-sass one.
+
+    Attributes:
+        hits (integer): Number of cache hits.
+        misses (integer): Number of cache misses.
+    """
+    def __init__(self, *args, **kwargs):
+        cache = kwargs.pop("cache")
+        super().__init__(*args, **kwargs)
+
+        self.cache = cache if isinstance(cache, CompileCache) else CompileCache(cache)
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._counter_lock = threading.Lock()
+
+    def get_cache_key(self, args_model, load_path=None):
+        """
+        Build the cache key for given arguments.
+
+        Paths are relative to the source directory so a same project in different
+        locations share the same keys.
+
+        Arguments:
+            args_model (ArgumentsModel): Validated arguments.
+
+        Keyword Arguments:
+            load_path (list): Load paths given to arguments.
+
+        Returns:
+            string: Cache key.
+        """
+        if self._version is None:
+            self._version = self.cache.get_version(self)
+
+        source = args_model.source.resolve()
+        basedir = source.parent
+
+        dependencies, unresolved = ImportResolver(
+            load_paths=load_path
+        ).get_dependencies(source)
+
+        target = None
+        if args_model.destination is not None:
+            destination = args_model.destination.resolve()
+            # Destination location matters for source map and its comment in CSS
+            target = [
+                os.path.relpath(source, destination.parent),
+                destination.name,
+            ]
+
+        files = [
+            [os.path.relpath(path, basedir), get_file_digest(path)]
+            for path in [source] + sorted(dependencies)
+        ]
+
+        signature = {
+            "version": self._version,
+            "target": target,
+            # Every option arguments, first one is the source and destination
+            "arguments": [
+                os.path.relpath(item, basedir) if Path(item).is_absolute() else item
+                for item in args_model.cmd_args[1:]
+            ],
+            "files": files,
+            "unresolved": sorted(unresolved),
+        }
+
+        return hashlib.sha256(
+            json.dumps(signature, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _count(self, hit):
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_destination_files(self, destination):
+        """
+        Get destination file and its possible source map.
+
+        Arguments:
+            destination (pathlib.Path): Destination file path.
+
+        Returns:
+            dict: Contents indexed on file names, it may be empty if compiler did
+            not write anything.
+        """
+        files = {}
+
+        for path in (destination, destination.parent / (destination.name + ".map")):
+            if path.is_file():
+                files[path.name] = path.read_text(encoding="utf-8")
+
+        return files
+
+    def compile(self, *args, **kwargs):
+        """
+        Compile Sass sources or restore them from cache.
+
+        Arguments and return are the same than ``DartSassCompiler.compile()``.
+        """
+        started = time.perf_counter()
+        args_model = ArgumentsModel(*args, **kwargs)
+        validation = time.perf_counter() - started
+
+        if args_model.source.is_dir():
+            return super().compile(*args, **kwargs)
+
+        options = kwargs["profile"].options if kwargs.get("profile") else kwargs
+        started = time.perf_counter()
+        key = self.get_cache_key(args_model, load_path=options.get("load_path"))
+
+        entry = self.cache.get(key)
+        if entry is None:
+            with self.cache.lock(key):
+                # Another process may have compiled it while we were waiting
+                entry = self.cache.get(key)
+
+                if entry is None:
+                    lookup = time.perf_counter() - started
+                    self._count(False)
+                    result = self._exec(
+                        *args_model.cmd_args,
+                        validation=validation
+                    )
+
+                    stored = time.perf_counter()
+                    entry = {"output": result.stdout.strip(), "files": {}}
+                    if args_model.destination is not None:
+                        entry["files"] = self.get_destination_files(
+                            args_model.destination
+                        )
+                    self.cache.set(key, entry)
+
+                    if self.hooks:
+                        self.emit_event(CacheEvent(
+                            key,
+                            False,
+                            started,
+                            lookup,
+                            write=time.perf_counter() - stored,
+                        ))
+
+                    return entry["output"]
+
+        self._count(True)
+        restored = time.perf_counter()
+
+        if args_model.destination is not None:
+            for name, content in entry["files"].items():
+                write_atomic(args_model.destination.parent / name, content)
+
+        if self.hooks:
+            self.emit_event(CacheEvent(
+                key,
+                True,
+                started,
+                restored - started,
+                write=time.perf_counter() - restored,
+            ))
+
+        return entry["output"]
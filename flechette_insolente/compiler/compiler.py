@@ -1,11 +1,26 @@
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from ..exceptions import RunnedCommandError
+
 from .executable import ExecutableAbstract
-from .arguments import ArgumentsModel
+from .arguments import ArgumentsModel, BatchArgumentsModel, StdinArgumentsModel
+from .parallel import ParallelExecutor
+from .results import CompileResult
 
 
 class DartSassCompiler(ExecutableAbstract):
     """
     This is the wrapper interface for dart-sass executable compiler.
     """
+    # Pattern to find the stylesheet which failed to be read
+    ERROR_READING_PATTERN = re.compile(r"^Error reading (?P<path>.+?): ")
+    # Pattern to find the root stylesheet from an error stack trace
+    ERROR_ROOT_PATTERN = re.compile(r"^\s+(?P<path>.+?) \d+:\d+\s+root stylesheet$")
+    # Size in bytes from which a spooled output is written to disk
+    DEFAULT_SPOOL_SIZE = 8388608
 
     def version(self):
         result = self._exec("--version")
@@ -14,20 +29,331 @@ class DartSassCompiler(ExecutableAbstract):
 
     def compile(self, *args, **kwargs):
         """
-        TODO
+        Compile a Sass source with a dart-sass execution.
+
+        Arguments are validated with ``ArgumentsModel`` before execution, options
+        can be validated once for many compiles with a profile.
 
         Arguments:
-            source (pathlib.Path):
+            source (pathlib.Path): Path to the Sass source file or directory.
 
         Keyword Arguments:
-            destination (pathlib.Path):
-            load_paths (list):
+            destination (pathlib.Path): Path to the CSS file, or directory for a
+                directory source, to write. If not given the CSS is returned.
+            style (string): Output style name.
+            load_path (list): List of paths to use when resolving imports.
+            indented (boolean): Whether to use the indented syntax for input from
+                stdin.
+            source_map (boolean): Whether to generate source map.
+            profile (CompileProfile): Validated options to use instead of giving
+                them.
 
         Returns:
-            string:
+            string: The compiled CSS, or the dart-sass output when writing to a
+            destination.
         """
+        started = time.perf_counter()
         args_model = ArgumentsModel(*args, **kwargs)
 
-        result = self._exec(*args_model.cmd_args)
+        result = self._exec(
+            *args_model.cmd_args,
+            validation=time.perf_counter() - started
+        )
 
         return result.stdout.strip()
+
+    def compile_string(self, source, syntax="scss", **kwargs):
+        """
+        Compile Sass source content given as a string.
+
+        Source is sent to dart-sass through its standard input so there is no
+        temporary file to write. Imports are resolved from load paths and the current
+        directory.
+
+        Arguments:
+            source (string): Sass source content.
+
+        Keyword Arguments:
+            syntax (string): Source syntax, one of ``scss``, ``sass`` (the indented
+                syntax) or ``css``.
+            destination (pathlib.Path): Path to the CSS file to write. If not given
+                the CSS is returned.
+            style (string): Output style name.
+            load_path (list): List of paths to use when resolving imports.
+            source_map (boolean): Whether to generate source map.
+
+        Returns:
+            string: Compiler output.
+        """
+        started = time.perf_counter()
+        args_model = StdinArgumentsModel(syntax=syntax, **kwargs)
+
+        result = self._exec(
+            *args_model.cmd_args,
+            input=source,
+            validation=time.perf_counter() - started
+        )
+
+        return result.stdout.strip()
+
+    def compile_stream(self, *args, chunk_size=None, stderr=None, **kwargs):
+        """
+        Compile a source and yield its CSS as it is output, without holding the
+        whole output in memory.
+
+        Output is given as produced by dart-sass, undecoded and with its trailing
+        newline. With a destination, dart-sass writes the file itself and there is
+        nothing to yield.
+
+        A ``RunnedCommandError`` is raised once the output has been consumed if the
+        compile has failed, its payload ``stderr`` contains the error message.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+
+        Keyword Arguments:
+            chunk_size (integer): Maximum size of each chunk in bytes.
+            stderr (object): Binary file object to write the dart-sass standard
+                error to on success, like its warnings.
+            **kwargs: Options as supported by ``compile()``.
+
+        Yields:
+            bytes: CSS chunks.
+        """
+        started = time.perf_counter()
+        args_model = ArgumentsModel(*args, **kwargs)
+
+        yield from self._stream(
+            *args_model.cmd_args,
+            chunk_size=chunk_size,
+            stderr=stderr,
+            validation=time.perf_counter() - started
+        )
+
+    def compile_spooled(self, *args, max_size=None, **kwargs):
+        """
+        Compile a source into a spooled temporary file.
+
+        Output stays in memory until it exceeds ``max_size``, then it is written to
+        a temporary file on disk.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+
+        Keyword Arguments:
+            max_size (integer): Size in bytes from which output is written to disk.
+                Default to ``DEFAULT_SPOOL_SIZE``.
+            **kwargs: Options as supported by ``compile()``.
+
+        Returns:
+            tempfile.SpooledTemporaryFile: Binary file with output, positioned at its
+            start. It is removed once closed.
+        """
+        spool = tempfile.SpooledTemporaryFile(
+            max_size=max_size or self.DEFAULT_SPOOL_SIZE
+        )
+
+        try:
+            for chunk in self.compile_stream(*args, **kwargs):
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+
+        spool.seek(0)
+
+        return spool
+
+    def compile_bytes(self, *args, **kwargs):
+        """
+        Compile a source and return its output without decoding it.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+
+        Keyword Arguments:
+            **kwargs: Options as supported by ``compile()``.
+
+        Returns:
+            bytes: Output as produced by dart-sass, with its trailing newline.
+        """
+        return b"".join(self.compile_stream(*args, **kwargs))
+
+    def split_errors(self, output):
+        """
+        Split dart-sass output into error blocks indexed on the entrypoint source they
+        belong to.
+
+        Every block starts with a line beginning with ``Error`` and the entrypoint is
+        either the stylesheet which could not be read or the root stylesheet from
+        stack trace. Warnings and unattributed blocks are ignored.
+
+        Arguments:
+            output (string): Compiler output.
+
+        Returns:
+            dict: Error block contents indexed on resolved source path.
+        """
+        blocks = []
+        for line in (output or "").splitlines():
+            if line.startswith("Error"):
+                blocks.append([line])
+            elif line[:1].isalpha():
+                # Any other message closes the current block (like warnings), source
+                # excerpt lines are either indented or start with a line number
+                blocks.append(None)
+            elif blocks and blocks[-1] is not None:
+                blocks[-1].append(line)
+
+        errors = {}
+        for block in blocks:
+            if block is None:
+                continue
+
+            path = None
+            match = self.ERROR_READING_PATTERN.match(block[0])
+            if match:
+                path = match.group("path")
+            else:
+                for line in block:
+                    match = self.ERROR_ROOT_PATTERN.match(line)
+                    if match:
+                        path = match.group("path")
+                        break
+
+            if path:
+                errors[Path(path).resolve()] = "\n".join(block) + "\n"
+
+        return errors
+
+    def compile_many(self, pairs, **kwargs):
+        """
+        Compile many sources in a single dart-sass execution.
+
+        Shared options are validated once and results are reported per target so a
+        failing source does not hide the status of the other ones.
+
+        Arguments:
+            pairs (iterable): Iterable of ``(source, destination)`` tuples.
+
+        Keyword Arguments:
+            **kwargs: Shared options as supported by ``DartSassCompiler.compile()``
+                except ``destination``.
+
+        Returns:
+            list: A ``CompileResult`` object for each given pair in the same order.
+        """
+        started = time.perf_counter()
+        args_model = BatchArgumentsModel(pairs, **kwargs)
+        validation = time.perf_counter() - started
+
+        results = {
+            (source, destination): CompileResult(source, destination, error=error)
+            for source, destination, error in args_model.invalid
+        }
+
+        if args_model.targets:
+            try:
+                result = self._exec(*args_model.cmd_args, validation=validation)
+            except RunnedCommandError as e:
+                resources = e.error_payload.get("resources")
+                results.update(self._get_batch_failures(args_model.targets, e))
+            else:
+                resources = result.resources
+                results.update({
+                    target: CompileResult(*target, output=result.stdout.strip())
+                    for target in args_model.targets
+                })
+
+            # Targets share the resource usage of their single process
+            for target in args_model.targets:
+                results[target].resources = resources
+
+        return [results[pair] for pair in args_model.pairs]
+
+    def compile_parallel(self, pairs, jobs=None, governor=None, history=None,
+                         **kwargs):
+        """
+        Compile many sources concurrently, each one with its own dart-sass process.
+
+        Arguments:
+            pairs (iterable): Iterable of ``(source, destination)`` tuples.
+
+        Keyword Arguments:
+            jobs (integer): Maximum number of concurrent dart-sass processes. Default
+                to the number of usable CPUs.
+            governor (ResourceGovernor): Governor to adjust the number of concurrent
+                processes from available memory and failures.
+            history (CompileHistory): Store of previous compiles to start the
+                longest targets first and get their timeout.
+            **kwargs: Shared options as supported by ``DartSassCompiler.compile()``
+                except ``destination``.
+
+        Returns:
+            generator: Yield a ``CompileResult`` object for each target in completion
+            order.
+        """
+        return ParallelExecutor(
+            self,
+            jobs=jobs,
+            governor=governor,
+            history=history,
+        ).run(
+            pairs,
+            **kwargs
+        )
+
+    def _get_batch_failures(self, targets, error):
+        """
+        Distribute a batch error to its targets.
+
+        Targets with an attributed error block get their own error, the other ones are
+        successful since dart-sass does not stop on the first error. If no error block
+        can be attributed to any target, like for a global error, every targets share
+        the same error.
+
+        When the process has been interrupted, from a timeout or a signal, targets
+        without an attributed error block may not have been compiled so they share
+        the same error.
+
+        Arguments:
+            targets (list): List of ``(source, destination)`` tuples.
+            error (RunnedCommandError): Error raised from batch execution.
+
+        Returns:
+            dict: ``CompileResult`` objects indexed on their target tuple.
+        """
+        errors = self.split_errors(error.error_payload.get("stdout"))
+
+        attributed = {
+            target: errors.get(target[0].resolve())
+            for target in targets
+        }
+
+        returncode = error.error_payload.get("returncode")
+        interrupted = (
+            error.error_payload.get("timeout") is not None or
+            returncode is None or
+            returncode < 0
+        )
+
+        if not any(attributed.values()):
+            return {
+                target: CompileResult(*target, error=error)
+                for target in targets
+            }
+
+        results = {}
+        for target, block in attributed.items():
+            if block:
+                payload = dict(error.error_payload, stdout=block)
+                results[target] = CompileResult(
+                    *target,
+                    error=RunnedCommandError(error_payload=payload)
+                )
+            elif interrupted:
+                results[target] = CompileResult(*target, error=error)
+            else:
+                results[target] = CompileResult(*target, output="")
+
+        return results
@@ -0,0 +1,418 @@
+import itertools
+import logging
+import queue
+import subprocess
+import threading
+from pathlib import Path
+
+from ..exceptions import CommandArgumentsError, ProtocolError, RunnedCommandError
+
+from .arguments import ArgumentsModel, StdinArgumentsModel
+from .executable import ExecutableAbstract
+from .protocol import (
+    build_compile_request, build_version_request, encode_packet,
+    parse_outbound_message, read_packet,
+)
+
+
+class EmbeddedDartSassCompiler(ExecutableAbstract):
+    """
+    Compiler backend which keeps a single long-lived ``sass --embedded`` process and
+    dialog with it through the Embedded Sass Protocol.
+
+    This avoids the process start and Dart VM warm-up for every compile. The process
+    is started on the first request and restarted on the next one if it has crashed
+    or has been killed after a timeout.
+
+    Requests are serialized, an instance only sends one request at once to its
+    process. Use multiple instances to compile concurrently.
+
+    It can be used as a context manager to ensure the process is stopped at the end.
+
+    Keyword Arguments:
+        command_timeout (integer): Timeout in seconds for each request.
+        executable (string or pathlib.Path or list): A custom executable to use
+            instead of the shipped dart-sass one.
+    """
+    EMBEDDED_ARGUMENT = "--embedded"
+    # Only the latest bytes of process error output are kept
+    MAX_STDERR_SIZE = 65536
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.logger = logging.getLogger("flechette-insolente")
+        self._process = None
+        self._responses = None
+        self._stderr = None
+        self._stderr_reader = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def is_alive(self):
+        """
+        Returns:
+            boolean: True if the compiler process is running.
+        """
+        return self._process is not None and self._process.poll() is None
+
+    def _read_responses(self, process, responses):
+        """
+        Read every packet from process output and push them into the responses queue
+        until output is closed.
+
+        This is runned in a dedicated thread for each started process.
+        """
+        try:
+            while True:
+                packet = read_packet(process.stdout)
+                if packet is None:
+                    break
+                responses.put(packet)
+        except (ProtocolError, ValueError, OSError) as e:
+            self.logger.debug("Embedded compiler output reader stopped: {}".format(e))
+        finally:
+            # Signal the end of output
+            responses.put(None)
+
+    def _read_errors(self, process, buffer):
+        """
+        Read process error output into a buffer until it is closed, so the process
+        never blocks on a full pipe.
+
+        Only the latest ``MAX_STDERR_SIZE`` bytes are kept. This is runned in a
+        dedicated thread for each started process.
+        """
+        try:
+            while True:
+                chunk = process.stderr.read1(4096)
+                if not chunk:
+                    break
+                buffer.extend(chunk)
+                del buffer[:-self.MAX_STDERR_SIZE]
+        except (ValueError, OSError) as e:
+            self.logger.debug("Embedded compiler error reader stopped: {}".format(e))
+
+    def start(self):
+        """
+        Start the compiler process if it is not already running.
+
+        A dead process is cleaned up before starting a new one.
+        """
+        if self.is_alive:
+            return
+
+        if self._process is not None:
+            self.stop()
+
+        self._responses = queue.Queue()
+        self._process = subprocess.Popen(
+            self.get_command(self.EMBEDDED_ARGUMENT),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        threading.Thread(
+            target=self._read_responses,
+            args=(self._process, self._responses),
+            daemon=True,
+        ).start()
+
+        self._stderr = bytearray()
+        self._stderr_reader = threading.Thread(
+            target=self._read_errors,
+            args=(self._process, self._stderr),
+            daemon=True,
+        )
+        self._stderr_reader.start()
+
+    def stop(self):
+        """
+        Stop the compiler process if any.
+
+        Returns:
+            integer: The process return code if there was a process, else ``None``.
+        """
+        process, self._process = self._process, None
+        if process is None:
+            return None
+
+        if process.poll() is None:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+            try:
+                process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+        for stream in (process.stdin, process.stdout, process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+        return process.returncode
+
+    def _get_stderr(self):
+        """
+        Get the error output collected from a dead process.
+        """
+        if self._stderr_reader is None:
+            return None
+
+        # Reader ends once the dead process error output has been fully read
+        self._stderr_reader.join(timeout=1)
+
+        return self._decode(bytes(self._stderr)) or None
+
+    def _request(self, compilation_id, message, cmd):
+        """
+        Send a message to the compiler process and wait for its response.
+
+        Log events are forwarded to the application logger while waiting.
+
+        Arguments:
+            compilation_id (integer): Compilation ID to use for the packet, the
+                response is expected with the same ID.
+            message (bytes): Encoded inbound message.
+            cmd (list): Command items used in error payload.
+
+        Returns:
+            dict: The parsed response message.
+        """
+        self.start()
+        process = self._process
+
+        try:
+            process.stdin.write(encode_packet(compilation_id, message))
+            process.stdin.flush()
+        except OSError:
+            # Broken pipe, process died since the start check, the response reader
+            # will signal the end of output
+            pass
+
+        command_timeout = self.get_timeout()
+        while True:
+            try:
+                packet = self._responses.get(timeout=command_timeout)
+            except queue.Empty:
+                # Process state is unknown, better to throw it away
+                self.stop()
+                raise RunnedCommandError(error_payload={
+                    "returncode": None,
+                    "cmd": cmd,
+                    "stdout": None,
+                    "stderr": None,
+                    "timeout": command_timeout,
+                })
+
+            if packet is None:
+                process.wait()
+                stderr = self._get_stderr()
+                self.stop()
+                raise RunnedCommandError(error_payload={
+                    # A crash without return code still have to be an error
+                    "returncode": process.returncode or 1,
+                    "cmd": cmd,
+                    "stdout": None,
+                    "stderr": stderr,
+                    "timeout": None,
+                })
+
+            response_id, data = packet
+            response = parse_outbound_message(data)
+
+            if response["type"] == "log_event":
+                self.logger.warning(response["formatted"] or response["message"])
+            elif response["type"] == "error":
+                # Protocol errors are fatal, the compiler closes itself after them
+                self.stop()
+                raise RunnedCommandError(error_payload={
+                    "returncode": 1,
+                    "cmd": cmd,
+                    "stdout": response["message"],
+                    "stderr": None,
+                    "timeout": None,
+                })
+            elif response_id == compilation_id:
+                return response
+
+    def version(self):
+        """
+        Request the compiler version.
+
+        Returns:
+            string: The dart-sass version.
+        """
+        with self._lock:
+            request_id = next(self._ids)
+            response = self._request(
+                0,
+                build_version_request(request_id),
+                self.get_command(self.EMBEDDED_ARGUMENT),
+            )
+
+        return response["compiler_version"]
+
+    def compile(self, *args, **kwargs):
+        """
+        Compile a Sass source file.
+
+        This has the same signature than ``DartSassCompiler.compile()`` and arguments
+        are validated the same way with ``ArgumentsModel``. However a directory source
+        is not supported.
+
+        Like dart-sass executable, the source map is enabled on default when writing
+        to a destination file and source map is written along with a ``.map``
+        extension.
+
+        Arguments:
+            source (pathlib.Path): Path to the Sass source file.
+
+        Keyword Arguments:
+            destination (pathlib.Path): Path to the CSS file to write. If not given the
+                CSS is returned.
+            style (string): Output style name.
+            load_path (list): List of paths to use when resolving imports.
+            indented (boolean): Ignored since syntax is guessed from file extension.
+            source_map (boolean): Whether to generate source map.
+            profile (CompileProfile): Validated options to use instead of giving
+                them.
+
+        Returns:
+            string: The compiled CSS if there is no destination, else an empty string.
+        """
+        args_model = ArgumentsModel(*args, **kwargs)
+        options = kwargs["profile"].options if kwargs.get("profile") else kwargs
+
+        if args_model.source.is_dir():
+            msg = "Embedded compiler does not support directory source: {}"
+            raise CommandArgumentsError(msg.format(args_model.source))
+
+        source_map = options.get("source_map")
+        if source_map is None:
+            source_map = args_model.destination is not None
+
+        message = build_compile_request(
+            path=args_model.source.resolve(),
+            style=options.get("style"),
+            source_map=source_map and args_model.destination is not None,
+            load_paths=[
+                Path(item).resolve() for item in options.get("load_path") or []
+            ],
+        )
+        cmd = self.get_command(self.EMBEDDED_ARGUMENT, *args_model.cmd_args)
+
+        return self._compile_request(message, cmd, args_model.destination)
+
+    def compile_string(self, source, syntax="scss", **kwargs):
+        """
+        Compile Sass source content given as a string.
+
+        This has the same signature than ``DartSassCompiler.compile_string()``, the
+        source is sent inside the compile request.
+
+        Arguments:
+            source (string): Sass source content.
+
+        Keyword Arguments:
+            syntax (string): Source syntax, one of ``scss``, ``sass`` (the indented
+                syntax) or ``css``.
+            destination (pathlib.Path): Path to the CSS file to write. If not given the
+                CSS is returned.
+            style (string): Output style name.
+            load_path (list): List of paths to use when resolving imports.
+            source_map (boolean): Whether to generate source map.
+
+        Returns:
+            string: The compiled CSS if there is no destination, else an empty string.
+        """
+        args_model = StdinArgumentsModel(syntax=syntax, **kwargs)
+
+        source_map = kwargs.get("source_map")
+        if source_map is None:
+            source_map = args_model.destination is not None
+
+        message = build_compile_request(
+            source=source,
+            syntax=args_model.syntax,
+            style=kwargs.get("style"),
+            source_map=source_map and args_model.destination is not None,
+            load_paths=[Path(item).resolve() for item in kwargs.get("load_path") or []],
+        )
+        cmd = self.get_command(self.EMBEDDED_ARGUMENT, *args_model.cmd_args)
+
+        return self._compile_request(message, cmd, args_model.destination)
+
+    def _compile_request(self, message, cmd, destination):
+        """
+        Send a compile request and manage its response.
+
+        Arguments:
+            message (bytes): Encoded compile request.
+            cmd (list): Equivalent command line used in error payloads.
+            destination (pathlib.Path): Destination file path, may be ``None``.
+
+        Returns:
+            string: The compiled CSS if there is no destination, else an empty string.
+        """
+        with self._lock:
+            response = self._request(next(self._ids), message, cmd)
+
+        if response["failure"]:
+            raise RunnedCommandError(error_payload={
+                # Same return code than dart-sass executable for compile errors
+                "returncode": 65,
+                "cmd": cmd,
+                "stdout": (
+                    response["failure"]["formatted"] or response["failure"]["message"]
+                ),
+                "stderr": None,
+                "timeout": None,
+            })
+
+        if destination is None:
+            return response["css"].strip()
+
+        self.write_output(
+            destination,
+            response["css"],
+            source_map=response["source_map"],
+        )
+
+        return ""
+
+    def write_output(self, destination, css, source_map=None):
+        """
+        Write compiled CSS to destination and its possible source map.
+
+        Arguments:
+            destination (pathlib.Path): Destination file path for CSS.
+            css (string): Compiled CSS.
+
+        Keyword Arguments:
+            source_map (string): Source map content. If given it will be written to
+                destination path with additional extension ``.map`` and a source
+                mapping comment is appended to CSS.
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        if source_map:
+            map_path = destination.parent / (destination.name + ".map")
+            map_path.write_text(source_map)
+            css = "{}\n\n/*# sourceMappingURL={} */".format(css, map_path.name)
+
+        destination.write_text(css + "\n")
@@ -1,10 +1,16 @@
 import subprocess
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
 import flechette_insolente
 
+from .. import plateform_build
 from ..exceptions import RunnedCommandError
-from ..plateform_build import DART_SASS_EXEC
+
+from .hooks import CompileEvent, SpawnEvent
+from .resources import ResourcePopen, apply_limits, get_resources
 
 
 class DebugExecVariance:
@@ -53,11 +59,129 @@ class ExecutableAbstract(DebugExecVariance):
     This should be the wrapper around dart-sass executable compiler.
 
     Start from libsass signature but it may not be suitable or accurate.
+
+    Keyword Arguments:
+        command_timeout (integer): Timeout in seconds for a command execution.
+            Default to ``DEFAULT_COMMAND_TIMEOUT``.
+        executable (string or pathlib.Path or list): A custom executable to use
+            instead of the shipped dart-sass one. It may be a list to give a command
+            with its own arguments like ``[sys.executable, "script.py"]``. This is
+            mostly used for tests and debug.
+        hooks (list): Callables to receive a ``CompileEvent`` for each execution.
+            See ``flechette_insolente.compiler.hooks``.
+        memory_limit (integer): Maximum virtual memory size in bytes for each
+            process. Dart reserves a lot of virtual memory, this limit has to be
+            far above the expected resident memory. Only supported on Linux.
+        cpu_limit (integer): Maximum CPU time in seconds for each process, unlike
+            ``command_timeout`` time waiting for disk or other processes does not
+            count. Only supported on Linux.
     """
     DEFAULT_COMMAND_TIMEOUT = 30
+    # Maximum size in bytes of each chunk read from a streamed output
+    DEFAULT_CHUNK_SIZE = 65536
 
-    def __init__(self, command_timeout=None):
+    def __init__(self, command_timeout=None, executable=None, hooks=None,
+                 memory_limit=None, cpu_limit=None):
         self.command_timeout = command_timeout or self.DEFAULT_COMMAND_TIMEOUT
+        self.executable = executable
+        self.hooks = list(hooks or [])
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self._local = threading.local()
+
+    def pop_resources(self):
+        """
+        Get resource usage of the last process executed from the current thread and
+        forget it.
+
+        This is how the resource usage of a compile can be retrieved since compile
+        methods only return the compiler output.
+
+        Returns:
+            dict: Resource usage as built from ``get_resources()``, ``None`` if there
+            was no execution since the last call or no resource usage.
+        """
+        resources = getattr(self._local, "resources", None)
+        self._local.resources = None
+
+        return resources
+
+    def get_timeout(self):
+        """
+        Returns:
+            float: Timeout in seconds for an execution from the current thread, the
+            one set with ``override_timeout()`` if any, else ``command_timeout``.
+        """
+        return getattr(self._local, "timeout", None) or self.command_timeout
+
+    @contextmanager
+    def override_timeout(self, timeout):
+        """
+        Use another timeout for executions from the current thread, like a timeout
+        estimated from previous compiles of a target.
+
+        Arguments:
+            timeout (float): Timeout in seconds, ``None`` keeps ``command_timeout``.
+        """
+        previous = getattr(self._local, "timeout", None)
+        self._local.timeout = timeout
+
+        try:
+            yield
+        finally:
+            self._local.timeout = previous
+
+    def add_hook(self, hook):
+        """
+        Register a hook to receive a ``CompileEvent`` for each execution.
+
+        Arguments:
+            hook (callable): Function which accepts an event as single argument.
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Unregister a hook.
+
+        Arguments:
+            hook (callable): A registered hook.
+        """
+        self.hooks.remove(hook)
+
+    def emit_event(self, event):
+        """
+        Send an event to every registered hooks.
+
+        Arguments:
+            event (CompileEvent): Event to send.
+        """
+        for hook in self.hooks:
+            hook(event)
+
+    def get_command(self, *args, **kwargs):
+        """
+        Build the full command line with executable and given arguments.
+
+        Arguments:
+            *args: Arguments to append after the executable.
+
+        Keyword Arguments:
+            cmd_name (string): Executable to use instead of the instance one.
+
+        Returns:
+            list: The command items.
+        """
+        cmd_name = (
+            kwargs.get("cmd_name") or
+            self.executable or
+            plateform_build.DART_SASS_EXEC
+        )
+
+        if isinstance(cmd_name, (list, tuple)):
+            return list(cmd_name) + list(args)
+
+        return [cmd_name] + list(args)
 
     def _fix_bytes(self, content):
         """
@@ -70,41 +194,321 @@ class ExecutableAbstract(DebugExecVariance):
 
         return content
 
+    def _decode(self, content):
+        """
+        Decode process output like subprocess does in text mode, with universal
+        newlines.
+        """
+        content = self._fix_bytes(content)
+
+        return content.replace("\r\n", "\n").replace("\r", "\n")
+
     def _exec(self, *args, **kwargs):
         """
         Execute command.
+
+        When there are hooks, a ``CompileEvent`` is emitted once process is finished
+        with the measures of each phase.
+
+        Arguments:
+            *args: Arguments to give to executable.
+
+        Keyword Arguments:
+            cmd_name (string): Executable to use instead of the instance one.
+            input (string): Content to send to the process standard input.
+            validation (float): Elapsed time in seconds to validate arguments, it is
+                only used in emitted event.
+
+        Returns:
+            subprocess.CompletedProcess: Result of finished process.
         """
         # One can override from kwargs the default executable command path to use
         # another one, mostly used for debug/test, maybe not accurate to keep it
-        cmd_name = kwargs.get("cmd_name", DART_SASS_EXEC)
+        cmd = self.get_command(*args, cmd_name=kwargs.get("cmd_name"))
+        content = kwargs.get("input")
+        if content is not None:
+            content = content.encode("utf-8")
+        command_timeout = self.get_timeout()
+        timeout = threading.Event()
 
-        try:
-            result = subprocess.run(
-                [cmd_name] + list(args),
-                timeout=self.command_timeout,
-                check=True,
-                text=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-            )
-        except subprocess.CalledProcessError as e:
+        started = time.perf_counter()
+        with ResourcePopen(
+            cmd,
+            stdin=None if content is None else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        ) as process:
+            if self.memory_limit or self.cpu_limit:
+                apply_limits(
+                    process.pid,
+                    memory_limit=self.memory_limit,
+                    cpu_limit=self.cpu_limit,
+                )
+            spawned = time.perf_counter()
+            if self.hooks:
+                self.emit_event(SpawnEvent(cmd))
+
+            def kill():
+                timeout.set()
+                process.kill()
+
+            feeder = None
+            if content is not None:
+                feeder = threading.Thread(
+                    target=self._feed,
+                    args=(process.stdin, content),
+                    daemon=True,
+                )
+            watchdog = threading.Timer(command_timeout, kill)
+
+            try:
+                if feeder is not None:
+                    feeder.start()
+                watchdog.start()
+
+                # Output is read until its end, also after a timeout so what has been
+                # outputed before is collected
+                stdout = process.stdout.read()
+                if feeder is not None:
+                    feeder.join()
+                process.reap()
+            except BaseException:
+                # Like with 'subprocess.run()', do not leave a running process behind
+                # an interruption
+                process.kill()
+                if self.hooks:
+                    self.emit_event(CompileEvent(
+                        cmd,
+                        started=started,
+                        returncode=process.wait(),
+                        cancelled=True,
+                        phases={
+                            "validation": kwargs.get("validation"),
+                            "spawn": spawned - started,
+                            "wait": time.perf_counter() - spawned,
+                        },
+                    ))
+                raise
+            finally:
+                watchdog.cancel()
+        waited = time.perf_counter()
+
+        resources = get_resources(process.rusage, waited - started)
+        self._local.resources = resources
+        output = self._decode(stdout)
+
+        if self.hooks:
+            self.emit_event(CompileEvent(
+                cmd,
+                started=started,
+                returncode=process.returncode,
+                timeout=timeout.is_set(),
+                input_bytes=len(content or b""),
+                output_bytes=len(stdout),
+                resources=resources,
+                phases={
+                    "validation": kwargs.get("validation"),
+                    "spawn": spawned - started,
+                    "wait": waited - spawned,
+                    "decode": time.perf_counter() - waited,
+                },
+            ))
+
+        if timeout.is_set():
             raise RunnedCommandError(error_payload={
-                "returncode": e.returncode,
-                "cmd": e.cmd,
-                "stdout": e.stdout,
-                "stderr": e.stderr,
+                "returncode": None,
+                "cmd": cmd,
+                "stdout": output or None,
+                "stderr": None,
+                "timeout": command_timeout,
+                "resources": resources,
+            })
+
+        if process.returncode:
+            raise RunnedCommandError(error_payload={
+                "returncode": process.returncode,
+                "cmd": cmd,
+                "stdout": output,
+                "stderr": None,
                 "timeout": None,
+                "resources": resources,
             })
-        except subprocess.TimeoutExpired as e:
-            # NOTE: For unknow reason, TimeoutExpired always have an empty stdout
+
+        result = subprocess.CompletedProcess(cmd, process.returncode, output, None)
+        result.resources = resources
+
+        return result
+
+    def _stream(self, *args, **kwargs):
+        """
+        Execute command and yield its standard output as it arrives.
+
+        Unlike ``_exec()`` the output is never held as a whole and not decoded.
+        Standard error is collected apart so it does not mix with output, it is
+        given as the ``stderr`` of a possible ``RunnedCommandError`` payload which
+        is raised once output has been consumed.
+
+        The timeout applies to the whole execution, including the time spent by the
+        consumer between chunks. Process is killed if the generator is closed before
+        the end of output.
+
+        Arguments:
+            *args: Arguments to give to executable.
+
+        Keyword Arguments:
+            chunk_size (integer): Maximum size of each chunk. Default to
+                ``DEFAULT_CHUNK_SIZE``.
+            input (string): Content to send to the process standard input.
+            stderr (object): Binary file object to write the standard error to
+                once the execution has succeeded, like for warnings. It is ignored
+                on failure since standard error is in the error payload.
+            validation (float): Elapsed time in seconds to validate arguments, it is
+                only used in emitted event.
+
+        Yields:
+            bytes: Output chunks.
+        """
+        cmd = self.get_command(*args, cmd_name=kwargs.get("cmd_name"))
+        chunk_size = kwargs.get("chunk_size") or self.DEFAULT_CHUNK_SIZE
+        content = kwargs.get("input")
+        if content is not None:
+            content = content.encode("utf-8")
+        command_timeout = self.get_timeout()
+        output_bytes = 0
+        stderr = []
+        timeout = threading.Event()
+
+        started = time.perf_counter()
+        with ResourcePopen(
+            cmd,
+            stdin=None if content is None else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ) as process:
+            if self.memory_limit or self.cpu_limit:
+                apply_limits(
+                    process.pid,
+                    memory_limit=self.memory_limit,
+                    cpu_limit=self.cpu_limit,
+                )
+            spawned = time.perf_counter()
+            if self.hooks:
+                self.emit_event(SpawnEvent(cmd))
+
+            def kill():
+                timeout.set()
+                process.kill()
+
+            # Pipes are read concurrently so none of them can fill up and block the
+            # process
+            readers = [
+                threading.Thread(
+                    target=lambda: stderr.append(process.stderr.read()),
+                    daemon=True,
+                ),
+            ]
+            if content is not None:
+                readers.append(threading.Thread(
+                    target=self._feed,
+                    args=(process.stdin, content),
+                    daemon=True,
+                ))
+            watchdog = threading.Timer(command_timeout, kill)
+
+            try:
+                for reader in readers:
+                    reader.start()
+                watchdog.start()
+
+                while True:
+                    chunk = process.stdout.read1(chunk_size)
+                    if not chunk:
+                        break
+                    output_bytes += len(chunk)
+                    yield chunk
+
+                for reader in readers:
+                    reader.join()
+                process.reap()
+            except BaseException:
+                # Also reached when consumer closes the generator
+                process.kill()
+                if self.hooks:
+                    self.emit_event(CompileEvent(
+                        cmd,
+                        started=started,
+                        returncode=process.wait(),
+                        cancelled=True,
+                        output_bytes=output_bytes,
+                        phases={
+                            "validation": kwargs.get("validation"),
+                            "spawn": spawned - started,
+                            "wait": time.perf_counter() - spawned,
+                        },
+                    ))
+                raise
+            finally:
+                watchdog.cancel()
+        waited = time.perf_counter()
+
+        resources = get_resources(process.rusage, waited - started)
+        self._local.resources = resources
+        errors = self._decode(b"".join(stderr)) or None
+
+        if self.hooks:
+            self.emit_event(CompileEvent(
+                cmd,
+                started=started,
+                returncode=process.returncode,
+                timeout=timeout.is_set(),
+                input_bytes=len(content or b""),
+                output_bytes=output_bytes,
+                resources=resources,
+                phases={
+                    "validation": kwargs.get("validation"),
+                    "spawn": spawned - started,
+                    "wait": waited - spawned,
+                    "decode": None,
+                },
+            ))
+
+        if timeout.is_set():
             raise RunnedCommandError(error_payload={
                 "returncode": None,
-                "cmd": e.cmd,
-                "stdout": self._fix_bytes(e.stdout),
-                "stderr": self._fix_bytes(e.stderr),
-                "timeout": e.timeout,
+                "cmd": cmd,
+                "stdout": None,
+                "stderr": errors,
+                "timeout": command_timeout,
+                "resources": resources,
+            })
+
+        if process.returncode:
+            raise RunnedCommandError(error_payload={
+                "returncode": process.returncode,
+                "cmd": cmd,
+                "stdout": None,
+                "stderr": errors,
+                "timeout": None,
+                "resources": resources,
             })
-        else:
-            return result
 
-        return None
+        forward = kwargs.get("stderr")
+        if forward is not None and errors:
+            forward.write(b"".join(stderr))
+            forward.flush()
+
+    def _feed(self, stdin, content):
+        """
+        Write content to a process standard input then close it.
+        """
+        try:
+            stdin.write(content)
+        except BrokenPipeError:
+            # Process has exited without reading everything, its return code tells
+            # why
+            pass
+        finally:
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
@@ -0,0 +1,146 @@
+"""
+Concurrency governor for parallel compiles.
+
+Running too many dart-sass processes at once on a host with limited memory leads to
+swapping or to processes killed by the OOM killer. ``ResourceGovernor`` caps the
+number of concurrent compiles from the available memory and adjusts it while
+compiles run, with an additive increase and multiplicative decrease (AIMD) like the
+TCP congestion control:
+
+* Each successful compile increases the limit by ``1 / limit``, so roughly by one
+  after a full round of compiles;
+* A compile which timed out, which has been killed by the system (likely by the OOM
+  killer) or which finished while memory is under pressure halves the limit.
+"""
+import signal
+import time
+
+from ..utils.system import (
+    CGROUP_ROOT, get_available_memory, get_cpu_count, get_memory_pressure,
+)
+
+
+class ResourceGovernor:
+    """
+    Decide how many compiles can run at once.
+
+    Keyword Arguments:
+        max_jobs (integer): Highest limit. Default to the number of usable CPUs.
+        min_jobs (integer): Lowest limit.
+        memory_per_job (integer): Expected peak memory in bytes of a compile. If not
+            given, it is learned from the highest peak resident memory of finished
+            compiles. Until it is known, limit is not capped by memory.
+        memory_reserve (integer): Memory in bytes to keep available for other
+            processes.
+        pressure_threshold (float): Memory pressure, as the percentage of stalled
+            time from Pressure Stall Information, from which memory is considered
+            under pressure.
+        root (pathlib.Path): Mount point of cgroup filesystem.
+
+    Attributes:
+        window (float): Current limit before the memory cap.
+        decreases (integer): Number of limit decreases.
+    """
+    def __init__(self, max_jobs=None, min_jobs=1, memory_per_job=None,
+                 memory_reserve=0, pressure_threshold=10.0, root=CGROUP_ROOT):
+        self.root = root
+        self.max_jobs = max_jobs or get_cpu_count(root=root)
+        self.min_jobs = min(min_jobs, self.max_jobs)
+        self.memory_per_job = memory_per_job
+        self.memory_reserve = memory_reserve
+        self.pressure_threshold = pressure_threshold
+        self.window = float(self.max_jobs)
+        self.decreases = 0
+        self._decreased_at = None
+
+    def get_available_memory(self):
+        return get_available_memory(root=self.root)
+
+    def get_memory_pressure(self):
+        return get_memory_pressure(root=self.root)
+
+    def get_memory_cap(self, running):
+        """
+        Get the number of compiles which fit in available memory.
+
+        Arguments:
+            running (integer): Number of running compiles, their memory is already
+                used.
+
+        Returns:
+            integer: Number of compiles including the running ones, ``None`` if
+            there is no memory estimation or available memory is unknown.
+        """
+        if not self.memory_per_job:
+            return None
+
+        available = self.get_available_memory()
+        if available is None:
+            return None
+
+        return running + max(0, available - self.memory_reserve) // self.memory_per_job
+
+    def get_limit(self, running=0):
+        """
+        Get the number of compiles allowed to run at once.
+
+        Keyword Arguments:
+            running (integer): Number of running compiles.
+
+        Returns:
+            integer: Limit between ``min_jobs`` and ``max_jobs``.
+        """
+        limit = int(self.window)
+
+        cap = self.get_memory_cap(running)
+        if cap is not None:
+            limit = min(limit, cap)
+
+        return max(self.min_jobs, min(limit, self.max_jobs))
+
+    def is_congested(self, result):
+        """
+        Check if a compile result is a signal to decrease the limit.
+
+        Arguments:
+            result (CompileResult): Finished compile.
+
+        Returns:
+            boolean: True if compile timed out, was killed by the system or if
+            memory is under pressure.
+        """
+        payload = getattr(result.error, "error_payload", None) or {}
+
+        if payload.get("timeout"):
+            return True
+        elif payload.get("returncode") == -signal.SIGKILL:
+            return True
+
+        pressure = self.get_memory_pressure()
+
+        return pressure is not None and pressure >= self.pressure_threshold
+
+    def update(self, result):
+        """
+        Adjust the limit from a finished compile.
+
+        A compile which started before the last decrease does not decrease the limit
+        again, since it is more likely a victim of the same congestion.
+
+        Arguments:
+            result (CompileResult): Finished compile.
+        """
+        if result.resources and result.resources.get("max_rss"):
+            self.memory_per_job = max(
+                self.memory_per_job or 0,
+                result.resources["max_rss"],
+            )
+
+        if self.is_congested(result):
+            started = time.perf_counter() - (result.duration or 0)
+            if self._decreased_at is None or started >= self._decreased_at:
+                self.window = max(float(self.min_jobs), self.window / 2)
+                self.decreases += 1
+                self._decreased_at = time.perf_counter()
+        else:
+            self.window = min(float(self.max_jobs), self.window + 1 / self.window)
@@ -0,0 +1,399 @@
+import json
+import os
+from pathlib import Path
+
+from .imports import ImportResolver
+
+
+SOURCE_EXTENSIONS = (".scss", ".sass")
+
+
+def find_entrypoints(directory):
+    """
+    Find every entrypoint from a directory, like dart-sass does when compiling a
+    directory.
+
+    Arguments:
+        directory (pathlib.Path): Directory to search recursively.
+
+    Returns:
+        list: Sorted paths of every Sass sources which are not partials.
+    """
+    return sorted([
+        path.resolve()
+        for path in Path(directory).rglob("*")
+        if (
+            path.suffix in SOURCE_EXTENSIONS and
+            not path.name.startswith("_") and
+            path.is_file()
+        )
+    ])
+
+
+def expand_targets(targets):
+    """
+    Expand targets to every entrypoint with its destination.
+
+    A directory source is expanded to its entrypoints with a destination in the
+    destination directory, like dart-sass does.
+
+    Arguments:
+        targets (list): List of ``(source, destination)`` tuples.
+
+    Returns:
+        dict: Destination path indexed on resolved entrypoint path.
+    """
+    entrypoints = {}
+
+    for source, destination in targets:
+        source = Path(source)
+        destination = Path(destination) if destination else None
+
+        if source.is_dir():
+            root = source.resolve()
+            for path in find_entrypoints(source):
+                entrypoints[path] = (
+                    destination / path.relative_to(root).with_suffix(".css")
+                )
+        else:
+            entrypoints[source.resolve()] = destination
+
+    return entrypoints
+
+
+def get_affected_targets(targets, paths, load_paths=None, stat_cache=None):
+    """
+    Get targets affected by some changed files.
+
+    Arguments:
+        targets (list): List of ``(source, destination)`` tuples. Directory sources
+            are expanded to their entrypoints.
+        paths (list): Changed file paths.
+
+    Keyword Arguments:
+        load_paths (list): List of paths to use when resolving imports.
+        stat_cache (StatCache): Optional stat cache.
+
+    Returns:
+        list: ``(source, destination)`` tuples of affected entrypoints, sorted on
+        source.
+    """
+    entrypoints = expand_targets(targets)
+    graph = DependencyGraph(load_paths=load_paths, stat_cache=stat_cache)
+    graph.build(list(entrypoints.keys()))
+
+    return [
+        (path, entrypoints[path])
+        for path in graph.get_affected_entrypoints(paths)
+    ]
+
+
+class DependencyGraph:
+    """
+    Forward and reverse dependency graph of Sass sources.
+
+    The graph is built from entrypoints by following their loaded stylesheets with
+    ``ImportResolver``. Scanned URLs of each file are stored with the file stats so
+    a file is scanned again only if it has changed. URLs are always resolved again on
+    refresh since resolution may change if files are created or removed.
+
+    The graph can be saved to a JSON file and loaded back, a saved graph is ignored
+    if it has been built with other load paths.
+
+    Keyword Arguments:
+        load_paths (list): List of paths to use when resolving imports.
+        stat_cache (StatCache): Optional stat cache for file stats and import
+            resolution, it makes a refresh of a loaded graph check each path once.
+
+    Attributes:
+        entrypoints (list): Entrypoint paths.
+        files (dict): Scanned file records indexed on their path, each record holds
+            the file stats, its loaded URLs and their resolved paths.
+        scanned (integer): Number of files scanned since graph creation.
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self, load_paths=None, stat_cache=None):
+        self.load_paths = [Path(item).resolve() for item in load_paths or []]
+        self.stat_cache = stat_cache
+        self.resolver = ImportResolver(
+            load_paths=self.load_paths,
+            stat_cache=stat_cache,
+        )
+        self.entrypoints = []
+        self.files = {}
+        self.scanned = 0
+
+    def get_stat(self, path):
+        if self.stat_cache is not None:
+            stat = self.stat_cache.stat(path)
+            return None if stat is None else [stat.st_mtime_ns, stat.st_size]
+
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def update_file(self, path):
+        """
+        Update record of a file, scanning it only if it has changed.
+
+        Arguments:
+            path (pathlib.Path): Resolved file path.
+
+        Returns:
+            dict: File record or ``None`` if file does not exist anymore.
+        """
+        key = str(path)
+        stat = self.get_stat(path)
+        if stat is None:
+            self.files.pop(key, None)
+            return None
+
+        record = self.files.get(key)
+        if record is None or record["stat"] != stat:
+            urls = [] if path.suffix == ".css" else self.resolver.scan(path)
+            self.scanned += 1
+            record = {"stat": stat, "urls": urls}
+
+        imports = []
+        unresolved = []
+        for url in record["urls"]:
+            found = self.resolver.resolve(url, path.parent)
+            if found is None:
+                unresolved.append(url)
+            elif str(found) not in imports:
+                imports.append(str(found))
+
+        record["imports"] = imports
+        record["unresolved"] = unresolved
+        self.files[key] = record
+
+        return record
+
+    def build(self, sources):
+        """
+        Build or refresh graph from given sources.
+
+        Files which are not reachable anymore from entrypoints are removed from
+        graph.
+
+        Arguments:
+            sources (list): Entrypoint file paths or directories to search for
+                entrypoints.
+
+        Returns:
+            DependencyGraph: The graph itself.
+        """
+        entrypoints = []
+        for item in sources:
+            item = Path(item)
+            if item.is_dir():
+                entrypoints.extend(find_entrypoints(item))
+            else:
+                entrypoints.append(item.resolve())
+
+        self.entrypoints = [str(item) for item in entrypoints]
+
+        seen = set()
+        queue = list(entrypoints)
+        while queue:
+            path = queue.pop(0)
+            if str(path) in seen:
+                continue
+            seen.add(str(path))
+
+            record = self.update_file(path)
+            if record:
+                queue.extend([Path(item) for item in record["imports"]])
+
+        for key in list(self.files.keys()):
+            if key not in seen:
+                del self.files[key]
+
+        return self
+
+    def get_reverse(self):
+        """
+        Build the reverse graph.
+
+        Returns:
+            dict: Paths of files which directly load a file, indexed on the loaded
+            file path.
+        """
+        reverse = {key: [] for key in self.files}
+        for key, record in self.files.items():
+            for item in record["imports"]:
+                reverse.setdefault(item, []).append(key)
+
+        return reverse
+
+    def _walk(self, edges, starts):
+        seen = []
+        queue = [str(Path(item).resolve()) for item in starts]
+        while queue:
+            current = queue.pop(0)
+            for item in edges.get(current, []):
+                if item not in seen:
+                    seen.append(item)
+                    queue.append(item)
+
+        return seen
+
+    def get_dependencies(self, path):
+        """
+        Get every file transitively loaded by a file.
+
+        Arguments:
+            path (pathlib.Path): File path.
+
+        Returns:
+            list: Paths of dependencies.
+        """
+        edges = {key: record["imports"] for key, record in self.files.items()}
+
+        return [
+            Path(item)
+            for item in self._walk(edges, [path])
+            if item != str(Path(path).resolve())
+        ]
+
+    def get_dependents(self, path):
+        """
+        Get every file which transitively loads a file.
+
+        Arguments:
+            path (pathlib.Path): File path.
+
+        Returns:
+            list: Paths of dependents.
+        """
+        return [
+            Path(item)
+            for item in self._walk(self.get_reverse(), [path])
+            if item != str(Path(path).resolve())
+        ]
+
+    def get_missing_loaders(self, paths):
+        """
+        Get files with an unresolved URL which could resolve to one of given paths,
+        like a removed file they still load.
+
+        Arguments:
+            paths (list): Resolved file paths as strings.
+
+        Returns:
+            list: Paths of files as strings.
+        """
+        paths = set(paths)
+        loaders = []
+
+        for key, record in self.files.items():
+            for url in record.get("unresolved", []):
+                candidates = self.resolver.get_url_candidates(url, Path(key).parent)
+                if any(str(item.resolve()) in paths for item in candidates):
+                    loaders.append(key)
+                    break
+
+        return loaders
+
+    def get_affected_entrypoints(self, paths):
+        """
+        Get entrypoints affected by some changed files.
+
+        Since graph is built from current files, a removed or renamed file is not in
+        graph anymore. Instead, files with an unresolved URL which could have loaded a
+        changed file are considered as changed.
+
+        Arguments:
+            paths (list): Changed file paths.
+
+        Returns:
+            list: Sorted paths of entrypoints which are a changed file or transitively
+            load one.
+        """
+        changed = [str(Path(item).resolve()) for item in paths]
+        changed.extend(self.get_missing_loaders(changed))
+        affected = set(self._walk(self.get_reverse(), changed)) | set(changed)
+
+        return [Path(item) for item in self.entrypoints if item in affected]
+
+    def to_dict(self):
+        return {
+            "version": self.FORMAT_VERSION,
+            "load_paths": [str(item) for item in self.load_paths],
+            "entrypoints": self.entrypoints,
+            "files": self.files,
+        }
+
+    def to_json(self, indent=4):
+        """
+        Returns:
+            string: Graph serialized to JSON.
+        """
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_dot(self):
+        """
+        Returns:
+            string: Graph in Graphviz DOT language where entrypoints have a box shape.
+            File names are relative to the current directory when possible.
+        """
+        def label(path):
+            try:
+                return os.path.relpath(path)
+            except ValueError:
+                return path
+
+        lines = ["digraph dependencies {"]
+        for key in self.entrypoints:
+            lines.append('    "{}" [shape=box];'.format(label(key)))
+        for key, record in sorted(self.files.items()):
+            for item in record["imports"]:
+                lines.append('    "{}" -> "{}";'.format(label(key), label(item)))
+        lines.append("}")
+
+        return "\n".join(lines) + "\n"
+
+    def save(self, path):
+        """
+        Save graph to a JSON file.
+
+        Arguments:
+            path (pathlib.Path): File path to write.
+        """
+        Path(path).write_text(self.to_json(indent=None))
+
+    @classmethod
+    def load(cls, path, load_paths=None, stat_cache=None):
+        """
+        Load a graph from a JSON file.
+
+        Arguments:
+            path (pathlib.Path): File path to read.
+
+        Keyword Arguments:
+            load_paths (list): List of paths to use when resolving imports.
+            stat_cache (StatCache): Optional stat cache.
+
+        Returns:
+            DependencyGraph: Loaded graph or an empty one if file does not exist, is
+            invalid or has been built with other load paths.
+        """
+        graph = cls(load_paths=load_paths, stat_cache=stat_cache)
+
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return graph
+
+        if (
+            data.get("version") == cls.FORMAT_VERSION and
+            data.get("load_paths") == [str(item) for item in graph.load_paths]
+        ):
+            graph.entrypoints = data["entrypoints"]
+            graph.files = data["files"]
+
+        return graph
@@ -0,0 +1,346 @@
+"""
+Local store of compile measures for each target.
+
+Every build records for each compiled target its duration, output size and peak
+memory into a SQLite database. The parallel executor uses it to start the longest
+targets first and to give each target a timeout from its previous durations, and
+command ``stats`` reports trends and regressions.
+
+Targets are identified by the absolute path of their destination, or of their
+source when they have no destination, so a single store can be shared by many
+projects.
+"""
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS compiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    build INTEGER NOT NULL REFERENCES builds (id),
+    target TEXT NOT NULL,
+    source TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    duration REAL,
+    output_size INTEGER,
+    max_rss INTEGER
+);
+CREATE INDEX IF NOT EXISTS compiles_target ON compiles (target, id);
+"""
+
+
+def get_history_path():
+    """
+    Get the default store path in the user cache directory.
+
+    Returns:
+        pathlib.Path: Path to the store file.
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(root) / "flechette-insolente" / "history.sqlite3"
+
+
+class CompileHistory:
+    """
+    SQLite store of compile measures.
+
+    The connection can be used from many threads, queries are serialized with a
+    lock.
+
+    Keyword Arguments:
+        path (pathlib.Path): Store file path, its directory is created if needed.
+            Default to an in-memory store which is lost once closed.
+        window (integer): Number of latest successful compiles of a target used to
+            estimate its duration. Default to ``DEFAULT_WINDOW``.
+    """
+    DEFAULT_WINDOW = 10
+    # Number of compiles kept for each target
+    MAX_RECORDS = 100
+    # A target timeout is this factor of its slowest known duration, including
+    # failed compiles
+    TIMEOUT_FACTOR = 5
+    # Lowest timeout in seconds, so a fast target survives a busy machine
+    MINIMUM_TIMEOUT = 10
+    # Maximum number of target keys given to a single query
+    QUERY_KEYS = 500
+
+    def __init__(self, path=None, window=None):
+        self.path = Path(path) if path else None
+        self.window = window or self.DEFAULT_WINDOW
+        self._lock = threading.Lock()
+
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.connection = sqlite3.connect(
+            str(self.path) if self.path else ":memory:",
+            check_same_thread=False,
+        )
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def get_key(self, source, destination=None):
+        return os.path.abspath(destination or source)
+
+    def start_build(self):
+        """
+        Register a new build.
+
+        Returns:
+            integer: Build identifier.
+        """
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO builds (started) VALUES (?)",
+                (time.time(),),
+            )
+
+        return cursor.lastrowid
+
+    def record(self, build, result):
+        """
+        Record the measures of a compile.
+
+        Peak memory is only recorded for a result with its own duration, results
+        from a single batch execution share the resource usage of their process.
+
+        Arguments:
+            build (integer): Build identifier from ``start_build()``.
+            result (CompileResult): Compile result.
+        """
+        max_rss = None
+        if result.duration is not None and result.resources:
+            max_rss = result.resources.get("max_rss")
+
+        with self._lock, self.connection:
+            self.connection.execute(
+                (
+                    "INSERT INTO compiles (build, target, source, success, "
+                    "duration, output_size, max_rss) VALUES (?, ?, ?, ?, ?, ?, ?)"
+                ),
+                (
+                    build,
+                    self.get_key(result.source, result.destination),
+                    os.path.abspath(result.source),
+                    int(result.success),
+                    result.duration,
+                    result.get_output_size(),
+                    max_rss,
+                ),
+            )
+
+    def update(self, results):
+        """
+        Record results of a build as they come.
+
+        Arguments:
+            results (iterable): ``CompileResult`` objects.
+
+        Yields:
+            CompileResult: Given results, so it can be chained to results as they
+            come.
+        """
+        build = self.start_build()
+
+        try:
+            for result in results:
+                self.record(build, result)
+                yield result
+        finally:
+            self.prune()
+
+    def prune(self):
+        """
+        Remove the oldest compiles of targets above ``MAX_RECORDS``.
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                (
+                    "DELETE FROM compiles WHERE id IN (SELECT id FROM (SELECT id, "
+                    "ROW_NUMBER() OVER (PARTITION BY target ORDER BY id DESC) AS "
+                    "rank FROM compiles) WHERE rank > ?)"
+                ),
+                (self.MAX_RECORDS,),
+            )
+
+    def get_durations(self, targets=None, failures=False):
+        """
+        Get durations of the latest compiles.
+
+        Keyword Arguments:
+            targets (list): List of ``(source, destination)`` tuples to restrict
+                to. Default to every target.
+            failures (boolean): Include the durations of failed compiles, like the
+                ones killed on timeout. Default to successful compiles only.
+
+        Returns:
+            dict: Durations in seconds from the oldest to the latest, indexed on
+            target key. Only the ``window`` latest ones are returned.
+        """
+        query = (
+            "SELECT target, duration FROM compiles WHERE success >= ? AND "
+            "duration IS NOT NULL"
+        )
+        success = 0 if failures else 1
+
+        with self._lock:
+            if targets is None:
+                rows = self.connection.execute(
+                    query + " ORDER BY target, id",
+                    (success,),
+                ).fetchall()
+            else:
+                keys = sorted({
+                    self.get_key(source, destination)
+                    for source, destination in targets
+                })
+                # Only the rows of given targets are read, by chunks of keys to stay
+                # below the limit of query parameters
+                rows = []
+                for start in range(0, len(keys), self.QUERY_KEYS):
+                    chunk = keys[start:start + self.QUERY_KEYS]
+                    rows.extend(self.connection.execute(
+                        query + " AND target IN ({}) ORDER BY target, id".format(
+                            ", ".join(["?"] * len(chunk))
+                        ),
+                        (success, *chunk),
+                    ).fetchall())
+
+        durations = {}
+        for key, items in itertools.groupby(rows, key=lambda row: row[0]):
+            durations[key] = [row[1] for row in items][-self.window:]
+
+        return durations
+
+    def get_estimates(self, targets):
+        """
+        Estimate the duration of targets from their previous compiles.
+
+        Arguments:
+            targets (list): List of ``(source, destination)`` tuples.
+
+        Returns:
+            dict: Mean of the latest durations in seconds, indexed on target key.
+            Targets without a known duration are ignored.
+        """
+        return {
+            key: sum(values) / len(values)
+            for key, values in self.get_durations(targets).items()
+        }
+
+    def get_timeouts(self, targets=None, minimum=None):
+        """
+        Get a timeout for targets from their previous compiles.
+
+        Durations of failed compiles are included, so a target killed on its
+        timeout gets a wider one on the next build.
+
+        Keyword Arguments:
+            targets (list): List of ``(source, destination)`` tuples to restrict
+                to. Default to every target.
+            minimum (float): Lowest timeout in seconds, like the compiler one. It
+                can not be lower than ``MINIMUM_TIMEOUT``.
+
+        Returns:
+            dict: Timeout in seconds indexed on target key. Targets without a known
+            duration are ignored so they keep the compiler timeout.
+        """
+        minimum = max(self.MINIMUM_TIMEOUT, minimum or 0)
+
+        return {
+            key: max(minimum, self.TIMEOUT_FACTOR * max(values))
+            for key, values in self.get_durations(targets, failures=True).items()
+        }
+
+    def sort_targets(self, targets):
+        """
+        Order targets from the longest to the shortest estimated duration.
+
+        Targets without a known duration come first since they may be the longest
+        ones, then ties keep their given order.
+
+        Arguments:
+            targets (list): List of ``(source, destination)`` tuples.
+
+        Returns:
+            list: Sorted targets.
+        """
+        estimates = self.get_estimates(targets)
+
+        def get_order(target):
+            estimate = estimates.get(self.get_key(*target))
+            return (estimate is not None, -(estimate or 0))
+
+        return sorted(targets, key=get_order)
+
+    def get_trends(self, threshold=0.2):
+        """
+        Compare the latest compile of each target to its previous ones.
+
+        Arguments:
+            threshold (float): Ratio of increase of the latest duration over the mean
+                of the previous ones from which it is a regression.
+
+        Returns:
+            list: A dictionnary for each target with its key, number of recorded
+            compiles, latest duration, mean of the previous durations, ratio of
+            change, latest output size, latest peak memory and if it is a
+            regression. Sorted from the biggest increase.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                (
+                    "SELECT target, duration, output_size, max_rss FROM compiles "
+                    "WHERE success = 1 ORDER BY target, id"
+                ),
+            ).fetchall()
+
+        trends = []
+        for key, items in itertools.groupby(rows, key=lambda row: row[0]):
+            items = list(items)
+            latest = items[-1]
+            durations = [
+                row[1] for row in items if row[1] is not None
+            ][-(self.window + 1):]
+
+            previous = None
+            change = None
+            if latest[1] is not None and len(durations) > 1:
+                previous = sum(durations[:-1]) / len(durations[:-1])
+                change = (latest[1] - previous) / previous if previous else None
+
+            trends.append({
+                "target": key,
+                "count": len(items),
+                "duration": latest[1],
+                "previous": previous,
+                "change": change,
+                "output_size": latest[2],
+                "max_rss": latest[3],
+                "regression": change is not None and change > threshold,
+            })
+
+        return sorted(
+            trends,
+            key=lambda item: (
+                -(item["change"] if item["change"] is not None else float("-inf")),
+                item["target"],
+            ),
+        )
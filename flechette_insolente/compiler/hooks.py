@@ -0,0 +1,243 @@
+"""
+Instrumentation of dart-sass executions.
+
+A hook is any callable registered on a compiler which receives a ``SpawnEvent`` once
+a dart-sass process is started and a ``CompileEvent`` once its execution is finished,
+either successful or not. When no hook is registered, no event is built at all.
+
+Some compiler interfaces emit more events, ``TargetEvent`` for each target compiled
+with ``ParallelExecutor`` and ``CacheEvent`` for each compile through
+``CachedDartSassCompiler``. Hooks must ignore the events they do not know.
+
+Events are emitted from the thread which performed the work and every time is from
+``time.perf_counter()``.
+"""
+import threading
+
+
+# Measured phases of an execution in chronological order
+PHASES = ("validation", "spawn", "wait", "decode")
+
+
+class SpawnEvent:
+    """
+    A dart-sass process has been started.
+
+    Arguments:
+        cmd (list): Executed command items.
+    """
+    def __init__(self, cmd):
+        self.cmd = cmd
+
+
+class CompileEvent:
+    """
+    Measures of a single dart-sass execution.
+
+    Arguments:
+        cmd (list): Executed command items.
+
+    Keyword Arguments:
+        returncode (integer): Exit status of process. A killed process has a
+            negative status.
+        timeout (boolean): True if process has been killed because it has reached
+            the command timeout.
+        cancelled (boolean): True if process has been killed because its execution
+            has been interrupted, like from a cancelled coroutine or a keyboard
+            interrupt.
+        input_bytes (integer): Size of content sent to process standard input.
+        output_bytes (integer): Size of process output before its decoding.
+        phases (dict): Elapsed time in seconds of each phase from ``PHASES``.
+            Validation is ``None`` when arguments have not been validated for this
+            execution, like for the version command.
+        started (float): Time when process has been spawned, validation happened
+            right before it.
+        resources (dict): Resource usage of process, see
+            ``flechette_insolente.compiler.resources.get_resources()``.
+
+    Attributes:
+        duration (float): Sum of every measured phases.
+        success (boolean): True if process has finished without error.
+    """
+    def __init__(self, cmd, returncode=None, timeout=False, cancelled=False,
+                 input_bytes=0, output_bytes=0, phases=None, started=None,
+                 resources=None):
+        self.cmd = cmd
+        self.returncode = returncode
+        self.timeout = timeout
+        self.cancelled = cancelled
+        self.input_bytes = input_bytes
+        self.output_bytes = output_bytes
+        self.phases = dict.fromkeys(PHASES)
+        self.phases.update(phases or {})
+        self.started = started
+        self.resources = resources
+
+    def __repr__(self):
+        return "<{klass} returncode={returncode} duration={duration:.6f}>".format(
+            klass=self.__class__.__name__,
+            returncode=self.returncode,
+            duration=self.duration,
+        )
+
+    @property
+    def duration(self):
+        return sum([value for value in self.phases.values() if value is not None])
+
+    @property
+    def success(self):
+        return not self.timeout and not self.cancelled and self.returncode == 0
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Event as a JSON serializable dictionnary.
+        """
+        return {
+            "cmd": [str(item) for item in self.cmd],
+            "returncode": self.returncode,
+            "timeout": self.timeout,
+            "cancelled": self.cancelled,
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "phases": dict(self.phases),
+            "duration": self.duration,
+            "resources": self.resources,
+        }
+
+
+class TargetEvent:
+    """
+    A target compiled with ``ParallelExecutor`` is finished.
+
+    Arguments:
+        source (pathlib.Path): Target source path.
+        destination (pathlib.Path): Target destination path, may be ``None``.
+        started (float): Time when target compile has started.
+        duration (float): Elapsed time in seconds to compile target.
+        success (boolean): True if target has been compiled without error.
+    """
+    def __init__(self, source, destination, started, duration, success):
+        self.source = source
+        self.destination = destination
+        self.started = started
+        self.duration = duration
+        self.success = success
+
+
+class CacheEvent:
+    """
+    A compile through cache is finished, it may have involved a ``CompileEvent``.
+
+    Arguments:
+        key (string): Cache key.
+        hit (boolean): True if compile has been restored from cache.
+        started (float): Time when cache key computing has started.
+        lookup (float): Elapsed time in seconds to compute the cache key and get
+            the cache entry.
+
+    Keyword Arguments:
+        write (float): Elapsed time in seconds to restore files on a hit or to store
+            the new entry on a miss. This is the last step, the event is emitted right
+            after it.
+    """
+    def __init__(self, key, hit, started, lookup, write=None):
+        self.key = key
+        self.hit = hit
+        self.started = started
+        self.lookup = lookup
+        self.write = write
+
+
+class TimingsCollector:
+    """
+    A hook which collects every ``CompileEvent`` to summarize them.
+
+    It can be shared between threads, like with ``compile_parallel()``.
+
+    Attributes:
+        events (list): Collected ``CompileEvent`` objects in reception order.
+    """
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if not isinstance(event, CompileEvent):
+            return
+
+        with self._lock:
+            self.events.append(event)
+
+    def get_summary(self):
+        """
+        Summarize collected events.
+
+        Returns:
+            dict: Counts of executions, failures, timeouts and output bytes, with the
+            total, mean and maximum duration in seconds of each phase and of whole
+            executions. A phase without any measure has ``None`` values.
+        """
+        with self._lock:
+            events = list(self.events)
+
+        def summarize(values):
+            values = [value for value in values if value is not None]
+            if not values:
+                return {"total": None, "mean": None, "max": None}
+
+            return {
+                "total": sum(values),
+                "mean": sum(values) / len(values),
+                "max": max(values),
+            }
+
+        return {
+            "count": len(events),
+            "failures": len([event for event in events if not event.success]),
+            "timeouts": len([event for event in events if event.timeout]),
+            "output_bytes": sum([event.output_bytes for event in events]),
+            "phases": {
+                name: summarize([event.phases[name] for event in events])
+                for name in PHASES
+            },
+            "duration": summarize([event.duration for event in events]),
+        }
+
+    def format_summary(self):
+        """
+        Format the summary for a terminal output.
+
+        Returns:
+            string: Summary with a line for each phase and durations in
+            milliseconds.
+        """
+        summary = self.get_summary()
+
+        lines = [
+            (
+                "Timings for {count} execution(s), {failures} failed, {timeouts} "
+                "timed out, {output_bytes} bytes of output"
+            ).format(**summary)
+        ]
+
+        for name, stats in list(summary["phases"].items()) + [
+            ("total", summary["duration"]),
+        ]:
+            if stats["total"] is None:
+                lines.append("  {}: -".format(name))
+                continue
+
+            lines.append(
+                (
+                    "  {name}: total={total:.3f}ms mean={mean:.3f}ms "
+                    "max={max:.3f}ms"
+                ).format(
+                    name=name,
+                    total=stats["total"] * 1000,
+                    mean=stats["mean"] * 1000,
+                    max=stats["max"] * 1000,
+                )
+            )
+
+        return "\n".join(lines)
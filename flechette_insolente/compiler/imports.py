@@ -0,0 +1,271 @@
+"""
+Python side resolution of Sass imports.
+
+This finds the stylesheets loaded by a Sass source from its ``@use``, ``@forward``
+and ``@import`` rules and resolve them the same way dart-sass does. It is not a
+Sass parser, it only scans for these rules after removing comments, so interpolated
+or otherwise dynamic URLs are not supported.
+"""
+import re
+from pathlib import Path
+
+
+# Match either a quoted string to keep or a comment to remove
+COMMENTS_PATTERN = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|(/\*.*?\*/|//[^\n]*)",
+    re.DOTALL,
+)
+
+# Match a loading rule with all its arguments until the end of statement
+RULE_PATTERN = re.compile(
+    r"@(?P<rule>use|forward|import)\s+(?P<arguments>[^;{}\n]+)",
+)
+
+# Match every quoted URL from rule arguments
+URL_PATTERN = re.compile(r"\"((?:\\.|[^\"\\])*)\"|'((?:\\.|[^'\\])*)'")
+
+
+class ImportResolver:
+    """
+    Find and resolve the stylesheets loaded from Sass sources.
+
+    Keyword Arguments:
+        load_paths (list): List of paths to use when resolving imports, in the same
+            order than given to dart-sass.
+        stat_cache (StatCache): Optional stat cache to check candidate files, since
+            the same candidates are commonly tried for many files.
+
+    Attributes:
+        EXTENSIONS (tuple): Extensions of stylesheets which can be loaded, in the
+            order of resolution.
+    """
+    EXTENSIONS = (".sass", ".scss", ".css")
+
+    def __init__(self, load_paths=None, stat_cache=None):
+        self.load_paths = [Path(item) for item in load_paths or []]
+        self.stat_cache = stat_cache
+
+    def is_file(self, path):
+        if self.stat_cache is not None:
+            return self.stat_cache.is_file(path)
+
+        return path.is_file()
+
+    def strip_comments(self, content):
+        """
+        Remove comments from source content.
+
+        Arguments:
+            content (string): Source content.
+
+        Returns:
+            string: Source content without comments.
+        """
+        return COMMENTS_PATTERN.sub(
+            lambda match: match.group(1) or "",
+            content,
+        )
+
+    def is_plain_css(self, url, rule):
+        """
+        Check if an URL is a plain CSS import which is not loaded by the compiler.
+
+        Arguments:
+            url (string): URL to check.
+            rule (string): Rule name.
+
+        Returns:
+            boolean: True if URL is not loaded by compiler.
+        """
+        if url.startswith("sass:"):
+            return True
+
+        if rule == "import":
+            return (
+                url.endswith(".css") or
+                url.startswith(("http://", "https://", "//"))
+            )
+
+        return False
+
+    def parse(self, content, indented=False):
+        """
+        Find URLs loaded from given source content.
+
+        Arguments:
+            content (string): Source content.
+
+        Keyword Arguments:
+            indented (boolean): If True, content is in indented syntax where
+                ``@import`` URLs may be unquoted.
+
+        Returns:
+            list: URLs in their order of appearance, without plain CSS imports and
+            built-in modules.
+        """
+        urls = []
+
+        for match in RULE_PATTERN.finditer(self.strip_comments(content)):
+            rule = match.group("rule")
+            arguments = match.group("arguments")
+
+            if rule == "import":
+                # Plain CSS imports with url() function or media queries
+                if "url(" in arguments:
+                    continue
+
+                found = [a or b for a, b in URL_PATTERN.findall(arguments)]
+                if not found and indented:
+                    found = [item.strip() for item in arguments.split(",")]
+            else:
+                # Only the first string is the URL, other ones are configuration
+                found = [a or b for a, b in URL_PATTERN.findall(arguments)][:1]
+
+            urls.extend([
+                url
+                for url in found
+                if url and not self.is_plain_css(url, rule)
+            ])
+
+        return urls
+
+    def scan(self, path):
+        """
+        Find URLs loaded from a Sass source file.
+
+        Arguments:
+            path (pathlib.Path): Source file path.
+
+        Returns:
+            list: URLs in their order of appearance.
+        """
+        path = Path(path)
+        return self.parse(
+            path.read_text(encoding="utf-8"),
+            indented=(path.suffix == ".sass"),
+        )
+
+    def get_candidates(self, base):
+        """
+        Get candidate file paths for an URL joined to a base directory.
+
+        Like dart-sass, the exact file is tried before the partial one, then the index
+        files if URL targets a directory.
+
+        Arguments:
+            base (pathlib.Path): URL joined to a directory.
+
+        Returns:
+            list: Candidate paths in order of resolution.
+        """
+        partial = base.parent / "_{}".format(base.name)
+
+        if base.suffix in self.EXTENSIONS:
+            return [base, partial]
+
+        candidates = []
+        for extension in self.EXTENSIONS:
+            candidates.append(base.parent / (base.name + extension))
+            candidates.append(partial.parent / (partial.name + extension))
+
+        for extension in self.EXTENSIONS:
+            candidates.append(base / ("index" + extension))
+            candidates.append(base / ("_index" + extension))
+
+        return candidates
+
+    def resolve(self, url, directory):
+        """
+        Resolve an URL to a file path.
+
+        URL is first resolved relatively to the directory of importing file, then
+        from each load path.
+
+        Arguments:
+            url (string): URL to resolve.
+            directory (pathlib.Path): Directory of the importing file.
+
+        Returns:
+            pathlib.Path: Resolved file path or ``None`` if it can not be resolved.
+        """
+        for candidate in self.get_url_candidates(url, directory):
+            if self.is_file(candidate):
+                return candidate.resolve()
+
+        return None
+
+    def get_url_candidates(self, url, directory):
+        """
+        Get every candidate file path for an URL.
+
+        Arguments:
+            url (string): URL to resolve.
+            directory (pathlib.Path): Directory of the importing file.
+
+        Returns:
+            list: Candidate paths in order of resolution, from the directory then
+            from each load path.
+        """
+        if url.startswith("file://"):
+            url = url[len("file://"):]
+
+        return [
+            candidate
+            for root in [Path(directory)] + self.load_paths
+            for candidate in self.get_candidates(root / url)
+        ]
+
+    def get_imports(self, path):
+        """
+        Get every resolved and unresolved imports from a source file.
+
+        Arguments:
+            path (pathlib.Path): Source file path.
+
+        Returns:
+            tuple: A list of resolved paths and a list of unresolved URLs.
+        """
+        path = Path(path)
+        resolved = []
+        unresolved = []
+
+        for url in self.scan(path):
+            found = self.resolve(url, path.parent)
+            if found is None:
+                unresolved.append(url)
+            elif found not in resolved:
+                resolved.append(found)
+
+        return resolved, unresolved
+
+    def get_dependencies(self, path):
+        """
+        Get every file transitively loaded by a source file.
+
+        Arguments:
+            path (pathlib.Path): Source file path.
+
+        Returns:
+            tuple: A list of resolved paths without the source itself, in order of
+            discovery, and a list of unresolved URLs.
+        """
+        source = Path(path).resolve()
+        seen = {source}
+        dependencies = []
+        unresolved = []
+        queue = [source]
+
+        while queue:
+            current = queue.pop(0)
+            found, missing = self.get_imports(current)
+            unresolved.extend([item for item in missing if item not in unresolved])
+
+            for item in found:
+                if item not in seen:
+                    seen.add(item)
+                    dependencies.append(item)
+                    # Plain CSS files can not load anything
+                    if item.suffix != ".css":
+                        queue.append(item)
+
+        return dependencies, unresolved
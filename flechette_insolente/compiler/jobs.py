@@ -0,0 +1,161 @@
+"""
+Compile jobs read from JSON lines, like from a build orchestrator which feeds jobs
+continuously through a pipe.
+
+Each line is a JSON object for a single job: ::
+
+    {"id": 1, "source": "scss/main.scss", "destination": "css/main.css",
+     "style": "compressed", "load_paths": ["node_modules"], "source_map": false}
+
+Only ``source`` is required, ``id`` can be any JSON value and is given back in the
+job result.
+"""
+import json
+
+from ..exceptions import CommandArgumentsError
+
+
+class CompileJob:
+    """
+    A compile target with its own options.
+
+    Arguments:
+        source (pathlib.Path): Source path.
+
+    Keyword Arguments:
+        destination (pathlib.Path): Destination path, if any.
+        options (dict): Compile options as supported by
+            ``DartSassCompiler.compile()`` except ``destination``.
+        id (object): Job identifier given back in its result.
+        timeout (float): Timeout in seconds to use instead of the compiler one.
+        error (CommandArgumentsError): Error from an invalid job specification, the
+            job fails with it without being compiled.
+    """
+    # Job keys with the compile option they are given to
+    OPTIONS = {
+        "style": "style",
+        "load_paths": "load_path",
+        "source_map": "source_map",
+        "indented": "indented",
+    }
+
+    def __init__(self, source, destination=None, options=None, id=None,
+                 timeout=None, error=None):
+        self.source = source
+        self.destination = destination
+        self.options = options or {}
+        self.id = id
+        self.timeout = timeout
+        self.error = error
+
+    def __repr__(self):
+        return "<{klass} {source}>".format(
+            klass=self.__class__.__name__,
+            source=self.source,
+        )
+
+    @classmethod
+    def from_dict(cls, data, defaults=None):
+        """
+        Build a job from its specification.
+
+        Option values are only validated once job is compiled, so an invalid
+        option makes its job fail like any other compile error.
+
+        Arguments:
+            data (dict): Job specification.
+
+        Keyword Arguments:
+            defaults (dict): Compile options for the ones missing from
+                specification.
+
+        Returns:
+            CompileJob: Job object.
+        """
+        if not isinstance(data, dict):
+            raise CommandArgumentsError("Job must be a JSON object.")
+
+        unknown = sorted(
+            set(data) - {"id", "source", "destination"} - set(cls.OPTIONS)
+        )
+        if unknown:
+            raise CommandArgumentsError(
+                "Unknown job key(s): {}".format(", ".join(unknown))
+            )
+
+        if not isinstance(data.get("source"), str):
+            raise CommandArgumentsError("Job source must be a path.")
+
+        if not isinstance(data.get("destination"), (str, type(None))):
+            raise CommandArgumentsError("Job destination must be a path.")
+
+        options = dict(defaults or {})
+        options.update({
+            option: data[key]
+            for key, option in cls.OPTIONS.items()
+            if key in data
+        })
+
+        return cls(
+            data["source"],
+            destination=data.get("destination"),
+            options=options,
+            id=data.get("id"),
+        )
+
+    def get_result_dict(self, result):
+        """
+        Build the details of the job result.
+
+        Arguments:
+            result (CompileResult): Compile result of job.
+
+        Returns:
+            dict: Job identifier with result details from ``CompileResult.to_dict()``
+            and output size, which can be serialized with ``ExtendedJsonEncoder``.
+        """
+        details = {"id": self.id}
+        details.update(result.to_dict())
+        details["output_size"] = result.get_output_size()
+
+        return details
+
+
+def read_jobs(lines, defaults=None):
+    """
+    Read jobs from JSON lines, one at a time.
+
+    An invalid line does not stop reading, it gives a job with its error so it is
+    reported like any other failed job.
+
+    Arguments:
+        lines (iterable): JSON lines, like a file object. Empty lines are ignored.
+
+    Keyword Arguments:
+        defaults (dict): Compile options for the ones missing from job
+            specifications.
+
+    Yields:
+        CompileJob: Job for each line.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        data = None
+        try:
+            data = json.loads(line)
+            job = CompileJob.from_dict(data, defaults=defaults)
+        except (ValueError, CommandArgumentsError) as e:
+            if not isinstance(data, dict):
+                data = {}
+            job = CompileJob(
+                data.get("source"),
+                destination=data.get("destination"),
+                id=data.get("id"),
+                error=CommandArgumentsError(
+                    "Invalid job on line {}: {}".format(number, e)
+                ),
+            )
+
+        yield job
@@ -0,0 +1,539 @@
+"""
+Build manifest to skip up-to-date targets.
+
+The manifest records for each compiled target the stats and content digest of every
+file it has loaded, the digest of its output and its arguments. A target whose
+record still matches is up to date and does not need to spawn dart-sass.
+
+File stats are gathered once in a ``StatCache`` which is shared with arguments
+validation and import resolution, and content is only hashed again when stats of a
+file have changed.
+"""
+import json
+import os
+import stat as stat_module
+from pathlib import Path
+
+from ..exceptions import CommandArgumentsError
+
+from .cache import get_file_digest, write_atomic
+from .imports import ImportResolver
+
+
+def get_relative_path(path):
+    """
+    Get a path relative to the current directory.
+
+    Arguments:
+        path (pathlib.Path): Path to get.
+
+    Returns:
+        string: Relative path, or the absolute one if it can not be relative like
+        on another drive.
+    """
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return os.path.abspath(path)
+
+
+class StatCache:
+    """
+    Memoize file stats and content digests.
+
+    Stats are kept for the lifetime of the cache, so it is meant to live for a single
+    build, files changed during the build have to be invalidated. It can be shared
+    between threads, at worst a same file is stat twice.
+
+    Attributes:
+        hashed (integer): Number of files which content has been hashed.
+    """
+    def __init__(self):
+        self._stats = {}
+        self._digests = {}
+        self.hashed = 0
+
+    def stat(self, path):
+        """
+        Get stats of a path.
+
+        Arguments:
+            path (pathlib.Path): Path to stat.
+
+        Returns:
+            os.stat_result: Path stats or ``None`` if it does not exist.
+        """
+        key = str(path)
+
+        try:
+            return self._stats[key]
+        except KeyError:
+            pass
+
+        try:
+            result = os.stat(key)
+        except OSError:
+            result = None
+
+        self._stats[key] = result
+
+        return result
+
+    def exists(self, path):
+        return self.stat(path) is not None
+
+    def is_file(self, path):
+        result = self.stat(path)
+        return result is not None and stat_module.S_ISREG(result.st_mode)
+
+    def get_signature(self, path):
+        """
+        Returns:
+            tuple: File modification time in nanoseconds and size, ``None`` if it
+            does not exist.
+        """
+        result = self.stat(path)
+        if result is None:
+            return None
+
+        return (result.st_mtime_ns, result.st_size)
+
+    def digest(self, path, known=None):
+        """
+        Get the content digest of a file.
+
+        Arguments:
+            path (pathlib.Path): File path.
+
+        Keyword Arguments:
+            known (list): A previous record of the file as ``[path, mtime_ns, size,
+                digest]``, its digest is used if file stats did not change.
+
+        Returns:
+            string: SHA-256 hexadecimal digest or ``None`` if file does not exist.
+        """
+        signature = self.get_signature(path)
+        if signature is None:
+            return None
+
+        key = str(path)
+        cached = self._digests.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        if known is not None and tuple(known[1:3]) == signature:
+            digest = known[3]
+        else:
+            digest = get_file_digest(path)
+            self.hashed += 1
+
+        self._digests[key] = (signature, digest)
+
+        return digest
+
+    def invalidate(self, path):
+        """
+        Forget stats and digest of a path, like after it has been written.
+
+        Arguments:
+            path (pathlib.Path): Path to forget.
+        """
+        self._stats.pop(str(path), None)
+        self._digests.pop(str(path), None)
+
+
+class BuildManifest:
+    """
+    Records of compiled targets to know which ones are up to date.
+
+    Only targets with a destination are recorded since there is no output to keep
+    otherwise. Targets are indexed on their absolute destination path and each record
+    holds:
+
+    inputs
+        The source and every file it transitively loads as ``[path, mtime_ns, size,
+        digest]``;
+    output
+        The destination file in the same form;
+    arguments
+        Command arguments of the target.
+
+    The duration of the last measured compile of each target is kept apart from
+    records, indexed on destination path relative to the current directory. So unlike
+    records, durations are still usable from a build in another directory or with
+    another executable, like a shard of the build on another machine.
+
+    Inputs are recorded as they were before the target is compiled, so a file
+    changed during its compile makes it stale on the next build. Dependencies are
+    found with ``ImportResolver`` at the same time, a file created afterwards which
+    would change how an import is resolved is not detected until one of the inputs
+    changes.
+
+    Keyword Arguments:
+        path (pathlib.Path): Manifest file path, used as default by ``save()``.
+        executable (list): Signature of compiler executable, like from
+            ``get_command_signature()``. Records from another executable are ignored
+            on load, but not durations.
+        stat_cache (StatCache): Stat cache to use, a new one is created if not
+            given.
+
+    Attributes:
+        targets (dict): Target records indexed on destination path.
+        durations (dict): Compile durations in seconds indexed on relative
+            destination path.
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self, path=None, executable=None, stat_cache=None):
+        self.path = Path(path) if path else None
+        self.executable = executable
+        self.stat_cache = stat_cache or StatCache()
+        self.targets = {}
+        self.durations = {}
+        # Input records of targets to compile, taken before their compile
+        self._snapshots = {}
+
+    def get_key(self, destination):
+        return os.path.abspath(destination)
+
+    def get_file_record(self, path, known=None):
+        """
+        Build the record of a file.
+
+        Arguments:
+            path (pathlib.Path): File path.
+
+        Keyword Arguments:
+            known (list): Previous record of the file.
+
+        Returns:
+            list: File path, modification time in nanoseconds, size and digest.
+            ``None`` if file does not exist.
+        """
+        signature = self.stat_cache.get_signature(path)
+        if signature is None:
+            return None
+
+        return [str(path), *signature, self.stat_cache.digest(path, known=known)]
+
+    def check_file(self, record):
+        """
+        Check a file still matches its record.
+
+        A file with changed stats but the same content still matches and its record
+        is refreshed so its content is not hashed again on the next build.
+
+        Arguments:
+            record (list): File record from ``get_file_record()``.
+
+        Returns:
+            boolean: True if file matches.
+        """
+        signature = self.stat_cache.get_signature(record[0])
+        if signature is None:
+            return False
+        elif signature == tuple(record[1:3]):
+            return True
+
+        if self.stat_cache.digest(record[0]) != record[3]:
+            return False
+
+        record[1:3] = signature
+
+        return True
+
+    def get_arguments(self, source, destination, profile):
+        return profile.get_arguments(source, destination=destination)
+
+    def is_up_to_date(self, source, destination, profile):
+        """
+        Check if a target is up to date.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+            destination (pathlib.Path): Destination path.
+            profile (CompileProfile): Shared options of target.
+
+        Returns:
+            boolean: True if target has a record which matches its arguments and
+            files.
+        """
+        record = self.targets.get(self.get_key(destination))
+        if record is None:
+            return False
+
+        try:
+            arguments = self.get_arguments(source, destination, profile)
+        except CommandArgumentsError:
+            return False
+
+        if record["arguments"] != arguments:
+            return False
+
+        return all([
+            self.check_file(item)
+            for item in [record["output"]] + record["inputs"]
+        ])
+
+    def partition(self, pairs, profile):
+        """
+        Split targets between the ones to compile and the up to date ones.
+
+        Arguments:
+            pairs (iterable): Iterable of ``(source, destination)`` tuples.
+            profile (CompileProfile): Shared options of targets.
+
+        Returns:
+            tuple: A list of targets to compile and a list of up to date targets.
+        """
+        stale = []
+        fresh = []
+
+        for source, destination in pairs:
+            if destination and self.is_up_to_date(source, destination, profile):
+                fresh.append((source, destination))
+            else:
+                stale.append((source, destination))
+                if destination:
+                    self.snapshot(source, destination, profile)
+
+        return stale, fresh
+
+    def get_inputs(self, source, profile, previous=None):
+        """
+        Build records of a source and every file it transitively loads.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+            profile (CompileProfile): Shared options of target.
+
+        Keyword Arguments:
+            previous (dict): Previous file records indexed on their path.
+
+        Returns:
+            list: File records from ``get_file_record()``.
+        """
+        previous = previous or {}
+        resolved = Path(source).resolve()
+        dependencies, unresolved = ImportResolver(
+            load_paths=profile.options.get("load_path"),
+            stat_cache=self.stat_cache,
+        ).get_dependencies(resolved)
+
+        inputs = []
+        for path in [resolved] + sorted(dependencies):
+            item = self.get_file_record(path, known=previous.get(str(path)))
+            if item is not None:
+                inputs.append(item)
+
+        return inputs
+
+    def get_previous_inputs(self, key):
+        if key not in self.targets:
+            return {}
+
+        return {item[0]: item for item in self.targets[key]["inputs"]}
+
+    def snapshot(self, source, destination, profile):
+        """
+        Take records of target inputs before it is compiled, they are used once it
+        is recorded.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+            destination (pathlib.Path): Destination path.
+            profile (CompileProfile): Shared options of target.
+        """
+        key = self.get_key(destination)
+        self._snapshots.pop(key, None)
+
+        # An invalid source will fail to compile, there is nothing to record
+        if not self.stat_cache.is_file(source):
+            return
+
+        try:
+            inputs = self.get_inputs(
+                source,
+                profile,
+                previous=self.get_previous_inputs(key),
+            )
+        except (OSError, ValueError):
+            return
+
+        self._snapshots[key] = inputs
+
+    def record(self, source, destination, profile, duration=None):
+        """
+        Record a compiled target.
+
+        Inputs are the ones taken with ``snapshot()`` before target compile if
+        any, else they are taken now.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+            destination (pathlib.Path): Destination path.
+            profile (CompileProfile): Shared options of target.
+
+        Keyword Arguments:
+            duration (float): Elapsed time in seconds to compile target. If not
+                given, the previously recorded duration is kept.
+        """
+        key = self.get_key(destination)
+        inputs = self._snapshots.pop(key, None)
+        if duration is not None:
+            self.durations[get_relative_path(destination)] = duration
+
+        # Destination has just been written
+        self.stat_cache.invalidate(destination)
+        output = self.get_file_record(destination)
+        if output is None:
+            self.targets.pop(key, None)
+            return
+
+        if inputs is None:
+            inputs = self.get_inputs(
+                source,
+                profile,
+                previous=self.get_previous_inputs(key),
+            )
+
+        self.targets[key] = {
+            "inputs": inputs,
+            "output": output,
+            "arguments": self.get_arguments(source, destination, profile),
+        }
+
+    def forget(self, destination):
+        """
+        Remove record of a target, like after it failed.
+
+        Arguments:
+            destination (pathlib.Path): Destination path.
+        """
+        self.targets.pop(self.get_key(destination), None)
+        self._snapshots.pop(self.get_key(destination), None)
+
+    def update(self, results, profile):
+        """
+        Record successful targets and forget the failed ones.
+
+        Arguments:
+            results (iterable): ``CompileResult`` objects.
+            profile (CompileProfile): Shared options of targets.
+
+        Yields:
+            CompileResult: Given results, so it can be chained to results as they
+            come.
+        """
+        for result in results:
+            if result.destination is not None:
+                if result.success:
+                    self.record(
+                        result.source,
+                        result.destination,
+                        profile,
+                        duration=result.duration,
+                    )
+                else:
+                    self.forget(result.destination)
+
+            yield result
+
+    def get_durations(self):
+        """
+        Returns:
+            dict: Recorded compile durations in seconds indexed on destination path
+            relative to the current directory.
+        """
+        return dict(self.durations)
+
+    def merge(self, other):
+        """
+        Add records from another manifest, like from another shard of a build.
+
+        Records and durations of the other manifest replace the ones for the same
+        targets.
+
+        Arguments:
+            other (BuildManifest): Manifest to merge.
+        """
+        self.targets.update(other.targets)
+        self.durations.update(other.durations)
+
+    def to_dict(self):
+        return {
+            "version": self.FORMAT_VERSION,
+            "executable": self.executable,
+            "targets": self.targets,
+            "durations": self.durations,
+        }
+
+    def save(self, path=None):
+        """
+        Write manifest to a JSON file.
+
+        Keyword Arguments:
+            path (pathlib.Path): File path to write. Default to manifest ``path``.
+        """
+        write_atomic(path or self.path, json.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path, executable=None, stat_cache=None):
+        """
+        Load a manifest from a JSON file.
+
+        Arguments:
+            path (pathlib.Path): File path to read.
+
+        Keyword Arguments:
+            executable (list): Signature of compiler executable.
+            stat_cache (StatCache): Stat cache to use.
+
+        Returns:
+            BuildManifest: Loaded manifest or an empty one if file does not exist or
+            is invalid. A manifest built with another executable only keeps its
+            durations.
+        """
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            data = {}
+
+        if data.get("executable") != executable:
+            data = {
+                "version": data.get("version"),
+                "durations": data.get("durations"),
+            }
+
+        manifest = cls.from_dict(data, path=path, stat_cache=stat_cache)
+        manifest.executable = executable
+
+        return manifest
+
+    @classmethod
+    def from_dict(cls, data, path=None, stat_cache=None):
+        """
+        Build a manifest from its dictionnary as returned by ``to_dict()``.
+
+        Arguments:
+            data (dict): Manifest data.
+
+        Keyword Arguments:
+            path (pathlib.Path): Manifest file path.
+            stat_cache (StatCache): Stat cache to use.
+
+        Returns:
+            BuildManifest: Manifest with records from data, an empty one if data is
+            from another format version.
+        """
+        manifest = cls(
+            path=path,
+            executable=data.get("executable"),
+            stat_cache=stat_cache,
+        )
+
+        if data.get("version") == cls.FORMAT_VERSION:
+            manifest.targets = data.get("targets") or {}
+            manifest.durations = data.get("durations") or {}
+
+        return manifest
@@ -0,0 +1,407 @@
+"""
+Dependency free metrics for compiles.
+
+Metrics are registered in a ``MetricsRegistry`` which can export them in the
+Prometheus text format. ``CompileMetrics`` is a compiler hook which records
+executions into a registry.
+
+Every metric has its own lock only held to update a value, so recording is safe from
+many threads and coroutines never wait on it.
+"""
+import bisect
+import math
+import threading
+from pathlib import Path
+
+from .hooks import CompileEvent, SpawnEvent
+
+
+# Default histogram upper bounds in seconds, suited to dart-sass executions
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Reasons of a failed execution
+FAILURE_REASONS = ("exit", "timeout", "cancelled")
+
+
+def format_value(value):
+    """
+    Format a sample value for Prometheus text format.
+
+    Arguments:
+        value (integer or float): Value to format.
+
+    Returns:
+        string: Formatted value.
+    """
+    if value == math.inf:
+        return "+Inf"
+    elif value == -math.inf:
+        return "-Inf"
+
+    return repr(value)
+
+
+def format_labels(labels):
+    """
+    Format sample labels for Prometheus text format.
+
+    Arguments:
+        labels (list): List of ``(name, value)`` tuples.
+
+    Returns:
+        string: Formatted labels, empty if there is no label.
+    """
+    if not labels:
+        return ""
+
+    return "{" + ",".join([
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in labels
+    ]) + "}"
+
+
+class Metric:
+    """
+    Abstract metric with optional labels.
+
+    Arguments:
+        name (string): Metric name.
+        documentation (string): Metric description.
+
+    Keyword Arguments:
+        labels (iterable): Label names. Every update must give a value for each of
+            them.
+    """
+    TYPE = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<{klass} {name}>".format(
+            klass=self.__class__.__name__,
+            name=self.name,
+        )
+
+    def get_key(self, labels):
+        """
+        Get the key of values for given labels.
+
+        Arguments:
+            labels (dict): Label values indexed on their names.
+
+        Returns:
+            tuple: Label values in order of label names.
+        """
+        if len(labels) != len(self.labels) or not set(labels) <= set(self.labels):
+            msg = "Metric '{name}' expects labels: {labels}"
+            raise ValueError(msg.format(
+                name=self.name,
+                labels=", ".join(self.labels) or "none",
+            ))
+
+        return tuple([str(labels[name]) for name in self.labels])
+
+    def get_samples(self):
+        """
+        Returns:
+            list: Samples as ``(suffix, labels, value)`` tuples where labels is a
+            list of ``(name, value)`` tuples.
+        """
+        with self._lock:
+            items = sorted(self._values.items())
+
+        return [
+            ("", list(zip(self.labels, key)), value)
+            for key, value in items
+        ]
+
+    def export(self):
+        """
+        Returns:
+            string: Metric in Prometheus text format.
+        """
+        lines = [
+            "# HELP {} {}".format(
+                self.name,
+                self.documentation.replace("\\", "\\\\").replace("\n", "\\n"),
+            ),
+            "# TYPE {} {}".format(self.name, self.TYPE),
+        ]
+
+        for suffix, labels, value in self.get_samples():
+            lines.append("{name}{suffix}{labels} {value}".format(
+                name=self.name,
+                suffix=suffix,
+                labels=format_labels(labels),
+                value=format_value(value),
+            ))
+
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """
+    A value which can only increase.
+    """
+    TYPE = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counter '{}' can only be increased".format(self.name))
+
+        key = self.get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self.get_key(labels), 0)
+
+
+class Gauge(Metric):
+    """
+    A value which can increase and decrease.
+    """
+    TYPE = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self.get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self.get_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels):
+        return self._values.get(self.get_key(labels), 0)
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in buckets.
+
+    Keyword Arguments:
+        buckets (iterable): Bucket upper bounds, an infinite one is always added.
+    """
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels=labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.get_key(labels)
+        # First bucket whose upper bound is greater or equal to value
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def get(self, **labels):
+        """
+        Returns:
+            dict: Cumulative bucket counts indexed on their upper bound, sum and
+            count of observed values.
+        """
+        with self._lock:
+            state = self._values.get(self.get_key(labels))
+            counts, total, count = state or [[0] * (len(self.buckets) + 1), 0, 0]
+            counts = list(counts)
+
+        cumulative = 0
+        buckets = {}
+        for bound, value in zip(self.buckets + (math.inf,), counts):
+            cumulative += value
+            buckets[bound] = cumulative
+
+        return {"buckets": buckets, "sum": total, "count": count}
+
+    def get_samples(self):
+        samples = []
+
+        for _, labels, _ in super().get_samples():
+            values = self.get(**dict(labels))
+            for bound, cumulative in values["buckets"].items():
+                samples.append(
+                    ("_bucket", labels + [("le", format_value(bound))], cumulative)
+                )
+            samples.append(("_sum", labels, values["sum"]))
+            samples.append(("_count", labels, values["count"]))
+
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics indexed on their name.
+
+    Registering a metric with an already registered name returns the existing one
+    if it has the same type and labels, so many objects can share their metrics.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Register a metric.
+
+        Arguments:
+            metric (Metric): Metric to register.
+
+        Returns:
+            Metric: The registered metric for this name.
+        """
+        with self._lock:
+            registered = self._metrics.setdefault(metric.name, metric)
+
+        if (
+            type(registered) is not type(metric) or
+            registered.labels != metric.labels
+        ):
+            msg = "Metric '{}' is already registered with another type or labels"
+            raise ValueError(msg.format(metric.name))
+
+        return registered
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels=labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self.register(Gauge(name, documentation, labels=labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(
+            Histogram(name, documentation, labels=labels, buckets=buckets)
+        )
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def export(self):
+        """
+        Export every metrics in Prometheus text format.
+
+        Returns:
+            string: Metrics ordered on their name.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda item: item.name)
+
+        return "".join([metric.export() + "\n" for metric in metrics])
+
+    def write(self, path):
+        """
+        Write exported metrics to a file, like for the textfile collector of
+        Prometheus node exporter.
+
+        File is replaced atomically so a collector never reads a partial file.
+
+        Arguments:
+            path (pathlib.Path): File path to write.
+        """
+        # Cache module loads many modules that are useless to metrics
+        from .cache import write_atomic
+
+        write_atomic(Path(path), self.export())
+
+
+class CompileMetrics:
+    """
+    A compiler hook which records executions into metrics.
+
+    Keyword Arguments:
+        registry (MetricsRegistry): Registry where to register metrics. A new one
+            is created if not given.
+        prefix (string): Prefix for metric names.
+        buckets (iterable): Bucket upper bounds in seconds for duration histograms.
+
+    Attributes:
+        compiles (Counter): Finished executions.
+        failures (Counter): Failed executions labelled with their reason from
+            ``FAILURE_REASONS``, either a non zero exit status, a timeout or a
+            cancellation.
+        in_flight (Gauge): Running processes.
+        output_bytes (Counter): Size of processes output.
+        duration (Histogram): Duration of executions.
+        phases (Histogram): Duration of each execution phase, labelled with the
+            phase name.
+    """
+    def __init__(self, registry=None, prefix="flechette_insolente",
+                 buckets=DEFAULT_BUCKETS):
+        self.registry = registry or MetricsRegistry()
+
+        self.compiles = self.registry.counter(
+            prefix + "_compiles_total",
+            "Finished dart-sass executions.",
+        )
+        self.failures = self.registry.counter(
+            prefix + "_compile_failures_total",
+            "Failed dart-sass executions by reason.",
+            labels=("reason",),
+        )
+        self.in_flight = self.registry.gauge(
+            prefix + "_compiles_in_flight",
+            "Running dart-sass processes.",
+        )
+        self.output_bytes = self.registry.counter(
+            prefix + "_compile_output_bytes_total",
+            "Size in bytes of dart-sass output.",
+        )
+        self.duration = self.registry.histogram(
+            prefix + "_compile_duration_seconds",
+            "Duration of dart-sass executions in seconds.",
+            buckets=buckets,
+        )
+        self.phases = self.registry.histogram(
+            prefix + "_compile_phase_duration_seconds",
+            "Duration of dart-sass execution phases in seconds.",
+            labels=("phase",),
+            buckets=buckets,
+        )
+
+        # Expose every reasons even before any failure
+        for reason in FAILURE_REASONS:
+            self.failures.inc(0, reason=reason)
+
+    def __call__(self, event):
+        if isinstance(event, SpawnEvent):
+            self.in_flight.inc()
+            return
+        elif not isinstance(event, CompileEvent):
+            return
+
+        self.in_flight.dec()
+        self.compiles.inc()
+        self.output_bytes.inc(event.output_bytes)
+
+        if event.timeout:
+            self.failures.inc(reason="timeout")
+        elif event.cancelled:
+            self.failures.inc(reason="cancelled")
+        elif event.returncode:
+            self.failures.inc(reason="exit")
+
+        self.duration.observe(event.duration)
+        for name, value in event.phases.items():
+            if value is not None:
+                self.phases.observe(value, phase=name)
@@ -0,0 +1,266 @@
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from ..exceptions import CommandArgumentsError, RunnedCommandError
+from ..utils.system import get_cpu_count
+
+from .arguments import CompileProfile
+from .hooks import TargetEvent
+from .results import CompileResult
+
+
+class ParallelExecutor:
+    """
+    Compile many targets concurrently with a bounded number of compiler processes.
+
+    Each target is compiled with its own compiler process through ``compile()`` of
+    given compiler so timeout and errors are managed per target. Workers are threads
+    since they only wait for their process.
+
+    Targets are consumed lazily, there is never more than ``jobs`` pending targets at
+    once so a huge or endless iterable of targets keeps a constant memory usage. With
+    a governor, the number of pending targets follows its limit.
+
+    With a history, targets are all read first to start the longest ones first, so
+    a slow target does not finish alone at the end of the build, and each target
+    with known durations gets its own timeout, never lower than the compiler one.
+
+    .. Note::
+        ``EmbeddedDartSassCompiler`` serializes its requests, use it with a single
+        job or use ``DartSassCompiler``.
+
+    Arguments:
+        compiler (ExecutableAbstract): Compiler object to use, commonly a
+            ``DartSassCompiler``.
+
+    Keyword Arguments:
+        jobs (integer): Maximum number of concurrent compiles. Default to the number
+            of usable CPUs, or to the governor maximum if there is one.
+        governor (ResourceGovernor): Governor which adjusts the number of concurrent
+            compiles while running, it never goes beyond ``jobs``.
+        history (CompileHistory): Store of previous compiles to order targets and
+            get their timeout. Timeouts require a compiler based on
+            ``ExecutableAbstract``.
+    """
+    # Seconds to wait for running compiles before checking for a new job
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, compiler, jobs=None, governor=None, history=None):
+        self.compiler = compiler
+        self.governor = governor
+        self.history = history
+        self.jobs = jobs or (governor.max_jobs if governor else get_cpu_count())
+
+    def get_limit(self, running):
+        """
+        Get the number of compiles allowed to run at once.
+
+        Arguments:
+            running (integer): Number of running compiles.
+
+        Returns:
+            integer: Limit.
+        """
+        if self.governor is None:
+            return self.jobs
+
+        return min(self.jobs, self.governor.get_limit(running))
+
+    def compile_target(self, source, destination, options, timeout=None):
+        """
+        Compile a single target.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+            destination (pathlib.Path): Destination path, may be ``None``.
+            options (dict): Compile options.
+
+        Keyword Arguments:
+            timeout (float): Timeout in seconds to use instead of the compiler one.
+
+        Returns:
+            CompileResult: Compile result with possible error.
+        """
+        start = time.perf_counter()
+        output = None
+        error = None
+        # Forget about a previous compile from this worker
+        self.compiler.pop_resources()
+
+        if timeout is None:
+            override = nullcontext()
+        else:
+            override = self.compiler.override_timeout(timeout)
+
+        try:
+            with override:
+                output = self.compiler.compile(
+                    source,
+                    destination=destination,
+                    **options
+                )
+        except (CommandArgumentsError, RunnedCommandError) as e:
+            error = e
+
+        duration = time.perf_counter() - start
+
+        if self.compiler.hooks:
+            self.compiler.emit_event(
+                TargetEvent(source, destination, start, duration, error is None)
+            )
+
+        return CompileResult(
+            source,
+            destination,
+            output=output,
+            error=error,
+            duration=duration,
+            resources=self.compiler.pop_resources(),
+        )
+
+    def run(self, targets, **kwargs):
+        """
+        Compile given targets.
+
+        Arguments:
+            targets (iterable): Iterable of ``(source, destination)`` tuples.
+
+        Keyword Arguments:
+            **kwargs: Shared options as supported by ``DartSassCompiler.compile()``
+                except ``destination``. They are validated with ``CompileProfile``
+                before starting any compile.
+
+        Yields:
+            CompileResult: Result for each target in completion order.
+        """
+        # Shared options are validated once for every targets
+        profile = CompileProfile(**kwargs)
+        timeouts = {}
+        if self.history is not None:
+            targets = self.history.sort_targets(list(targets))
+            # A target timeout never goes below the compiler one
+            timeouts = self.history.get_timeouts(
+                targets,
+                minimum=getattr(self.compiler, "command_timeout", None),
+            )
+        targets = iter(targets)
+        pending = set()
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while True:
+                while (
+                    not exhausted and
+                    len(pending) < self.get_limit(len(pending))
+                ):
+                    try:
+                        source, destination = next(targets)
+                    except StopIteration:
+                        exhausted = True
+                    else:
+                        timeout = None
+                        if timeouts:
+                            timeout = timeouts.get(
+                                self.history.get_key(source, destination)
+                            )
+                        pending.add(executor.submit(
+                            self.compile_target,
+                            source,
+                            destination,
+                            {"profile": profile},
+                            timeout=timeout,
+                        ))
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if self.governor is not None:
+                        self.governor.update(result)
+                    yield result
+
+    def run_jobs(self, jobs):
+        """
+        Compile jobs as they come.
+
+        Unlike ``run()``, jobs are read from a separate thread so reading a job can
+        block, like from a pipe, while results of finished compiles are still
+        yielded. There is never more than ``jobs`` read jobs waiting to start.
+
+        Each job has its own options which are validated with its compile, invalid
+        options only make their job fail.
+
+        Arguments:
+            jobs (iterable): Iterable of ``CompileJob`` objects.
+
+        Yields:
+            tuple: Each job with its ``CompileResult``, in completion order.
+        """
+        incoming = queue.Queue(maxsize=self.jobs)
+        end = object()
+
+        def feed():
+            try:
+                for job in jobs:
+                    incoming.put(job)
+            except Exception as e:
+                # Raised again from the consumer
+                incoming.put(e)
+            incoming.put(end)
+
+        threading.Thread(target=feed, daemon=True).start()
+        pending = {}
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while True:
+                while (
+                    not exhausted and
+                    len(pending) < self.get_limit(len(pending))
+                ):
+                    try:
+                        # Only block when there is no running compile to wait for
+                        job = incoming.get(block=not pending)
+                    except queue.Empty:
+                        break
+
+                    if job is end:
+                        exhausted = True
+                    elif isinstance(job, Exception):
+                        raise job
+                    elif job.error is not None:
+                        yield job, CompileResult(
+                            job.source,
+                            job.destination,
+                            error=job.error,
+                        )
+                    else:
+                        pending[executor.submit(
+                            self.compile_target,
+                            job.source,
+                            job.destination,
+                            job.options,
+                            timeout=job.timeout,
+                        )] = job
+
+                if not pending:
+                    if exhausted:
+                        break
+                    continue
+
+                done, _ = wait(
+                    pending,
+                    timeout=None if exhausted else self.POLL_INTERVAL,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    job = pending.pop(future)
+                    result = future.result()
+                    if self.governor is not None:
+                        self.governor.update(result)
+                    yield job, result
@@ -0,0 +1,376 @@
+"""
+Pool of warm compiler processes.
+
+The dart-sass executable is a one shot command which can only be started once the
+compile arguments are known, so it can not be started before a compile request. The
+pool holds ``EmbeddedDartSassCompiler`` objects instead, whose process is started
+and warmed up with a version request before any compile, then reused for many
+compiles.
+"""
+import collections
+import contextlib
+import logging
+import threading
+import time
+
+from ..exceptions import PoolError, ProtocolError, RunnedCommandError
+from ..utils.system import get_cpu_count
+
+from .embedded import EmbeddedDartSassCompiler
+
+
+class CompilerPool:
+    """
+    A thread safe pool of started compilers, like a database connection pool.
+
+    A compiler is checked out for a compile then returned to the pool. The pool
+    always keeps at least ``min_size`` started compilers, more are started on demand
+    up to ``max_size`` and the idle ones beyond ``min_size`` are stopped after
+    ``idle_timeout``.
+
+    A background thread evicts idle compilers, checks their health with a version
+    request and starts new ones to keep the minimum size, so a compile after a long
+    idle period still gets a ready compiler.
+
+    Keyword Arguments:
+        min_size (integer): Number of compilers to keep started.
+        max_size (integer): Maximum number of compilers. Default to the number of
+            usable CPUs, at least ``min_size``.
+        idle_timeout (float): Seconds after which an idle compiler beyond
+            ``min_size`` is stopped.
+        health_interval (float): Seconds after which an idle compiler is checked
+            again before being used.
+        checkout_timeout (float): Seconds to wait for a compiler when the pool is
+            exhausted. Wait forever if ``None``.
+        factory (callable): Function to create a compiler. Default to create an
+            ``EmbeddedDartSassCompiler`` with remaining keyword arguments.
+        **kwargs: Arguments for default factory like ``executable`` or
+            ``command_timeout``.
+    """
+    def __init__(self, min_size=1, max_size=None, idle_timeout=300.0,
+                 health_interval=30.0, checkout_timeout=None, factory=None,
+                 **kwargs):
+        self.min_size = min_size
+        self.max_size = max(max_size or get_cpu_count(), min_size, 1)
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.checkout_timeout = checkout_timeout
+        self.factory = factory or (lambda: EmbeddedDartSassCompiler(**kwargs))
+
+        self.logger = logging.getLogger("flechette-insolente")
+        # Idle compilers with the time they have been checked in and the time they
+        # have been checked in or checked for health
+        self._idle = collections.deque()
+        self._size = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def size(self):
+        """
+        Returns:
+            integer: Number of compilers, either idle or checked out.
+        """
+        return self._size
+
+    @property
+    def idle(self):
+        """
+        Returns:
+            integer: Number of idle compilers.
+        """
+        return len(self._idle)
+
+    def create(self):
+        """
+        Create a compiler and warm it up.
+
+        Returns:
+            ExecutableAbstract: A started compiler.
+        """
+        compiler = self.factory()
+        try:
+            compiler.start()
+            compiler.version()
+        except BaseException:
+            compiler.stop()
+            raise
+
+        return compiler
+
+    def is_healthy(self, compiler):
+        """
+        Check a compiler still responds.
+
+        Arguments:
+            compiler (ExecutableAbstract): Compiler to check.
+
+        Returns:
+            boolean: True if compiler process is alive and answered a version
+            request.
+        """
+        if not compiler.is_alive:
+            return False
+
+        try:
+            compiler.version()
+        except (RunnedCommandError, ProtocolError, OSError) as e:
+            self.logger.debug("Pooled compiler failed health check: {}".format(e))
+            return False
+
+        return True
+
+    def _discard(self, compiler):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+        compiler.stop()
+
+    def fill(self):
+        """
+        Start compilers until the pool has its minimum size.
+
+        Returns:
+            integer: Number of started compilers.
+        """
+        started = 0
+
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return started
+                self._size += 1
+
+            try:
+                compiler = self.create()
+            except BaseException:
+                with self._condition:
+                    self._size -= 1
+                raise
+
+            self.checkin(compiler)
+            started += 1
+
+    def evict(self):
+        """
+        Stop idle compilers beyond the minimum size which are idle for too long and
+        the unhealthy ones.
+
+        Returns:
+            integer: Number of stopped compilers.
+        """
+        now = time.monotonic()
+        expired = []
+        checks = []
+
+        with self._condition:
+            for item in list(self._idle):
+                compiler, last_used, last_checked = item
+                if (
+                    now - last_used >= self.idle_timeout and
+                    self._size - len(expired) > self.min_size
+                ):
+                    expired.append(item)
+                elif now - last_checked >= self.health_interval:
+                    checks.append(item)
+
+            # Checked compilers are out of the pool during their check
+            for item in expired + checks:
+                self._idle.remove(item)
+
+        for compiler, last_used, last_checked in expired:
+            self._discard(compiler)
+
+        evicted = len(expired)
+        for compiler, last_used, last_checked in checks:
+            if self.is_healthy(compiler):
+                # A check does not make a compiler used
+                self._put(compiler, last_used)
+            else:
+                self._discard(compiler)
+                evicted += 1
+
+        return evicted
+
+    def start(self, interval=None):
+        """
+        Start the minimum number of compilers and the maintenance thread.
+
+        Keyword Arguments:
+            interval (float): Seconds between maintenance runs. Default to the
+                lowest from idle timeout and health interval, but at least one
+                second.
+
+        Returns:
+            CompilerPool: The pool itself.
+        """
+        with self._condition:
+            if self._closed:
+                raise PoolError("Pool is closed")
+
+        self.fill()
+
+        if self._thread is None:
+            interval = interval or max(
+                1.0, min(self.idle_timeout, self.health_interval)
+            )
+            self._thread = threading.Thread(
+                target=self._maintain,
+                args=(interval,),
+                daemon=True,
+            )
+            self._thread.start()
+
+        return self
+
+    def _maintain(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.evict()
+                self.fill()
+            except Exception as e:
+                self.logger.warning("Compiler pool maintenance failed: {}".format(e))
+
+    def checkout(self, timeout=None):
+        """
+        Take a compiler from the pool.
+
+        The most recently used idle compiler is given first so the other ones can
+        expire. If there is no idle compiler, a new one is started unless the pool
+        has reached its maximum size, then it waits for a compiler to be checked
+        in.
+
+        Keyword Arguments:
+            timeout (float): Seconds to wait for a compiler. Default to the pool
+                ``checkout_timeout``.
+
+        Returns:
+            ExecutableAbstract: A started compiler. It must be returned with
+            ``checkin()``.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolError("Pool is closed")
+
+                    if self._idle:
+                        compiler, last_used, last_checked = self._idle.pop()
+                        break
+
+                    if self._size < self.max_size:
+                        self._size += 1
+                        compiler = None
+                        break
+
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            msg = "No compiler available after {}s"
+                            raise PoolError(msg.format(timeout))
+
+                    self._condition.wait(remaining)
+
+            if compiler is None:
+                try:
+                    return self.create()
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+            if not compiler.is_alive or (
+                time.monotonic() - last_checked >= self.health_interval and
+                not self.is_healthy(compiler)
+            ):
+                self._discard(compiler)
+                continue
+
+            return compiler
+
+    def checkin(self, compiler):
+        """
+        Return a compiler to the pool.
+
+        A dead compiler or a compiler returned to a closed pool is stopped.
+
+        Arguments:
+            compiler (ExecutableAbstract): A compiler from ``checkout()``.
+        """
+        self._put(compiler, time.monotonic())
+
+    def _put(self, compiler, last_used):
+        with self._condition:
+            if not self._closed and compiler.is_alive:
+                self._idle.append((compiler, last_used, time.monotonic()))
+                self._condition.notify()
+                return
+
+        self._discard(compiler)
+
+    @contextlib.contextmanager
+    def compiler(self, timeout=None):
+        """
+        Context manager to check out a compiler and return it once done.
+
+        Keyword Arguments:
+            timeout (float): Seconds to wait for a compiler.
+
+        Yields:
+            ExecutableAbstract: A started compiler.
+        """
+        compiler = self.checkout(timeout=timeout)
+        try:
+            yield compiler
+        finally:
+            self.checkin(compiler)
+
+    def compile(self, *args, **kwargs):
+        """
+        Compile with a pooled compiler, see ``EmbeddedDartSassCompiler.compile()``.
+        """
+        with self.compiler() as compiler:
+            return compiler.compile(*args, **kwargs)
+
+    def compile_string(self, *args, **kwargs):
+        """
+        Compile Sass source content with a pooled compiler, see
+        ``EmbeddedDartSassCompiler.compile_string()``.
+        """
+        with self.compiler() as compiler:
+            return compiler.compile_string(*args, **kwargs)
+
+    def close(self):
+        """
+        Stop the maintenance thread and every idle compilers.
+
+        Checked out compilers are stopped when they are returned.
+        """
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        for compiler, last_used, last_checked in idle:
+            self._discard(compiler)
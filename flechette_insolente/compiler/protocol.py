@@ -0,0 +1,405 @@
+"""
+Minimal implementation of the Embedded Sass Protocol wire format.
+
+We don't use the Protobuf library (see ``Embedded-Sass-Protocol_draft.rst`` for the
+reasons), instead we only implement the few Protobuf wire primitives required to
+encode the inbound messages we send and decode the outbound messages we receive.
+
+Each packet sent or received is made of a varint length, followed by a varint
+compilation ID and finally the Protobuf message. The length covers both the
+compilation ID and the message. Compilation ID ``0`` is reserved for version requests.
+
+Message and field numbers are taken from the `Proto file`_ delivered by Sass.
+
+.. _Proto file: https://github.com/sass/sass/blob/main/spec/embedded_sass.proto
+"""
+from ..exceptions import ProtocolError
+
+
+# Protobuf wire types
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+# InboundMessage fields
+INBOUND_COMPILE_REQUEST = 2
+INBOUND_VERSION_REQUEST = 7
+
+# OutboundMessage fields
+OUTBOUND_ERROR = 1
+OUTBOUND_COMPILE_RESPONSE = 2
+OUTBOUND_LOG_EVENT = 3
+OUTBOUND_VERSION_RESPONSE = 8
+
+# Enumerations
+OUTPUT_STYLES = {
+    "expanded": 0,
+    "compressed": 1,
+}
+SYNTAXES = {
+    "scss": 0,
+    "indented": 1,
+    "sass": 1,
+    "css": 2,
+}
+LOG_EVENT_TYPES = {
+    0: "warning",
+    1: "deprecation_warning",
+    2: "debug",
+}
+
+
+def encode_varint(value):
+    """
+    Encode an unsigned integer to a Protobuf varint.
+
+    Arguments:
+        value (integer): Positive integer to encode.
+
+    Returns:
+        bytes: Encoded value.
+    """
+    if value < 0:
+        raise ProtocolError("Can not encode negative varint: {}".format(value))
+
+    chunks = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            chunks.append(byte | 0x80)
+        else:
+            chunks.append(byte)
+            return bytes(chunks)
+
+
+def decode_varint(data, position=0):
+    """
+    Decode a Protobuf varint from given data.
+
+    Arguments:
+        data (bytes): Data to read from.
+
+    Keyword Arguments:
+        position (integer): Position where to start reading.
+
+    Returns:
+        tuple: The decoded integer and the position just after the varint.
+    """
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(data):
+            raise ProtocolError("Truncated varint")
+
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def encode_field(number, value):
+    """
+    Encode a single message field.
+
+    Booleans and integers are encoded as varint, strings and bytes as
+    length-delimited. A nested message have to be given already encoded as bytes.
+
+    Arguments:
+        number (integer): Field number.
+        value (object): Field value.
+
+    Returns:
+        bytes: Encoded field with its key.
+    """
+    if isinstance(value, (bool, int)):
+        return encode_varint(number << 3 | WIRE_VARINT) + encode_varint(int(value))
+
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+
+    return (
+        encode_varint(number << 3 | WIRE_LENGTH_DELIMITED) +
+        encode_varint(len(value)) +
+        value
+    )
+
+
+def encode_message(fields):
+    """
+    Encode a message from its fields.
+
+    Arguments:
+        fields (iterable): Iterable of ``(number, value)`` tuples. Fields with a
+            ``None`` value are ignored like Protobuf does with default values.
+
+    Returns:
+        bytes: Encoded message.
+    """
+    return b"".join([
+        encode_field(number, value)
+        for number, value in fields
+        if value is not None
+    ])
+
+
+def decode_message(data):
+    """
+    Decode a message to its raw fields.
+
+    Since we don't have the message schema, varint fields are returned as integer and
+    length-delimited fields as bytes, it is the caller job to decode them further.
+
+    Arguments:
+        data (bytes): Encoded message.
+
+    Returns:
+        dict: Field values indexed on field number. Each value is a list since any
+        field may be repeated.
+    """
+    fields = {}
+    position = 0
+
+    while position < len(data):
+        key, position = decode_varint(data, position)
+        number, wire_type = key >> 3, key & 0x07
+
+        if wire_type == WIRE_VARINT:
+            value, position = decode_varint(data, position)
+        elif wire_type == WIRE_LENGTH_DELIMITED:
+            length, position = decode_varint(data, position)
+            value = data[position:position + length]
+            if len(value) < length:
+                raise ProtocolError("Truncated length-delimited field")
+            position += length
+        elif wire_type == WIRE_FIXED64:
+            value = data[position:position + 8]
+            position += 8
+        elif wire_type == WIRE_FIXED32:
+            value = data[position:position + 4]
+            position += 4
+        else:
+            raise ProtocolError("Unsupported wire type: {}".format(wire_type))
+
+        fields.setdefault(number, []).append(value)
+
+    return fields
+
+
+def get_field(fields, number, default=None):
+    """
+    Shortcut to get the last value of a decoded field, like Protobuf does for non
+    repeated fields.
+    """
+    values = fields.get(number)
+    if not values:
+        return default
+
+    return values[-1]
+
+
+def get_string(fields, number, default=""):
+    """
+    Shortcut to get a decoded string field.
+    """
+    value = get_field(fields, number)
+    if value is None:
+        return default
+
+    return value.decode("utf-8")
+
+
+def encode_packet(compilation_id, message):
+    """
+    Frame a message into a packet.
+
+    Arguments:
+        compilation_id (integer): Compilation ID the message belongs to.
+        message (bytes): Encoded message.
+
+    Returns:
+        bytes: Packet ready to be written to the compiler.
+    """
+    payload = encode_varint(compilation_id) + message
+
+    return encode_varint(len(payload)) + payload
+
+
+def read_packet(stream):
+    """
+    Read a single packet from a binary stream.
+
+    Arguments:
+        stream (io.BufferedReader): Binary stream to read, commonly the compiler
+            process stdout.
+
+    Returns:
+        tuple: The compilation ID and the encoded message. If the stream has been
+        closed before a new packet, ``None`` is returned.
+    """
+    header = bytearray()
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if header:
+                raise ProtocolError("Stream closed inside a packet header")
+            return None
+
+        header += byte
+        if not byte[0] & 0x80:
+            break
+
+    length, _ = decode_varint(header)
+
+    payload = b""
+    while len(payload) < length:
+        chunk = stream.read(length - len(payload))
+        if not chunk:
+            raise ProtocolError("Stream closed inside a packet")
+        payload += chunk
+
+    compilation_id, position = decode_varint(payload)
+
+    return compilation_id, payload[position:]
+
+
+def build_version_request(request_id):
+    """
+    Build an InboundMessage with a VersionRequest.
+
+    Arguments:
+        request_id (integer): Identifier that will be returned in response.
+
+    Returns:
+        bytes: Encoded message.
+    """
+    return encode_message([
+        (
+            INBOUND_VERSION_REQUEST,
+            encode_message([(1, request_id)]),
+        ),
+    ])
+
+
+def build_compile_request(path=None, source=None, syntax="scss", url=None,
+                          style="expanded", source_map=False, load_paths=None):
+    """
+    Build an InboundMessage with a CompileRequest.
+
+    Either ``path`` or ``source`` must be given.
+
+    Keyword Arguments:
+        path (string or pathlib.Path): Path to the Sass source file to compile.
+        source (string): Sass source content to compile.
+        syntax (string): Syntax name of given ``source``, one of ``scss``,
+            ``indented`` (or ``sass``) and ``css``. Ignored when ``path`` is used since
+            compiler will guess it from file extension.
+        url (string): Optional canonical URL for given ``source``.
+        style (string): Output style name, one of ``expanded`` or ``compressed``.
+        source_map (boolean): Whether to generate a source map.
+        load_paths (list): List of paths to use when resolving imports.
+
+    Returns:
+        bytes: Encoded message.
+    """
+    if path is None and source is None:
+        raise ProtocolError("A compile request requires either a path or a source")
+
+    fields = []
+
+    if path is not None:
+        fields.append((3, str(path)))
+    else:
+        fields.append((2, encode_message([
+            (1, source),
+            (2, url),
+            (3, SYNTAXES[syntax] or None),
+        ])))
+
+    fields.append((4, OUTPUT_STYLES[style or "expanded"] or None))
+    fields.append((5, True if source_map else None))
+
+    for item in load_paths or []:
+        fields.append((6, encode_message([(1, str(item))])))
+
+    return encode_message([
+        (INBOUND_COMPILE_REQUEST, encode_message(fields)),
+    ])
+
+
+def parse_outbound_message(data):
+    """
+    Parse an OutboundMessage to a dictionnary.
+
+    Only the compile response, log event, protocol error and version response are
+    supported since we never register any custom importers or functions.
+
+    Arguments:
+        data (bytes): Encoded message.
+
+    Returns:
+        dict: Message details, item ``type`` is the message type name.
+    """
+    fields = decode_message(data)
+
+    if OUTBOUND_COMPILE_RESPONSE in fields:
+        content = decode_message(get_field(fields, OUTBOUND_COMPILE_RESPONSE))
+        message = {
+            "type": "compile_response",
+            "css": None,
+            "source_map": None,
+            "failure": None,
+            "loaded_urls": [
+                item.decode("utf-8") for item in content.get(4, [])
+            ],
+        }
+
+        if 2 in content:
+            success = decode_message(get_field(content, 2))
+            message["css"] = get_string(success, 1)
+            message["source_map"] = get_string(success, 2) or None
+        else:
+            failure = decode_message(get_field(content, 3, b""))
+            message["failure"] = {
+                "message": get_string(failure, 1),
+                "stack_trace": get_string(failure, 3),
+                "formatted": get_string(failure, 4),
+            }
+
+        return message
+
+    if OUTBOUND_LOG_EVENT in fields:
+        content = decode_message(get_field(fields, OUTBOUND_LOG_EVENT))
+        return {
+            "type": "log_event",
+            "level": LOG_EVENT_TYPES.get(get_field(content, 1, 0), "warning"),
+            "message": get_string(content, 2),
+            "formatted": get_string(content, 5),
+        }
+
+    if OUTBOUND_VERSION_RESPONSE in fields:
+        content = decode_message(get_field(fields, OUTBOUND_VERSION_RESPONSE))
+        return {
+            "type": "version_response",
+            "id": get_field(content, 5, 0),
+            "protocol_version": get_string(content, 1),
+            "compiler_version": get_string(content, 2),
+            "implementation_version": get_string(content, 3),
+            "implementation_name": get_string(content, 4),
+        }
+
+    if OUTBOUND_ERROR in fields:
+        content = decode_message(get_field(fields, OUTBOUND_ERROR))
+        return {
+            "type": "error",
+            "id": get_field(content, 2, 0),
+            "message": get_string(content, 3),
+        }
+
+    return {
+        "type": "unsupported",
+        "fields": sorted(fields.keys()),
+    }
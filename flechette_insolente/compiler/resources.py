@@ -0,0 +1,185 @@
+"""
+Resource usage of dart-sass processes.
+
+Resource usage of a child process is only available from the system call which reaps
+it, so ``ResourcePopen`` explicitly reaps its process with ``os.wait4()`` instead of
+``os.waitpid()``. Unlike ``resource.getrusage(RUSAGE_CHILDREN)`` it is accurate for
+each process even when many of them run concurrently.
+
+On platforms without ``os.wait4()``, like Windows, there is no resource usage.
+
+Limits can also be applied to a running process with ``apply_limits()``.
+"""
+import os
+import subprocess
+import sys
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows
+    resource = None
+
+
+def get_resources(rusage, wall_time):
+    """
+    Build resource usage details.
+
+    Arguments:
+        rusage (resource.struct_rusage): Resource usage of a reaped process.
+        wall_time (float): Elapsed time in seconds from process start to its end.
+
+    Returns:
+        dict: Peak resident set size in bytes and user, system and wall times in
+        seconds. ``None`` if there is no resource usage.
+    """
+    if rusage is None:
+        return None
+
+    return {
+        # Linux gives kilobytes where macOS gives bytes
+        "max_rss": rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        "user_time": rusage.ru_utime,
+        "system_time": rusage.ru_stime,
+        "wall_time": wall_time,
+    }
+
+
+def summarize_resources(items):
+    """
+    Aggregate resource usage of many processes, like to size a worker pool.
+
+    Items with the same resource usage object, like results from a single batch
+    execution, are counted once.
+
+    Arguments:
+        items (iterable): Objects with a ``resources`` attribute, commonly
+            ``CompileResult`` objects. Items without resource usage are ignored.
+
+    Returns:
+        dict: Count of processes, highest and mean peak resident set size in bytes,
+        total of user, system and wall times in seconds. ``None`` if there is no
+        resource usage at all.
+    """
+    unique = {}
+    for item in items:
+        if item.resources is not None:
+            unique[id(item.resources)] = item.resources
+
+    resources = list(unique.values())
+    if not resources:
+        return None
+
+    return {
+        "count": len(resources),
+        "max_rss": max([item["max_rss"] for item in resources]),
+        "mean_rss": sum([item["max_rss"] for item in resources]) / len(resources),
+        "user_time": sum([item["user_time"] for item in resources]),
+        "system_time": sum([item["system_time"] for item in resources]),
+        "wall_time": sum([item["wall_time"] for item in resources]),
+    }
+
+
+def format_resources(resources):
+    """
+    Format resource usage summary on a single line.
+
+    Arguments:
+        resources (dict): Summary from ``summarize_resources()``.
+
+    Returns:
+        string: Formatted summary with sizes in MiB.
+    """
+    return (
+        "{count} process(es), peak RSS max={max_rss:.1f}MiB mean={mean_rss:.1f}MiB, "
+        "CPU user={user_time:.3f}s system={system_time:.3f}s, wall={wall_time:.3f}s"
+    ).format(
+        count=resources["count"],
+        max_rss=resources["max_rss"] / 1048576,
+        mean_rss=resources["mean_rss"] / 1048576,
+        user_time=resources["user_time"],
+        system_time=resources["system_time"],
+        wall_time=resources["wall_time"],
+    )
+
+
+def apply_limits(pid, memory_limit=None, cpu_limit=None):
+    """
+    Apply resource limits to a running process.
+
+    Limits are applied with ``prlimit()`` from the parent process, since setting
+    them from a ``preexec_fn`` is not safe when processes are started from many
+    threads. So the process is already running when its limits are applied.
+
+    Arguments:
+        pid (integer): Process ID.
+
+    Keyword Arguments:
+        memory_limit (integer): Maximum size in bytes of the process virtual memory
+            (``RLIMIT_AS``). Memory allocations beyond it fail.
+        cpu_limit (integer): Maximum CPU time in seconds (``RLIMIT_CPU``). Process is
+            killed by a ``SIGXCPU`` signal once it is reached.
+
+    Returns:
+        boolean: True if limits have been applied, False if there was no limit to
+        apply or if platform does not support it (only Linux does).
+    """
+    if not memory_limit and not cpu_limit:
+        return False
+
+    if resource is None or not hasattr(resource, "prlimit"):
+        return False
+
+    try:
+        if memory_limit:
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory_limit, memory_limit))
+        if cpu_limit:
+            # Hard limit is above so the process receives SIGXCPU before a SIGKILL
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+    except ProcessLookupError:
+        # Process already finished
+        return False
+
+    return True
+
+
+class ResourcePopen(subprocess.Popen):
+    """
+    A ``subprocess.Popen`` which keeps the resource usage of its reaped process.
+
+    Process has to be reaped with ``reap()`` once its output has been read, since
+    ``wait()`` and ``communicate()`` reap it without its resource usage.
+
+    Attributes:
+        rusage (resource.struct_rusage): Resource usage once process has been
+            reaped with ``reap()``, else ``None``.
+    """
+    rusage = None
+
+    def reap(self):
+        """
+        Wait for process to end and reap it with ``os.wait4()``.
+
+        If the process has already been reaped, like from ``poll()``, or if
+        platform does not support it, it is only waited for without resource
+        usage.
+
+        Returns:
+            integer: Process return code, negative for a process killed by a
+            signal.
+        """
+        if self.returncode is not None or not hasattr(os, "wait4"):
+            return self.wait()
+
+        try:
+            pid, status, rusage = os.wait4(self.pid, 0)
+        except ChildProcessError:
+            return self.wait()
+
+        self.rusage = rusage
+        if os.WIFSIGNALED(status):
+            self.returncode = -os.WTERMSIG(status)
+        else:
+            self.returncode = os.WEXITSTATUS(status)
+
+        return self.returncode
@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+
+from ..exceptions import CommandArgumentsError, RunnedCommandError
+
+
+class CompileResult:
+    """
+    Result of a single compile target.
+
+    Arguments:
+        source (pathlib.Path): Source path of target.
+
+    Keyword Arguments:
+        destination (pathlib.Path): Destination path of target, if any.
+        output (string): Compiler output, commonly the CSS when there is no
+            destination.
+        error (Exception): Error which made the target fail, commonly a
+            ``RunnedCommandError`` or a ``CommandArgumentsError``.
+        duration (float): Elapsed time in seconds to compile target, if measured.
+        resources (dict): Resource usage of the dart-sass process which compiled
+            target, if any. See
+            ``flechette_insolente.compiler.resources.get_resources()``.
+
+    Attributes:
+        success (boolean): True if the target succeeded.
+    """
+    def __init__(self, source, destination=None, output=None, error=None,
+                 duration=None, resources=None):
+        self.source = source
+        self.destination = destination
+        self.output = output
+        self.error = error
+        self.duration = duration
+        self.resources = resources
+
+    def __repr__(self):
+        return "<{klass} {source} success={success}>".format(
+            klass=self.__class__.__name__,
+            source=self.source,
+            success=self.success,
+        )
+
+    @property
+    def success(self):
+        return self.error is None
+
+    def get_output_size(self):
+        """
+        Get the size of a successful compile output.
+
+        Returns:
+            integer: Size in bytes of the written destination, or of the returned
+            output if there is no destination. ``None`` if it is unknown.
+        """
+        if not self.success:
+            return None
+
+        if self.destination is not None:
+            try:
+                return os.stat(self.destination).st_size
+            except OSError:
+                return None
+
+        return len((self.output or "").encode("utf-8"))
+
+    def to_dict(self):
+        """
+        Returns result details as a dictionnary which can be serialized with
+        ``ExtendedJsonEncoder``.
+
+        Returns:
+            dict: Result details.
+        """
+        return {
+            "source": self.source,
+            "destination": self.destination,
+            "success": self.success,
+            "duration": self.duration,
+            "resources": self.resources,
+            "output": self.output,
+            "error": str(self.error) if self.error else None,
+            "error_payload": getattr(self.error, "error_payload", None),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a result from its dictionnary as returned by ``to_dict()``, like after
+        a JSON round trip.
+
+        Error is restored as a ``RunnedCommandError`` if it has a payload, else as a
+        ``CommandArgumentsError``.
+
+        Arguments:
+            data (dict): Result details.
+
+        Returns:
+            CompileResult: The result.
+        """
+        error = None
+        if data.get("error_payload"):
+            error = RunnedCommandError(error_payload=data["error_payload"])
+        elif data.get("error"):
+            error = CommandArgumentsError(data["error"])
+
+        return cls(
+            Path(data["source"]),
+            Path(data["destination"]) if data.get("destination") else None,
+            output=data.get("output"),
+            error=error,
+            duration=data.get("duration"),
+            resources=data.get("resources"),
+        )
@@ -0,0 +1,115 @@
+"""
+Deterministic partition of targets into shards, to spread a build across many
+machines.
+
+Every machine computes the same partition from the same targets and weights, then
+only compiles its own shard. Targets are balanced with the longest processing time
+first rule (LPT): heaviest targets are assigned first, each one to the shard with the
+lowest load.
+
+Durations are indexed on paths relative to the current directory, so machines with
+the build in another directory still agree on the partition.
+"""
+from .graph import expand_targets
+from .manifest import StatCache, get_relative_path
+
+
+def get_weights(targets, durations=None, stat_cache=None):
+    """
+    Estimate the compile cost of targets.
+
+    Recorded durations are used when available. Targets without a recorded duration
+    get the mean of the known ones, and if no duration is known at all, the size of
+    sources is used instead.
+
+    Arguments:
+        targets (list): List of ``(source, destination)`` tuples.
+
+    Keyword Arguments:
+        durations (dict): Compile durations in seconds indexed on destination path
+            relative to the current directory, like from
+            ``BuildManifest.get_durations()``.
+        stat_cache (StatCache): Stat cache to get source sizes.
+
+    Returns:
+        list: Weight of each target in the same order.
+    """
+    durations = durations or {}
+    values = [
+        durations.get(get_relative_path(destination))
+        for source, destination in targets
+    ]
+    known = [value for value in values if value is not None]
+
+    if known:
+        mean = sum(known) / len(known)
+        return [mean if value is None else value for value in values]
+
+    stat_cache = stat_cache or StatCache()
+    weights = []
+    for source, destination in targets:
+        stat = stat_cache.stat(source)
+        weights.append(stat.st_size if stat else 0)
+
+    return weights
+
+
+def partition_targets(targets, count, weights):
+    """
+    Split targets into balanced shards.
+
+    Arguments:
+        targets (list): List of ``(source, destination)`` tuples.
+        count (integer): Number of shards.
+        weights (list): Weight of each target.
+
+    Returns:
+        list: A list of targets for each shard. Targets keep their given order
+        inside a shard.
+    """
+    # Ties are broken on paths so the order does not depend on given order
+    order = sorted(
+        range(len(targets)),
+        key=lambda index: (
+            -weights[index],
+            str(targets[index][0]),
+            str(targets[index][1]),
+        ),
+    )
+
+    loads = [0] * count
+    assigned = [[] for i in range(count)]
+    for index in order:
+        shard = loads.index(min(loads))
+        loads[shard] += weights[index]
+        assigned[shard].append(index)
+
+    return [
+        [targets[index] for index in sorted(indexes)]
+        for indexes in assigned
+    ]
+
+
+def select_shard(targets, index, count, durations=None, stat_cache=None):
+    """
+    Get the targets of a shard.
+
+    Directory sources are expanded to their entrypoints, so they can be spread over
+    many shards.
+
+    Arguments:
+        targets (list): List of ``(source, destination)`` tuples.
+        index (integer): Shard number, starting from 1.
+        count (integer): Number of shards.
+
+    Keyword Arguments:
+        durations (dict): Compile durations indexed on relative destination path.
+        stat_cache (StatCache): Stat cache to get source sizes.
+
+    Returns:
+        list: ``(source, destination)`` tuples of shard.
+    """
+    targets = sorted(expand_targets(targets).items())
+    weights = get_weights(targets, durations=durations, stat_cache=stat_cache)
+
+    return partition_targets(targets, count, weights)[index - 1]
@@ -0,0 +1,236 @@
+"""
+Trace of compiles in the Chrome trace event format.
+
+``TraceRecorder`` is a compiler hook which turns compiler events into spans drawn on
+a lane for each thread which performed the work, so a trace of a parallel build shows
+each worker. Trace files can be opened with ``chrome://tracing`` or
+`Perfetto <https://ui.perfetto.dev>`_.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .hooks import CacheEvent, CompileEvent, TargetEvent
+
+
+def merge_traces(traces, names=None):
+    """
+    Merge many traces into a single one, like the traces of each shard of a build.
+
+    Each trace becomes a process of the merged trace so its lanes stay together.
+    Spans keep their time from the start of their own trace.
+
+    Arguments:
+        traces (list): Traces in the trace event format, like from
+            ``TraceRecorder.to_dict()``.
+
+    Keyword Arguments:
+        names (list): Process name for each trace. Default to ``trace-N``.
+
+    Returns:
+        dict: Merged trace.
+    """
+    events = []
+
+    for index, trace in enumerate(traces, start=1):
+        name = names[index - 1] if names else "trace-{}".format(index)
+        events.append({
+            "name": "process_name",
+            "ph": "M",
+            "pid": index,
+            "tid": 0,
+            "args": {"name": name},
+        })
+        for event in trace.get("traceEvents", []):
+            events.append(dict(event, pid=index))
+
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+    }
+
+
+class TraceRecorder:
+    """
+    A compiler hook which records spans for a trace.
+
+    Recorded spans are:
+
+    target
+        The whole compile of a target from ``ParallelExecutor``;
+    validation
+        Arguments validation;
+    spawn
+        Process start;
+    run
+        Wait for process to finish;
+    decode
+        Process output decoding;
+    cache hit and cache miss
+        Cache key computing and lookup from ``CachedDartSassCompiler``;
+    write
+        Files restored from cache on a hit or entry stored on a miss.
+
+    Attributes:
+        origin (float): Time from ``time.perf_counter()`` used as the trace start.
+        events (list): Recorded trace events.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def get_lane(self):
+        """
+        Get the lane of the current thread.
+
+        Returns:
+            integer: Lane number, lanes are numbered in order of their first span.
+        """
+        ident = threading.get_ident()
+
+        with self._lock:
+            if ident not in self._lanes:
+                self._lanes[ident] = len(self._lanes) + 1
+
+            return self._lanes[ident]
+
+    def add_span(self, name, category, start, duration, lane, args=None):
+        """
+        Record a span.
+
+        Arguments:
+            name (string): Span name.
+            category (string): Span category.
+            start (float): Time when span has started, from ``time.perf_counter()``.
+            duration (float): Span duration in seconds.
+            lane (integer): Lane where to draw span.
+
+        Keyword Arguments:
+            args (dict): Details displayed with span.
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1000000,
+            "dur": duration * 1000000,
+            "pid": os.getpid(),
+            "tid": lane,
+        }
+        if args:
+            event["args"] = args
+
+        with self._lock:
+            self.events.append(event)
+
+    def __call__(self, event):
+        if isinstance(event, CompileEvent):
+            self.record_compile(event)
+        elif isinstance(event, TargetEvent):
+            self.add_span(
+                "target",
+                "target",
+                event.started,
+                event.duration,
+                self.get_lane(),
+                args={
+                    "source": str(event.source),
+                    "destination": str(event.destination),
+                    "success": event.success,
+                },
+            )
+        elif isinstance(event, CacheEvent):
+            lane = self.get_lane()
+            self.add_span(
+                "cache hit" if event.hit else "cache miss",
+                "cache",
+                event.started,
+                event.lookup,
+                lane,
+                args={"key": event.key},
+            )
+            if event.write is not None:
+                self.add_span(
+                    "write",
+                    "cache",
+                    # On a miss, the entry is stored once compile is finished
+                    time.perf_counter() - event.write,
+                    event.write,
+                    lane,
+                )
+
+    def record_compile(self, event):
+        """
+        Record a span for each phase of an execution.
+
+        Arguments:
+            event (CompileEvent): Finished execution event.
+        """
+        lane = self.get_lane()
+        args = {
+            "cmd": " ".join([str(item) for item in event.cmd]),
+            "returncode": event.returncode,
+            "timeout": event.timeout,
+            "output_bytes": event.output_bytes,
+        }
+
+        validation = event.phases["validation"]
+        if validation is not None:
+            self.add_span(
+                "validation", "compile", event.started - validation, validation, lane,
+            )
+
+        start = event.started
+        for phase, name in (("spawn", "spawn"), ("wait", "run"), ("decode", "decode")):
+            duration = event.phases[phase]
+            if duration is None:
+                continue
+
+            self.add_span(
+                name,
+                "compile",
+                start,
+                duration,
+                lane,
+                args=args if phase == "wait" else None,
+            )
+            start += duration
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Trace with lane names and every recorded spans in the trace event
+            format.
+        """
+        with self._lock:
+            lanes = sorted(self._lanes.values())
+            events = list(self.events)
+
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": lane,
+                "args": {"name": "worker-{}".format(lane)},
+            }
+            for lane in lanes
+        ]
+
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self, path):
+        """
+        Write the trace to a JSON file.
+
+        Arguments:
+            path (pathlib.Path): File path to write.
+        """
+        Path(path).write_text(json.dumps(self.to_dict()))
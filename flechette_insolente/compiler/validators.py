@@ -7,7 +7,28 @@ class ArgumentsValidationAbstract:
     """
     An abstract to include all argument validators. It need to work conjointly with
     ArgumentsModel.
+
+    Attributes:
+        stat_cache (StatCache): Optional stat cache used to check path existence, so
+            many models built during a same build do not check the same paths again.
     """
+    stat_cache = None
+
+    def path_exists(self, value):
+        """
+        Check if a path exists, through the stat cache if any.
+
+        Arguments:
+            value (string or pathlib.Path): Path to check.
+
+        Returns:
+            boolean: True if path exists.
+        """
+        if self.stat_cache is not None:
+            return self.stat_cache.exists(value)
+
+        return Path(value).exists()
+
     def validate_boolean_flag(self, value, arg_true, arg_false):
         """
         Create arguments for given boolean flag
@@ -30,7 +51,7 @@ class ArgumentsValidationAbstract:
     def _validate_source(self, value):
         path = Path(value)
 
-        if not path.exists():
+        if not self.path_exists(path):
             msg = "Given source path does not exist: {}"
             raise CommandArgumentsError(msg.format(path))
 
@@ -58,7 +79,23 @@ class ArgumentsValidationAbstract:
                 names=", ".join(self.OPTION_STYLE_CHOICES),
             ))
 
-        return [self.get_available_parameters()["style"], value]
+        return [self.get_parameter_schema()["style"], value]
+
+    def _validate_syntax(self, value):
+        """
+        Validate the syntax of a source given as a string.
+
+        Returns:
+            string: Given syntax.
+        """
+        if value not in self.OPTION_SYNTAX_CHOICES:
+            msg = "Invalid given syntax '{value}', it should be one of: {names}"
+            raise CommandArgumentsError(msg.format(
+                value=value,
+                names=", ".join(self.OPTION_SYNTAX_CHOICES),
+            ))
+
+        return value
 
     def _validate_indented(self, value):
         """
@@ -74,8 +111,7 @@ class ArgumentsValidationAbstract:
         """
         return self.validate_boolean_flag(
             value,
-            self.get_available_parameters()["indented"][0],
-            self.get_available_parameters()["indented"][1],
+            *self.get_parameter_schema()["indented"]
         )
 
     def _validate_source_map(self, value):
@@ -92,8 +128,7 @@ class ArgumentsValidationAbstract:
         """
         return self.validate_boolean_flag(
             value,
-            self.get_available_parameters()["source_map"][0],
-            self.get_available_parameters()["source_map"][1],
+            *self.get_parameter_schema()["source_map"]
         )
 
     def _validate_load_path(self, value):
@@ -103,7 +138,7 @@ class ArgumentsValidationAbstract:
         errors = [
             item
             for item in value
-            if not Path(item).exists()
+            if not self.path_exists(item)
         ]
         if len(errors):
             msg = "Some given 'load-path' does not exist: \n{}"
@@ -111,8 +146,9 @@ class ArgumentsValidationAbstract:
                 "\n".join(errors)
             ))
 
+        flag = self.get_parameter_schema()["load_path"]
         paths = []
         for item in value:
-            paths.extend([self.get_available_parameters()["load_path"], str(item)])
+            paths.extend([flag, str(item)])
 
         return paths
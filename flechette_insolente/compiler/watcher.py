@@ -0,0 +1,566 @@
+"""
+Watch Sass sources and compile again the entrypoints affected by changes.
+
+Changes are detected with inotify on Linux, it is used through ``ctypes`` so there
+is no additional dependency. On other platforms or if inotify can not be used, the
+sources are polled for changes from their file stats.
+"""
+import ctypes
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from .graph import SOURCE_EXTENSIONS, DependencyGraph, expand_targets
+from .parallel import ParallelExecutor
+
+
+# Extensions of files which may be loaded by a compile, the other ones are ignored
+WATCHED_EXTENSIONS = SOURCE_EXTENSIONS + (".css",)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+
+# Fixed part of an inotify event: watch descriptor, mask, cookie and name length
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def get_libc():
+    """
+    Load the C library if it provides inotify.
+
+    Returns:
+        ctypes.CDLL: The C library or ``None`` if inotify is not available.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+    except OSError:
+        return None
+
+    if not hasattr(libc, "inotify_init1"):
+        return None
+
+    return libc
+
+
+def get_watch_roots(paths):
+    """
+    Reduce paths to the directories to watch.
+
+    Arguments:
+        paths (list): File or directory paths.
+
+    Returns:
+        list: Sorted resolved directories, a directory contained in another one is
+        removed since directories are watched recursively.
+    """
+    directories = set()
+    for path in paths:
+        path = Path(path).resolve()
+        directories.add(path if path.is_dir() else path.parent)
+
+    roots = []
+    for path in sorted(directories):
+        if not any(root in path.parents for root in roots):
+            roots.append(path)
+
+    return roots
+
+
+class PollingWatcher:
+    """
+    Detect changes by comparing file stats between two scans of watched directories.
+
+    Only files with a watched extension are considered, directories are walked with
+    ``os.scandir`` which does not need a stat call for each directory entry.
+
+    Arguments:
+        paths (list): Directories to watch recursively.
+
+    Keyword Arguments:
+        interval (float): Delay in seconds between two scans.
+    """
+    def __init__(self, paths, interval=0.5):
+        self.paths = [Path(item) for item in paths]
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def _scan_directory(self, directory, snapshot):
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    self._scan_directory(entry.path, snapshot)
+                elif entry.name.endswith(WATCHED_EXTENSIONS):
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+
+    def scan(self):
+        """
+        Returns:
+            dict: Stats of watched files indexed on their path.
+        """
+        snapshot = {}
+        for path in self.paths:
+            self._scan_directory(str(path), snapshot)
+
+        return snapshot
+
+    def wait(self, timeout=None):
+        """
+        Wait for changes.
+
+        Arguments:
+            timeout (float): Maximum time to wait in seconds, wait forever if
+                ``None``.
+
+        Returns:
+            set: Paths of changed, created or removed files. It is empty if nothing
+            changed before timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+
+            snapshot = self.scan()
+            changes = {
+                Path(path)
+                for path in set(snapshot) | set(self.snapshot)
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+
+            if changes or (deadline is not None and time.monotonic() >= deadline):
+                return changes
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detect changes with Linux inotify.
+
+    Every directory is watched, including the ones created after watcher start.
+
+    Arguments:
+        paths (list): Directories to watch recursively.
+
+    Keyword Arguments:
+        libc (ctypes.CDLL): C library to use, default to the one from
+            ``get_libc()``.
+    """
+    def __init__(self, paths, libc=None):
+        self.libc = libc or get_libc()
+        if self.libc is None:
+            raise OSError("inotify is not available")
+
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "Unable to initialize inotify")
+
+        self.watches = {}
+        for path in paths:
+            self.add_directory(path)
+
+    def add_directory(self, path):
+        """
+        Add watches for a directory and all its subdirectories.
+
+        Arguments:
+            path (pathlib.Path): Directory to watch.
+
+        Returns:
+            set: Paths of files found in directories. For a directory created after
+            watcher start, they may have been written before its watch was added.
+        """
+        found = set()
+
+        for dirpath, dirnames, filenames in os.walk(path):
+            wd = self.libc.inotify_add_watch(
+                self.fd,
+                os.fsencode(dirpath),
+                INOTIFY_MASK,
+            )
+            if wd >= 0:
+                self.watches[wd] = Path(dirpath)
+
+            found.update([
+                Path(dirpath) / name
+                for name in filenames
+                if name.endswith(WATCHED_EXTENSIONS)
+            ])
+
+        return found
+
+    def read_events(self):
+        """
+        Read pending events.
+
+        Returns:
+            set: Paths of files with an event.
+        """
+        changes = set()
+
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changes
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changes.update(self.add_directory(path))
+            elif path.name.endswith(WATCHED_EXTENSIONS):
+                changes.add(path)
+
+        return changes
+
+    def wait(self, timeout=None):
+        """
+        Wait for changes.
+
+        Arguments:
+            timeout (float): Maximum time to wait in seconds, wait forever if
+                ``None``.
+
+        Returns:
+            set: Paths of changed, created or removed files. It is empty if nothing
+            changed before timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if ready:
+                changes = self.read_events()
+                if changes:
+                    return changes
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+    def close(self):
+        os.close(self.fd)
+
+
+def get_watcher(paths, polling=False, interval=0.5):
+    """
+    Get the best available watcher.
+
+    Arguments:
+        paths (list): Directories to watch recursively.
+
+    Keyword Arguments:
+        polling (boolean): Force usage of polling watcher.
+        interval (float): Delay in seconds between two scans for polling watcher.
+
+    Returns:
+        object: ``InotifyWatcher`` if available else ``PollingWatcher``.
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(paths)
+        except OSError:
+            pass
+
+    return PollingWatcher(paths, interval=interval)
+
+
+def collect_changes(watcher, timeout=None, debounce=0.1):
+    """
+    Wait for changes then keep collecting them until there is no more change during
+    the debounce delay, so a burst of events from an editor or a checkout triggers a
+    single rebuild.
+
+    Arguments:
+        watcher (object): Watcher object.
+
+    Keyword Arguments:
+        timeout (float): Maximum time to wait for a first change in seconds, wait
+            forever if ``None``.
+        debounce (float): Delay in seconds without changes to end collecting.
+
+    Returns:
+        set: Paths of changed files.
+    """
+    changes = watcher.wait(timeout)
+
+    while changes:
+        more = watcher.wait(debounce)
+        if not more:
+            break
+        changes |= more
+
+    return changes
+
+
+class CompileWatcher:
+    """
+    Compile targets once then compile again the ones affected by source changes.
+
+    A dependency graph is maintained for target sources so a change only compiles
+    again the entrypoints which are or transitively load a changed file. Directory
+    targets are expanded to their entrypoints, an entrypoint created in such
+    directory is compiled when it appears.
+
+    Arguments:
+        compiler (DartSassCompiler): Compiler to use.
+        targets (list): List of ``(source, destination)`` tuples. Source may be a
+            directory, in this case the destination is a directory too.
+
+    Keyword Arguments:
+        jobs (integer): Maximum number of concurrent compiles.
+        debounce (float): Delay in seconds without changes before rebuilding.
+        polling (boolean): Force usage of polling watcher.
+        interval (float): Delay in seconds between two scans for polling watcher.
+        **kwargs: Shared compile options as supported by
+            ``DartSassCompiler.compile()`` except ``destination``.
+    """
+    def __init__(self, compiler, targets, jobs=None, debounce=0.1, polling=False,
+                 interval=0.5, **kwargs):
+        self.logger = logging.getLogger("flechette-insolente")
+        self.compiler = compiler
+        self.targets = [
+            (Path(source), Path(destination) if destination else None)
+            for source, destination in targets
+        ]
+        self.jobs = jobs
+        self.debounce = debounce
+        self.polling = polling
+        self.interval = interval
+        self.options = kwargs
+        self.graph = DependencyGraph(load_paths=kwargs.get("load_path"))
+        self.entrypoints = {}
+
+    def get_entrypoints(self):
+        """
+        Expand targets to every entrypoint with its destination.
+
+        Returns:
+            dict: Destination path indexed on resolved entrypoint path.
+        """
+        return expand_targets(self.targets)
+
+    def refresh(self):
+        """
+        Refresh entrypoints and dependency graph.
+
+        Returns:
+            list: Entrypoints which did not exist on previous refresh.
+        """
+        entrypoints = self.get_entrypoints()
+        created = [path for path in entrypoints if path not in self.entrypoints]
+        self.entrypoints = entrypoints
+        self.graph.build(list(entrypoints.keys()))
+
+        return created
+
+    def get_watched_paths(self):
+        """
+        Returns:
+            list: Directories to watch.
+        """
+        return get_watch_roots(
+            [source for source, destination in self.targets] +
+            list(self.graph.load_paths) +
+            list(self.graph.files.keys())
+        )
+
+    def filter_changes(self, changes):
+        """
+        Remove destinations written by builds from changes, unless they are loaded
+        by a source.
+
+        Arguments:
+            changes (set): Paths of changed files.
+
+        Returns:
+            set: Paths of changed files which may affect entrypoints.
+        """
+        destinations = {
+            destination.resolve()
+            for destination in self.entrypoints.values()
+            if destination
+        }
+
+        return {
+            path for path in changes
+            if path.resolve() not in destinations or
+            str(path.resolve()) in self.graph.files
+        }
+
+    def build(self, paths):
+        """
+        Compile given entrypoints.
+
+        Arguments:
+            paths (list): Entrypoint paths to compile.
+
+        Returns:
+            list: ``CompileResult`` objects in completion order.
+        """
+        executor = ParallelExecutor(self.compiler, jobs=self.jobs)
+
+        return list(executor.run(
+            [(path, self.entrypoints[path]) for path in paths],
+            **self.options
+        ))
+
+    def rebuild(self, changes):
+        """
+        Compile again entrypoints affected by some changed files.
+
+        Arguments:
+            changes (set): Paths of changed files.
+
+        Returns:
+            list: ``CompileResult`` objects in completion order.
+        """
+        # Changed files are checked against graph before refresh so removed imports
+        # still lead to their previous dependents
+        affected = set(self.graph.get_affected_entrypoints(changes))
+        affected.update(self.refresh())
+        affected.update(self.graph.get_affected_entrypoints(changes))
+
+        return self.build(sorted(path for path in affected if path in self.entrypoints))
+
+    def report(self, results, elapsed):
+        """
+        Log compile results with their timings.
+
+        Arguments:
+            results (list): ``CompileResult`` objects.
+            elapsed (float): Total elapsed time in seconds.
+
+        Returns:
+            integer: Count of failed targets.
+        """
+        failures = 0
+
+        for result in results:
+            if result.success:
+                self.logger.info("Compiled {} in {:.0f}ms".format(
+                    result.source,
+                    result.duration * 1000,
+                ))
+            else:
+                failures += 1
+                payload = getattr(result.error, "get_payload_details", None)
+                if payload:
+                    print(payload())
+                self.logger.error("Failed to compile {}: {}".format(
+                    result.source,
+                    result.error,
+                ))
+
+        self.logger.info("Built {} target(s) with {} failure(s) in {:.0f}ms".format(
+            len(results),
+            failures,
+            elapsed * 1000,
+        ))
+
+        return failures
+
+    def run(self, timeout=None, callback=None):
+        """
+        Compile every targets then watch for changes until interrupted.
+
+        Keyword Arguments:
+            timeout (float): Stop watching after this number of seconds without
+                changes. Watch forever if ``None``.
+            callback (callable): Function called with results and elapsed time in
+                seconds after each build has been reported. If it returns True,
+                watching is stopped.
+        """
+        def notify(results, elapsed):
+            self.report(results, elapsed)
+            return callback(results, elapsed) if callback else False
+
+        start = time.perf_counter()
+        self.refresh()
+        results = self.build(sorted(self.entrypoints))
+        if notify(results, time.perf_counter() - start):
+            return
+
+        roots = self.get_watched_paths()
+        watcher = get_watcher(roots, polling=self.polling, interval=self.interval)
+        self.logger.info("Watching {} with {}".format(
+            ", ".join([str(item) for item in roots]),
+            watcher.__class__.__name__,
+        ))
+
+        try:
+            while True:
+                changes = collect_changes(
+                    watcher,
+                    timeout=timeout,
+                    debounce=self.debounce,
+                )
+                if not changes:
+                    return
+
+                # Destinations written by the previous build are not source changes
+                changes = self.filter_changes(changes)
+                if not changes:
+                    continue
+
+                start = time.perf_counter()
+                results = self.rebuild(changes)
+                if notify(results, time.perf_counter() - start):
+                    return
+
+                # Dependencies may have moved outside of watched directories
+                new_roots = self.get_watched_paths()
+                if new_roots != roots:
+                    watcher.close()
+                    roots = new_roots
+                    watcher = get_watcher(
+                        roots,
+                        polling=self.polling,
+                        interval=self.interval,
+                    )
+        finally:
+            watcher.close()
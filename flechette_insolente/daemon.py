@@ -0,0 +1,422 @@
+"""
+Compile daemon serving compile jobs over a Unix domain socket.
+
+A long-lived daemon keeps the Python interpreter, the validated options schema,
+compilers and caches warm, so a compile sent from ``DaemonClient`` only costs the
+compile itself.
+
+Each message is a JSON object on a single line. A client sends a request and reads
+its response on the same connection, requests are:
+
+``{"action": "ping"}``
+    Check the daemon is running, responds with its process ID.
+``{"action": "compile", "targets": [[SOURCE, DESTINATION], ...], "options": {...},
+"jobs": N}``
+    Compile targets with shared options, responds with a result for each target.
+    Paths must be absolute since the daemon does not share the client working
+    directory, a destination may be ``null``.
+``{"action": "shutdown"}``
+    Stop the daemon.
+
+A response always has a ``status`` which is either ``ok`` or ``error`` with an error
+``message``.
+
+This module only imports the compiler when a daemon is created, so the client stays
+cheap to load.
+"""
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .exceptions import (
+    CommandArgumentsError, DaemonError, FlechetteInsolenteBaseException,
+    RunnedCommandError,
+)
+
+
+def get_socket_path():
+    """
+    Get the default socket path for current user.
+
+    Returns:
+        pathlib.Path: Socket path inside the user runtime directory if any, else in
+        the temporary directory.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "flechette-insolente.sock"
+
+    return Path(tempfile.gettempdir()) / "flechette-insolente-{}.sock".format(
+        os.getuid()
+    )
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Read requests from a connection and write their responses until the client
+    closes it.
+    """
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+            except ValueError as e:
+                request = {}
+                response = {
+                    "status": "error",
+                    "message": "Invalid request: {}".format(e),
+                }
+            else:
+                response = self.server.daemon.handle(request)
+
+            self.wfile.write(self.server.daemon.encode(response))
+            self.wfile.flush()
+
+            if request.get("action") == "shutdown":
+                # Shutdown waits for the serving loop, it must not be called from it
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class CompileDaemon:
+    """
+    Serve compile jobs on a Unix domain socket.
+
+    Keyword Arguments:
+        socket_path (pathlib.Path): Socket path, default to ``get_socket_path()``.
+        compiler (object): Compiler used for every job, anything with a
+            ``compile()`` method like ``DartSassCompiler``, ``CachedDartSassCompiler``
+            or ``CompilerPool``. Default to a ``DartSassCompiler``.
+        jobs (integer): Maximum number of concurrent compiles for a job with many
+            targets. Default to the number of usable CPUs.
+    """
+    def __init__(self, socket_path=None, compiler=None, jobs=None):
+        from .compiler.compiler import DartSassCompiler
+        from .utils.system import get_cpu_count
+
+        self.socket_path = Path(socket_path or get_socket_path())
+        self.compiler = compiler or DartSassCompiler()
+        self.jobs = jobs or get_cpu_count()
+        self.server = None
+        self._executor = ThreadPoolExecutor(max_workers=self.jobs)
+
+    def encode(self, response):
+        from .utils.jsons import ExtendedJsonEncoder
+
+        return (json.dumps(response, cls=ExtendedJsonEncoder) + "\n").encode("utf-8")
+
+    def compile_target(self, source, destination, options):
+        """
+        Compile a single target.
+
+        Arguments:
+            source (pathlib.Path): Source path.
+            destination (pathlib.Path): Destination path, may be ``None``.
+            options (dict): Compile options.
+
+        Returns:
+            CompileResult: Compile result with possible error.
+        """
+        from .compiler.results import CompileResult
+
+        try:
+            output = self.compiler.compile(source, destination=destination, **options)
+        except (CommandArgumentsError, RunnedCommandError) as e:
+            return CompileResult(source, destination, error=e)
+
+        return CompileResult(source, destination, output=output)
+
+    def compile(self, targets, options=None, jobs=None):
+        """
+        Compile targets with shared options.
+
+        Arguments:
+            targets (list): List of ``(source, destination)`` tuples.
+
+        Keyword Arguments:
+            options (dict): Shared compile options.
+            jobs (integer): Maximum number of concurrent compiles, it can not be
+                more than the daemon ``jobs``.
+
+        Returns:
+            list: ``CompileResult`` object for each target in the same order.
+        """
+        from .compiler.arguments import CompileProfile
+
+        # Shared options are validated once for every targets
+        options = {"profile": CompileProfile(**(options or {}))}
+        targets = [
+            (Path(source), Path(destination) if destination else None)
+            for source, destination in targets
+        ]
+
+        if len(targets) == 1 or jobs == 1:
+            return [
+                self.compile_target(source, destination, options)
+                for source, destination in targets
+            ]
+
+        # Targets are only submitted when a slot is free, so a job does not run
+        # more concurrent compiles than it asked for
+        slots = threading.Semaphore(min(jobs or self.jobs, self.jobs))
+        futures = []
+        for source, destination in targets:
+            slots.acquire()
+            future = self._executor.submit(
+                self.compile_target, source, destination, options
+            )
+            future.add_done_callback(lambda future: slots.release())
+            futures.append(future)
+
+        return [future.result() for future in futures]
+
+    def validate_compile(self, request):
+        """
+        Validate the shape of a compile request.
+
+        Arguments:
+            request (dict): Compile request message.
+
+        Returns:
+            tuple: Targets as a list of ``(source, destination)`` tuples, options and
+            jobs from request.
+        """
+        targets = request.get("targets") or []
+        options = request.get("options") or {}
+        jobs = request.get("jobs")
+
+        if not isinstance(targets, list):
+            raise CommandArgumentsError("Targets must be a list.")
+
+        for target in targets:
+            if (
+                not isinstance(target, list) or
+                len(target) != 2 or
+                not isinstance(target[0], str) or
+                not isinstance(target[1], (str, type(None)))
+            ):
+                msg = "Target must be a list of a source and a destination: {}"
+                raise CommandArgumentsError(msg.format(json.dumps(target)))
+
+            source, destination = target
+            if not Path(source).is_absolute():
+                msg = "Source path must be absolute: {}"
+                raise CommandArgumentsError(msg.format(source))
+            if destination is not None and not Path(destination).is_absolute():
+                msg = "Destination path must be absolute: {}"
+                raise CommandArgumentsError(msg.format(destination))
+
+        if not isinstance(options, dict):
+            raise CommandArgumentsError("Options must be an object.")
+
+        if jobs is not None and (
+            not isinstance(jobs, int) or isinstance(jobs, bool) or jobs < 1
+        ):
+            raise CommandArgumentsError("Jobs must be a positive integer.")
+
+        return [tuple(target) for target in targets], options, jobs
+
+    def handle(self, request):
+        """
+        Perform a request.
+
+        Arguments:
+            request (dict): Request message.
+
+        Returns:
+            dict: Response message.
+        """
+        action = request.get("action")
+
+        if action == "ping":
+            return {"status": "ok", "pid": os.getpid()}
+        elif action == "shutdown":
+            return {"status": "ok"}
+        elif action == "compile":
+            try:
+                targets, options, jobs = self.validate_compile(request)
+                results = self.compile(targets, options=options, jobs=jobs)
+            except FlechetteInsolenteBaseException as e:
+                return {"status": "error", "message": str(e)}
+
+            return {
+                "status": "ok",
+                "results": [item.to_dict() for item in results],
+            }
+
+        return {"status": "error", "message": "Unknown action: {}".format(action)}
+
+    def bind(self):
+        """
+        Create the server on socket.
+
+        A socket left by a daemon which did not stop properly is removed, but an
+        error is raised if another daemon is running on it.
+
+        Returns:
+            DaemonServer: The server.
+        """
+        if self.socket_path.exists():
+            try:
+                DaemonClient(self.socket_path, timeout=1).ping()
+            except DaemonError:
+                self.socket_path.unlink()
+            else:
+                msg = "A daemon is already running on socket: {}"
+                raise DaemonError(msg.format(self.socket_path))
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Socket is only usable by current user
+        umask = os.umask(0o177)
+        try:
+            self.server = DaemonServer(str(self.socket_path), DaemonRequestHandler)
+        finally:
+            os.umask(umask)
+
+        self.server.daemon = self
+
+        return self.server
+
+    def serve_forever(self):
+        """
+        Serve requests until a shutdown request or ``shutdown()`` is called.
+        """
+        if self.server is None:
+            self.bind()
+
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+
+    def close(self):
+        """
+        Close the server, remove its socket and stop the compiler if it can be.
+        """
+        if self.server is not None:
+            self.server.server_close()
+            self.server = None
+
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+        self._executor.shutdown(wait=False)
+
+        close = getattr(self.compiler, "close", None) or getattr(
+            self.compiler, "stop", None
+        )
+        if close:
+            close()
+
+
+class DaemonClient:
+    """
+    Send requests to a compile daemon.
+
+    Keyword Arguments:
+        socket_path (pathlib.Path): Socket path, default to ``get_socket_path()``.
+        timeout (float): Seconds to wait for a response. Wait forever if ``None``.
+    """
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = Path(socket_path or get_socket_path())
+        self.timeout = timeout
+
+    def request(self, message):
+        """
+        Send a request and wait for its response.
+
+        Arguments:
+            message (dict): Request message.
+
+        Returns:
+            dict: Response message.
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(self.timeout)
+                client.connect(str(self.socket_path))
+                client.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+                with client.makefile("rb") as stream:
+                    line = stream.readline()
+        except OSError as e:
+            msg = "Unable to reach daemon on socket {}: {}"
+            raise DaemonError(msg.format(self.socket_path, e))
+
+        if not line:
+            msg = "Daemon closed connection without response on socket: {}"
+            raise DaemonError(msg.format(self.socket_path))
+
+        response = json.loads(line)
+        if response.get("status") != "ok":
+            raise DaemonError(response.get("message") or "Unexpected daemon error")
+
+        return response
+
+    def ping(self):
+        """
+        Returns:
+            integer: Process ID of daemon.
+        """
+        return self.request({"action": "ping"})["pid"]
+
+    def shutdown(self):
+        self.request({"action": "shutdown"})
+
+    def compile(self, targets, options=None, jobs=None):
+        """
+        Send a compile job.
+
+        Relative paths are resolved from the current directory before being sent.
+
+        Arguments:
+            targets (list): List of ``(source, destination)`` tuples.
+
+        Keyword Arguments:
+            options (dict): Shared compile options, ``load_path`` items are resolved
+                like targets.
+            jobs (integer): Maximum number of concurrent compiles.
+
+        Returns:
+            list: ``CompileResult`` object for each target in the same order.
+        """
+        from .compiler.results import CompileResult
+
+        options = dict(options or {})
+        if options.get("load_path"):
+            options["load_path"] = [
+                str(Path(item).resolve()) for item in options["load_path"]
+            ]
+
+        response = self.request({
+            "action": "compile",
+            "targets": [
+                [
+                    str(Path(source).resolve()),
+                    str(Path(destination).resolve()) if destination else None,
+                ]
+                for source, destination in targets
+            ],
+            "options": options,
+            "jobs": jobs,
+        })
+
+        return [CompileResult.from_dict(item) for item in response["results"]]
@@ -27,6 +27,13 @@ class CommandArgumentsError(FlechetteInsolenteBaseException):
     pass
 
 
+class ProtocolError(FlechetteInsolenteBaseException):
+    """
+    Exception for invalid or unexpected data in Embedded Sass Protocol exchanges.
+    """
+    pass
+
+
 class RunnedCommandError(FlechetteInsolenteBaseException):
     """
     A special error related to an executed commandline which failed.
@@ -77,3 +84,25 @@ class RunnedCommandError(FlechetteInsolenteBaseException):
 
     def __str__(self):
         return self.message
+
+
+class PoolError(FlechetteInsolenteBaseException):
+    """
+    Exception for a compiler pool which can not give a compiler.
+    """
+    pass
+
+
+class DaemonError(FlechetteInsolenteBaseException):
+    """
+    Exception for a compile daemon which can not be reached or started.
+    """
+    pass
+
+
+class GitError(FlechetteInsolenteBaseException):
+    """
+    Exception for a git command which failed, like with an unknown revision or
+    outside of a repository.
+    """
+    pass
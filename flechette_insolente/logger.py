@@ -1,7 +1,5 @@
 import logging
 
-import colorlog
-
 
 def init_logger(name, level, printout=True):
     """
@@ -27,6 +25,8 @@ def init_logger(name, level, printout=True):
         handler = logging.StreamHandler(dummystream)
     # Standard output with colored messages
     else:
+        import colorlog
+
         handler = logging.StreamHandler()
         handler.setFormatter(
             colorlog.ColoredFormatter(
@@ -20,8 +20,6 @@ import platform
 
 from pathlib import Path
 
-import flechette_insolente
-
 
 def get_plateform():
     """
@@ -72,9 +70,13 @@ def get_sass_executable():
         Path: Path to executable file.
     """
     plateform_code = "-".join(get_plateform())
-    return (
-        Path(flechette_insolente.__file__).parent / "vendor" / plateform_code / "sass"
-    )
+    return Path(__file__).parent / "vendor" / plateform_code / "sass"
+
 
+def __getattr__(name):
+    # Executable path is only resolved once on first usage
+    if name == "DART_SASS_EXEC":
+        globals()[name] = get_sass_executable()
+        return globals()[name]
 
-DART_SASS_EXEC = get_sass_executable()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
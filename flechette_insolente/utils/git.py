@@ -0,0 +1,68 @@
+"""
+Helpers to query a local git repository.
+"""
+import subprocess
+from pathlib import Path
+
+from ..exceptions import GitError
+
+
+def run_git(*args, cwd=None):
+    """
+    Run a git command.
+
+    Arguments:
+        *args: Git arguments.
+
+    Keyword Arguments:
+        cwd (pathlib.Path): Directory where to run command, default to the current
+            directory.
+
+    Returns:
+        string: Command output.
+    """
+    try:
+        result = subprocess.run(
+            ["git"] + list(args),
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+        )
+    except OSError as e:
+        raise GitError("Unable to run git: {}".format(e))
+
+    if result.returncode:
+        msg = "Command 'git {}' failed: {}"
+        raise GitError(msg.format(" ".join(args), result.stderr.strip()))
+
+    return result.stdout
+
+
+def get_changed_files(revision, cwd=None):
+    """
+    Get files changed since a revision.
+
+    Changes are taken from the working tree, so committed, staged and unstaged
+    changes are all included, along untracked files which are not ignored.
+
+    Arguments:
+        revision (string): Any revision git understands, like a commit, a branch or
+            ``HEAD~3``.
+
+    Keyword Arguments:
+        cwd (pathlib.Path): A directory inside the repository, default to the
+            current directory.
+
+    Returns:
+        list: Sorted absolute paths of added, modified, renamed or removed files.
+    """
+    root = Path(run_git("rev-parse", "--show-toplevel", cwd=cwd).strip())
+
+    names = run_git(
+        "diff", "--name-only", "--no-renames", "-z", revision, "--", cwd=cwd,
+    ).split("\0")
+    names.extend(run_git(
+        "ls-files", "--others", "--exclude-standard", "--full-name", "-z", cwd=cwd,
+    ).split("\0"))
+
+    return sorted(set([root / name for name in names if name]))
@@ -0,0 +1,211 @@
+"""
+Helpers to inspect the system resources available to the current process.
+"""
+import math
+import os
+from pathlib import Path
+
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def get_cgroup_path(root=CGROUP_ROOT, proc_cgroup=Path("/proc/self/cgroup")):
+    """
+    Get the cgroup v2 directory of current process.
+
+    Keyword Arguments:
+        root (pathlib.Path): Mount point of cgroup filesystem.
+        proc_cgroup (pathlib.Path): File which describes the process cgroups.
+
+    Returns:
+        pathlib.Path: Path to the process cgroup directory if any, else the root.
+    """
+    try:
+        lines = proc_cgroup.read_text().splitlines()
+    except OSError:
+        return root
+
+    for line in lines:
+        # cgroup v2 unified hierarchy is always on the '0' hierarchy without
+        # controllers
+        if line.startswith("0::"):
+            path = root / line[3:].strip().lstrip("/")
+            if path.is_dir():
+                return path
+
+    return root
+
+
+def read_cgroup_file(name, root=CGROUP_ROOT):
+    """
+    Read a cgroup file content from process cgroup or the root one.
+
+    Arguments:
+        name (string): File name relative to a cgroup directory.
+
+    Keyword Arguments:
+        root (pathlib.Path): Mount point of cgroup filesystem.
+
+    Returns:
+        string: File content or ``None`` if it does not exist.
+    """
+    for path in (get_cgroup_path(root=root) / name, root / name):
+        try:
+            return path.read_text().strip()
+        except OSError:
+            continue
+
+    return None
+
+
+def get_cgroup_cpu_quota(root=CGROUP_ROOT):
+    """
+    Get the CPU quota from cgroup limits.
+
+    Both cgroup v2 (``cpu.max``) and cgroup v1 (``cpu.cfs_quota_us``) are supported.
+
+    Keyword Arguments:
+        root (pathlib.Path): Mount point of cgroup filesystem.
+
+    Returns:
+        float: Number of CPUs allowed, ``None`` if there is no limit.
+    """
+    content = read_cgroup_file("cpu.max", root=root)
+    if content:
+        quota, _, period = content.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    quota = read_cgroup_file("cpu/cpu.cfs_quota_us", root=root)
+    period = read_cgroup_file("cpu/cpu.cfs_period_us", root=root)
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+
+    return None
+
+
+def get_cpu_count(root=CGROUP_ROOT):
+    """
+    Get the number of CPUs really usable by current process.
+
+    This respects the CPU affinity and the possible cgroup CPU quota, like in
+    containers.
+
+    Keyword Arguments:
+        root (pathlib.Path): Mount point of cgroup filesystem.
+
+    Returns:
+        integer: Number of CPUs, always at least 1.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    quota = get_cgroup_cpu_quota(root=root)
+    if quota:
+        count = min(count, math.ceil(quota))
+
+    return max(1, count)
+
+
+# cgroup v1 reports a huge number instead of no limit
+CGROUP_V1_UNLIMITED = 2 ** 60
+
+
+def get_cgroup_memory(root=CGROUP_ROOT):
+    """
+    Get the memory limit and usage from cgroup.
+
+    Both cgroup v2 (``memory.max`` and ``memory.current``) and cgroup v1
+    (``memory.limit_in_bytes`` and ``memory.usage_in_bytes``) are supported.
+
+    Keyword Arguments:
+        root (pathlib.Path): Mount point of cgroup filesystem.
+
+    Returns:
+        dict: Memory ``limit`` and ``current`` usage in bytes, each one is ``None``
+        if unknown or when there is no limit.
+    """
+    limit = read_cgroup_file("memory.max", root=root)
+    current = read_cgroup_file("memory.current", root=root)
+
+    if limit is None:
+        limit = read_cgroup_file("memory/memory.limit_in_bytes", root=root)
+        current = read_cgroup_file("memory/memory.usage_in_bytes", root=root)
+        if limit and int(limit) >= CGROUP_V1_UNLIMITED:
+            limit = None
+
+    return {
+        "limit": int(limit) if limit and limit != "max" else None,
+        "current": int(current) if current else None,
+    }
+
+
+def get_available_memory(root=CGROUP_ROOT, meminfo=Path("/proc/meminfo")):
+    """
+    Get the memory available to new processes.
+
+    This is the lowest value from the system available memory and the remaining
+    memory from cgroup limit.
+
+    Keyword Arguments:
+        root (pathlib.Path): Mount point of cgroup filesystem.
+        meminfo (pathlib.Path): File which describes the system memory.
+
+    Returns:
+        integer: Available memory in bytes, ``None`` if unknown.
+    """
+    available = None
+
+    try:
+        lines = meminfo.read_text().splitlines()
+    except OSError:
+        lines = []
+
+    for line in lines:
+        if line.startswith("MemAvailable:"):
+            # Value is always in kilobytes
+            available = int(line.split()[1]) * 1024
+            break
+
+    cgroup = get_cgroup_memory(root=root)
+    if cgroup["limit"] is not None and cgroup["current"] is not None:
+        remaining = max(0, cgroup["limit"] - cgroup["current"])
+        available = remaining if available is None else min(available, remaining)
+
+    return available
+
+
+def get_memory_pressure(root=CGROUP_ROOT,
+                        proc_pressure=Path("/proc/pressure/memory")):
+    """
+    Get the memory pressure from Pressure Stall Information.
+
+    Pressure is read from cgroup v2 (``memory.pressure``) else from system.
+
+    Keyword Arguments:
+        root (pathlib.Path): Mount point of cgroup filesystem.
+        proc_pressure (pathlib.Path): File which describes the system memory
+            pressure.
+
+    Returns:
+        float: Percentage of time in the last 10 seconds where some tasks were
+        stalled waiting for memory. ``None`` if unknown.
+    """
+    content = read_cgroup_file("memory.pressure", root=root)
+    if content is None:
+        try:
+            content = proc_pressure.read_text()
+        except OSError:
+            return None
+
+    for line in content.splitlines():
+        if line.startswith("some "):
+            for item in line.split()[1:]:
+                name, _, value = item.partition("=")
+                if name == "avg10":
+                    return float(value)
+
+    return None
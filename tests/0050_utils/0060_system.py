@@ -0,0 +1,134 @@
+import pytest
+
+from flechette_insolente.utils.system import (
+    get_available_memory, get_cgroup_cpu_quota, get_cgroup_memory, get_cpu_count,
+    get_memory_pressure,
+)
+
+
+def write_files(root, files):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+@pytest.mark.parametrize("files,expected", [
+    ({}, None),
+    ({"cpu.max": "max 100000\n"}, None),
+    ({"cpu.max": "150000 100000\n"}, 1.5),
+    (
+        {
+            "cpu/cpu.cfs_quota_us": "200000\n",
+            "cpu/cpu.cfs_period_us": "100000\n",
+        },
+        2,
+    ),
+    (
+        {
+            "cpu/cpu.cfs_quota_us": "-1\n",
+            "cpu/cpu.cfs_period_us": "100000\n",
+        },
+        None,
+    ),
+])
+def test_get_cgroup_cpu_quota(tmp_path, files, expected):
+    """
+    CPU quota is read from cgroup v2 or v1 files.
+    """
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    assert get_cgroup_cpu_quota(root=tmp_path) == expected
+
+
+def test_get_cpu_count(tmp_path):
+    """
+    CPU count is limited by cgroup quota and is at least 1.
+    """
+    assert get_cpu_count(root=tmp_path) >= 1
+
+    (tmp_path / "cpu.max").write_text("10000 100000\n")
+    assert get_cpu_count(root=tmp_path) == 1
+
+
+@pytest.mark.parametrize("files,expected", [
+    ({}, {"limit": None, "current": None}),
+    (
+        {"memory.max": "max\n", "memory.current": "1024\n"},
+        {"limit": None, "current": 1024},
+    ),
+    (
+        {"memory.max": "4096\n", "memory.current": "1024\n"},
+        {"limit": 4096, "current": 1024},
+    ),
+    (
+        {
+            "memory/memory.limit_in_bytes": "4096\n",
+            "memory/memory.usage_in_bytes": "1024\n",
+        },
+        {"limit": 4096, "current": 1024},
+    ),
+    (
+        {
+            "memory/memory.limit_in_bytes": "9223372036854771712\n",
+            "memory/memory.usage_in_bytes": "1024\n",
+        },
+        {"limit": None, "current": 1024},
+    ),
+])
+def test_get_cgroup_memory(tmp_path, files, expected):
+    """
+    Memory limit and usage are read from cgroup v2 or v1 files.
+    """
+    write_files(tmp_path, files)
+
+    assert get_cgroup_memory(root=tmp_path) == expected
+
+
+def test_get_available_memory(tmp_path):
+    """
+    Available memory is the lowest from system and cgroup.
+    """
+    meminfo = tmp_path / "meminfo"
+    cgroup = tmp_path / "cgroup"
+    cgroup.mkdir()
+
+    assert get_available_memory(root=cgroup, meminfo=meminfo) is None
+
+    meminfo.write_text(
+        "MemTotal:        8000000 kB\n"
+        "MemFree:          100000 kB\n"
+        "MemAvailable:    2000000 kB\n"
+    )
+    assert get_available_memory(root=cgroup, meminfo=meminfo) == 2048000000
+
+    write_files(cgroup, {"memory.max": "3000\n", "memory.current": "1000\n"})
+    assert get_available_memory(root=cgroup, meminfo=meminfo) == 2000
+
+    write_files(cgroup, {"memory.current": "4000\n"})
+    assert get_available_memory(root=cgroup, meminfo=meminfo) == 0
+
+
+def test_get_memory_pressure(tmp_path):
+    """
+    Memory pressure is read from cgroup else from system.
+    """
+    proc_pressure = tmp_path / "pressure"
+    cgroup = tmp_path / "cgroup"
+    cgroup.mkdir()
+
+    assert get_memory_pressure(root=cgroup, proc_pressure=proc_pressure) is None
+
+    proc_pressure.write_text(
+        "some avg10=1.50 avg60=0.00 avg300=0.00 total=0\n"
+        "full avg10=0.50 avg60=0.00 avg300=0.00 total=0\n"
+    )
+    assert get_memory_pressure(root=cgroup, proc_pressure=proc_pressure) == 1.5
+
+    write_files(cgroup, {
+        "memory.pressure": "some avg10=25.00 avg60=3.00 avg300=1.00 total=42\n",
+    })
+    assert get_memory_pressure(root=cgroup, proc_pressure=proc_pressure) == 25
@@ -0,0 +1,83 @@
+import subprocess
+
+import pytest
+
+from flechette_insolente.exceptions import GitError
+from flechette_insolente.utils.git import get_changed_files
+
+
+def git(cwd, *args):
+    subprocess.run(
+        [
+            "git",
+            "-c", "user.name=Tester",
+            "-c", "user.email=tester@example.com",
+        ] + list(args),
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def init_repository(path, files):
+    """
+    Create a repository with a first commit of given files.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    git(path, "init", "-q")
+    for name, content in files.items():
+        (path / name).parent.mkdir(parents=True, exist_ok=True)
+        (path / name).write_text(content)
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "Initial")
+
+    return path
+
+
+def test_changed_files(tmp_path):
+    """
+    Committed, unstaged, renamed and untracked changes are all listed with absolute
+    paths, from any directory of repository.
+    """
+    repository = init_repository(tmp_path / "repo", {
+        ".gitignore": "*.css\n",
+        "scss/a.scss": "a",
+        "scss/b.scss": "b",
+        "scss/c.scss": "c",
+        "scss/d.scss": "d",
+    })
+    repository = repository.resolve()
+
+    assert get_changed_files("HEAD", cwd=repository) == []
+
+    (repository / "scss/a.scss").write_text("changed")
+    git(repository, "commit", "-q", "-am", "Change a")
+    (repository / "scss/b.scss").write_text("changed")
+    git(repository, "mv", "scss/c.scss", "scss/e.scss")
+    (repository / "scss/f.scss").write_text("new")
+    (repository / "scss/ignored.css").write_text("ignored")
+
+    expected = [
+        repository / "scss/a.scss",
+        repository / "scss/b.scss",
+        repository / "scss/c.scss",
+        repository / "scss/e.scss",
+        repository / "scss/f.scss",
+    ]
+    assert get_changed_files("HEAD~1", cwd=repository) == expected
+    assert get_changed_files("HEAD~1", cwd=repository / "scss") == expected
+    assert get_changed_files("HEAD", cwd=repository) == expected[1:]
+
+
+def test_errors(tmp_path):
+    """
+    Unknown revision or a directory outside of a repository raise an error.
+    """
+    repository = init_repository(tmp_path / "repo", {"a.scss": "a"})
+
+    with pytest.raises(GitError):
+        get_changed_files("nope", cwd=repository)
+
+    (tmp_path / "other").mkdir()
+    with pytest.raises(GitError):
+        get_changed_files("HEAD", cwd=tmp_path / "other")
@@ -120,6 +120,39 @@ def test_get_available_parameters():
     }
 
 
+def test_get_parameter_schema():
+    """
+    Schema is built once per class and can not be modified.
+    """
+    class CustomArgumentsModel(ArgumentsModel):
+        COMMAND_ARGUMENTS = {
+            "source": {},
+        }
+        COMMAND_OPTIONS = {
+            "indented": {
+                "args": ("--indented/--no-indented",),
+            },
+        }
+
+    schema = CustomArgumentsModel.get_parameter_schema()
+
+    assert schema == {
+        "source": None,
+        "indented": ("--indented", "--no-indented"),
+    }
+    assert CustomArgumentsModel.get_parameter_schema() is schema
+    assert ArgumentsModel.get_parameter_schema() is not schema
+    assert "style" in ArgumentsModel.get_parameter_schema()
+
+    with pytest.raises(TypeError):
+        schema["source"] = "--source"
+
+    # Available parameters is a new dict each time
+    parameters = CustomArgumentsModel.get_available_parameters()
+    parameters["source"] = "--source"
+    assert CustomArgumentsModel.get_available_parameters()["source"] is None
+
+
 def test_get_available_parameters_former_spec():
     """
     Just get available parameters as described from ArgumentsModel attributes to ensure
@@ -1,4 +1,9 @@
-from flechette_insolente.compiler.arguments import ArgumentsModel
+import pytest
+
+from flechette_insolente.exceptions import CommandArgumentsError
+from flechette_insolente.compiler.arguments import (
+    ArgumentsModel, BatchArgumentsModel, CompileProfile, StdinArgumentsModel,
+)
 
 
 def test_success_simple_source(source_structure):
@@ -138,3 +143,136 @@ def test_success_mixed(source_structure):
         "--style",
         "expanded"
     ]
+
+
+def test_batch_pairs(source_structure):
+    """
+    Batch model builds a pair argument for each target with shared options and keeps
+    invalid sources apart.
+    """
+    model = BatchArgumentsModel(
+        [
+            (source_structure / "scss/minimal.scss", source_structure / "css/a.css"),
+            (source_structure / "scss/nope.scss", source_structure / "css/b.css"),
+            (source_structure / "scss/basic.scss", source_structure / "css/c.css"),
+        ],
+        style="compressed",
+    )
+    assert model.cmd_args == [
+        "{0}/scss/minimal.scss:{0}/css/a.css".format(source_structure),
+        "{0}/scss/basic.scss:{0}/css/c.css".format(source_structure),
+        "--style",
+        "compressed",
+    ]
+    assert model.targets == [
+        (source_structure / "scss/minimal.scss", source_structure / "css/a.css"),
+        (source_structure / "scss/basic.scss", source_structure / "css/c.css"),
+    ]
+    assert [(str(item[0]), str(item[2])) for item in model.invalid] == [
+        (
+            "{}/scss/nope.scss".format(source_structure),
+            "Given source path does not exist: {}/scss/nope.scss".format(
+                source_structure
+            ),
+        ),
+    ]
+    assert len(model.pairs) == 3
+
+
+def test_batch_errors(source_structure):
+    """
+    Batch model requires a destination for each pair and does not accept shared
+    destination.
+    """
+    with pytest.raises(CommandArgumentsError) as exc_info:
+        BatchArgumentsModel([(source_structure / "scss/minimal.scss", None)])
+
+    assert exc_info.value.args[0] == (
+        "A destination is required for each source in batch: {}".format(
+            source_structure / "scss/minimal.scss"
+        )
+    )
+
+    with pytest.raises(CommandArgumentsError):
+        BatchArgumentsModel([], destination="foo.css")
+
+    with pytest.raises(CommandArgumentsError):
+        BatchArgumentsModel([], style="niet")
+
+
+def test_stdin(source_structure):
+    """
+    Stdin model sets the indented option from syntax.
+    """
+    assert StdinArgumentsModel().cmd_args == ["--stdin", "--no-indented"]
+
+    model = StdinArgumentsModel(
+        syntax="sass",
+        destination=source_structure / "css/foo.css",
+        style="compressed",
+    )
+    assert model.source is None
+    assert model.cmd_args == [
+        "--stdin",
+        str(source_structure / "css/foo.css"),
+        "--style", "compressed",
+        "--indented",
+    ]
+
+    assert StdinArgumentsModel(syntax="css", indented=False).cmd_args == [
+        "--stdin", "--no-indented",
+    ]
+
+    with pytest.raises(CommandArgumentsError) as excinfo:
+        StdinArgumentsModel(syntax="less")
+    assert str(excinfo.value) == (
+        "Invalid given syntax 'less', it should be one of: scss, sass, css"
+    )
+
+    with pytest.raises(CommandArgumentsError) as excinfo:
+        StdinArgumentsModel(syntax="scss", indented=True)
+    assert str(excinfo.value) == (
+        "Option 'indented' does not match source syntax 'scss'"
+    )
+
+
+def test_profile(source_structure):
+    """
+    Profile validates options once and builds arguments for each target.
+    """
+    profile = CompileProfile(
+        style="compressed",
+        load_path=[source_structure / "libraries"],
+    )
+    assert profile.option_args == (
+        "--style", "compressed",
+        "--load-path", str(source_structure / "libraries"),
+    )
+
+    assert profile.get_arguments(
+        source_structure / "scss/minimal.scss",
+        destination=source_structure / "css/minimal.css",
+    ) == ArgumentsModel(
+        source_structure / "scss/minimal.scss",
+        destination=source_structure / "css/minimal.css",
+        style="compressed",
+        load_path=[source_structure / "libraries"],
+    ).cmd_args
+
+    # Sources are still validated for each target
+    with pytest.raises(CommandArgumentsError):
+        profile.get_arguments(source_structure / "nope.scss")
+
+    with pytest.raises(CommandArgumentsError) as excinfo:
+        ArgumentsModel(
+            source_structure / "scss/minimal.scss",
+            profile=profile,
+            style="expanded",
+        )
+    assert str(excinfo.value) == "Options can not be given along a profile: style"
+
+    with pytest.raises(CommandArgumentsError) as excinfo:
+        CompileProfile(style="nope")
+    assert str(excinfo.value) == (
+        "Invalid given output style 'nope', it should be one of: expanded, compressed"
+    )
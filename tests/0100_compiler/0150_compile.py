@@ -58,6 +58,9 @@ def test_compiler_error_destination_mismatch_source(source_structure, settings):
     assert stdout.startswith("Error reading ") is True
     assert stdout.endswith(": Cannot open file.\n") is True
 
+    resources = exc_info.value.error_payload.pop("resources")
+    assert resources["max_rss"] > 0
+
     assert exc_info.value.error_payload == {
         "returncode": 66,
         "cmd": [
@@ -90,6 +93,9 @@ def test_compiler_error_missing_import(source_structure, settings):
 
     assert exc_info.value.message == "Command failed with signal code: 65"
 
+    resources = exc_info.value.error_payload.pop("resources")
+    assert resources["max_rss"] > 0
+
     assert exc_info.value.error_payload == {
         "returncode": 65,
         "cmd": [
@@ -0,0 +1,165 @@
+import io
+
+import pytest
+
+from flechette_insolente.exceptions import ProtocolError
+from flechette_insolente.compiler.protocol import (
+    build_compile_request, build_version_request, decode_message, decode_varint,
+    encode_message, encode_packet, encode_varint, parse_outbound_message, read_packet,
+)
+
+
+@pytest.mark.parametrize("value,expected", [
+    (0, b"\x00"),
+    (1, b"\x01"),
+    (127, b"\x7f"),
+    (128, b"\x80\x01"),
+    (300, b"\xac\x02"),
+    (16384, b"\x80\x80\x01"),
+])
+def test_varint(value, expected):
+    """
+    Varint should be encoded and decoded like Protobuf does.
+    """
+    assert encode_varint(value) == expected
+    assert decode_varint(expected) == (value, len(expected))
+
+
+def test_varint_errors():
+    """
+    Negative and truncated varints are invalid.
+    """
+    with pytest.raises(ProtocolError):
+        encode_varint(-1)
+
+    with pytest.raises(ProtocolError):
+        decode_varint(b"\x80")
+
+
+def test_message_roundtrip():
+    """
+    Encoded message fields should be decoded to their raw values, ignoring the None
+    ones.
+    """
+    nested = encode_message([(1, "nested")])
+    data = encode_message([
+        (1, 42),
+        (2, True),
+        (3, "café"),
+        (4, None),
+        (5, nested),
+        (5, nested),
+    ])
+
+    assert decode_message(data) == {
+        1: [42],
+        2: [1],
+        3: ["café".encode("utf-8")],
+        5: [nested, nested],
+    }
+
+
+def test_packet_roundtrip():
+    """
+    Packets are framed with their length and compilation ID and read back the same.
+    """
+    stream = io.BytesIO(
+        encode_packet(0, b"first") + encode_packet(300, b"") + b"\x05\x01ab"
+    )
+
+    assert read_packet(stream) == (0, b"first")
+    assert read_packet(stream) == (300, b"")
+
+    # Last packet announces more than what is available
+    with pytest.raises(ProtocolError):
+        read_packet(stream)
+
+    assert read_packet(io.BytesIO(b"")) is None
+
+
+def test_build_version_request():
+    """
+    Version request is wrapped in the InboundMessage field 7.
+    """
+    assert decode_message(build_version_request(5)) == {
+        7: [b"\x08\x05"],
+    }
+
+
+def test_build_compile_request():
+    """
+    Compile request is wrapped in the InboundMessage field 2 and only includes the
+    non default values.
+    """
+    message = decode_message(build_compile_request(path="foo.scss"))
+    assert decode_message(message[2][0]) == {
+        3: [b"foo.scss"],
+    }
+
+    message = decode_message(build_compile_request(
+        source="a{}",
+        syntax="indented",
+        style="compressed",
+        source_map=True,
+        load_paths=["lib", "vendor"],
+    ))
+    request = decode_message(message[2][0])
+    assert decode_message(request[2][0]) == {1: [b"a{}"], 3: [1]}
+    assert request[4] == [1]
+    assert request[5] == [1]
+    assert [decode_message(item) for item in request[6]] == [
+        {1: [b"lib"]},
+        {1: [b"vendor"]},
+    ]
+
+    with pytest.raises(ProtocolError):
+        build_compile_request()
+
+
+def test_parse_outbound_message():
+    """
+    Supported outbound messages are parsed to dictionnaries.
+    """
+    success = encode_message([
+        (2, encode_message([
+            (2, encode_message([(1, "a{}"), (2, "{}")])),
+            (4, "file:///foo.scss"),
+        ])),
+    ])
+    assert parse_outbound_message(success) == {
+        "type": "compile_response",
+        "css": "a{}",
+        "source_map": "{}",
+        "failure": None,
+        "loaded_urls": ["file:///foo.scss"],
+    }
+
+    failure = encode_message([
+        (2, encode_message([
+            (3, encode_message([(1, "Nope"), (4, "Error: Nope")])),
+        ])),
+    ])
+    assert parse_outbound_message(failure)["failure"] == {
+        "message": "Nope",
+        "stack_trace": "",
+        "formatted": "Error: Nope",
+    }
+
+    version = encode_message([
+        (8, encode_message([(1, "2.0.0"), (2, "1.69.0"), (5, 3)])),
+    ])
+    assert parse_outbound_message(version) == {
+        "type": "version_response",
+        "id": 3,
+        "protocol_version": "2.0.0",
+        "compiler_version": "1.69.0",
+        "implementation_version": "",
+        "implementation_name": "",
+    }
+
+    error = encode_message([(1, encode_message([(3, "Invalid")]))])
+    assert parse_outbound_message(error) == {
+        "type": "error",
+        "id": 0,
+        "message": "Invalid",
+    }
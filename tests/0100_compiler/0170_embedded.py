@@ -0,0 +1,132 @@
+import pytest
+
+from flechette_insolente.exceptions import CommandArgumentsError, RunnedCommandError
+from flechette_insolente.compiler import EmbeddedDartSassCompiler
+
+
+def test_embedded_version(fake_embedded_sass):
+    """
+    Version is requested through the protocol.
+    """
+    with EmbeddedDartSassCompiler(executable=fake_embedded_sass) as compiler:
+        assert compiler.version() == "1.0.0-fake"
+
+
+def test_embedded_compile_reuse_process(fake_embedded_sass, source_structure):
+    """
+    Many compiles are sent to the same process.
+    """
+    compiler = EmbeddedDartSassCompiler(executable=fake_embedded_sass)
+
+    try:
+        output = compiler.compile(source_structure / "scss/minimal.scss")
+        pid = compiler._process.pid
+
+        assert output == (source_structure / "scss/minimal.scss").read_text().strip()
+
+        output = compiler.compile(
+            source_structure / "scss/minimal.scss",
+            style="compressed",
+        )
+        assert output == "#yeep {font-size: 5rem;color: YELLOW;}"
+        assert compiler._process.pid == pid
+    finally:
+        compiler.stop()
+
+    assert compiler.is_alive is False
+
+
+def test_embedded_compile_destination(fake_embedded_sass, source_structure):
+    """
+    Compiled CSS and source map are written to the destination.
+    """
+    destination = source_structure / "css" / "minimal.css"
+
+    with EmbeddedDartSassCompiler(executable=fake_embedded_sass) as compiler:
+        output = compiler.compile(
+            source_structure / "scss/minimal.scss",
+            destination=destination,
+        )
+
+    assert output == ""
+    assert destination.read_text().endswith(
+        "\n\n/*# sourceMappingURL=minimal.css.map */\n"
+    )
+    assert (source_structure / "css" / "minimal.css.map").exists() is True
+
+
+def test_embedded_compile_failure(fake_embedded_sass, source_structure):
+    """
+    Compile failure raises the same error than the executable and the process is
+    still usable after it.
+    """
+    source = source_structure / "scss" / "broken.scss"
+    source.write_text('@error "Nope";\n')
+
+    with EmbeddedDartSassCompiler(executable=fake_embedded_sass) as compiler:
+        with pytest.raises(RunnedCommandError) as exc_info:
+            compiler.compile(source)
+
+        assert exc_info.value.message == "Command failed with signal code: 65"
+        assert exc_info.value.error_payload["stdout"].startswith("Error: Nope\n")
+        assert compiler.is_alive is True
+
+        with pytest.raises(CommandArgumentsError):
+            compiler.compile(source_structure / "scss")
+
+
+def test_embedded_restart_after_crash(fake_embedded_sass, source_structure):
+    """
+    A crashed process is reported and a new one is started on the next request.
+    """
+    source = source_structure / "scss" / "crash.scss"
+    source.write_text("// crash\n")
+
+    with EmbeddedDartSassCompiler(executable=fake_embedded_sass) as compiler:
+        assert compiler.version() == "1.0.0-fake"
+        pid = compiler._process.pid
+
+        with pytest.raises(RunnedCommandError) as exc_info:
+            compiler.compile(source)
+
+        assert exc_info.value.error_payload["returncode"] == 3
+        assert exc_info.value.error_payload["stderr"] == "Fake compiler crashed\n"
+        assert compiler.is_alive is False
+
+        assert compiler.compile(source_structure / "scss/minimal.scss") != ""
+        assert compiler._process.pid != pid
+
+
+def test_embedded_stderr_bounded(fake_embedded_sass, source_structure):
+    """
+    Process error output is drained while it runs and only its latest bytes are
+    kept.
+    """
+    source = source_structure / "scss" / "crash.scss"
+    source.write_text("// crash\n")
+
+    with EmbeddedDartSassCompiler(executable=fake_embedded_sass) as compiler:
+        compiler.MAX_STDERR_SIZE = 10
+
+        with pytest.raises(RunnedCommandError) as exc_info:
+            compiler.compile(source)
+
+        assert exc_info.value.error_payload["stderr"] == "r crashed\n"
+
+
+def test_embedded_timeout(fake_embedded_sass, source_structure):
+    """
+    A request exceeding timeout kills the process.
+    """
+    source = source_structure / "scss" / "sleepy.scss"
+    source.write_text("// sleep\n")
+
+    with EmbeddedDartSassCompiler(
+        executable=fake_embedded_sass,
+        command_timeout=0.5
+    ) as compiler:
+        with pytest.raises(RunnedCommandError) as exc_info:
+            compiler.compile(source)
+
+        assert exc_info.value.message == "Command exceeded timeout: 0.5"
+        assert compiler.is_alive is False
@@ -0,0 +1,140 @@
+from flechette_insolente.exceptions import CommandArgumentsError, RunnedCommandError
+from flechette_insolente.compiler import DartSassCompiler
+
+
+def test_compile_many_success(fake_sass, source_structure, tmp_path, monkeypatch):
+    """
+    Every pairs are compiled from a single execution.
+    """
+    log = tmp_path / "commands.log"
+    monkeypatch.setenv("FAKE_SASS_LOG", str(log))
+
+    compiler = DartSassCompiler(executable=fake_sass)
+    css_bucket = source_structure / "css"
+
+    results = compiler.compile_many(
+        [
+            (source_structure / "scss/minimal.scss", css_bucket / "a.css"),
+            (source_structure / "scss/_settings.scss", css_bucket / "b.css"),
+        ],
+        source_map=False,
+    )
+
+    assert [item.success for item in results] == [True, True]
+    assert [item.destination for item in results] == [
+        css_bucket / "a.css",
+        css_bucket / "b.css",
+    ]
+    assert sorted(css_bucket.iterdir()) == [css_bucket / "a.css", css_bucket / "b.css"]
+    assert len(log.read_text().splitlines()) == 1
+
+
+def test_compile_many_partial_failure(fake_sass, source_structure):
+    """
+    A failing source or an invalid source does not hide the other targets status.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    css_bucket = source_structure / "css"
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+
+    results = compiler.compile_many([
+        (source_structure / "scss/minimal.scss", css_bucket / "a.css"),
+        (broken, css_bucket / "broken.css"),
+        (source_structure / "scss/nope.scss", css_bucket / "nope.css"),
+        (source_structure / "scss/_settings.scss", css_bucket / "b.css"),
+    ])
+
+    assert [item.success for item in results] == [True, False, False, True]
+
+    assert isinstance(results[1].error, RunnedCommandError)
+    assert results[1].error.error_payload["returncode"] == 65
+    assert results[1].error.error_payload["stdout"].startswith("Error: Nope\n")
+    assert results[1].error.error_payload["stdout"].endswith(
+        "  {} 1:1  root stylesheet\n".format(broken)
+    )
+
+    assert isinstance(results[2].error, CommandArgumentsError)
+
+    assert results[1].to_dict()["error"] == "Command failed with signal code: 65"
+
+
+def test_compile_many_global_failure(fake_sass, source_structure):
+    """
+    An error which can not be attributed to a target is shared by every targets.
+    """
+    compiler = DartSassCompiler(executable=fake_sass, command_timeout=0.5)
+    css_bucket = source_structure / "css"
+    sleepy = source_structure / "scss/sleepy.scss"
+    sleepy.write_text("// sleep 5\n")
+
+    results = compiler.compile_many([
+        (source_structure / "scss/minimal.scss", css_bucket / "a.css"),
+        (sleepy, css_bucket / "sleepy.css"),
+    ])
+
+    assert [item.success for item in results] == [False, False]
+    assert results[0].error is results[1].error
+    assert results[0].error.error_payload["timeout"] == 0.5
+
+
+def test_compile_many_interrupted(source_structure):
+    """
+    Once the process has been interrupted, targets without their own error block
+    are not assumed as successful.
+    """
+    compiler = DartSassCompiler()
+    broken = source_structure / "scss/broken.scss"
+    targets = [
+        (source_structure / "scss/minimal.scss", source_structure / "css/a.css"),
+        (broken, source_structure / "css/broken.css"),
+    ]
+    stdout = "Error: Nope\n  {} 1:1  root stylesheet\n".format(broken)
+
+    def get_failures(**payload):
+        error = RunnedCommandError(error_payload=dict(
+            {"returncode": 65, "cmd": [], "stdout": stdout, "stderr": None,
+             "timeout": None},
+            **payload
+        ))
+        results = compiler._get_batch_failures(targets, error)
+        return [results[target].success for target in targets], error, results
+
+    assert get_failures()[0] == [True, False]
+
+    for payload in ({"returncode": None, "timeout": 1}, {"returncode": -9}):
+        successes, error, results = get_failures(**payload)
+        assert successes == [False, False]
+        assert results[targets[0]].error is error
+        assert results[targets[1]].error.error_payload["stdout"] == stdout
+
+
+def test_split_errors(tmp_path):
+    """
+    Error blocks are attributed to their entrypoints and warnings are ignored.
+    """
+    output = "\n".join([
+        "Error reading {}/nope.scss: Cannot open file.".format(tmp_path),
+        "WARNING: Something",
+        "    some.scss 2:1  root stylesheet",
+        "Error: Undefined variable.",
+        "  ╷",
+        "1 │ a { color: $x }",
+        "  ╵",
+        "  {}/_partial.scss 1:12  @use".format(tmp_path),
+        "  {}/main.scss 2:1  root stylesheet".format(tmp_path),
+    ])
+
+    assert DartSassCompiler().split_errors(output) == {
+        tmp_path / "nope.scss": (
+            "Error reading {}/nope.scss: Cannot open file.\n".format(tmp_path)
+        ),
+        tmp_path / "main.scss": "\n".join([
+            "Error: Undefined variable.",
+            "  ╷",
+            "1 │ a { color: $x }",
+            "  ╵",
+            "  {}/_partial.scss 1:12  @use".format(tmp_path),
+            "  {}/main.scss 2:1  root stylesheet".format(tmp_path),
+        ]) + "\n",
+    }
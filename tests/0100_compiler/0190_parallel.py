@@ -0,0 +1,90 @@
+import time
+
+from flechette_insolente.exceptions import CommandArgumentsError, RunnedCommandError
+from flechette_insolente.compiler import DartSassCompiler, ParallelExecutor
+
+
+def test_parallel_completion_order(fake_sass, source_structure):
+    """
+    Results are yielded in completion order and slow targets run concurrently.
+    """
+    css_bucket = source_structure / "css"
+    slow = source_structure / "scss/slow.scss"
+    slow.write_text("// sleep 1\n")
+
+    compiler = DartSassCompiler(executable=fake_sass)
+
+    start = time.perf_counter()
+    results = list(compiler.compile_parallel(
+        [
+            (slow, css_bucket / "slow1.css"),
+            (slow, css_bucket / "slow2.css"),
+            (source_structure / "scss/minimal.scss", css_bucket / "minimal.css"),
+        ],
+        jobs=3,
+        source_map=False,
+    ))
+    elapsed = time.perf_counter() - start
+
+    assert [item.success for item in results] == [True, True, True]
+    assert results[0].destination == css_bucket / "minimal.css"
+    assert elapsed < 2
+    assert sorted(css_bucket.iterdir()) == [
+        css_bucket / "minimal.css",
+        css_bucket / "slow1.css",
+        css_bucket / "slow2.css",
+    ]
+
+
+def test_parallel_errors_per_job(fake_sass, source_structure):
+    """
+    Errors and timeouts are reported per target.
+    """
+    css_bucket = source_structure / "css"
+    sleepy = source_structure / "scss/sleepy.scss"
+    sleepy.write_text("// sleep 5\n")
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+
+    executor = ParallelExecutor(
+        DartSassCompiler(executable=fake_sass, command_timeout=0.5),
+        jobs=2,
+    )
+    results = {
+        item.source.name: item
+        for item in executor.run([
+            (sleepy, css_bucket / "sleepy.css"),
+            (broken, css_bucket / "broken.css"),
+            (source_structure / "scss/nope.scss", css_bucket / "nope.css"),
+            (source_structure / "scss/minimal.scss", css_bucket / "minimal.css"),
+        ])
+    }
+
+    assert results["minimal.scss"].success is True
+    assert isinstance(results["nope.scss"].error, CommandArgumentsError)
+    assert isinstance(results["broken.scss"].error, RunnedCommandError)
+    assert results["broken.scss"].error.error_payload["returncode"] == 65
+    assert results["sleepy.scss"].error.error_payload["timeout"] == 0.5
+
+
+def test_parallel_lazy_targets(fake_sass, source_structure):
+    """
+    Targets are consumed lazily so no more than the jobs count are pending.
+    """
+    consumed = []
+
+    def targets():
+        for i in range(4):
+            consumed.append(i)
+            yield (
+                source_structure / "scss/minimal.scss",
+                source_structure / "css/{}.css".format(i),
+            )
+
+    results = ParallelExecutor(DartSassCompiler(executable=fake_sass), jobs=1).run(
+        targets()
+    )
+
+    next(results)
+    assert len(consumed) <= 2
+    assert len(list(results)) == 3
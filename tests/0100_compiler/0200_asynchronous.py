@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from flechette_insolente.exceptions import RunnedCommandError
+from flechette_insolente.compiler import AsyncDartSassCompiler, DartSassCompiler
+
+
+def test_async_version(fake_sass):
+    """
+    Version is returned from a coroutine.
+    """
+    compiler = AsyncDartSassCompiler(executable=fake_sass)
+
+    assert asyncio.run(compiler.version()) == "1.0.0-fake"
+
+
+def test_async_compile_concurrent(fake_sass, source_structure):
+    """
+    Many compiles can run concurrently from the same event loop.
+    """
+    compiler = AsyncDartSassCompiler(executable=fake_sass)
+    minimal = source_structure / "scss/minimal.scss"
+
+    async def main():
+        return await asyncio.gather(
+            compiler.compile(minimal),
+            compiler.compile(minimal, style="compressed"),
+        )
+
+    assert asyncio.run(main()) == [
+        minimal.read_text().strip(),
+        "#yeep {font-size: 5rem;color: YELLOW;}",
+    ]
+
+
+def test_async_compile_errors(fake_sass, source_structure):
+    """
+    Failures and timeouts raise the same error payloads than the synchronous
+    compiler.
+    """
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+    sleepy = source_structure / "scss/sleepy.scss"
+    sleepy.write_text("// sleep 5\n")
+
+    compiler = AsyncDartSassCompiler(executable=fake_sass, command_timeout=0.5)
+
+    with pytest.raises(RunnedCommandError) as exc_info:
+        asyncio.run(compiler.compile(broken))
+
+    assert exc_info.value.message == "Command failed with signal code: 65"
+    assert exc_info.value.error_payload["cmd"] == fake_sass + [str(broken)]
+    assert exc_info.value.error_payload["stdout"].startswith("Error: Nope\n")
+    assert exc_info.value.error_payload["stderr"] is None
+    assert exc_info.value.error_payload["timeout"] is None
+
+    with pytest.raises(RunnedCommandError) as exc_info:
+        asyncio.run(compiler.compile(sleepy))
+
+    assert exc_info.value.error_payload == {
+        "returncode": None,
+        "cmd": fake_sass + [str(sleepy)],
+        "stdout": None,
+        "stderr": None,
+        "timeout": 0.5,
+        "resources": None,
+    }
+
+    # Timeout follows an override from the current thread
+    with compiler.override_timeout(0.2):
+        with pytest.raises(RunnedCommandError) as exc_info:
+            asyncio.run(compiler.compile(sleepy))
+
+    assert exc_info.value.error_payload["timeout"] == 0.2
+
+
+def test_async_payloads(fake_sass, source_structure):
+    """
+    Error payloads have the same items than the synchronous ones and output before
+    a timeout is kept.
+    """
+    sleepy = [
+        sys.executable, "-c",
+        "import time; print('Partial', flush=True); time.sleep(5)",
+    ]
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+
+    def get_payloads(executable, *args):
+        payloads = []
+        for klass in (AsyncDartSassCompiler, DartSassCompiler):
+            compiler = klass(executable=executable, command_timeout=0.5)
+            with pytest.raises(RunnedCommandError) as exc_info:
+                result = compiler._exec(*args)
+                if asyncio.iscoroutine(result):
+                    asyncio.run(result)
+            payloads.append(exc_info.value.error_payload)
+        return payloads
+
+    for payloads in (get_payloads(sleepy), get_payloads(fake_sass, str(broken))):
+        assert set(payloads[0]) == set(payloads[1])
+        assert payloads[0]["stdout"] == payloads[1]["stdout"]
+
+    assert get_payloads(sleepy)[0]["stdout"] == "Partial\n"
+
+
+def test_async_compile_cancel(fake_sass, source_structure, tmp_path, monkeypatch):
+    """
+    Cancelling a compile kills its process.
+    """
+    log = tmp_path / "commands.log"
+    monkeypatch.setenv("FAKE_SASS_LOG", str(log))
+    sleepy = source_structure / "scss/sleepy.scss"
+    sleepy.write_text("// sleep 5\n")
+
+    compiler = AsyncDartSassCompiler(executable=fake_sass)
+
+    async def main():
+        task = asyncio.ensure_future(compiler.compile(sleepy))
+        while not log.exists():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+    pid = int(log.read_text().split()[0])
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
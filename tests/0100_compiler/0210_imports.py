@@ -0,0 +1,72 @@
+import pytest
+
+from flechette_insolente.compiler import ImportResolver
+
+
+@pytest.mark.parametrize("content,indented,expected", [
+    ('@use "foo";', False, ["foo"]),
+    ("@use 'foo' as bar;", False, ["foo"]),
+    ('@use "foo" with ($a: "b");', False, ["foo"]),
+    ('@forward "foo" show bar;', False, ["foo"]),
+    ('@import "foo", "bar";', False, ["foo", "bar"]),
+    ('@use "sass:math";', False, []),
+    ('@import "foo.css";', False, []),
+    ('@import "http://foo/bar";', False, []),
+    ('@import url("foo");', False, []),
+    ('// @use "foo";\n/* @use "bar"; */\n@use "ping";', False, ["ping"]),
+    ('$url: "//foo";\n@use "bar";', False, ["bar"]),
+    ("@import foo, bar", True, ["foo", "bar"]),
+    ('@use "foo"\n.a\n  color: red', True, ["foo"]),
+])
+def test_parse(content, indented, expected):
+    """
+    Loaded URLs are found from rules, without comments, plain CSS imports and
+    built-in modules.
+    """
+    assert ImportResolver().parse(content, indented=indented) == expected
+
+
+def test_resolve(tmp_path):
+    """
+    URLs are resolved like dart-sass does, from importing directory then load paths,
+    with partials and index files.
+    """
+    (tmp_path / "lib" / "grid").mkdir(parents=True)
+    (tmp_path / "lib" / "grid" / "_index.scss").write_text("")
+    (tmp_path / "lib" / "_colors.scss").write_text("")
+    (tmp_path / "scss").mkdir()
+    (tmp_path / "scss" / "local.scss").write_text("")
+    (tmp_path / "scss" / "plain.css").write_text("")
+
+    resolver = ImportResolver(load_paths=[tmp_path / "lib"])
+    directory = tmp_path / "scss"
+
+    assert resolver.resolve("local", directory) == directory / "local.scss"
+    assert resolver.resolve("plain", directory) == directory / "plain.css"
+    assert resolver.resolve("colors", directory) == tmp_path / "lib/_colors.scss"
+    assert resolver.resolve("colors.scss", directory) == (
+        tmp_path / "lib/_colors.scss"
+    )
+    assert resolver.resolve("grid", directory) == tmp_path / "lib/grid/_index.scss"
+    assert resolver.resolve("nope", directory) is None
+
+
+def test_get_dependencies(source_structure):
+    """
+    Every transitively loaded files are found.
+    """
+    resolver = ImportResolver(load_paths=[source_structure / "libraries"])
+    basic = source_structure / "scss/basic.scss"
+
+    assert resolver.get_dependencies(basic) == (
+        [
+            source_structure / "scss/_settings.scss",
+            source_structure / "libraries/addons/_addon_lib.scss",
+        ],
+        [],
+    )
+
+    assert ImportResolver().get_dependencies(basic) == (
+        [source_structure / "scss/_settings.scss"],
+        ["addons/addon_lib"],
+    )
@@ -0,0 +1,88 @@
+import pytest
+
+from flechette_insolente.exceptions import RunnedCommandError
+from flechette_insolente.compiler import (
+    ArgumentsModel, CachedDartSassCompiler, CompileCache,
+)
+
+
+def get_spawns(log):
+    if not log.exists():
+        return []
+
+    return [line.split(" ", 1)[1] for line in log.read_text().splitlines()]
+
+
+def test_cache_hit(fake_sass, source_structure, tmp_path, monkeypatch):
+    """
+    A second compile with the same inputs is restored from cache without to spawn
+    anything, even from another compiler instance.
+    """
+    log = tmp_path / "commands.log"
+    monkeypatch.setenv("FAKE_SASS_LOG", str(log))
+
+    cache = CompileCache(tmp_path / "cache")
+    source = source_structure / "scss/minimal.scss"
+    destination = source_structure / "css/minimal.css"
+
+    compiler = CachedDartSassCompiler(cache=cache, executable=fake_sass)
+    assert compiler.compile(source) == source.read_text().strip()
+    compiler.compile(source, destination=destination)
+    assert get_spawns(log) == [
+        "--version",
+        str(source),
+        "{}:{}".format(source, destination),
+    ]
+    assert (compiler.hits, compiler.misses) == (0, 2)
+
+    css = destination.read_text()
+    source_map = (source_structure / "css/minimal.css.map").read_text()
+    destination.unlink()
+    (source_structure / "css/minimal.css.map").unlink()
+
+    compiler = CachedDartSassCompiler(cache=tmp_path / "cache", executable=fake_sass)
+    assert compiler.compile(source) == source.read_text().strip()
+    compiler.compile(source, destination=destination)
+    assert len(get_spawns(log)) == 3
+    assert (compiler.hits, compiler.misses) == (2, 0)
+    assert destination.read_text() == css
+    assert (source_structure / "css/minimal.css.map").read_text() == source_map
+
+
+def test_cache_key_invalidation(fake_sass, source_structure, tmp_path):
+    """
+    Cache key changes with loaded files content and options.
+    """
+    compiler = CachedDartSassCompiler(cache=tmp_path / "cache", executable=fake_sass)
+    model_args = [source_structure / "scss/basic.scss"]
+    load_path = [source_structure / "libraries"]
+
+    def get_key(**kwargs):
+        kwargs["load_path"] = load_path
+        return compiler.get_cache_key(
+            ArgumentsModel(*model_args, **kwargs),
+            load_path=load_path,
+        )
+
+    initial = get_key()
+    assert get_key() == initial
+    assert get_key(style="compressed") != initial
+
+    (source_structure / "libraries/addons/_addon_lib.scss").write_text("$a: 1;")
+    assert get_key() != initial
+
+
+def test_cache_failure_not_stored(fake_sass, source_structure, tmp_path):
+    """
+    Failed compiles are not stored.
+    """
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+
+    compiler = CachedDartSassCompiler(cache=tmp_path / "cache", executable=fake_sass)
+
+    for i in range(2):
+        with pytest.raises(RunnedCommandError):
+            compiler.compile(broken)
+
+    assert compiler.misses == 2
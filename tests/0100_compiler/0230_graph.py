@@ -0,0 +1,161 @@
+import json
+import os
+
+from flechette_insolente.compiler import (
+    DependencyGraph, expand_targets, find_entrypoints, get_affected_targets,
+)
+
+
+def test_find_entrypoints(source_structure):
+    """
+    Every non partial Sass sources are entrypoints.
+    """
+    assert find_entrypoints(source_structure) == [
+        source_structure / "scss/basic.scss",
+        source_structure / "scss/minimal.scss",
+    ]
+
+
+def test_build(source_structure):
+    """
+    Graph follows loaded files from entrypoints and provides forward and reverse
+    relations.
+    """
+    graph = DependencyGraph(load_paths=[source_structure / "libraries"])
+    graph.build([source_structure / "scss"])
+
+    basic = source_structure / "scss/basic.scss"
+    settings = source_structure / "scss/_settings.scss"
+    addon = source_structure / "libraries/addons/_addon_lib.scss"
+
+    assert graph.scanned == 4
+    assert graph.get_dependencies(basic) == [settings, addon]
+    assert graph.get_dependents(addon) == [basic]
+    assert graph.get_affected_entrypoints([addon]) == [basic]
+    assert graph.get_affected_entrypoints([source_structure / "scss/minimal.scss"]) == [
+        source_structure / "scss/minimal.scss",
+    ]
+    assert graph.get_affected_entrypoints([source_structure / "nope.scss"]) == []
+
+
+def test_unresolved(source_structure):
+    """
+    Without load path, library import is unresolved.
+    """
+    graph = DependencyGraph().build([source_structure / "scss/basic.scss"])
+
+    assert graph.files[str(source_structure / "scss/basic.scss")]["unresolved"] == [
+        "addons/addon_lib",
+    ]
+
+
+def test_persistence(source_structure, tmp_path):
+    """
+    A saved graph is loaded back and only changed files are scanned again.
+    """
+    graph_file = tmp_path / "graph.json"
+    load_paths = [source_structure / "libraries"]
+
+    graph = DependencyGraph(load_paths=load_paths).build([source_structure / "scss"])
+    graph.save(graph_file)
+
+    graph = DependencyGraph.load(graph_file, load_paths=load_paths)
+    graph.build([source_structure / "scss"])
+    assert graph.scanned == 0
+
+    # Change the partial content and stats
+    settings = source_structure / "scss/_settings.scss"
+    settings.write_text('@use "extra";\n$red: red;\n')
+    os.utime(settings, ns=(1, 1))
+    (source_structure / "scss/_extra.scss").write_text("")
+
+    graph.build([source_structure / "scss"])
+    assert graph.scanned == 2
+    assert graph.get_dependents(source_structure / "scss/_extra.scss") == [
+        settings,
+        source_structure / "scss/basic.scss",
+    ]
+
+    # Another load paths invalidate saved graph
+    graph = DependencyGraph.load(graph_file)
+    assert graph.files == {}
+
+
+def test_exports(source_structure, monkeypatch):
+    """
+    Graph can be exported to JSON and DOT.
+    """
+    monkeypatch.chdir(source_structure)
+    graph = DependencyGraph().build([source_structure / "scss/basic.scss"])
+
+    assert json.loads(graph.to_json())["entrypoints"] == [
+        str(source_structure / "scss/basic.scss"),
+    ]
+    assert graph.to_dot() == "\n".join([
+        "digraph dependencies {",
+        '    "scss/basic.scss" [shape=box];',
+        '    "scss/basic.scss" -> "scss/_settings.scss";',
+        "}",
+        "",
+    ])
+
+
+def test_affected_targets(source_structure):
+    """
+    Targets are expanded to their entrypoints and filtered on changed files.
+    """
+    basic = source_structure / "scss/basic.scss"
+    minimal = source_structure / "scss/minimal.scss"
+    css = source_structure / "css"
+    targets = [(source_structure / "scss", css)]
+
+    assert expand_targets(targets) == {
+        basic: css / "basic.css",
+        minimal: css / "minimal.css",
+    }
+    assert expand_targets([(minimal, None)]) == {minimal: None}
+
+    addon = source_structure / "libraries/addons/_addon_lib.scss"
+    assert get_affected_targets(
+        targets,
+        [addon, source_structure / "nope.scss"],
+        load_paths=[source_structure / "libraries"],
+    ) == [(basic, css / "basic.css")]
+    assert get_affected_targets(
+        targets + [(minimal, css / "other.css")],
+        [minimal],
+    ) == [(minimal, css / "other.css")]
+
+
+def test_affected_removed(source_structure):
+    """
+    Files which still load a removed or renamed file are affected by its removal.
+    """
+    basic = source_structure / "scss/basic.scss"
+    css = source_structure / "css"
+    targets = [(source_structure / "scss", css)]
+    load_paths = [source_structure / "libraries"]
+
+    settings = source_structure / "scss/_settings.scss"
+    settings.unlink()
+    assert get_affected_targets(targets, [settings], load_paths=load_paths) == [
+        (basic, css / "basic.css"),
+    ]
+    settings.write_text("$color: red;\n")
+
+    # A rename is a removed file and a created one
+    addon = source_structure / "libraries/addons/_addon_lib.scss"
+    renamed = addon.parent / "_addon_renamed.scss"
+    addon.rename(renamed)
+    assert get_affected_targets(
+        targets,
+        [addon, renamed],
+        load_paths=load_paths,
+    ) == [(basic, css / "basic.css")]
+
+    # Unrelated removed file does not affect anything
+    assert get_affected_targets(
+        targets,
+        [source_structure / "scss/_nope.scss"],
+        load_paths=load_paths,
+    ) == []
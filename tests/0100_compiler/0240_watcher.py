@@ -0,0 +1,200 @@
+import threading
+
+import pytest
+
+from flechette_insolente.compiler import CompileWatcher, DartSassCompiler
+from flechette_insolente.compiler.watcher import (
+    InotifyWatcher, PollingWatcher, collect_changes, get_libc, get_watch_roots,
+)
+
+
+class ScriptedWatcher:
+    """
+    Watcher which returns predefined changes.
+    """
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    def wait(self, timeout=None):
+        return self.changes.pop(0) if self.changes else set()
+
+
+def test_get_watch_roots(source_structure):
+    """
+    Files are reduced to their directories and nested directories are removed.
+    """
+    assert get_watch_roots([
+        source_structure / "scss/basic.scss",
+        source_structure / "scss",
+        source_structure / "libraries/addons/_addon_lib.scss",
+        source_structure / "libraries",
+    ]) == [
+        source_structure / "libraries",
+        source_structure / "scss",
+    ]
+
+
+@pytest.mark.parametrize("watcher_class", [
+    PollingWatcher,
+    pytest.param(
+        InotifyWatcher,
+        marks=pytest.mark.skipif(get_libc() is None, reason="inotify is required"),
+    ),
+])
+def test_watcher(source_structure, watcher_class):
+    """
+    Watchers report modified, created and removed Sass sources but not other files.
+    """
+    scss_dir = source_structure / "scss"
+    if watcher_class is PollingWatcher:
+        watcher = watcher_class([scss_dir], interval=0.01)
+    else:
+        watcher = watcher_class([scss_dir])
+
+    try:
+        assert watcher.wait(timeout=0.05) == set()
+
+        (scss_dir / "minimal.scss").write_text("body { color: red; }\n")
+        (scss_dir / "components").mkdir()
+        (scss_dir / "components/_button.scss").write_text("button { color: red; }\n")
+        (scss_dir / "_settings.scss").unlink()
+        (scss_dir / "notes.txt").write_text("Nope")
+
+        assert collect_changes(watcher, timeout=2, debounce=0.2) == {
+            scss_dir / "minimal.scss",
+            scss_dir / "components/_button.scss",
+            scss_dir / "_settings.scss",
+        }
+    finally:
+        watcher.close()
+
+
+def test_collect_changes():
+    """
+    Changes are collected until there is no more change during debounce delay.
+    """
+    watcher = ScriptedWatcher([{"a"}, {"b"}, {"a", "c"}, set(), {"d"}])
+
+    assert collect_changes(watcher) == {"a", "b", "c"}
+    assert collect_changes(watcher) == {"d"}
+    assert collect_changes(watcher) == set()
+
+
+def test_rebuild(source_structure, fake_sass):
+    """
+    Only the entrypoints affected by changes are compiled again and created
+    entrypoints are compiled.
+    """
+    scss_dir = source_structure / "scss"
+    css_dir = source_structure / "css"
+
+    watcher = CompileWatcher(
+        DartSassCompiler(executable=fake_sass),
+        [(scss_dir, css_dir)],
+        load_path=[source_structure / "libraries"],
+    )
+    watcher.refresh()
+
+    results = watcher.build(sorted(watcher.entrypoints))
+    assert sorted([item.destination for item in results]) == [
+        css_dir / "basic.css",
+        css_dir / "minimal.css",
+    ]
+    assert all([item.success for item in results])
+    assert all([item.duration >= 0 for item in results])
+
+    addon = source_structure / "libraries/addons/_addon_lib.scss"
+    addon.write_text(addon.read_text() + "\n.changed { color: red; }\n")
+    results = watcher.rebuild({addon})
+    assert [item.source for item in results] == [scss_dir / "basic.scss"]
+
+    (scss_dir / "sub").mkdir()
+    (scss_dir / "sub/new.scss").write_text(".new { color: red; }\n")
+    results = watcher.rebuild({scss_dir / "sub/new.scss"})
+    assert [item.source for item in results] == [scss_dir / "sub/new.scss"]
+    assert (css_dir / "sub/new.css").exists() is True
+
+    assert watcher.rebuild({source_structure / "nope.scss"}) == []
+
+
+def test_run(source_structure, fake_sass):
+    """
+    Watcher builds every targets then builds again on changes.
+    """
+    scss_dir = source_structure / "scss"
+    css_dir = source_structure / "css"
+    settings = scss_dir / "_settings.scss"
+    builds = []
+
+    def callback(results, elapsed):
+        builds.append(sorted([item.source.name for item in results]))
+        if len(builds) == 1:
+            threading.Timer(0.2, settings.write_text, args=["$color: red;\n"]).start()
+        return len(builds) == 2
+
+    watcher = CompileWatcher(
+        DartSassCompiler(executable=fake_sass),
+        [(scss_dir / "basic.scss", css_dir / "basic.css")],
+        load_path=[source_structure / "libraries"],
+        polling=True,
+        interval=0.05,
+        debounce=0.05,
+    )
+    watcher.run(timeout=5, callback=callback)
+
+    assert builds == [["basic.scss"], ["basic.scss"]]
+
+
+def test_run_own_destinations(source_structure, fake_sass):
+    """
+    Destinations written by builds in a watched directory do not trigger another
+    build.
+    """
+    scss_dir = source_structure / "scss"
+    source = scss_dir / "minimal.scss"
+    builds = []
+
+    watcher = CompileWatcher(
+        DartSassCompiler(executable=fake_sass),
+        [(source, scss_dir / "minimal.css")],
+        polling=True,
+        interval=0.05,
+        debounce=0.05,
+    )
+    threading.Timer(0.2, source.write_text, args=[".foo { color: red; }\n"]).start()
+    watcher.run(
+        timeout=1,
+        callback=lambda results, elapsed: builds.append(
+            [item.source.name for item in results]
+        ),
+    )
+
+    assert builds == [["minimal.scss"], ["minimal.scss"]]
+    assert watcher.filter_changes({scss_dir / "minimal.css", source}) == {source}
+
+
+def test_run_failure(source_structure, fake_sass):
+    """
+    A failed build does not stop watching.
+    """
+    scss_dir = source_structure / "scss"
+    broken = scss_dir / "broken.scss"
+    broken.write_text('@error "Nope";\n')
+    builds = []
+
+    watcher = CompileWatcher(
+        DartSassCompiler(executable=fake_sass),
+        [(broken, source_structure / "css/broken.css")],
+        polling=True,
+        interval=0.05,
+        debounce=0.05,
+    )
+    threading.Timer(0.2, broken.write_text, args=[".foo { color: red; }\n"]).start()
+    watcher.run(
+        timeout=1,
+        callback=lambda results, elapsed: builds.append(
+            [item.success for item in results]
+        ),
+    )
+
+    assert builds == [[False], [True]]
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from flechette_insolente.exceptions import RunnedCommandError
+from flechette_insolente.compiler import (
+    AsyncDartSassCompiler, DartSassCompiler, EmbeddedDartSassCompiler,
+)
+
+
+def test_compile_string(fake_sass, source_structure):
+    """
+    Source content is compiled through standard input.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+
+    assert compiler.compile_string(".foo {\n    color: red;\n}\n") == (
+        ".foo {\n    color: red;\n}"
+    )
+    assert compiler.compile_string(".foo\n  color: red\n", syntax="sass") == (
+        "/* indented */\n.foo\n  color: red"
+    )
+
+    destination = source_structure / "css/string.css"
+    assert compiler.compile_string(
+        ".foo { color: red; }",
+        destination=destination,
+        style="compressed",
+    ) == ""
+    assert destination.read_text() == ".foo { color: red; }\n"
+
+    with pytest.raises(RunnedCommandError) as excinfo:
+        compiler.compile_string('@error "Nope";')
+    assert excinfo.value.error_payload["returncode"] == 65
+    assert "Error: Nope" in excinfo.value.error_payload["stdout"]
+
+
+def test_async_compile_string(fake_sass):
+    """
+    Asynchronous compiler sends source content to standard input too.
+    """
+    compiler = AsyncDartSassCompiler(executable=fake_sass)
+
+    async def main():
+        return await asyncio.gather(
+            compiler.compile_string(".foo { color: red; }"),
+            compiler.compile_string(".bar\n  color: red", syntax="sass"),
+        )
+
+    assert asyncio.run(main()) == [
+        ".foo { color: red; }",
+        "/* indented */\n.bar\n  color: red",
+    ]
+
+
+def test_embedded_compile_string(fake_embedded_sass, source_structure):
+    """
+    Embedded compiler sends source content inside the compile request.
+    """
+    with EmbeddedDartSassCompiler(executable=fake_embedded_sass) as compiler:
+        assert compiler.compile_string(".foo { color: red; }") == (
+            ".foo { color: red; }"
+        )
+        assert compiler.compile_string(".bar\n  color: red", syntax="sass") == (
+            "/* indented */\n.bar\n  color: red"
+        )
+
+        destination = source_structure / "css/string.css"
+        assert compiler.compile_string(
+            ".foo { color: red; }",
+            destination=destination,
+        ) == ""
+        assert destination.read_text() == (
+            ".foo { color: red; }\n\n/*# sourceMappingURL=string.css.map */\n"
+        )
@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from flechette_insolente.exceptions import RunnedCommandError
+from flechette_insolente.compiler import (
+    AsyncDartSassCompiler, CompileEvent, DartSassCompiler, TimingsCollector,
+)
+from flechette_insolente.compiler.hooks import PHASES, SpawnEvent
+
+
+def test_event_success(fake_sass, source_structure):
+    """
+    An event is emitted for each execution with its measures.
+    """
+    collector = TimingsCollector()
+    compiler = DartSassCompiler(executable=fake_sass, hooks=[collector])
+
+    output = compiler.compile(source_structure / "scss/minimal.scss")
+    compiler.compile_string(".foo { color: red; }")
+    compiler.version()
+
+    assert len(collector.events) == 3
+    compile_event, string_event, version_event = collector.events
+
+    assert compile_event.success is True
+    assert compile_event.returncode == 0
+    assert compile_event.timeout is False
+    assert compile_event.cmd == fake_sass + [
+        str(source_structure / "scss/minimal.scss"),
+    ]
+    assert compile_event.input_bytes == 0
+    assert compile_event.output_bytes == len(output) + 1
+    assert all([compile_event.phases[name] >= 0 for name in PHASES])
+    assert compile_event.duration == sum(compile_event.phases.values())
+
+    assert string_event.input_bytes == len(".foo { color: red; }")
+    assert string_event.phases["validation"] >= 0
+
+    # Version command has no arguments to validate
+    assert version_event.phases["validation"] is None
+    assert version_event.duration > 0
+
+    assert compile_event.to_dict()["phases"] == compile_event.phases
+
+
+def test_event_failures(fake_sass, source_structure):
+    """
+    Failed and timed out executions still emit an event before raising error.
+    """
+    events = []
+    compiler = DartSassCompiler(executable=fake_sass, command_timeout=0.5)
+    compiler.add_hook(events.append)
+
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+    with pytest.raises(RunnedCommandError):
+        compiler.compile(broken)
+
+    sleepy = source_structure / "scss/sleepy.scss"
+    sleepy.write_text("// sleep 5\n")
+    with pytest.raises(RunnedCommandError) as excinfo:
+        compiler.compile(sleepy)
+    assert excinfo.value.error_payload["timeout"] == 0.5
+    assert excinfo.value.error_payload["returncode"] is None
+
+    # Each process emits an event when spawned then when finished
+    assert [item.__class__ for item in events] == [
+        SpawnEvent, CompileEvent, SpawnEvent, CompileEvent,
+    ]
+    assert events[0].cmd == events[1].cmd
+
+    finished = events[1::2]
+    assert [
+        (item.returncode, item.timeout, item.success) for item in finished
+    ] == [
+        (65, False, False),
+        (-9, True, False),
+    ]
+    assert finished[0].output_bytes > 0
+    assert finished[1].phases["wait"] >= 0.5
+
+    compiler.remove_hook(events.append)
+    compiler.version()
+    assert len(events) == 4
+
+
+def test_no_hooks(monkeypatch, fake_sass, source_structure):
+    """
+    Without any hook, no event is built.
+    """
+    def fail(*args, **kwargs):
+        raise AssertionError("No event should be built")
+
+    monkeypatch.setattr(
+        "flechette_insolente.compiler.executable.CompileEvent", fail
+    )
+    compiler = DartSassCompiler(executable=fake_sass)
+
+    assert compiler.compile(source_structure / "scss/minimal.scss") != ""
+
+
+def test_async_event(fake_sass, source_structure):
+    """
+    Asynchronous compiler emits the same events.
+    """
+    collector = TimingsCollector()
+    compiler = AsyncDartSassCompiler(executable=fake_sass, hooks=[collector])
+
+    output = asyncio.run(compiler.compile(source_structure / "scss/minimal.scss"))
+
+    assert len(collector.events) == 1
+    assert collector.events[0].success is True
+    assert collector.events[0].output_bytes == len(output) + 1
+    assert collector.events[0].phases["validation"] >= 0
+
+
+def test_collector_summary():
+    """
+    Collector summarizes phases of every events.
+    """
+    collector = TimingsCollector()
+    assert collector.get_summary()["phases"]["spawn"] == {
+        "total": None, "mean": None, "max": None,
+    }
+
+    collector(CompileEvent(
+        ["sass"],
+        returncode=0,
+        output_bytes=10,
+        phases={"validation": 0.001, "spawn": 0.002, "wait": 0.01, "decode": 0.0},
+    ))
+    collector(CompileEvent(
+        ["sass"],
+        returncode=-9,
+        timeout=True,
+        output_bytes=5,
+        phases={"spawn": 0.004, "wait": 0.5, "decode": 0.0},
+    ))
+
+    summary = collector.get_summary()
+    assert summary["count"] == 2
+    assert summary["failures"] == 1
+    assert summary["timeouts"] == 1
+    assert summary["output_bytes"] == 15
+    assert summary["phases"]["validation"] == {
+        "total": 0.001, "mean": 0.001, "max": 0.001,
+    }
+    assert summary["phases"]["spawn"]["mean"] == pytest.approx(0.003)
+    assert summary["phases"]["wait"]["max"] == 0.5
+    assert summary["duration"]["total"] == pytest.approx(0.517)
+
+    lines = collector.format_summary().splitlines()
+    assert lines[0] == (
+        "Timings for 2 execution(s), 1 failed, 1 timed out, 15 bytes of output"
+    )
+    assert [line.split(":")[0].strip() for line in lines[1:]] == [
+        "validation", "spawn", "wait", "decode", "total",
+    ]
+    assert lines[3] == "  wait: total=510.000ms mean=255.000ms max=500.000ms"
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+
+import pytest
+
+from flechette_insolente.exceptions import RunnedCommandError
+from flechette_insolente.compiler import (
+    AsyncDartSassCompiler, CompileMetrics, DartSassCompiler, MetricsRegistry,
+)
+from flechette_insolente.compiler.metrics import format_labels
+
+
+def test_counter_and_gauge():
+    """
+    Counters only increase and labels are required as declared.
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter("hits_total", "Hits.", labels=("kind",))
+
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    counter.inc(kind="b")
+    assert counter.get(kind="a") == 3
+    assert counter.get(kind="c") == 0
+
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind="a")
+
+    with pytest.raises(ValueError):
+        counter.inc()
+
+    with pytest.raises(ValueError):
+        counter.inc(kind="a", other="b")
+
+    gauge = registry.gauge("running", "Running.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.get() == 1
+    gauge.set(5)
+    assert gauge.get() == 5
+
+    # Same name and definition share the metric, other definitions are refused
+    assert registry.counter("hits_total", "Hits.", labels=("kind",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("hits_total", "Hits.")
+
+
+def test_histogram():
+    """
+    Histogram buckets are cumulative with an infinite upper bound.
+    """
+    histogram = MetricsRegistry().histogram(
+        "duration", "Duration.", buckets=(0.5, 0.1, 1.0),
+    )
+
+    for value in (0.05, 0.1, 0.3, 2):
+        histogram.observe(value)
+
+    assert histogram.get() == {
+        "buckets": {0.1: 2, 0.5: 3, 1.0: 3, float("inf"): 4},
+        "sum": pytest.approx(2.45),
+        "count": 4,
+    }
+
+
+def test_concurrent_recording():
+    """
+    Recording from many threads does not lose any update.
+    """
+    counter = MetricsRegistry().counter("total", "Total.")
+
+    def work():
+        for index in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.get() == 40000
+
+
+def test_export(tmp_path):
+    """
+    Metrics are exported in Prometheus text format, ordered on their name.
+    """
+    registry = MetricsRegistry()
+    registry.counter("b_total", "Second.", labels=("path",)).inc(path='a"b\\c')
+    registry.histogram("a_seconds", "First.", buckets=(1,)).observe(0.5)
+
+    expected = "\n".join([
+        "# HELP a_seconds First.",
+        "# TYPE a_seconds histogram",
+        'a_seconds_bucket{le="1"} 1',
+        'a_seconds_bucket{le="+Inf"} 1',
+        "a_seconds_sum 0.5",
+        "a_seconds_count 1",
+        "# HELP b_total Second.",
+        "# TYPE b_total counter",
+        'b_total{path="a\\"b\\\\c"} 1',
+    ]) + "\n"
+    assert registry.export() == expected
+
+    registry.write(tmp_path / "metrics.prom")
+    assert (tmp_path / "metrics.prom").read_text() == expected
+
+    assert format_labels([]) == ""
+
+
+def test_compile_metrics(fake_sass, source_structure):
+    """
+    Compile metrics record executions, failures by reason and phases.
+    """
+    recorder = CompileMetrics()
+    compiler = DartSassCompiler(
+        executable=fake_sass,
+        command_timeout=0.5,
+        hooks=[recorder],
+    )
+
+    compiler.compile(source_structure / "scss/minimal.scss")
+
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+    with pytest.raises(RunnedCommandError):
+        compiler.compile(broken)
+
+    sleepy = source_structure / "scss/sleepy.scss"
+    sleepy.write_text("// sleep 5\n")
+    with pytest.raises(RunnedCommandError):
+        compiler.compile(sleepy)
+
+    assert recorder.compiles.get() == 3
+    assert recorder.failures.get(reason="exit") == 1
+    assert recorder.failures.get(reason="timeout") == 1
+    assert recorder.failures.get(reason="cancelled") == 0
+    assert recorder.in_flight.get() == 0
+    assert recorder.output_bytes.get() > 0
+    assert recorder.duration.get()["count"] == 3
+    assert recorder.phases.get(phase="wait")["count"] == 3
+
+    exported = recorder.registry.export()
+    assert "flechette_insolente_compiles_total 3" in exported
+    assert (
+        'flechette_insolente_compile_failures_total{reason="timeout"} 1'
+    ) in exported
+
+
+def test_compile_metrics_async(fake_sass, source_structure):
+    """
+    Processes are in flight until their coroutine finishes, even when cancelled.
+    """
+    recorder = CompileMetrics()
+    compiler = AsyncDartSassCompiler(executable=fake_sass, hooks=[recorder])
+    sleepy = source_structure / "scss/sleepy.scss"
+    sleepy.write_text("// sleep 5\n")
+
+    async def run():
+        task = asyncio.ensure_future(compiler.compile(sleepy))
+        while recorder.in_flight.get() == 0:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert recorder.in_flight.get() == 0
+    assert recorder.failures.get(reason="cancelled") == 1
@@ -0,0 +1,116 @@
+import threading
+
+from flechette_insolente.compiler import (
+    CachedDartSassCompiler, DartSassCompiler, TraceRecorder,
+)
+from flechette_insolente.compiler.hooks import CompileEvent
+
+
+def get_spans(trace):
+    return [item for item in trace["traceEvents"] if item["ph"] == "X"]
+
+
+def test_record_compile():
+    """
+    An execution is recorded as a span for each phase, one after another.
+    """
+    recorder = TraceRecorder()
+    started = recorder.origin + 1
+
+    recorder(CompileEvent(
+        ["sass", "a.scss"],
+        returncode=0,
+        started=started,
+        phases={"validation": 0.001, "spawn": 0.002, "wait": 0.01, "decode": 0.0005},
+    ))
+    # Unknown events are ignored
+    recorder(object())
+
+    trace = recorder.to_dict()
+    assert trace["traceEvents"][0]["args"] == {"name": "worker-1"}
+
+    spans = get_spans(trace)
+    assert [(item["name"], item["tid"]) for item in spans] == [
+        ("validation", 1), ("spawn", 1), ("run", 1), ("decode", 1),
+    ]
+    assert [round(item["ts"]) for item in spans] == [
+        999000, 1000000, 1002000, 1012000,
+    ]
+    assert [round(item["dur"]) for item in spans] == [1000, 2000, 10000, 500]
+    assert spans[2]["args"]["cmd"] == "sass a.scss"
+
+
+def test_lanes():
+    """
+    Each thread has its own lane.
+    """
+    recorder = TraceRecorder()
+
+    thread = threading.Thread(target=recorder.get_lane)
+    thread.start()
+    thread.join()
+
+    assert recorder.get_lane() == 2
+    assert recorder.get_lane() == 2
+
+
+def test_parallel_trace(fake_sass, source_structure, tmp_path):
+    """
+    Parallel compiles are traced on worker lanes with their cache status.
+    """
+    recorder = TraceRecorder()
+    compiler = CachedDartSassCompiler(
+        executable=fake_sass,
+        cache=tmp_path / "cache",
+        hooks=[recorder],
+    )
+    css_dir = source_structure / "css"
+    pairs = [
+        (source_structure / "scss/minimal.scss", css_dir / "minimal.css"),
+        (source_structure / "scss/basic.scss", css_dir / "basic.css"),
+    ]
+    options = {"load_path": [source_structure / "libraries"]}
+
+    list(compiler.compile_parallel(pairs, jobs=2, **options))
+    list(compiler.compile_parallel(pairs[:1], jobs=2, **options))
+
+    recorder.write(tmp_path / "trace.json")
+    spans = get_spans(recorder.to_dict())
+    names = [item["name"] for item in spans]
+
+    assert names.count("target") == 3
+    # Cache also runs the version command
+    assert len([
+        item for item in spans
+        if item["name"] == "run" and "--version" not in item["args"]["cmd"]
+    ]) == 2
+    assert names.count("cache miss") == 2
+    assert names.count("cache hit") == 1
+    assert names.count("write") == 3
+
+    # Every span of a target is drawn on the lane of the target
+    for target in [item for item in spans if item["name"] == "target"]:
+        inner = [
+            item for item in spans
+            if item["tid"] == target["tid"] and item is not target and
+            target["ts"] <= item["ts"] <= target["ts"] + target["dur"]
+        ]
+        assert inner
+    assert (tmp_path / "trace.json").exists()
+
+
+def test_compile_many_trace(fake_sass, source_structure):
+    """
+    A batch compile is a single execution.
+    """
+    recorder = TraceRecorder()
+    compiler = DartSassCompiler(executable=fake_sass, hooks=[recorder])
+    css_dir = source_structure / "css"
+
+    compiler.compile_many([
+        (source_structure / "scss/minimal.scss", css_dir / "minimal.css"),
+    ])
+
+    assert [item["name"] for item in get_spans(recorder.to_dict())] == [
+        "validation", "spawn", "run", "decode",
+    ]
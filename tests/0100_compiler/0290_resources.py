@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from flechette_insolente.exceptions import RunnedCommandError
+from flechette_insolente.compiler import CompileResult, DartSassCompiler
+from flechette_insolente.compiler.resources import (
+    ResourcePopen, format_resources, get_resources, summarize_resources,
+)
+
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "wait4"), reason="Resource usage requires os.wait4()"
+)
+
+
+def test_resource_popen():
+    """
+    Resource usage of the reaped process is kept, its peak memory is measured.
+    """
+    script = "data = bytearray(64 * 1024 * 1024); data[::4096] = b'1' * 16384"
+
+    with ResourcePopen([sys.executable, "-c", script]) as process:
+        assert process.reap() == 0
+
+    resources = get_resources(process.rusage, 0.5)
+    assert resources["max_rss"] > 64 * 1024 * 1024
+    assert resources["user_time"] + resources["system_time"] > 0
+    assert resources["wall_time"] == 0.5
+
+    assert get_resources(None, 0.5) is None
+
+    with ResourcePopen([sys.executable, "-c", ""], stdout=subprocess.PIPE) as process:
+        process.stdout.read()
+        process.reap()
+    assert process.rusage is not None
+
+    # A process killed by a signal has a negative return code
+    with ResourcePopen([sys.executable, "-c", "import time; time.sleep(5)"]) as process:
+        process.kill()
+        assert process.reap() == -9
+    assert process.rusage is not None
+
+    # An already reaped process has no resource usage
+    with ResourcePopen([sys.executable, "-c", ""]) as process:
+        process.wait()
+        assert process.reap() == 0
+    assert process.rusage is None
+
+
+def test_summarize_resources():
+    """
+    Resource usage shared by results is counted once.
+    """
+    batch = {"max_rss": 300, "user_time": 1, "system_time": 0.5, "wall_time": 2}
+    single = {"max_rss": 100, "user_time": 2, "system_time": 0, "wall_time": 1}
+
+    summary = summarize_resources([
+        CompileResult("a", resources=batch),
+        CompileResult("b", resources=batch),
+        CompileResult("c", resources=single),
+        CompileResult("d"),
+    ])
+
+    assert summary == {
+        "count": 2,
+        "max_rss": 300,
+        "mean_rss": 200,
+        "user_time": 3,
+        "system_time": 0.5,
+        "wall_time": 3,
+    }
+    assert format_resources(summary).startswith("2 process(es), peak RSS max=")
+    assert summarize_resources([CompileResult("d")]) is None
+
+
+def test_compile_resources(fake_sass, source_structure):
+    """
+    Resource usage is available from compiler, error payloads and results.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    css_dir = source_structure / "css"
+
+    compiler.compile(source_structure / "scss/minimal.scss")
+    resources = compiler.pop_resources()
+    assert resources["max_rss"] > 0
+    assert resources["wall_time"] > 0
+    assert compiler.pop_resources() is None
+
+    broken = source_structure / "scss/broken.scss"
+    broken.write_text('@error "Nope";\n')
+    with pytest.raises(RunnedCommandError) as excinfo:
+        compiler.compile(broken)
+    assert excinfo.value.error_payload["resources"]["max_rss"] > 0
+
+    results = list(compiler.compile_parallel([
+        (source_structure / "scss/minimal.scss", css_dir / "a.css"),
+        (broken, css_dir / "broken.css"),
+    ], jobs=2))
+    assert all([item.resources["max_rss"] > 0 for item in results])
+    assert results[0].resources is not results[1].resources
+
+    results = compiler.compile_many([
+        (source_structure / "scss/minimal.scss", css_dir / "a.css"),
+        (broken, css_dir / "broken.css"),
+    ])
+    assert results[0].resources["max_rss"] > 0
+    assert results[0].resources is results[1].resources
+    assert summarize_resources(results)["count"] == 1
@@ -0,0 +1,169 @@
+import signal
+import sys
+import threading
+import time
+
+import pytest
+
+from flechette_insolente.exceptions import RunnedCommandError
+from flechette_insolente.compiler import (
+    CompileResult, DartSassCompiler, ParallelExecutor, ResourceGovernor,
+)
+from flechette_insolente.compiler.resources import apply_limits, resource
+
+
+class StaticGovernor(ResourceGovernor):
+    """
+    Governor with given memory state instead of the system one.
+    """
+    def __init__(self, *args, available=None, pressure=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.available = available
+        self.pressure = pressure
+
+    def get_available_memory(self):
+        return self.available
+
+    def get_memory_pressure(self):
+        return self.pressure
+
+
+def failure(**payload):
+    return CompileResult(
+        "a.scss",
+        error=RunnedCommandError(error_payload=payload),
+        duration=0,
+    )
+
+
+def test_aimd():
+    """
+    Limit increases slowly on success and is halved on congestion, once for
+    compiles running at the same time.
+    """
+    governor = StaticGovernor(max_jobs=8, min_jobs=2)
+    assert governor.get_limit() == 8
+
+    governor.update(failure(returncode=None, timeout=30))
+    assert governor.get_limit() == 4
+    assert governor.decreases == 1
+
+    # A compile which started before the decrease is ignored
+    governor.update(CompileResult("a.scss", error=failure(timeout=30).error,
+                                  duration=10))
+    assert governor.decreases == 1
+
+    governor.update(failure(returncode=-signal.SIGKILL, timeout=None))
+    governor.update(failure(returncode=None, timeout=30))
+    assert governor.get_limit() == 2
+    assert governor.decreases == 3
+
+    # A common error is not a congestion
+    governor.update(failure(returncode=65, timeout=None))
+    assert governor.window == pytest.approx(2.5)
+
+    for index in range(5):
+        governor.update(CompileResult("a.scss", output=""))
+    assert governor.get_limit() == 4
+
+    for index in range(100):
+        governor.update(CompileResult("a.scss", output=""))
+    assert governor.get_limit() == 8
+
+    governor.pressure = 50.0
+    governor.update(CompileResult("a.scss", output=""))
+    assert governor.get_limit() == 4
+
+
+def test_memory_cap():
+    """
+    Limit is capped by the number of compiles which fit in available memory, their
+    size is learned from finished compiles.
+    """
+    governor = StaticGovernor(max_jobs=8, available=1000, memory_reserve=100)
+    assert governor.get_limit() == 8
+
+    governor.update(CompileResult("a.scss", output="", resources={"max_rss": 200}))
+    governor.update(CompileResult("a.scss", output="", resources={"max_rss": 300}))
+    assert governor.memory_per_job == 300
+    assert governor.get_limit() == 3
+    assert governor.get_limit(running=2) == 5
+
+    governor.available = 0
+    assert governor.get_limit() == 1
+
+    governor.available = None
+    assert governor.get_limit() == 8
+
+
+def test_executor_follows_governor():
+    """
+    Executor never runs more compiles than the governor limit.
+    """
+    class SleepyCompiler:
+        hooks = []
+
+        def __init__(self):
+            self.running = 0
+            self.highest = 0
+            self.lock = threading.Lock()
+
+        def pop_resources(self):
+            return None
+
+        def compile(self, source, destination=None, **kwargs):
+            with self.lock:
+                self.running += 1
+                self.highest = max(self.highest, self.running)
+            time.sleep(0.02)
+            with self.lock:
+                self.running -= 1
+            if source == "timeout":
+                raise RunnedCommandError(error_payload={"timeout": 1})
+            return ""
+
+    compiler = SleepyCompiler()
+    governor = StaticGovernor(max_jobs=4)
+    executor = ParallelExecutor(compiler, governor=governor)
+    assert executor.jobs == 4
+
+    targets = [("timeout", None)] * 4 + [("ok", None)] * 20
+    results = list(executor.run(targets))
+
+    assert len(results) == 24
+    assert governor.decreases == 1
+    assert compiler.highest == 4
+
+
+@pytest.mark.skipif(
+    resource is None or not hasattr(resource, "prlimit"),
+    reason="prlimit is required",
+)
+def test_limits(fake_sass, source_structure):
+    """
+    Limits are applied to processes.
+    """
+    assert apply_limits(1, memory_limit=None, cpu_limit=None) is False
+
+    compiler = DartSassCompiler(
+        executable=[sys.executable, "-c", "while True: pass"],
+        cpu_limit=1,
+        command_timeout=10,
+    )
+    with pytest.raises(RunnedCommandError) as excinfo:
+        compiler.version()
+    assert excinfo.value.error_payload["returncode"] == -signal.SIGXCPU
+
+    compiler = DartSassCompiler(
+        executable=[
+            sys.executable, "-c",
+            "import time; time.sleep(0.2); data = bytearray(512 * 1024 * 1024)",
+        ],
+        memory_limit=256 * 1024 * 1024,
+    )
+    with pytest.raises(RunnedCommandError) as excinfo:
+        compiler.version()
+    assert "MemoryError" in excinfo.value.error_payload["stdout"]
+
+    compiler = DartSassCompiler(executable=fake_sass, memory_limit=2 * 1024 ** 3)
+    assert compiler.compile(source_structure / "scss/minimal.scss") != ""
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from flechette_insolente.exceptions import PoolError
+from flechette_insolente.compiler import CompilerPool, EmbeddedDartSassCompiler
+
+
+def test_warm_start(fake_embedded_sass, source_structure):
+    """
+    Minimum compilers are started and ready before any compile.
+    """
+    with CompilerPool(min_size=2, executable=fake_embedded_sass) as pool:
+        assert pool.size == 2
+        assert pool.idle == 2
+
+        with pool.compiler() as compiler:
+            assert isinstance(compiler, EmbeddedDartSassCompiler)
+            assert compiler.is_alive is True
+            assert pool.idle == 1
+            pid = compiler._process.pid
+
+        # The most recently used compiler is reused
+        with pool.compiler() as compiler:
+            assert compiler._process.pid == pid
+
+        output = pool.compile(source_structure / "scss/minimal.scss")
+        assert output == (source_structure / "scss/minimal.scss").read_text().strip()
+        assert pool.compile_string(".foo { color: red; }") != ""
+
+    assert pool.size == 0
+    with pytest.raises(PoolError):
+        pool.checkout()
+
+
+def test_max_size(fake_embedded_sass):
+    """
+    Checkout waits for a returned compiler when pool is exhausted.
+    """
+    pool = CompilerPool(
+        min_size=0,
+        max_size=1,
+        checkout_timeout=0.1,
+        executable=fake_embedded_sass,
+    )
+
+    try:
+        compiler = pool.checkout()
+        assert pool.size == 1
+
+        with pytest.raises(PoolError) as excinfo:
+            pool.checkout()
+        assert str(excinfo.value) == "No compiler available after 0.1s"
+
+        threading.Timer(0.1, pool.checkin, args=[compiler]).start()
+        assert pool.checkout(timeout=2) is compiler
+        pool.checkin(compiler)
+    finally:
+        pool.close()
+
+
+def test_dead_compiler(fake_embedded_sass):
+    """
+    A dead compiler is replaced on checkout.
+    """
+    with CompilerPool(min_size=1, executable=fake_embedded_sass) as pool:
+        with pool.compiler() as compiler:
+            first = compiler
+        first._process.kill()
+        first._process.wait()
+
+        with pool.compiler() as compiler:
+            assert compiler is not first
+            assert compiler.is_alive is True
+
+        assert pool.size == 1
+
+
+def test_evict(fake_embedded_sass):
+    """
+    Idle compilers beyond minimum size expire and unhealthy ones are removed.
+    """
+    pool = CompilerPool(
+        min_size=1,
+        max_size=3,
+        idle_timeout=0.2,
+        health_interval=0.1,
+        executable=fake_embedded_sass,
+    )
+
+    try:
+        compilers = [pool.checkout() for index in range(3)]
+        for compiler in compilers:
+            pool.checkin(compiler)
+        assert pool.size == 3
+
+        # Nothing expired yet
+        assert pool.evict() == 0
+
+        time.sleep(0.15)
+        compilers[0]._process.kill()
+        compilers[0]._process.wait()
+        assert pool.evict() == 1
+        assert pool.size == 2
+
+        time.sleep(0.1)
+        assert pool.evict() == 1
+        assert pool.size == 1
+        assert pool.idle == 1
+
+        # Minimum size is restored
+        pool.min_size = 2
+        assert pool.fill() == 1
+        assert pool.idle == 2
+    finally:
+        pool.close()
+
+
+def test_concurrent_checkout(fake_embedded_sass, source_structure):
+    """
+    Many threads share the pool without exceeding its maximum size.
+    """
+    outputs = []
+
+    with CompilerPool(min_size=1, max_size=2, executable=fake_embedded_sass) as pool:
+        def work():
+            for index in range(5):
+                outputs.append(pool.compile(source_structure / "scss/minimal.scss"))
+
+        threads = [threading.Thread(target=work) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert pool.size <= 2
+
+    assert len(outputs) == 20
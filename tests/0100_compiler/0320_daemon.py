@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+
+import pytest
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+from flechette_insolente.compiler import CompilerPool, DartSassCompiler
+from flechette_insolente.daemon import CompileDaemon, DaemonClient, get_socket_path
+from flechette_insolente.exceptions import DaemonError, RunnedCommandError
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """
+    Start daemons on a socket from the temporary directory and stop them once test
+    is finished.
+
+    The started daemon is returned with its thread.
+    """
+    daemons = []
+
+    def start(compiler, **kwargs):
+        daemon = CompileDaemon(socket_path=tmp_path / "d.sock", compiler=compiler,
+                               **kwargs)
+        daemon.bind()
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        daemons.append((daemon, thread))
+        return daemon, thread
+
+    yield start
+
+    for daemon, thread in daemons:
+        daemon.shutdown()
+        thread.join()
+
+
+def test_socket_path(monkeypatch):
+    """
+    Default socket is in user runtime directory if any.
+    """
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert str(get_socket_path()) == "/run/user/1000/flechette-insolente.sock"
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert get_socket_path().name == "flechette-insolente-{}.sock".format(
+        os.getuid()
+    )
+
+
+def test_compile(serve, fake_sass, source_structure, monkeypatch):
+    """
+    Targets are compiled by the daemon with relative paths resolved by client.
+    """
+    daemon, thread = serve(DartSassCompiler(executable=fake_sass), jobs=2)
+    client = DaemonClient(daemon.socket_path, timeout=10)
+
+    assert client.ping() == os.getpid()
+    assert daemon.socket_path.stat().st_mode & 0o777 == 0o600
+
+    (source_structure / "scss/broken.scss").write_text('@error "Nope";\n')
+    monkeypatch.chdir(source_structure)
+
+    results = client.compile([
+        ("scss/minimal.scss", None),
+        ("scss/minimal.scss", "css/minimal.css"),
+        ("scss/broken.scss", "css/broken.css"),
+    ], options={"style": "compressed"})
+
+    assert [item.success for item in results] == [True, True, False]
+    assert results[0].source == source_structure / "scss/minimal.scss"
+    assert results[0].output != ""
+    assert results[1].destination == source_structure / "css/minimal.css"
+    assert (source_structure / "css/minimal.css").exists() is True
+    assert isinstance(results[2].error, RunnedCommandError)
+    assert results[2].error.error_payload["returncode"] == 65
+
+    # Invalid options are rejected for the whole job
+    with pytest.raises(DaemonError):
+        client.compile([("scss/minimal.scss", None)], options={"style": "nope"})
+
+
+def test_requests(serve, fake_sass, tmp_path):
+    """
+    Daemon answers invalid requests with an error and stops on a shutdown request.
+    """
+    daemon, thread = serve(DartSassCompiler(executable=fake_sass))
+    client = DaemonClient(daemon.socket_path, timeout=10)
+
+    with pytest.raises(DaemonError) as excinfo:
+        client.request({"action": "nope"})
+    assert str(excinfo.value) == "Unknown action: nope"
+
+    with pytest.raises(DaemonError) as excinfo:
+        client.request({"action": "compile", "targets": [["foo.scss", None]]})
+    assert str(excinfo.value) == "Source path must be absolute: foo.scss"
+
+    with pytest.raises(DaemonError) as excinfo:
+        client.request({"action": "compile", "targets": [["/foo.scss", "foo.css"]]})
+    assert str(excinfo.value) == "Destination path must be absolute: foo.css"
+
+    for targets in ([["/foo.scss"]], "abc", [["/foo.scss", 42]], [None]):
+        with pytest.raises(DaemonError):
+            client.request({"action": "compile", "targets": targets})
+
+    for extra in ({"options": "abc"}, {"jobs": 0}, {"jobs": "2"}):
+        with pytest.raises(DaemonError):
+            client.request(dict({"action": "compile", "targets": []}, **extra))
+
+    with pytest.raises(DaemonError) as excinfo:
+        client.request(["ping"])
+    assert str(excinfo.value) == (
+        "Invalid request: Request must be a JSON object"
+    )
+
+    # Only one daemon can serve on a socket
+    with pytest.raises(DaemonError):
+        CompileDaemon(socket_path=daemon.socket_path, compiler=object()).bind()
+
+    client.shutdown()
+    thread.join(timeout=10)
+    assert daemon.socket_path.exists() is False
+
+    with pytest.raises(DaemonError):
+        client.ping()
+
+
+def test_jobs(serve, tmp_path):
+    """
+    A compile job does not run more concurrent compiles than it asked for.
+    """
+    class SlowCompiler:
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.running = 0
+            self.highest = 0
+
+        def compile(self, source, destination=None, **kwargs):
+            with self.lock:
+                self.running += 1
+                self.highest = max(self.highest, self.running)
+            time.sleep(0.05)
+            with self.lock:
+                self.running -= 1
+            return ""
+
+    compiler = SlowCompiler()
+    daemon, thread = serve(compiler, jobs=4)
+    client = DaemonClient(daemon.socket_path, timeout=10)
+    targets = [("/{}.scss".format(i), None) for i in range(6)]
+
+    assert len(client.compile(targets, jobs=2)) == 6
+    assert compiler.highest == 2
+
+    compiler.highest = 0
+    assert len(client.compile(targets, jobs=10)) == 6
+    assert compiler.highest == 4
+
+
+def test_stale_socket(serve, fake_sass, tmp_path):
+    """
+    A socket left by a stopped daemon is replaced.
+    """
+    stale = CompileDaemon(socket_path=tmp_path / "d.sock", compiler=object())
+    stale.bind()
+    # Simulate a crash where socket is not removed
+    stale.server.server_close()
+
+    daemon, thread = serve(DartSassCompiler(executable=fake_sass))
+    assert DaemonClient(daemon.socket_path, timeout=10).ping() == os.getpid()
+
+
+def test_pool(serve, fake_embedded_sass, source_structure):
+    """
+    Daemon can compile with a pool of embedded compilers which is closed with it.
+    """
+    pool = CompilerPool(min_size=1, executable=fake_embedded_sass).start()
+    daemon, thread = serve(pool)
+
+    results = DaemonClient(daemon.socket_path, timeout=10).compile([
+        (source_structure / "scss/minimal.scss", None),
+    ])
+    assert results[0].success is True
+    assert results[0].output == (
+        (source_structure / "scss/minimal.scss").read_text().strip()
+    )
+
+    daemon.shutdown()
+    thread.join(timeout=10)
+    assert pool.size == 0
+
+
+def test_cli(serve, monkeypatch, fake_sass, source_structure):
+    """
+    Command compile sends its targets to the daemon with '--daemon'.
+    """
+    daemon, thread = serve(DartSassCompiler(executable=fake_sass))
+    css_bucket = source_structure / "css"
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--daemon",
+        "--socket", str(daemon.socket_path),
+        str(source_structure / "scss/minimal.scss"),
+    ])
+    assert result.exit_code == 0
+    assert result.output.strip() == (
+        (source_structure / "scss/minimal.scss").read_text().strip()
+    )
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--daemon",
+        "--socket", str(daemon.socket_path),
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "a.css"
+        ),
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "b.css"
+        ),
+    ])
+    assert result.exit_code == 0
+    assert (css_bucket / "a.css").exists() is True
+    assert (css_bucket / "b.css").exists() is True
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--daemon",
+        "--timings",
+        "--socket", str(daemon.socket_path),
+        str(source_structure / "scss/minimal.scss"),
+    ])
+    assert result.exit_code == 2
+
+    # Unreachable daemon
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--daemon",
+        "--socket", str(source_structure / "nope.sock"),
+        str(source_structure / "scss/minimal.scss"),
+    ])
+    assert result.exit_code == 1
@@ -0,0 +1,127 @@
+import pytest
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+from flechette_insolente.compiler import DartSassCompiler, TimingsCollector
+from flechette_insolente.exceptions import CommandArgumentsError, RunnedCommandError
+
+
+def large_source(path, size):
+    """
+    Write a source with one rule per line until given size is reached.
+    """
+    rule = ".item-{} {{ color: red; }}\n"
+    lines = [rule.format(i) for i in range(size // len(rule.format(0)) + 1)]
+    path.write_text("".join(lines))
+
+    return path
+
+
+def test_stream(fake_sass, source_structure):
+    """
+    Output is yielded in chunks with the same content than a regular compile.
+    """
+    source = large_source(source_structure / "scss/large.scss", 200000)
+    collector = TimingsCollector()
+    compiler = DartSassCompiler(executable=fake_sass, hooks=[collector])
+
+    chunks = list(compiler.compile_stream(source, chunk_size=4096))
+
+    assert len(chunks) > 1
+    assert all([len(chunk) <= 4096 for chunk in chunks])
+    assert b"".join(chunks) == source.read_bytes()
+    assert b"".join(chunks).decode("utf-8").strip() == compiler.compile(source)
+    assert compiler.compile_bytes(source) == source.read_bytes()
+    assert compiler.pop_resources() is not None
+
+    summary = collector.get_summary()
+    assert summary["count"] == 3
+    assert summary["output_bytes"] == 3 * len(source.read_bytes())
+
+
+def test_stream_error(fake_sass, source_structure):
+    """
+    Errors are raised once output is consumed with error message from standard error.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    (source_structure / "scss/broken.scss").write_text('@error "Nope";\n')
+
+    with pytest.raises(RunnedCommandError) as excinfo:
+        list(compiler.compile_stream(source_structure / "scss/broken.scss"))
+    assert excinfo.value.error_payload["returncode"] == 65
+    assert excinfo.value.error_payload["stderr"].startswith("Error: Nope")
+    assert "Error: Nope" in excinfo.value.get_payload_details()
+
+    # Arguments are validated once generator is started
+    with pytest.raises(CommandArgumentsError):
+        compiler.compile_bytes(source_structure / "scss/nope.scss")
+
+
+def test_stream_timeout(fake_sass, source_structure):
+    """
+    Process is killed when timeout is reached.
+    """
+    compiler = DartSassCompiler(executable=fake_sass, command_timeout=0.5)
+    (source_structure / "scss/slow.scss").write_text("// sleep 5\n")
+
+    with pytest.raises(RunnedCommandError) as excinfo:
+        compiler.compile_bytes(source_structure / "scss/slow.scss")
+    assert excinfo.value.error_payload["timeout"] == 0.5
+
+
+def test_stream_close(fake_sass, source_structure):
+    """
+    Closing generator before the end of output kills process.
+    """
+    source = large_source(source_structure / "scss/large.scss", 200000)
+    collector = TimingsCollector()
+    compiler = DartSassCompiler(executable=fake_sass, hooks=[collector])
+
+    stream = compiler.compile_stream(source, chunk_size=1024)
+    next(stream)
+    stream.close()
+
+    summary = collector.get_summary()
+    assert summary["count"] == 1
+    assert summary["output_bytes"] < len(source.read_bytes())
+
+
+def test_spooled(fake_sass, source_structure):
+    """
+    Output is written to disk only above spool maximum size.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    source = large_source(source_structure / "scss/large.scss", 50000)
+
+    with compiler.compile_spooled(source) as spool:
+        assert spool._rolled is False
+        assert spool.read() == source.read_bytes()
+
+    with compiler.compile_spooled(source, max_size=10000) as spool:
+        assert spool._rolled is True
+        assert spool.read() == source.read_bytes()
+
+
+def test_cli(monkeypatch, fake_sass, source_structure):
+    """
+    Command compile writes output to stdout as it comes when there is no
+    destination.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    source = large_source(source_structure / "scss/large.scss", 200000)
+
+    result = CliRunner().invoke(cli_frontend, ["compile", str(source)])
+
+    assert result.exit_code == 0
+    assert result.stdout_bytes == source.read_bytes()
+
+    # Warnings are given to stderr apart from output
+    source.write_text('@warn "Careful";\n.foo { color: red; }\n')
+    result = CliRunner().invoke(cli_frontend, ["compile", str(source)])
+
+    assert result.exit_code == 0
+    assert result.stdout == source.read_text().strip() + "\n"
+    assert result.stderr.startswith("WARNING: Careful\n")
@@ -0,0 +1,268 @@
+import os
+
+import pytest
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+from flechette_insolente.compiler import (
+    ArgumentsModel, BuildManifest, CompileProfile, DartSassCompiler,
+    DependencyGraph, StatCache,
+)
+from flechette_insolente.exceptions import CommandArgumentsError
+
+
+def touch(path):
+    """
+    Change modification time of a file without changing its content.
+    """
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+
+def test_stat_cache(tmp_path):
+    """
+    Stats are memoized until invalidated and content is only hashed again when
+    stats change.
+    """
+    path = tmp_path / "foo.scss"
+    cache = StatCache()
+
+    assert cache.exists(path) is False
+    path.write_text("a")
+    assert cache.exists(path) is False
+
+    cache.invalidate(path)
+    assert cache.exists(path) is True
+    assert cache.is_file(path) is True
+    assert cache.is_file(tmp_path) is False
+
+    digest = cache.digest(path)
+    assert cache.digest(path) == digest
+    assert cache.hashed == 1
+
+    # A known record with the same stats is trusted
+    other = StatCache()
+    known = [str(path), *other.get_signature(path), "known"]
+    assert other.digest(path, known=known) == "known"
+    assert other.hashed == 0
+
+    touch(path)
+    other.invalidate(path)
+    assert other.digest(path, known=known) == digest
+    assert other.hashed == 1
+
+
+def test_validation(tmp_path):
+    """
+    Arguments validation checks existence through the stat cache.
+    """
+    source = tmp_path / "foo.scss"
+    cache = StatCache()
+    profile = CompileProfile(stat_cache=cache, load_path=[str(tmp_path)])
+
+    with pytest.raises(CommandArgumentsError):
+        ArgumentsModel(source, profile=profile)
+
+    # The missing source is memoized
+    source.write_text("a")
+    with pytest.raises(CommandArgumentsError):
+        ArgumentsModel(source, profile=profile)
+
+    assert ArgumentsModel(source).source == source
+
+
+def test_graph(source_structure):
+    """
+    Graph resolves imports through the stat cache.
+    """
+    cache = StatCache()
+    graph = DependencyGraph(stat_cache=cache).build([source_structure / "scss"])
+
+    assert graph.entrypoints == DependencyGraph().build(
+        [source_structure / "scss"]
+    ).entrypoints
+    assert len(cache._stats) > 0
+
+
+def test_manifest(fake_sass, source_structure):
+    """
+    Targets are up to date until one of their files or arguments change.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    source = source_structure / "scss/basic.scss"
+    destination = source_structure / "css/basic.css"
+    partial = source_structure / "scss/_vendor.scss"
+    partial.write_text(".vendor { color: red; }\n")
+    source.write_text('@import "vendor";\n.foo { color: blue; }\n')
+    pairs = [(source, destination)]
+
+    def build(**options):
+        manifest = BuildManifest.load(source_structure / "manifest.json")
+        profile = CompileProfile(stat_cache=manifest.stat_cache, **options)
+        stale, fresh = manifest.partition(pairs, profile)
+        results = compiler.compile_many(stale, **options)
+        results = list(manifest.update(results, profile))
+        manifest.save(source_structure / "manifest.json")
+        return manifest, results
+
+    manifest, results = build()
+    assert len(results) == 1
+    record = manifest.targets[str(destination)]
+    assert [item[0] for item in record["inputs"]] == [
+        str(source.resolve()), str(partial.resolve())
+    ]
+
+    manifest, results = build()
+    assert results == []
+    assert manifest.stat_cache.hashed == 0
+
+    # Same content with other stats is still up to date
+    touch(partial)
+    manifest, results = build()
+    assert results == []
+    assert manifest.stat_cache.hashed == 1
+    # The record stats have been refreshed
+    manifest, results = build()
+    assert manifest.stat_cache.hashed == 0
+
+    partial.write_text(".vendor { color: green; }\n")
+    manifest, results = build()
+    assert len(results) == 1
+
+    manifest, results = build(style="compressed")
+    assert len(results) == 1
+
+    destination.write_text("changed")
+    manifest, results = build(style="compressed")
+    assert len(results) == 1
+
+    destination.unlink()
+    manifest, results = build(style="compressed")
+    assert len(results) == 1
+    assert destination.exists() is True
+
+
+def test_manifest_failure(fake_sass, source_structure):
+    """
+    A failed target is forgotten.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    source = source_structure / "scss/basic.scss"
+    destination = source_structure / "css/basic.css"
+    manifest = BuildManifest()
+    profile = CompileProfile(stat_cache=manifest.stat_cache)
+
+    list(manifest.update(compiler.compile_many([(source, destination)]), profile))
+    assert str(destination) in manifest.targets
+
+    source.write_text('@error "Nope";\n')
+    manifest.stat_cache = StatCache()
+    profile = CompileProfile(stat_cache=manifest.stat_cache)
+    stale, fresh = manifest.partition([(source, destination)], profile)
+    assert stale == [(source, destination)]
+
+    list(manifest.update(compiler.compile_many(stale), profile))
+    assert manifest.targets == {}
+
+
+def test_manifest_changed_during_compile(fake_sass, source_structure):
+    """
+    Inputs are recorded as they were before compile, so a file changed during
+    compile makes its target stale.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    source = source_structure / "scss/basic.scss"
+    destination = source_structure / "css/basic.css"
+    manifest = BuildManifest()
+    profile = CompileProfile(stat_cache=manifest.stat_cache)
+
+    stale, fresh = manifest.partition([(source, destination)], profile)
+    # Source changes after the compile has read it
+    results = compiler.compile_many(stale)
+    source.write_text(source.read_text() + "\n.changed { color: red; }\n")
+    list(manifest.update(results, profile))
+    assert str(destination) in manifest.targets
+
+    manifest.stat_cache = StatCache()
+    profile = CompileProfile(stat_cache=manifest.stat_cache)
+    stale, fresh = manifest.partition([(source, destination)], profile)
+    assert stale == [(source, destination)]
+
+
+def test_load(tmp_path):
+    """
+    Records from another executable or an invalid file are ignored.
+    """
+    path = tmp_path / "manifest.json"
+    assert BuildManifest.load(path).targets == {}
+
+    manifest = BuildManifest(path, executable=["sass"])
+    manifest.targets = {"foo.css": {}}
+    manifest.save()
+
+    assert BuildManifest.load(path, executable=["sass"]).targets == {"foo.css": {}}
+    assert BuildManifest.load(path, executable=["other"]).targets == {}
+
+    path.write_text("nope")
+    assert BuildManifest.load(path).targets == {}
+
+
+def test_cli(caplog, monkeypatch, tmp_path, fake_sass, source_structure):
+    """
+    Command compile skips up to date targets with '--manifest'.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    log = tmp_path / "fake.log"
+    monkeypatch.setenv("FAKE_SASS_LOG", str(log))
+    css_bucket = source_structure / "css"
+    manifest = source_structure / "manifest.json"
+    runner = CliRunner()
+
+    args = [
+        "compile",
+        "--manifest", str(manifest),
+        "--jobs", "2",
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "a.css"
+        ),
+        "--pair", "{}:{}".format(
+            source_structure / "scss/basic.scss", css_bucket / "b.css"
+        ),
+    ]
+
+    result = runner.invoke(cli_frontend, args)
+    assert result.exit_code == 0
+    assert len(log.read_text().splitlines()) == 2
+    assert manifest.exists() is True
+
+    caplog.clear()
+    result = runner.invoke(cli_frontend, args)
+    assert result.exit_code == 0
+    assert len(log.read_text().splitlines()) == 2
+    assert caplog.record_tuples[-1][2] == "Skipped 2 up to date target(s)"
+
+    (source_structure / "scss/minimal.scss").write_text(".changed {}\n")
+    result = runner.invoke(cli_frontend, args)
+    assert result.exit_code == 0
+    assert len(log.read_text().splitlines()) == 3
+
+    # A single source works the same
+    single = [
+        "compile",
+        "--manifest", str(manifest),
+        str(source_structure / "scss/minimal.scss"),
+        str(css_bucket / "a.css"),
+    ]
+    result = runner.invoke(cli_frontend, single)
+    assert result.exit_code == 0
+    assert len(log.read_text().splitlines()) == 3
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--manifest", str(manifest),
+        str(source_structure / "scss/minimal.scss"),
+    ])
+    assert result.exit_code == 2
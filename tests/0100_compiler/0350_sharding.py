@@ -0,0 +1,213 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+from flechette_insolente.compiler import (
+    BuildManifest, merge_traces, partition_targets, select_shard,
+)
+from flechette_insolente.compiler.sharding import get_weights
+
+
+def test_partition():
+    """
+    Heaviest targets are spread first and targets keep their order in a shard.
+    """
+    targets = [("{}.scss".format(i), "{}.css".format(i)) for i in range(6)]
+    weights = [1, 8, 3, 5, 2, 4]
+
+    shards = partition_targets(targets, 2, weights)
+
+    assert shards == [
+        [("0.scss", "0.css"), ("1.scss", "1.css"), ("2.scss", "2.css")],
+        [("3.scss", "3.css"), ("4.scss", "4.css"), ("5.scss", "5.css")],
+    ]
+    assert partition_targets(targets, 8, weights)[7] == []
+
+
+def test_weights(tmp_path):
+    """
+    Weights come from durations with the mean for unknown targets, else from
+    source sizes.
+    """
+    (tmp_path / "a.scss").write_text("a" * 10)
+    (tmp_path / "b.scss").write_text("b" * 20)
+    targets = [
+        (tmp_path / "a.scss", tmp_path / "a.css"),
+        (tmp_path / "b.scss", tmp_path / "b.css"),
+        (tmp_path / "c.scss", tmp_path / "c.css"),
+    ]
+
+    assert get_weights(targets) == [10, 20, 0]
+    assert get_weights(targets, durations={
+        os.path.relpath(tmp_path / "a.css"): 1.0,
+        os.path.relpath(tmp_path / "c.css"): 3.0,
+    }) == [1.0, 2.0, 3.0]
+
+
+def test_select_shard(source_structure):
+    """
+    Every target is in one shard only, whatever the order of given targets.
+    """
+    css_bucket = source_structure / "css"
+    targets = [(source_structure / "scss", css_bucket)]
+    entrypoints = sorted(
+        [path.name for path in (source_structure / "scss").rglob("[!_]*.scss")]
+    )
+
+    shards = [select_shard(targets, index, 2) for index in (1, 2)]
+    assert sorted([source.name for shard in shards for source, _ in shard]) == (
+        entrypoints
+    )
+    assert all([shard for shard in shards])
+    assert select_shard(list(reversed(targets * 2)), 1, 2) == shards[0]
+
+    # Durations take precedence over sizes
+    durations = {
+        os.path.relpath(destination): 100.0 if source.name == "minimal.scss" else 1.0
+        for shard in shards
+        for source, destination in shard
+    }
+    shard = select_shard(targets, 1, 2, durations=durations)
+    assert [source.name for source, _ in shard] == ["minimal.scss"]
+
+
+def test_select_shard_nodes(monkeypatch, tmp_path, fake_sass, source_structure):
+    """
+    Nodes with the build in other directories and with other executables select
+    complementary shards from the same manifest.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    for name in ("a", "b", "c"):
+        (source_structure / "scss/{}.scss".format(name)).write_text(
+            ".{} {{ color: red; }}\n".format(name)
+        )
+    roots = [tmp_path / "node-1", tmp_path / "node-2"]
+    for root in roots:
+        shutil.copytree(source_structure, root)
+    manifest_path = tmp_path / "manifest.json"
+    targets = [("scss", "css")]
+
+    # Manifest is built from the first node
+    monkeypatch.chdir(roots[0])
+    result = CliRunner().invoke(cli_frontend, [
+        "compile", "--shard", "1/1", "--manifest", str(manifest_path),
+        "--pair", "scss:css",
+    ])
+    assert result.exit_code == 0
+
+    # Durations make a partition which differs from the one with source sizes
+    data = json.loads(manifest_path.read_text())
+    data["durations"] = {
+        key: 100.0 if key.endswith("minimal.css") else 1.0
+        for key in data["durations"]
+    }
+    manifest_path.write_text(json.dumps(data))
+
+    shards = []
+    executables = [data["executable"], ["other"]]
+    for index, (root, executable) in enumerate(zip(roots, executables)):
+        monkeypatch.chdir(root)
+        manifest = BuildManifest.load(manifest_path, executable=executable)
+        shard = select_shard(targets, index + 1, 2, manifest.get_durations())
+        shards.append(sorted([source.relative_to(root) for source, _ in shard]))
+
+    assert shards[0] == [Path("scss/minimal.scss")]
+    assert sorted(shards[0] + shards[1]) == sorted([
+        path.relative_to(source_structure)
+        for path in (source_structure / "scss").rglob("[!_]*.scss")
+    ])
+
+
+def test_merge_traces():
+    """
+    Each trace becomes a named process of the merged trace.
+    """
+    trace = {"traceEvents": [{"name": "target", "ph": "X", "pid": 1, "tid": 1}]}
+
+    merged = merge_traces([trace, trace], names=["a", "b"])
+
+    assert [(item["name"], item["pid"]) for item in merged["traceEvents"]] == [
+        ("process_name", 1), ("target", 1), ("process_name", 2), ("target", 2),
+    ]
+    assert merged["traceEvents"][2]["args"] == {"name": "b"}
+
+
+def test_cli(monkeypatch, tmp_path, fake_sass, source_structure):
+    """
+    Command compile only builds its shard with '--shard' and manifests or traces of
+    shards are merged with command merge.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    css_bucket = source_structure / "css"
+    runner = CliRunner()
+
+    def build(index, *args):
+        return runner.invoke(cli_frontend, [
+            "compile",
+            "--shard", "{}/2".format(index),
+            "--manifest", str(tmp_path / "manifest-{}.json".format(index)),
+            "--trace", str(tmp_path / "trace-{}.json".format(index)),
+            "--pair", "{}:{}".format(source_structure / "scss", css_bucket),
+            *args,
+        ])
+
+    assert build(1).exit_code == 0
+    first = sorted(css_bucket.rglob("*.css"))
+    assert len(first) > 0
+    assert build(2).exit_code == 0
+    second = sorted(set(css_bucket.rglob("*.css")) - set(first))
+    assert len(second) > 0
+
+    result = runner.invoke(cli_frontend, [
+        "merge",
+        "--output", str(tmp_path / "manifest.json"),
+        str(tmp_path / "manifest-1.json"),
+        str(tmp_path / "manifest-2.json"),
+    ])
+    assert result.exit_code == 0
+    manifest = BuildManifest.load(
+        tmp_path / "manifest.json",
+        executable=json.loads(
+            (tmp_path / "manifest-1.json").read_text()
+        )["executable"],
+    )
+    assert sorted(manifest.targets) == [str(path) for path in first + second]
+    assert sorted(manifest.get_durations()) == [
+        os.path.relpath(path) for path in first + second
+    ]
+
+    result = runner.invoke(cli_frontend, [
+        "merge",
+        "--output", str(tmp_path / "trace.json"),
+        str(tmp_path / "trace-1.json"),
+        str(tmp_path / "trace-2.json"),
+    ])
+    assert result.exit_code == 0
+    names = [
+        item["args"]["name"]
+        for item in json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        if item["name"] == "process_name"
+    ]
+    assert names == ["trace-1", "trace-2"]
+
+    # Mixed kinds of files
+    result = runner.invoke(cli_frontend, [
+        "merge",
+        "--output", str(tmp_path / "nope.json"),
+        str(tmp_path / "trace-1.json"),
+        str(tmp_path / "manifest-1.json"),
+    ])
+    assert result.exit_code == 2
+
+    assert build(3).exit_code == 2
+    assert runner.invoke(cli_frontend, [
+        "compile", "--shard", "1/2", str(source_structure / "scss/minimal.scss"),
+    ]).exit_code == 2
@@ -0,0 +1,235 @@
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+from flechette_insolente.compiler import (
+    CompileHistory, CompileResult, DartSassCompiler, ParallelExecutor,
+    get_history_path,
+)
+
+
+def build(history, *results):
+    """
+    Record a build from given ``(source, destination, duration)`` tuples.
+    """
+    return list(history.update([
+        CompileResult(source, destination, output="", duration=duration)
+        for source, destination, duration in results
+    ]))
+
+
+def test_history_path(monkeypatch, tmp_path):
+    """
+    Default store is in the user cache directory.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert get_history_path() == tmp_path / "flechette-insolente/history.sqlite3"
+
+
+def test_trends(tmp_path):
+    """
+    Latest compile of each target is compared to the mean of its previous ones.
+    """
+    path = tmp_path / "store/history.sqlite3"
+    cwd = Path.cwd()
+
+    with CompileHistory(path) as history:
+        build(history, ("a.scss", "a.css", 1.0), ("b.scss", "b.css", 2.0))
+        build(history, ("a.scss", "a.css", 3.0), ("b.scss", "b.css", 2.0))
+
+    with CompileHistory(path, window=1) as history:
+        build(history, ("a.scss", "a.css", 6.0), ("b.scss", "b.css", 1.0))
+        build(history, ("c.scss", None, None))
+
+        trends = {item["target"]: item for item in history.get_trends()}
+        assert list(trends) == [
+            str(cwd / "a.css"),
+            str(cwd / "b.css"),
+            str(cwd / "c.scss"),
+        ]
+
+        a = trends[str(cwd / "a.css")]
+        assert (a["count"], a["duration"], a["previous"], a["change"]) == (
+            3, 6.0, 3.0, 1.0
+        )
+        assert a["regression"] is True
+        assert a["output_size"] is None
+
+        b = trends[str(cwd / "b.css")]
+        assert (b["change"], b["regression"]) == (-0.5, False)
+
+        c = trends[str(cwd / "c.scss")]
+        assert (c["duration"], c["change"], c["output_size"]) == (None, None, 0)
+
+        history.MAX_RECORDS = 1
+        history.prune()
+        assert history.get_durations() == {
+            str(cwd / "a.css"): [6.0],
+            str(cwd / "b.css"): [1.0],
+        }
+
+
+def test_scheduling():
+    """
+    Longest targets come first, unknown ones before them, and timeouts follow the
+    slowest known durations.
+    """
+    history = CompileHistory()
+    history.MINIMUM_TIMEOUT = 1
+    build(history, ("a.scss", "a.css", 0.1), ("b.scss", "b.css", 2.0))
+    build(history, ("a.scss", "a.css", 0.3), ("b.scss", "b.css", 1.0))
+
+    targets = [("a.scss", "a.css"), ("b.scss", "b.css"), ("c.scss", "c.css")]
+    assert history.sort_targets(targets) == [
+        ("c.scss", "c.css"), ("b.scss", "b.css"), ("a.scss", "a.css"),
+    ]
+    assert history.get_estimates(targets) == {
+        history.get_key("a.scss", "a.css"): 0.2,
+        history.get_key("b.scss", "b.css"): 1.5,
+    }
+    assert history.get_timeouts(targets) == {
+        history.get_key("a.scss", "a.css"): 1.5,
+        history.get_key("b.scss", "b.css"): 10.0,
+    }
+
+    # Keys of targets are given by chunks to queries
+    history.QUERY_KEYS = 1
+    assert history.get_timeouts(targets) == {
+        history.get_key("a.scss", "a.css"): 1.5,
+        history.get_key("b.scss", "b.css"): 10.0,
+    }
+    history.QUERY_KEYS = CompileHistory.QUERY_KEYS
+
+    # Timeouts are never lower than the given minimum
+    assert history.get_timeouts(targets, minimum=5) == {
+        history.get_key("a.scss", "a.css"): 5,
+        history.get_key("b.scss", "b.css"): 10.0,
+    }
+
+    # A failure, like a timeout, widens the timeout but not the estimate
+    list(history.update([
+        CompileResult("a.scss", "a.css", error=Exception("Nope"), duration=1.5),
+    ]))
+    assert history.get_timeouts(targets)[history.get_key("a.scss", "a.css")] == 7.5
+    assert history.get_estimates(targets)[history.get_key("a.scss", "a.css")] == 0.2
+
+
+def test_override_timeout(fake_sass, source_structure):
+    """
+    Timeout can be changed for executions from the current thread only.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+
+    with compiler.override_timeout(2):
+        assert compiler.get_timeout() == 2
+        with compiler.override_timeout(None):
+            assert compiler.get_timeout() == compiler.DEFAULT_COMMAND_TIMEOUT
+        assert compiler.get_timeout() == 2
+    assert compiler.get_timeout() == compiler.DEFAULT_COMMAND_TIMEOUT
+
+
+def test_parallel(fake_sass, source_structure):
+    """
+    Executor starts the longest targets first and kills a target above its
+    timeout from history.
+    """
+    css_bucket = source_structure / "css"
+    slow = source_structure / "scss/slow.scss"
+    slow.write_text("// sleep 5\n")
+    minimal = source_structure / "scss/minimal.scss"
+    compiler = DartSassCompiler(executable=fake_sass, command_timeout=0.3)
+    history = CompileHistory()
+    history.MINIMUM_TIMEOUT = 0
+    build(
+        history,
+        (minimal, css_bucket / "a.css", 0.01),
+        (minimal, css_bucket / "b.css", 0.02),
+        (slow, css_bucket / "slow.css", 0.1),
+    )
+
+    results = list(history.update(ParallelExecutor(
+        compiler,
+        jobs=1,
+        history=history,
+    ).run([
+        (minimal, css_bucket / "a.css"),
+        (minimal, css_bucket / "b.css"),
+        (slow, css_bucket / "slow.css"),
+    ])))
+
+    assert [item.destination.name for item in results] == [
+        "slow.css", "b.css", "a.css",
+    ]
+    assert results[0].error.error_payload["timeout"] == 0.5
+    assert [item.success for item in results] == [False, True, True]
+
+    # Failed compiles are recorded but do not count in estimates, only in timeouts
+    # which never go below the compiler one
+    assert history.get_durations()[str(css_bucket / "slow.css")] == [0.1]
+    timeouts = history.get_timeouts(minimum=compiler.command_timeout)
+    assert timeouts[str(css_bucket / "a.css")] == 0.3
+    assert timeouts[str(css_bucket / "slow.css")] >= 2.5
+    assert history.get_trends()[0]["output_size"] > 0
+
+
+def test_cli(monkeypatch, tmp_path, fake_sass, source_structure):
+    """
+    Builds are recorded in history and command stats reports their trends.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    css_bucket = source_structure / "css"
+    path = tmp_path / "history.sqlite3"
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, ["stats", "--history", str(path)])
+    assert result.exit_code == 1
+
+    for i in range(2):
+        result = runner.invoke(cli_frontend, [
+            "compile",
+            "--history", str(path),
+            "--jobs", "2",
+            "--pair", "{}:{}".format(
+                source_structure / "scss/minimal.scss", css_bucket / "a.css"
+            ),
+            "--pair", "{}:{}".format(
+                source_structure / "scss/basic.scss", css_bucket / "b.css"
+            ),
+        ])
+        assert result.exit_code == 0
+
+    result = runner.invoke(cli_frontend, [
+        "stats", "--history", str(path), "--format", "json",
+    ])
+    assert result.exit_code == 0
+    trends = json.loads(result.output)
+    assert sorted([item["target"] for item in trends]) == [
+        str(css_bucket / "a.css"), str(css_bucket / "b.css"),
+    ]
+    assert all([item["count"] == 2 for item in trends])
+    assert all([item["change"] is not None for item in trends])
+
+    result = runner.invoke(cli_frontend, ["stats", "--history", str(path)])
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == 2
+
+    # No regression can be found with a threshold that high
+    result = runner.invoke(cli_frontend, [
+        "stats", "--history", str(path), "--regressions", "--threshold", "1000",
+    ])
+    assert result.exit_code == 0
+    assert result.output == ""
+
+    # Default store is used without '--history'
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "a.css"
+        ),
+    ])
+    assert result.exit_code == 0
+    assert get_history_path().exists() is True
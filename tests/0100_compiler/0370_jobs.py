@@ -0,0 +1,175 @@
+import json
+import threading
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.compile import compile_jobs
+from flechette_insolente.cli.entrypoint import cli_frontend
+from flechette_insolente.compiler import (
+    CompileHistory, CompileJob, CompileResult, DartSassCompiler, ParallelExecutor,
+    read_jobs,
+)
+from flechette_insolente.exceptions import CommandArgumentsError
+
+
+def test_read_jobs():
+    """
+    Jobs get their options from specification or defaults and invalid lines give a
+    job with its error.
+    """
+    jobs = list(read_jobs(
+        [
+            '{"id": 1, "source": "a.scss", "destination": "a.css", '
+            '"load_paths": ["lib"]}\n',
+            "\n",
+            "nope\n",
+            '{"id": "x", "source": "b.scss", "nope": true}\n',
+            '{"source": 42}\n',
+            "[1]\n",
+        ],
+        defaults={"style": "compressed", "load_path": ["other"]},
+    ))
+
+    assert (jobs[0].id, jobs[0].source, jobs[0].destination) == (1, "a.scss", "a.css")
+    assert jobs[0].options == {"style": "compressed", "load_path": ["lib"]}
+    assert jobs[0].error is None
+
+    assert all([isinstance(job.error, CommandArgumentsError) for job in jobs[1:]])
+    assert str(jobs[1].error).startswith("Invalid job on line 3:")
+    assert (jobs[2].id, jobs[2].source) == ("x", "b.scss")
+    assert str(jobs[2].error) == "Invalid job on line 4: Unknown job key(s): nope"
+    assert str(jobs[3].error) == "Invalid job on line 5: Job source must be a path."
+    assert str(jobs[4].error) == "Invalid job on line 6: Job must be a JSON object."
+
+
+def test_run_jobs(fake_sass, source_structure):
+    """
+    Results are yielded while waiting for the next job.
+    """
+    compiler = DartSassCompiler(executable=fake_sass)
+    minimal = str(source_structure / "scss/minimal.scss")
+    received = threading.Event()
+    waited = []
+
+    def get_jobs():
+        yield CompileJob(minimal, id=1)
+        # Next job only comes once the first result has been received
+        waited.append(received.wait(timeout=10))
+        yield CompileJob(minimal, id=2, options={"style": "nope"})
+        yield CompileJob(None, id=3, error=CommandArgumentsError("Nope"))
+
+    results = []
+    for job, result in ParallelExecutor(compiler, jobs=2).run_jobs(get_jobs()):
+        results.append((job.id, result))
+        received.set()
+
+    assert waited == [True]
+    assert sorted([(job_id, result.success) for job_id, result in results]) == [
+        (1, True), (2, False), (3, False),
+    ]
+    assert results[0][0] == 1
+    assert results[0][1].output == (
+        (source_structure / "scss/minimal.scss").read_text().strip()
+    )
+
+
+def test_jobs_timeout(monkeypatch, fake_sass, source_structure):
+    """
+    Job timeout from history is never lower than the compiler one.
+    """
+    compiler = DartSassCompiler(executable=fake_sass, command_timeout=20)
+    minimal = source_structure / "scss/minimal.scss"
+    slow = source_structure / "scss/slow.scss"
+    slow.write_text(".slow { color: red; }\n")
+    history = CompileHistory()
+    history.MINIMUM_TIMEOUT = 0
+    list(history.update([
+        CompileResult(minimal, None, output="", duration=0.01),
+        CompileResult(slow, None, output="", duration=10.0),
+    ]))
+
+    timeouts = {}
+    compile_target = ParallelExecutor.compile_target
+
+    def spy(self, source, destination, options, timeout=None):
+        timeouts[source] = timeout
+        return compile_target(self, source, destination, options, timeout=timeout)
+
+    monkeypatch.setattr(ParallelExecutor, "compile_target", spy)
+
+    failures = compile_jobs(
+        compiler,
+        [json.dumps({"source": str(path)}) + "\n" for path in (minimal, slow)],
+        {},
+        jobs=1,
+        history=history,
+    )
+
+    assert failures == 0
+    assert timeouts == {str(minimal): 20, str(slow): 50.0}
+
+
+def test_cli(monkeypatch, tmp_path, fake_sass, source_structure):
+    """
+    Command compile reads jobs from standard input and writes a JSON line for each
+    result.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    (source_structure / "scss/broken.scss").write_text('@error "Nope";\n')
+    css_bucket = source_structure / "css"
+    history = tmp_path / "history.sqlite3"
+    lines = [
+        {
+            "id": "a",
+            "source": str(source_structure / "scss/minimal.scss"),
+            "destination": str(css_bucket / "a.css"),
+        },
+        {
+            "id": "b",
+            "source": str(source_structure / "scss/minimal.scss"),
+            "style": "compressed",
+        },
+        {
+            "id": "c",
+            "source": str(source_structure / "scss/broken.scss"),
+            "destination": str(css_bucket / "c.css"),
+        },
+    ]
+    content = "".join([json.dumps(item) + "\n" for item in lines]) + "nope\n"
+
+    result = CliRunner().invoke(
+        cli_frontend,
+        ["compile", "--jobs-from", "-", "--jobs", "2", "--history", str(history)],
+        input=content,
+    )
+
+    assert result.exit_code == 1
+    results = {
+        item["id"]: item
+        for item in [json.loads(line) for line in result.stdout.splitlines()]
+    }
+    assert sorted(results, key=str) == [None, "a", "b", "c"]
+
+    assert results["a"]["success"] is True
+    assert results["a"]["output_size"] == (css_bucket / "a.css").stat().st_size
+    assert results["a"]["duration"] > 0
+    assert results["b"]["output"] == DartSassCompiler(executable=fake_sass).compile(
+        source_structure / "scss/minimal.scss", style="compressed"
+    )
+    assert results["c"]["success"] is False
+    assert results["c"]["error_payload"]["returncode"] == 65
+    assert results["c"]["output_size"] is None
+    assert results[None]["error"].startswith("Invalid job on line 4:")
+
+    # Compiled jobs have been recorded, stats only report the successful ones
+    result = CliRunner().invoke(cli_frontend, [
+        "stats", "--history", str(history), "--format", "json",
+    ])
+    assert len(json.loads(result.stdout)) == 2
+
+    result = CliRunner().invoke(cli_frontend, [
+        "compile", "--jobs-from", "-", str(source_structure / "scss/minimal.scss"),
+    ], input="")
+    assert result.exit_code == 2
@@ -0,0 +1,13 @@
+from flechette_insolente.benchmarks.arguments import benchmark_arguments
+
+
+def test_benchmark_arguments():
+    """
+    Benchmark returns a per-target duration for each way to build arguments.
+    """
+    results = benchmark_arguments(number=10, repeat=1)
+
+    assert results["number"] == 10
+    assert results["model"] > 0
+    assert results["profile"] > 0
+    assert results["profile_setup"] > 0
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+
+import pytest
+
+from flechette_insolente.benchmarks import simulated_sass
+from flechette_insolente.benchmarks.suite import (
+    BenchmarkSuite, compare_results, get_percentile, get_statistics, load_results,
+    save_results,
+)
+
+
+def test_get_percentile():
+    """
+    Percentiles are interpolated between the nearest durations.
+    """
+    assert get_percentile([], 50) is None
+    assert get_percentile([1.0], 99) == 1.0
+    assert get_percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert get_percentile([1.0, 2.0, 3.0, 4.0], 100) == 4.0
+
+
+def test_get_statistics():
+    """
+    Throughput is computed from the sum of durations or the given elapsed time.
+    """
+    stats = get_statistics([0.3, 0.1, 0.2, 0.4])
+    assert stats["count"] == 4
+    assert stats["min"] == 0.1
+    assert stats["max"] == 0.4
+    assert stats["p50"] == pytest.approx(0.25)
+    assert stats["throughput"] == pytest.approx(4.0)
+
+    stats = get_statistics([0.3, 0.1, 0.2, 0.4], elapsed=0.5)
+    assert stats["throughput"] == pytest.approx(8.0)
+
+
+def test_compare_results():
+    """
+    Only the benchmarks slower than baseline with tolerance are regressions.
+    """
+    baseline = {"benchmarks": {
+        "spawn": {"p50": 0.010, "p90": 0.020},
+        "compile": {"p50": 0.010, "p90": 0.020},
+    }}
+    results = {"benchmarks": {
+        "spawn": {"p50": 0.012, "p90": 0.030},
+        "compile": {"p50": 0.020, "p90": 0.020},
+        "parallel": {"p50": 0.020, "p90": 0.020},
+    }}
+
+    regressions = compare_results(results, baseline, tolerance=0.25)
+    assert [item["name"] for item in regressions] == ["compile"]
+    assert regressions[0]["ratio"] == pytest.approx(2.0)
+
+    regressions = compare_results(results, baseline, tolerance=0.25, metric="p90")
+    assert [item["name"] for item in regressions] == ["spawn"]
+
+
+def test_simulated_sass(tmp_path):
+    """
+    Simulated executable writes CSS of given size to destinations or standard
+    output.
+    """
+    assert len(simulated_sass.generate_css(1000)) == 1000
+
+    cmd = [
+        sys.executable, simulated_sass.__file__,
+        "--simulate-size", "500",
+    ]
+
+    result = subprocess.run(
+        cmd + ["--version"], capture_output=True, text=True, check=True,
+    )
+    assert result.stdout == simulated_sass.VERSION + "\n"
+
+    result = subprocess.run(
+        cmd + ["--style", "compressed", "main.scss"],
+        capture_output=True, text=True, check=True,
+    )
+    assert len(result.stdout) == 500
+
+    subprocess.run(
+        cmd + [
+            "a.scss:{}".format(tmp_path / "a.css"),
+            "b.scss:{}".format(tmp_path / "b.css"),
+            "--load-path", "foo",
+        ],
+        check=True,
+    )
+    assert len((tmp_path / "a.css").read_text()) == 500
+    assert len((tmp_path / "b.css").read_text()) == 500
+
+
+def test_suite_run(tmp_path):
+    """
+    Suite runs benchmarks and its results can be saved and loaded back.
+    """
+    done = []
+    suite = BenchmarkSuite(iterations=2, output_size=100, jobs=2)
+
+    results = suite.run(
+        names=["profile", "capture", "parallel"],
+        callback=lambda name, stats: done.append(name),
+    )
+
+    assert done == ["profile", "capture", "parallel"]
+    assert results["settings"]["iterations"] == 2
+    assert results["benchmarks"]["parallel"]["count"] == 2
+    assert results["benchmarks"]["capture"]["p50"] > 0
+
+    save_results(results, tmp_path / "results.json")
+    assert load_results(tmp_path / "results.json")["benchmarks"] == (
+        results["benchmarks"]
+    )
@@ -0,0 +1,69 @@
+import pytest
+
+from flechette_insolente.benchmarks.generator import ProjectGenerator
+from flechette_insolente.compiler import DependencyGraph
+
+
+def read_tree(directory):
+    return {
+        str(path.relative_to(directory)): path.read_text()
+        for path in sorted(directory.rglob("*.scss"))
+    }
+
+
+def test_get_levels():
+    """
+    Partials are spread evenly on levels.
+    """
+    assert ProjectGenerator(partials=10, depth=3).get_levels() == [4, 3, 3]
+    assert ProjectGenerator(partials=1, depth=3).get_levels() == [1, 1, 1]
+
+    with pytest.raises(ValueError):
+        ProjectGenerator(depth=0)
+
+
+def test_generate(tmp_path):
+    """
+    Every generated partial is reachable from entrypoints and imports are resolved,
+    including the ones from load paths.
+    """
+    generator = ProjectGenerator(
+        entrypoints=4,
+        partials=30,
+        fanout=3,
+        depth=3,
+        load_paths=2,
+        output_size=100,
+    )
+    summary = generator.generate(tmp_path)
+
+    assert len(summary["entrypoints"]) == 4
+    assert summary["files"] == 34
+    assert summary["size"] == sum([
+        len(content) for content in read_tree(tmp_path).values()
+    ])
+
+    graph = DependencyGraph(load_paths=summary["load_paths"])
+    graph.build([summary["sources"]])
+
+    assert len(graph.entrypoints) == 4
+    assert len(graph.files) == 34
+    assert [
+        key for key, record in graph.files.items() if record["unresolved"]
+    ] == []
+
+    # Last level is in load paths
+    assert len(list(summary["load_paths"][0].rglob("*.scss"))) == 5
+    assert len(list(summary["load_paths"][1].rglob("*.scss"))) == 5
+
+
+def test_generate_reproducible(tmp_path):
+    """
+    A same seed produces the same project and another one changes imports.
+    """
+    ProjectGenerator(partials=20, seed=1).generate(tmp_path / "first")
+    ProjectGenerator(partials=20, seed=1).generate(tmp_path / "second")
+    ProjectGenerator(partials=20, seed=2).generate(tmp_path / "third")
+
+    assert read_tree(tmp_path / "first") == read_tree(tmp_path / "second")
+    assert read_tree(tmp_path / "first") != read_tree(tmp_path / "third")
@@ -1,3 +1,7 @@
+import json
+import logging
+import subprocess
+
 import pytest
 
 from click.testing import CliRunner
@@ -45,3 +49,255 @@ def test_compile_basic(caplog):
 
     # Empty logs is expected
     assert caplog.record_tuples == []
+
+
+def test_compile_pairs(caplog, monkeypatch, fake_sass, source_structure):
+    """
+    Many pairs are compiled at once and each target status is reported.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    css_bucket = source_structure / "css"
+    (source_structure / "scss/broken.scss").write_text('@error "Nope";\n')
+
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "minimal.css"
+        ),
+        "--pair", "{}:{}".format(
+            source_structure / "scss/broken.scss", css_bucket / "broken.css"
+        ),
+    ])
+
+    assert result.exit_code == 1
+    assert (css_bucket / "minimal.css").exists() is True
+    assert [(name, level) for name, level, msg in caplog.record_tuples] == [
+        ("flechette-insolente", logging.INFO),
+        ("flechette-insolente", logging.ERROR),
+        ("flechette-insolente", logging.INFO),
+    ]
+    assert caplog.record_tuples[-1][2].startswith("Resources: 1 process(es)")
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "minimal.css"
+        ),
+        str(source_structure / "scss/minimal.scss"),
+    ])
+    assert result.exit_code == 2
+
+
+def test_compile_pairs_jobs(caplog, monkeypatch, fake_sass, source_structure):
+    """
+    Pairs are compiled concurrently when jobs are given.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    css_bucket = source_structure / "css"
+
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--jobs", "2",
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "a.css"
+        ),
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "b.css"
+        ),
+    ])
+
+    assert result.exit_code == 0
+    assert sorted(css_bucket.iterdir()) == [
+        css_bucket / "a.css",
+        css_bucket / "a.css.map",
+        css_bucket / "b.css",
+        css_bucket / "b.css.map",
+    ]
+
+
+def test_compile_watch_destination(source_structure):
+    """
+    Watch mode requires a destination since there is no output to print.
+    """
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--watch",
+        str(source_structure / "scss/minimal.scss"),
+    ])
+
+    assert result.exit_code == 2
+    assert "A destination is required with '--watch'." in result.output
+
+
+def test_compile_timings(monkeypatch, fake_sass, source_structure):
+    """
+    Timings summary is printed once compile is finished.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--timings",
+        str(source_structure / "scss/minimal.scss"),
+    ])
+
+    assert result.exit_code == 0
+    assert "Timings for 1 execution(s), 0 failed, 0 timed out" in result.output
+    assert "  spawn: total=" in result.output
+
+
+def test_compile_metrics(monkeypatch, fake_sass, source_structure):
+    """
+    Metrics are written once compile is finished.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    metrics = source_structure / "metrics.prom"
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--metrics", str(metrics),
+        str(source_structure / "scss/minimal.scss"),
+    ])
+
+    assert result.exit_code == 0
+    assert "flechette_insolente_compiles_total 1\n" in metrics.read_text()
+
+
+def test_compile_trace(monkeypatch, fake_sass, source_structure):
+    """
+    Trace is written once compile is finished.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    css_bucket = source_structure / "css"
+    trace = source_structure / "build.json"
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--jobs", "2",
+        "--trace", str(trace),
+        "--pair", "{}:{}".format(
+            source_structure / "scss/minimal.scss", css_bucket / "minimal.css"
+        ),
+    ])
+
+    assert result.exit_code == 0
+    names = [item["name"] for item in json.loads(trace.read_text())["traceEvents"]]
+    assert "target" in names
+    assert "run" in names
+
+
+def test_compile_adaptive(monkeypatch, fake_sass, source_structure):
+    """
+    Adaptive concurrency requires jobs.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    css_bucket = source_structure / "css"
+    pair = "{}:{}".format(
+        source_structure / "scss/minimal.scss", css_bucket / "minimal.css"
+    )
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, ["compile", "--adaptive", "--pair", pair])
+    assert result.exit_code == 2
+    assert "Option '--adaptive' requires '--jobs'." in result.output
+
+    result = runner.invoke(cli_frontend, [
+        "compile",
+        "--jobs", "2",
+        "--adaptive",
+        "--memory-limit", "2048",
+        "--cpu-limit", "10",
+        "--pair", pair,
+    ])
+    assert result.exit_code == 0
+    assert (css_bucket / "minimal.css").exists() is True
+
+
+def test_compile_changed_since(caplog, monkeypatch, fake_sass, source_structure):
+    """
+    Only targets affected by changes since a revision are compiled.
+    """
+    monkeypatch.setattr(
+        "flechette_insolente.plateform_build.DART_SASS_EXEC", fake_sass
+    )
+    monkeypatch.chdir(source_structure)
+    for args in (
+        ["init", "-q"],
+        ["add", "."],
+        ["commit", "-q", "-m", "Initial"],
+    ):
+        subprocess.run(
+            [
+                "git",
+                "-c", "user.name=Tester",
+                "-c", "user.email=tester@example.com",
+            ] + args,
+            check=True,
+            capture_output=True,
+        )
+
+    css_bucket = source_structure / "css"
+    args = [
+        "compile",
+        "--changed-since", "HEAD",
+        "--load-path", "libraries",
+        "scss",
+        "css",
+    ]
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, args)
+    assert result.exit_code == 0
+    assert caplog.record_tuples[-1][2] == "No target affected by changes since HEAD"
+    assert css_bucket.exists() is False
+
+    (source_structure / "libraries/addons/_addon_lib.scss").write_text(
+        "@mixin addon_tool { color: blue; }\n"
+    )
+    result = runner.invoke(cli_frontend, args)
+    assert result.exit_code == 0
+    assert sorted(css_bucket.iterdir()) == [
+        css_bucket / "basic.css",
+        css_bucket / "basic.css.map",
+    ]
+
+    # A removed partial is detected from the sources which still load it
+    for path in css_bucket.iterdir():
+        path.unlink()
+    (source_structure / "libraries/addons/_addon_lib.scss").unlink()
+    result = runner.invoke(cli_frontend, args)
+    assert result.exit_code == 0
+    assert sorted(css_bucket.iterdir()) == [
+        css_bucket / "basic.css",
+        css_bucket / "basic.css.map",
+    ]
+
+    result = runner.invoke(cli_frontend, args[:-1])
+    assert result.exit_code == 2
+
+    result = runner.invoke(
+        cli_frontend,
+        ["compile", "--changed-since", "nope"] + args[3:],
+    )
+    assert result.exit_code == 1
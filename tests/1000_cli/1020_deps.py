@@ -0,0 +1,41 @@
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+
+
+def test_deps_text(monkeypatch, source_structure):
+    """
+    Default output lists every entrypoint with its dependencies.
+    """
+    monkeypatch.chdir(source_structure)
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, ["deps", "scss"])
+
+    assert result.exit_code == 0
+    assert result.output == "\n".join([
+        "scss/basic.scss",
+        "    scss/_settings.scss",
+        "    addons/addon_lib (unresolved)",
+        "scss/minimal.scss",
+        "",
+    ])
+
+
+def test_deps_dependents(monkeypatch, source_structure, tmp_path):
+    """
+    With dependents, only affected entrypoints are output and graph is saved.
+    """
+    monkeypatch.chdir(source_structure)
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "deps", "scss",
+        "--load-path", "libraries",
+        "--graph-file", str(tmp_path / "graph.json"),
+        "--dependents", "libraries/addons/_addon_lib.scss",
+    ])
+
+    assert result.exit_code == 0
+    assert result.output == "scss/basic.scss\n"
+    assert (tmp_path / "graph.json").exists() is True
@@ -0,0 +1,93 @@
+import json
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+
+
+def get_loaded_modules(code):
+    """
+    Run Python code in a new interpreter and returns the modules it has loaded.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            code + "\nimport json, sys; print(json.dumps(sorted(sys.modules)))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_entrypoint_startup():
+    """
+    Loading the CLI does not load commands, compiler, package metadata or the
+    dart-sass executable path.
+    """
+    modules = get_loaded_modules("import flechette_insolente.cli.entrypoint")
+
+    assert modules.isdisjoint({
+        "asyncio",
+        "colorlog",
+        "flechette_insolente.cli.compile",
+        "flechette_insolente.cli.version",
+        "flechette_insolente.compiler",
+        "flechette_insolente.plateform_build",
+        "importlib.metadata",
+    })
+
+
+def test_version_startup():
+    """
+    Command version does not load compiler.
+    """
+    modules = get_loaded_modules(
+        "from flechette_insolente.cli.entrypoint import cli_frontend\n"
+        "cli_frontend(['-v', '0', 'version'], standalone_mode=False)"
+    )
+
+    assert "flechette_insolente.cli.version" in modules
+    assert modules.isdisjoint({
+        "asyncio",
+        "flechette_insolente.compiler",
+        "flechette_insolente.plateform_build",
+    })
+
+
+def test_compiler_startup():
+    """
+    Compiler objects are imported from their module on first access and the
+    executable path is not resolved before a command is built.
+    """
+    modules = get_loaded_modules(
+        "from flechette_insolente.compiler import DartSassCompiler\n"
+        "import flechette_insolente.plateform_build as build\n"
+        "assert 'DART_SASS_EXEC' not in vars(build)"
+    )
+
+    assert "flechette_insolente.compiler.compiler" in modules
+    assert modules.isdisjoint({
+        "asyncio",
+        "ctypes",
+        "flechette_insolente.compiler.asynchronous",
+        "flechette_insolente.compiler.embedded",
+    })
+
+
+def test_lazy_commands():
+    """
+    Every command is still listed in help.
+    """
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, ["--help"])
+
+    assert result.exit_code == 0
+    for name in ("compile", "deps", "execdev", "version"):
+        assert name in result.output
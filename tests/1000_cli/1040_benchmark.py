@@ -0,0 +1,65 @@
+import json
+
+from click.testing import CliRunner
+
+from flechette_insolente.cli.entrypoint import cli_frontend
+
+
+def test_benchmark_run(tmp_path):
+    """
+    Results are output and saved, command fails on a regression from baseline.
+    """
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "benchmark", "run",
+        "--name", "arguments",
+        "--name", "spawn",
+        "--iterations", "2",
+        "--output", str(tmp_path / "results.json"),
+    ])
+
+    assert result.exit_code == 0
+    assert result.output.startswith("arguments: p50=")
+
+    results = json.loads((tmp_path / "results.json").read_text())
+    assert list(results["benchmarks"].keys()) == ["arguments", "spawn"]
+
+    # A very fast baseline to be sure to fail
+    results["benchmarks"]["spawn"]["p50"] = 0.000001
+    (tmp_path / "baseline.json").write_text(json.dumps(results))
+
+    result = runner.invoke(cli_frontend, [
+        "benchmark", "run",
+        "--name", "spawn",
+        "--iterations", "2",
+        "--baseline", str(tmp_path / "baseline.json"),
+    ])
+
+    assert result.exit_code == 1
+
+
+def test_benchmark_generate(tmp_path):
+    """
+    Command generates a project only in an empty directory.
+    """
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "benchmark", "generate",
+        str(tmp_path / "project"),
+        "--entrypoints", "2",
+        "--partials", "6",
+        "--depth", "2",
+        "--load-paths", "0",
+    ])
+
+    assert result.exit_code == 0
+    assert len(list((tmp_path / "project").rglob("*.scss"))) == 8
+
+    result = runner.invoke(cli_frontend, [
+        "benchmark", "generate", str(tmp_path / "project"),
+    ])
+
+    assert result.exit_code == 2
+    assert "Destination directory is not empty" in result.output
@@ -2,6 +2,7 @@
 Pytest fixtures
 """
 import shutil
+import sys
 from pathlib import Path
 
 import pytest
@@ -55,6 +56,15 @@ class FixturesSettingsTestMixin(object):
         )
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch, tmp_path_factory):
+    """
+    Use a temporary user cache directory so tests never write a compile history in
+    the real one.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("cache")))
+
+
 @pytest.fixture(scope="function")
 def temp_builds_dir(tmp_path):
     """
@@ -82,6 +92,34 @@ def source_structure(tmp_path, settings):
     return destination
 
 
+@pytest.fixture(scope="function")
+def fake_sass(settings):
+    """
+    Command to run the stand-in compiler which mimics the dart-sass executable.
+
+    Returns:
+        list: Command items to use as compiler executable.
+    """
+    return [
+        sys.executable,
+        str(settings.datas_path / "scripts" / "fake_sass.py"),
+    ]
+
+
+@pytest.fixture(scope="function")
+def fake_embedded_sass(settings):
+    """
+    Command to run the stand-in compiler which speaks the Embedded Sass Protocol.
+
+    Returns:
+        list: Command items to use as compiler executable.
+    """
+    return [
+        sys.executable,
+        str(settings.datas_path / "scripts" / "fake_embedded_sass.py"),
+    ]
+
+
 @pytest.fixture(scope="module")
 def settings():
     """
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+A small stand-in for ``sass --embedded`` which speaks the Embedded Sass Protocol.
+
+It does not compile anything, the CSS output is just the source content. Some
+markers in source content change its behavior:
+
+* ``@error "message"`` responds with a compile failure;
+* ``@warn "message"`` emits a log event before the response;
+* ``// crash`` makes the process exit immediately with code 3;
+* ``// sleep`` makes the process sleep for 5 seconds before responding;
+"""
+import os
+import re
+import sys
+import time
+
+from flechette_insolente.compiler.protocol import (
+    decode_message, encode_message, encode_packet, get_field, get_string,
+    read_packet,
+)
+
+
+def respond(compilation_id, fields):
+    sys.stdout.buffer.write(encode_packet(compilation_id, encode_message(fields)))
+    sys.stdout.buffer.flush()
+
+
+def compile_request(compilation_id, request):
+    if get_field(request, 2):
+        # Source given as a string, indented syntax is marked in output
+        string = decode_message(get_field(request, 2))
+        path = "-"
+        content = get_string(string, 1)
+        if get_field(string, 3, 0) == 1:
+            content = "/* indented */\n" + content
+    else:
+        path = get_string(request, 3)
+        with open(path) as fp:
+            content = fp.read()
+
+    if "// crash" in content:
+        sys.stderr.write("Fake compiler crashed\n")
+        sys.stderr.flush()
+        os._exit(3)
+
+    if "// sleep" in content:
+        time.sleep(5)
+
+    for warning in re.findall(r'@warn "(.*)";', content):
+        respond(compilation_id, [
+            (3, encode_message([(2, warning), (5, "WARNING: " + warning)])),
+        ])
+
+    errors = re.findall(r'@error "(.*)";', content)
+    if errors:
+        result = (3, encode_message([
+            (1, errors[0]),
+            (4, "Error: {}\n    {} 1:1  root stylesheet".format(errors[0], path)),
+        ]))
+    else:
+        css = content.strip()
+        # Compressed style just remove every line breaks and indentation
+        if get_field(request, 4, 0) == 1:
+            css = re.sub(r"\s*\n\s*", "", css)
+
+        source_map = None
+        if get_field(request, 5):
+            source_map = '{"version":3,"sources":["' + path + '"]}'
+
+        result = (2, encode_message([(1, css), (2, source_map)]))
+
+    respond(compilation_id, [
+        (2, encode_message([result, (4, "file://" + path)])),
+    ])
+
+
+if __name__ == "__main__":
+    while True:
+        packet = read_packet(sys.stdin.buffer)
+        if packet is None:
+            break
+
+        compilation_id, data = packet
+        message = decode_message(data)
+
+        if 7 in message:
+            request = decode_message(get_field(message, 7))
+            respond(0, [
+                (8, encode_message([
+                    (1, "2.0.0"),
+                    (2, "1.0.0-fake"),
+                    (3, "1.0.0-fake"),
+                    (4, "fake-sass"),
+                    (5, get_field(request, 1, 0)),
+                ])),
+            ])
+        elif 2 in message:
+            compile_request(compilation_id, decode_message(get_field(message, 2)))
+        else:
+            respond(compilation_id, [
+                (1, encode_message([(1, 0), (3, "Unsupported message")])),
+            ])
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+A small stand-in for the dart-sass executable with its command line arguments.
+
+It does not compile anything, the CSS output is just the source content. Some
+markers in source content change its behavior:
+
+* ``@error "message";`` makes the compile fail like dart-sass does with a stack trace
+  and exit code 65;
+* ``// sleep <seconds>`` makes the process sleep before compiling;
+* ``@warn "message";`` writes a warning to standard error like dart-sass does;
+
+Source from standard input with ``--indented`` is output with a leading
+``/* indented */`` comment.
+
+Every executed command is appended with the process ID to the file from environment
+variable ``FAKE_SASS_LOG`` if defined.
+"""
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+
+VERSION = "1.0.0-fake"
+
+
+def compile_content(content, style):
+    sleep = re.search(r"// sleep ([\d\.]+)", content)
+    if sleep:
+        time.sleep(float(sleep.group(1)))
+
+    css = content.strip()
+    if style == "compressed":
+        css = re.sub(r"\s*\n\s*", "", css)
+
+    return css
+
+
+def compile_file(source, destination, style, source_map):
+    """
+    Returns an error message if any.
+    """
+    if not source.exists():
+        return 66, "Error reading {}: Cannot open file.".format(source)
+
+    content = source.read_text()
+    errors = re.findall(r'@error "(.*)";', content)
+    if errors:
+        return 65, "\n".join([
+            "Error: {}".format(errors[0]),
+            "  ╷",
+            "1 │ @error \"{}\";".format(errors[0]),
+            "  │ ^^^^^^^^^^^^^^^^^^^^^^^^^^",
+            "  ╵",
+            "  {} 1:1  root stylesheet".format(source),
+        ])
+
+    for warning in re.findall(r'@warn "(.*)";', content):
+        print("WARNING: {}\n    {} 1:1  root stylesheet\n".format(warning, source),
+              file=sys.stderr)
+
+    css = compile_content(content, style)
+
+    if destination is None:
+        print(css)
+        return 0, None
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if source_map:
+        map_path = destination.parent / (destination.name + ".map")
+        map_path.write_text('{"version":3,"sources":["' + str(source) + '"]}')
+        css += "\n\n/*# sourceMappingURL={} */".format(map_path.name)
+    destination.write_text(css + "\n")
+
+    return 0, None
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if os.environ.get("FAKE_SASS_LOG"):
+        with open(os.environ["FAKE_SASS_LOG"], "a") as fp:
+            fp.write("{} {}\n".format(os.getpid(), " ".join(args)))
+
+    if "--version" in args:
+        print(VERSION)
+        sys.exit(0)
+
+    style = "expanded"
+    source_map = True
+    stdin = False
+    indented = False
+    positionals = []
+    while args:
+        arg = args.pop(0)
+        if arg in ("--style", "--load-path"):
+            value = args.pop(0)
+            if arg == "--style":
+                style = value
+        elif arg == "--no-source-map":
+            source_map = False
+        elif arg == "--stdin":
+            stdin = True
+        elif arg == "--indented":
+            indented = True
+        elif not arg.startswith("--"):
+            positionals.append(arg)
+
+    if stdin:
+        content = sys.stdin.read()
+        errors = re.findall(r'@error "(.*)";', content)
+        if errors:
+            print(
+                "Error: {}\n  - 1:1  root stylesheet".format(errors[0]),
+                file=sys.stderr,
+            )
+            sys.exit(65)
+
+        css = compile_content(content, style)
+        if indented:
+            css = "/* indented */\n" + css
+        if positionals:
+            Path(positionals[0]).parent.mkdir(parents=True, exist_ok=True)
+            Path(positionals[0]).write_text(css + "\n")
+        else:
+            print(css)
+        sys.exit(0)
+
+    if len(positionals) == 2 and ":" not in positionals[0]:
+        pairs = [tuple(positionals)]
+    else:
+        pairs = [
+            item.rsplit(":", 1) if ":" in item else (item, None)
+            for item in positionals
+        ]
+
+    targets = []
+    for source, destination in pairs:
+        source = Path(source)
+        destination = Path(destination) if destination else None
+        if source.is_dir():
+            for item in sorted(source.glob("*.scss")):
+                if not item.name.startswith("_"):
+                    targets.append((item, destination / (item.stem + ".css")))
+        else:
+            targets.append((source, destination))
+
+    returncode = 0
+    for source, destination in targets:
+        code, error = compile_file(source, destination, style, source_map)
+        if error:
+            print(error, file=sys.stderr)
+            returncode = max(returncode, code)
+
+    sys.exit(returncode)